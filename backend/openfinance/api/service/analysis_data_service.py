@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from typing import Any, Optional
 
+import numpy as np
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -260,6 +261,20 @@ class AnalysisDataService:
                 logger.warning(f"No K-line data for {stock_code}")
                 return {}
             
+            ads_klines = [
+                ADSKLineModel(
+                    code=k.code,
+                    trade_date=k.trade_date,
+                    open=k.open,
+                    high=k.high,
+                    low=k.low,
+                    close=k.close,
+                    volume=k.volume,
+                    amount=k.amount,
+                )
+                for k in reversed(klines)
+            ]
+            
             for factor_name in factor_names:
                 factor_id = factor_mapping.get(factor_name, f'factor_{factor_name}')
                 
@@ -280,35 +295,23 @@ class AnalysisDataService:
                 if not factor_instance:
                     continue
                 
-                ads_klines = [
-                    ADSKLineModel(
-                        code=k.code,
-                        trade_date=k.trade_date,
-                        open=k.open,
-                        high=k.high,
-                        low=k.low,
-                        close=k.close,
-                        volume=k.volume,
-                        amount=k.amount,
-                    )
-                    for k in reversed(klines)
-                ]
-                
                 lookback = factor_def.lookback_period or 20
                 min_required = max(20, lookback)
                 
                 if len(ads_klines) < min_required:
                     continue
                 
-                factor_values = []
-                for i in range(min_required - 1, len(ads_klines)):
-                    window = ads_klines[:i + 1]
-                    try:
-                        calc_result = factor_instance.calculate(window)
-                        if calc_result and calc_result.value is not None:
-                            factor_values.append((ads_klines[i].trade_date, calc_result.value))
-                    except Exception as calc_error:
-                        logger.debug(f"Factor calculation error: {calc_error}")
+                try:
+                    values = factor_instance.calculate_series(ads_klines)
+                except Exception as calc_error:
+                    logger.debug(f"Factor calculation error: {calc_error}")
+                    continue
+                
+                factor_values = [
+                    (ads_klines[i].trade_date, float(values[i]))
+                    for i in range(min_required - 1, len(ads_klines))
+                    if not np.isnan(values[i])
+                ]
                 
                 if factor_values:
                     result[factor_name] = factor_values
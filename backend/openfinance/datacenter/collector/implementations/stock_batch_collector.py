@@ -470,9 +470,27 @@ class StockBatchCollector(BatchProcessor[StockDataItem, StockDataResult]):
         )
     
     async def on_batch_complete(self, result: BatchResult[StockDataResult]) -> None:
-        """Log batch completion."""
+        """Log batch completion and report new daily bars to the factor cache."""
         total_records = sum(r.data.records_count for r in result.results if r.data)
         
+        watermarks = {
+            r.data.code: r.data.latest_date
+            for r in result.results
+            if r.data
+            and r.data.data_type == DataType.KLINE_DAILY.value
+            and r.data.records_count
+            and r.data.latest_date
+        }
+        if watermarks:
+            try:
+                from openfinance.quant.factors.warmup import notify_bars_committed
+                await notify_bars_committed(watermarks, commit=result.batch_id)
+            except Exception as e:
+                logger.warning_with_context(
+                    "Failed to notify factor cache of new bars",
+                    context={"batch_id": result.batch_id, "error": str(e)}
+                )
+        
         logger.info_with_context(
             "Stock data batch completed",
             context={
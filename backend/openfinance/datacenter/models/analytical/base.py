@@ -189,7 +189,7 @@ class FieldMapping:
     """
     orm_field: str
     ads_field: str
-    transform: callable | None = None
+    transform: "callable | None" = None
     default: Any = None
 
 
@@ -31,6 +31,17 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T", bound=ADSModel)
 ORMModel = TypeVar("ORMModel")
 
+KLINE_ROW_FIELDS = (
+    "open", "high", "low", "close", "volume", "amount", "pre_close",
+    "change", "change_pct", "turnover_rate", "amplitude",
+    "market_cap", "circulating_market_cap",
+)
+
+
+def _kline_columns(table: type[StockDailyQuoteModel]) -> list[Any]:
+    """Numeric K-Line columns of ``stock_daily_quote``, one per ``ADSKLineModel`` field."""
+    return [getattr(table, name) for name in KLINE_ROW_FIELDS]
+
 
 class GenericADSRepository(ABC, Generic[T, ORMModel]):
     """
@@ -121,10 +132,70 @@ class ADSKLineRepository(GenericADSRepository[ADSKLineModel, StockDailyQuoteMode
     async def find_latest(self, code: str, count: int = 100) -> list[ADSKLineModel]:
         return await self.find_by_code(code=code, limit=count)
     
+    async def find_rows_by_code(
+        self,
+        code: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """
+        Fetch raw K-Line rows without building ORM or ADS objects.
+        
+        Rows are plain mappings ordered by trade_date descending, meant for
+        columnar consumers that convert them straight into arrays.
+        """
+        session = await self._get_session()
+        
+        table = StockDailyQuoteModel
+        query = select(
+            table.code, table.trade_date, table.name, *_kline_columns(table),
+        ).where(table.code == code)
+        
+        if start_date:
+            query = query.where(table.trade_date >= start_date)
+        if end_date:
+            query = query.where(table.trade_date <= end_date)
+        
+        query = query.order_by(table.trade_date.desc()).limit(limit)
+        
+        result = await session.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+    
+    async def find_rows_by_codes(
+        self,
+        codes: list[str],
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Fetch raw K-Line rows for many codes in a single query.
+        
+        Same row shape as ``find_rows_by_code``, ordered by code and then
+        trade_date ascending. Bound the date range: there is no row limit.
+        """
+        session = await self._get_session()
+        
+        table = StockDailyQuoteModel
+        query = select(
+            table.code, table.trade_date, *_kline_columns(table),
+        ).where(table.code.in_(codes))
+        
+        if start_date:
+            query = query.where(table.trade_date >= start_date)
+        if end_date:
+            query = query.where(table.trade_date <= end_date)
+        
+        query = query.order_by(table.code, table.trade_date)
+        
+        result = await session.execute(query)
+        return [dict(row) for row in result.mappings().all()]
+    
     async def get_trading_dates(
         self,
         start_date: date | None = None,
         end_date: date | None = None,
+        limit: int | None = None,
     ) -> list[date]:
         session = await self._get_session()
         
@@ -136,6 +207,8 @@ class ADSKLineRepository(GenericADSRepository[ADSKLineModel, StockDailyQuoteMode
             query = query.where(StockDailyQuoteModel.trade_date <= end_date)
         
         query = query.order_by(StockDailyQuoteModel.trade_date.desc())
+        if limit:
+            query = query.limit(limit)
         
         result = await session.execute(query)
         return [r[0] for r in result.all()]
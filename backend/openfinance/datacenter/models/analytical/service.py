@@ -132,6 +132,39 @@ class ADSService:
         
         return data
     
+    async def get_kline_rows(
+        self,
+        code: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """Raw K-Line rows (newest first) for columnar consumers; no per-row validation."""
+        limit = min(limit or self._config.default_limit, self._config.max_limit)
+        
+        return await self._kline_repo.find_rows_by_code(
+            code=code,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+        )
+    
+    async def get_kline_rows_batch(
+        self,
+        codes: list[str],
+        start_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[dict[str, Any]]:
+        """Raw K-Line rows for many codes in one query (code, then trade_date ascending)."""
+        if not codes:
+            return []
+        
+        return await self._kline_repo.find_rows_by_codes(
+            codes=codes,
+            start_date=start_date,
+            end_date=end_date,
+        )
+    
     async def get_kline_by_date(
         self,
         trade_date: date,
@@ -179,10 +212,12 @@ class ADSService:
         self,
         start_date: date | None = None,
         end_date: date | None = None,
+        limit: int | None = None,
     ) -> list[date]:
         return await self._kline_repo.get_trading_dates(
             start_date=start_date,
             end_date=end_date,
+            limit=limit,
         )
     
     async def get_date_range(self, code: str) -> tuple[date | None, date | None]:
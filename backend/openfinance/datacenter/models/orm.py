@@ -609,6 +609,8 @@ class FactorDataModel(Base):
     factor_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
     factor_percentile: Mapped[float | None] = mapped_column(DECIMAL(8, 4), nullable=True)
     neutralized: Mapped[bool] = mapped_column(default=False)
+    factor_zscore: Mapped[float | None] = mapped_column(DECIMAL(12, 6), nullable=True)
+    factor_neutralized: Mapped[float | None] = mapped_column(DECIMAL(20, 8), nullable=True)
     collected_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.utcnow
     )
@@ -226,7 +226,29 @@ class StockDailyQuoteExecutor(TaskExecutor[Any]):
     
     async def save(self, data: list[Any], progress: TaskProgress) -> int:
         from ..persistence import persistence
-        return await persistence.save("stock_daily_quote", data)
+        saved = await persistence.save("stock_daily_quote", data)
+        if saved:
+            await self._notify_factor_cache(data)
+        return saved
+    
+    async def _notify_factor_cache(self, data: list[Any]) -> None:
+        """Invalidate cached factors of stocks with new bars and warm them up."""
+        watermarks: dict[str, date_type] = {}
+        for item in data:
+            code = item.get("code") if isinstance(item, dict) else getattr(item, "code", None)
+            trade_date = item.get("trade_date") if isinstance(item, dict) else getattr(item, "trade_date", None)
+            if isinstance(trade_date, datetime):
+                trade_date = trade_date.date()
+            elif isinstance(trade_date, str):
+                trade_date = date_type.fromisoformat(trade_date[:10])
+            if code and trade_date and (code not in watermarks or trade_date > watermarks[code]):
+                watermarks[code] = trade_date
+        
+        try:
+            from openfinance.quant.factors.warmup import notify_bars_committed
+            await notify_bars_committed(watermarks)
+        except Exception as e:
+            logger.warning(f"Failed to notify factor cache of new bars: {e}")
 
 
 @task_executor(
@@ -508,7 +530,7 @@ class FinancialNewsExecutor(TaskExecutor[Any]):
             name="batch_size",
             type="integer",
             default=50,
-            description="每批处理的股票数量",
+            description="逐只计算时每批处理的股票数量（融合计算一次覆盖全部股票）",
         ),
         TaskParameter(
             name="force",
@@ -516,12 +538,27 @@ class FinancialNewsExecutor(TaskExecutor[Any]):
             default=False,
             description="强制执行，即使今天不是交易日",
         ),
+        TaskParameter(
+            name="fused",
+            type="boolean",
+            default=True,
+            description="融合计算：全部股票只加载一次K线并计算全部因子",
+        ),
+        TaskParameter(
+            name="cross_section",
+            type="boolean",
+            default=True,
+            description="截面处理：计算排名、分位数、标准化值及行业市值中性化值",
+        ),
     ],
     output=TaskOutput(
         data_type="factor_data",
         table_name="factor_data",
         description="因子数据",
-        fields=["factor_id", "code", "trade_date", "value", "signal"],
+        fields=[
+            "factor_id", "code", "trade_date", "value", "signal",
+            "factor_rank", "factor_percentile", "factor_zscore", "factor_neutralized",
+        ],
     ),
     tags=["factor", "quant"],
 )
@@ -550,8 +587,14 @@ class FactorComputeExecutor(TaskExecutor[Any]):
     
     async def _get_engine(self):
         if self._engine is None:
+            import os
             from openfinance.quant.factors.engine import FactorEngine, EngineConfig
-            config = EngineConfig(max_workers=4, use_cache=True, save_to_db=True)
+            config = EngineConfig(
+                max_workers=os.cpu_count() or 4,
+                use_cache=True,
+                save_to_db=False,
+                backend="process",
+            )
             self._engine = FactorEngine(config)
             await self._engine.initialize()
         return self._engine
@@ -562,6 +605,7 @@ class FactorComputeExecutor(TaskExecutor[Any]):
         trade_date_str = params.get("trade_date")
         batch_size = params.get("batch_size", 50)
         force = params.get("force", False)
+        fused = params.get("fused", True)
         
         today = date_type.today()
         
@@ -619,6 +663,31 @@ class FactorComputeExecutor(TaskExecutor[Any]):
         
         engine = await self._get_engine()
         
+        if fused:
+            results = await self._collect_fused(engine, factor_ids, codes, trade_date, progress)
+        else:
+            results = await self._collect_single(engine, factor_ids, codes, trade_date, batch_size, progress)
+        
+        if results and params.get("cross_section", True):
+            industry_map, market_caps = await self._load_neutralization_inputs(codes, trade_date)
+            results = await engine.process_cross_sections(results, industry_map, market_caps)
+            progress.details["neutralization_inputs"] = {
+                "industries": len(industry_map),
+                "market_caps": len(market_caps),
+            }
+        
+        return results
+    
+    async def _collect_single(
+        self,
+        engine,
+        factor_ids: list[str],
+        codes: list[str],
+        trade_date: date_type,
+        batch_size: int,
+        progress: TaskProgress,
+    ) -> list[Any]:
+        """Compute each factor stock by stock."""
         all_results = []
         processed = 0
         
@@ -644,6 +713,63 @@ class FactorComputeExecutor(TaskExecutor[Any]):
         
         return all_results
     
+    async def _collect_fused(
+        self,
+        engine,
+        factor_ids: list[str],
+        codes: list[str],
+        trade_date: date_type,
+        progress: TaskProgress,
+    ) -> list[Any]:
+        """
+        Load the universe's K-lines once and compute every factor on them.
+        
+        The whole universe goes through one ``calculate_fused`` call: ``cs_*``
+        operators in expression factors rank across every stock, so they must
+        never see a batch on its own.
+        """
+        try:
+            results = await engine.calculate_fused(factor_ids, codes, trade_date, persist=False)
+        except Exception as e:
+            logger.warning(f"Failed to calculate factors for {len(codes)} stocks: {e}")
+            results = []
+        progress.processed_records = len(codes) * len(factor_ids)
+        
+        counts = dict.fromkeys(factor_ids, 0)
+        for result in results:
+            counts[result.factor_id] = counts.get(result.factor_id, 0) + 1
+        for factor_id, count in counts.items():
+            logger.info(f"Calculated {factor_id}: {count} results")
+        
+        return results
+    
+    async def _load_neutralization_inputs(
+        self,
+        codes: list[str],
+        trade_date: date_type,
+    ) -> tuple[dict[str, str], dict[str, float]]:
+        """Industry from stock_basic; market cap from the day's quote, else stock_basic."""
+        from ..persistence import persistence
+        from sqlalchemy import text
+        
+        try:
+            async with persistence.session_maker() as session:
+                result = await session.execute(text("""
+                    SELECT b.code, b.industry, COALESCE(q.market_cap, b.market_cap)
+                    FROM openfinance.stock_basic b
+                    LEFT JOIN openfinance.stock_daily_quote q
+                        ON q.code = b.code AND q.trade_date = :trade_date
+                    WHERE b.code = ANY(:codes)
+                """), {"trade_date": trade_date, "codes": codes})
+                rows = result.fetchall()
+        except Exception as e:
+            logger.warning(f"Failed to load industries and market caps: {e}")
+            return {}, {}
+        
+        industry_map = {code: industry for code, industry, _ in rows if industry}
+        market_caps = {code: float(cap) for code, _, cap in rows if cap is not None}
+        return industry_map, market_caps
+    
     async def validate(self, data: list[Any]) -> list[Any]:
         validated = []
         for item in data:
@@ -673,7 +799,16 @@ class FactorComputeExecutor(TaskExecutor[Any]):
                 )
                 factor_results.append(result)
         
-        return await storage.save_factor_data_batch(factor_results)
+        saved = await storage.save_factor_data_batch(factor_results)
+        
+        try:
+            from openfinance.quant.factors.storage.columnar import get_columnar_factor_store
+            store = get_columnar_factor_store()
+            await asyncio.get_running_loop().run_in_executor(None, store.append_results, factor_results)
+        except Exception as e:
+            logger.warning(f"Failed to append factor results to columnar store: {e}")
+        
+        return saved
 
 
 @task_executor(
@@ -2028,7 +2163,7 @@ class CashFlowStatementExecutor(TaskExecutor[Any]):
             name="batch_size",
             type="integer",
             default=50,
-            description="每批处理的股票数量",
+            description="逐只计算时每批处理的股票数量（融合计算一次覆盖全部股票）",
         ),
     ],
     output=TaskOutput(
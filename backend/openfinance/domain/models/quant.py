@@ -71,6 +71,8 @@ class OptimizeMethod(str, enum.Enum):
     RANDOM_SEARCH = "random_search"
     GENETIC = "genetic"
     BAYESIAN = "bayesian"
+    SUCCESSIVE_HALVING = "successive_halving"
+    HYPERBAND = "hyperband"
 
 
 class BacktestStatus(str, enum.Enum):
@@ -309,6 +311,18 @@ class OptimizationConfig(BaseModel):
     max_iterations: int = Field(default=100, description="Maximum iterations")
     n_jobs: int = Field(default=1, description="Parallel jobs")
     seed: int | None = Field(default=None, description="Random seed")
+    target_score: float | None = Field(
+        default=None,
+        description="Stop once a candidate reaches this objective score",
+    )
+    eta: int = Field(
+        default=3,
+        description="Successive halving / Hyperband reduction factor",
+    )
+    min_budget: float = Field(
+        default=1 / 9,
+        description="Shortest backtest window, as a share of the full period",
+    )
 
 
 class OptimizationResult(BaseModel):
@@ -7,9 +7,15 @@ Provides backtesting and performance evaluation capabilities.
 from openfinance.quant.backtest.engine import BacktestEngine
 from openfinance.quant.backtest.metrics import BacktestCalculator
 from openfinance.quant.backtest.attribution import AttributionAnalyzer
+from openfinance.quant.backtest.simulation import PortfolioSimulator, PriceMatrix
+from openfinance.quant.backtest.panel import MarketPanel, SharedMarketPanel
 
 __all__ = [
     "BacktestEngine",
     "BacktestCalculator",
     "AttributionAnalyzer",
+    "PortfolioSimulator",
+    "PriceMatrix",
+    "MarketPanel",
+    "SharedMarketPanel",
 ]
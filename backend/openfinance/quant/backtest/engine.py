@@ -24,9 +24,17 @@ from openfinance.domain.models.quant import (
     DailyPosition,
     PerformanceMetrics,
     FactorValue,
+    WeightMethod,
 )
 from openfinance.quant.strategy.engine import StrategyEngine
 from openfinance.quant.backtest.metrics import BacktestCalculator
+from openfinance.quant.backtest.panel import MarketPanel
+from openfinance.quant.backtest.simulation import (
+    PortfolioSimulator,
+    PriceMatrix,
+    factor_values_on,
+    index_factor_values,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +47,14 @@ class BacktestEngine:
     - Trade simulation with realistic costs
     - Performance metrics calculation
     - Benchmark comparison
+
+    By default the simulation runs on a pivoted price matrix
+    (see ``simulation.py``); ``vectorized=False`` selects the original
+    event loop, which produces the same results.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, vectorized: bool = True) -> None:
+        self._vectorized = vectorized
         self._strategy_engine = StrategyEngine()
         self._performance_calc = BacktestCalculator()
         self._backtest_results: dict[str, BacktestResult] = {}
@@ -71,106 +84,14 @@ class BacktestEngine:
         try:
             price_data = self._prepare_price_data(price_data, config)
 
-            dates = sorted(price_data["trade_date"].unique())
-
-            equity_curve: list[DailyEquity] = []
-            positions: list[DailyPosition] = []
-            trades: list[TradeRecord] = []
-
-            cash = config.initial_capital
-            current_positions: dict[str, dict[str, Any]] = {}
-
-            rebalance_dates = self._get_rebalance_dates(
-                dates,
-                strategy.rebalance_freq,
-            )
-            
-            logger.info(f"Backtest: {len(dates)} dates, {len(rebalance_dates)} rebalance dates")
-
-            for i, date in enumerate(dates):
-                daily_data = price_data[price_data["trade_date"] == date]
-
-                if date in rebalance_dates:
-                    signals = self._generate_signals(
-                        strategy,
-                        daily_data,
-                        factor_values,
-                        date,
-                    )
-                    
-                    logger.info(f"Date {date}: generated {len(signals)} signals")
-
-                    weights = self._strategy_engine.calculate_weights(
-                        strategy,
-                        signals,
-                        daily_data,
-                    )
-                    
-                    logger.info(f"Date {date}: calculated {len(weights)} weights")
-
-                    trades_today = self._rebalance_portfolio(
-                        current_positions,
-                        weights,
-                        daily_data,
-                        cash,
-                        config,
-                        date,
-                    )
-                    trades.extend(trades_today)
-                    
-                    if trades_today:
-                        logger.info(f"Date {date}: executed {len(trades_today)} trades")
-
-                    for trade in trades_today:
-                        if trade.direction == "buy":
-                            cash -= trade.amount + trade.commission + trade.slippage
-                        else:
-                            cash += trade.amount - trade.commission - trade.slippage
-
-                    current_positions = self._update_positions(
-                        current_positions,
-                        trades_today,
-                        daily_data,
-                    )
-
-                position_value = sum(
-                    pos["quantity"] * pos["price"]
-                    for pos in current_positions.values()
+            if self._vectorized:
+                dates, equity_curve, positions, trades = self._simulate_vectorized(
+                    strategy, config, price_data, factor_values,
+                )
+            else:
+                dates, equity_curve, positions, trades = self._simulate_event_loop(
+                    strategy, config, price_data, factor_values,
                 )
-                total_equity = cash + position_value
-
-                daily_return = 0.0
-                if equity_curve:
-                    prev_equity = equity_curve[-1].equity
-                    daily_return = (total_equity - prev_equity) / prev_equity if prev_equity > 0 else 0
-
-                cumulative_return = (total_equity / config.initial_capital - 1)
-
-                drawdown = 0.0
-                if equity_curve:
-                    peak = max(e.equity for e in equity_curve)
-                    drawdown = (peak - total_equity) / peak if peak > 0 else 0
-
-                equity_curve.append(DailyEquity(
-                    date=date,
-                    equity=total_equity,
-                    cash=cash,
-                    position_value=position_value,
-                    daily_return=daily_return,
-                    cumulative_return=cumulative_return,
-                    drawdown=drawdown,
-                ))
-
-                for stock_code, pos in current_positions.items():
-                    stock_price = self._get_stock_price(daily_data, stock_code)
-                    if stock_price:
-                        positions.append(DailyPosition(
-                            date=date,
-                            stock_code=stock_code,
-                            quantity=pos["quantity"],
-                            market_value=pos["quantity"] * stock_price,
-                            weight=pos["quantity"] * stock_price / total_equity if total_equity > 0 else 0,
-                        ))
 
             benchmark_curve = self._calculate_benchmark_curve(
                 benchmark_data,
@@ -218,6 +139,232 @@ class BacktestEngine:
                 error=str(e),
             )
 
+    def run_panel(
+        self,
+        strategy: Strategy,
+        config: BacktestConfig,
+        panel: MarketPanel,
+    ) -> BacktestResult:
+        """Run a backtest on a prebuilt market panel.
+
+        Synchronous and CPU-bound, for parameter sweeps that evaluate many
+        candidates against the same data, typically in worker processes.
+        Signals come from ``MarketPanel.signals``; benchmark metrics are
+        left at their defaults. Results are not stored on the engine.
+
+        Args:
+            strategy: Strategy to backtest.
+            config: Backtest configuration.
+            panel: Market panel covering the backtest period.
+
+        Returns:
+            BacktestResult with equity curve, trades and metrics.
+        """
+        start_time = time.time()
+
+        try:
+            window = panel.between(config.start_date, config.end_date)
+            prices = window.price_matrix()
+            simulator = PortfolioSimulator(prices, config)
+            rebalance_dates = self._get_rebalance_dates(
+                prices.dates,
+                strategy.rebalance_freq,
+            )
+            market_cap_weighted = strategy.weight_method == WeightMethod.MARKET_CAP
+
+            trades: list[TradeRecord] = []
+            for i, date in enumerate(prices.dates):
+                if date not in rebalance_dates:
+                    continue
+                signals = window.signals(strategy, i)
+                weights = self._strategy_engine.calculate_weights(
+                    strategy,
+                    signals,
+                    window.daily_frame(i) if market_cap_weighted else None,
+                )
+                trades.extend(simulator.rebalance(i, weights))
+
+            equity_curve = simulator.equity_curve()
+            metrics = self._performance_calc.calculate(equity_curve, [], config)
+
+            return BacktestResult(
+                backtest_id=config.backtest_id,
+                strategy_id=strategy.strategy_id,
+                config=config,
+                status=BacktestStatus.COMPLETED,
+                equity_curve=equity_curve,
+                trades=trades,
+                metrics=metrics,
+                start_date=config.start_date,
+                end_date=config.end_date,
+                duration_ms=(time.time() - start_time) * 1000,
+            )
+
+        except Exception as e:
+            logger.exception(f"Panel backtest failed: {strategy.strategy_id}")
+            return BacktestResult(
+                backtest_id=config.backtest_id,
+                strategy_id=strategy.strategy_id,
+                config=config,
+                status=BacktestStatus.FAILED,
+                start_date=config.start_date,
+                end_date=config.end_date,
+                duration_ms=(time.time() - start_time) * 1000,
+                error=str(e),
+            )
+
+    def _simulate_event_loop(
+        self,
+        strategy: Strategy,
+        config: BacktestConfig,
+        price_data: pd.DataFrame,
+        factor_values: dict[str, list[FactorValue]] | None,
+    ) -> tuple[list, list[DailyEquity], list[DailyPosition], list[TradeRecord]]:
+        """Reference simulation, one DataFrame filter per date and holding."""
+        dates = sorted(price_data["trade_date"].unique())
+
+        equity_curve: list[DailyEquity] = []
+        positions: list[DailyPosition] = []
+        trades: list[TradeRecord] = []
+
+        cash = config.initial_capital
+        current_positions: dict[str, dict[str, Any]] = {}
+
+        rebalance_dates = self._get_rebalance_dates(
+            dates,
+            strategy.rebalance_freq,
+        )
+        
+        logger.info(f"Backtest: {len(dates)} dates, {len(rebalance_dates)} rebalance dates")
+
+        for i, date in enumerate(dates):
+            daily_data = price_data[price_data["trade_date"] == date]
+
+            if date in rebalance_dates:
+                signals = self._generate_signals(
+                    strategy,
+                    daily_data,
+                    factor_values,
+                    date,
+                )
+                
+                logger.info(f"Date {date}: generated {len(signals)} signals")
+
+                weights = self._strategy_engine.calculate_weights(
+                    strategy,
+                    signals,
+                    daily_data,
+                )
+                
+                logger.info(f"Date {date}: calculated {len(weights)} weights")
+
+                trades_today = self._rebalance_portfolio(
+                    current_positions,
+                    weights,
+                    daily_data,
+                    cash,
+                    config,
+                    date,
+                )
+                trades.extend(trades_today)
+                
+                if trades_today:
+                    logger.info(f"Date {date}: executed {len(trades_today)} trades")
+
+                for trade in trades_today:
+                    if trade.direction == "buy":
+                        cash -= trade.amount + trade.commission + trade.slippage
+                    else:
+                        cash += trade.amount - trade.commission - trade.slippage
+
+                current_positions = self._update_positions(
+                    current_positions,
+                    trades_today,
+                    daily_data,
+                )
+
+            position_value = sum(
+                pos["quantity"] * pos["price"]
+                for pos in current_positions.values()
+            )
+            total_equity = cash + position_value
+
+            daily_return = 0.0
+            if equity_curve:
+                prev_equity = equity_curve[-1].equity
+                daily_return = (total_equity - prev_equity) / prev_equity if prev_equity > 0 else 0
+
+            cumulative_return = (total_equity / config.initial_capital - 1)
+
+            drawdown = 0.0
+            if equity_curve:
+                peak = max(e.equity for e in equity_curve)
+                drawdown = (peak - total_equity) / peak if peak > 0 else 0
+
+            equity_curve.append(DailyEquity(
+                date=date,
+                equity=total_equity,
+                cash=cash,
+                position_value=position_value,
+                daily_return=daily_return,
+                cumulative_return=cumulative_return,
+                drawdown=drawdown,
+            ))
+
+            for stock_code, pos in current_positions.items():
+                stock_price = self._get_stock_price(daily_data, stock_code)
+                if stock_price:
+                    positions.append(DailyPosition(
+                        date=date,
+                        stock_code=stock_code,
+                        quantity=pos["quantity"],
+                        market_value=pos["quantity"] * stock_price,
+                        weight=pos["quantity"] * stock_price / total_equity if total_equity > 0 else 0,
+                    ))
+
+        return dates, equity_curve, positions, trades
+
+    def _simulate_vectorized(
+        self,
+        strategy: Strategy,
+        config: BacktestConfig,
+        price_data: pd.DataFrame,
+        factor_values: dict[str, list[FactorValue]] | None,
+    ) -> tuple[list, list[DailyEquity], list[DailyPosition], list[TradeRecord]]:
+        """Simulation on a pivoted price matrix; same results as the event loop."""
+        prices = PriceMatrix.from_frame(price_data)
+        simulator = PortfolioSimulator(prices, config)
+        indexed = index_factor_values(factor_values) if factor_values else None
+
+        rebalance_dates = self._get_rebalance_dates(
+            prices.dates,
+            strategy.rebalance_freq,
+        )
+
+        logger.info(f"Backtest: {len(prices)} dates, {len(rebalance_dates)} rebalance dates")
+
+        trades: list[TradeRecord] = []
+        for i, date in enumerate(prices.dates):
+            if date not in rebalance_dates:
+                continue
+
+            daily_data = prices.daily_frame(i)
+            day_values = factor_values_on(factor_values, indexed, date) if indexed is not None else None
+            signals = self._generate_signals(
+                strategy,
+                daily_data,
+                day_values,
+                date,
+            )
+            weights = self._strategy_engine.calculate_weights(
+                strategy,
+                signals,
+                daily_data,
+            )
+            trades.extend(simulator.rebalance(i, weights))
+
+        return prices.dates, simulator.equity_curve(), simulator.daily_positions(), trades
+
     def _prepare_price_data(
         self,
         price_data: pd.DataFrame,
@@ -289,13 +436,15 @@ class BacktestEngine:
                 factor_values,
                 date,
             )
-        else:
-            for _, row in daily_data.iterrows():
-                stock_code = row.get("stock_code", "")
-                if "momentum_20" in row:
-                    signals[stock_code] = row["momentum_20"]
-                elif "close" in row and len(daily_data) > 20:
-                    signals[stock_code] = np.random.randn()
+        elif len(daily_data):
+            if "stock_code" in daily_data.columns:
+                codes = daily_data["stock_code"].tolist()
+            else:
+                codes = [""] * len(daily_data)
+            if "momentum_20" in daily_data.columns:
+                signals = dict(zip(codes, daily_data["momentum_20"].tolist()))
+            elif "close" in daily_data.columns and len(daily_data) > 20:
+                signals = dict(zip(codes, np.random.randn(len(codes)).tolist()))
 
         return signals
 
@@ -433,10 +582,12 @@ class BacktestEngine:
         initial_value = config.initial_capital
         prev_value = initial_value
 
+        last_rows = benchmark_data.drop_duplicates("trade_date", keep="last")
+        returns = dict(zip(last_rows["trade_date"], last_rows["daily_return"].tolist()))
+
         for date in dates:
-            bench_data = benchmark_data[benchmark_data["trade_date"] == date]
-            if not bench_data.empty:
-                daily_return = float(bench_data["daily_return"].iloc[-1])
+            if date in returns:
+                daily_return = float(returns[date])
                 current_value = prev_value * (1 + daily_return)
 
                 curve.append(DailyEquity(
@@ -0,0 +1,299 @@
+"""
+Market Panel for Repeated Backtests.
+
+A ``MarketPanel`` holds everything a factor strategy backtest reads as
+(dates x codes) float64 arrays: close prices, optional per-stock fields
+such as market cap, and factor signals. Parameter sweeps build it once and
+run every candidate against it with ``BacktestEngine.run_panel``.
+
+``SharedMarketPanel`` moves a panel's arrays into named shared memory
+blocks, so worker processes attach to one copy of the market data instead
+of each unpickling their own.
+"""
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from openfinance.domain.models.quant import FactorValue, Strategy, StrategyType
+from openfinance.quant.backtest.simulation import PriceMatrix, pivot_column
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIELDS = ("market_cap", "momentum_20")
+
+
+@dataclass
+class MarketPanel:
+    """Close prices, stock fields and factor signals on one (dates x codes) grid.
+
+    ``close`` is NaN where a stock has no positive close. Factor arrays hold
+    the signal the strategy engine would use (z-score when present, else
+    the raw value), NaN where missing.
+    """
+
+    dates: np.ndarray
+    codes: list[str]
+    close: np.ndarray
+    fields: dict[str, np.ndarray] = field(default_factory=dict)
+    factors: dict[str, np.ndarray] = field(default_factory=dict)
+    _last_rows: dict[str, np.ndarray] = field(default_factory=dict, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return int(self.dates.shape[0])
+
+    @classmethod
+    def from_frame(
+        cls,
+        price_data: pd.DataFrame,
+        factor_values: dict[str, list[FactorValue]] | None = None,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+    ) -> "MarketPanel":
+        """Pivot a price frame and factor values onto one grid.
+
+        Args:
+            price_data: Rows with trade_date, stock_code and close.
+            factor_values: Factor values by factor ID.
+            fields: Extra numeric columns of ``price_data`` to keep.
+        """
+        date_idx, dates = pd.factorize(price_data["trade_date"], sort=True)
+        code_idx, codes = pd.factorize(price_data["stock_code"], sort=True)
+        shape = (len(dates), len(codes))
+
+        close = pivot_column(price_data["close"], date_idx, code_idx, shape)
+        close[~(close > 0)] = np.nan
+        panel = cls(
+            dates=pd.DatetimeIndex(dates).to_numpy(dtype="datetime64[ns]"),
+            codes=list(codes),
+            close=close,
+            fields={
+                name: pivot_column(price_data[name], date_idx, code_idx, shape)
+                for name in fields if name in price_data.columns
+            },
+        )
+        for factor_id, values in (factor_values or {}).items():
+            signals = [
+                (v.trade_date, v.stock_code, v.zscore if v.zscore is not None else v.value)
+                for v in values
+            ]
+            signals = [s for s in signals if s[2] is not None]
+            if not signals:
+                continue
+            trade_dates, stock_codes, signal = zip(*signals, strict=True)
+            panel.add_factor(factor_id, trade_dates, stock_codes, signal)
+        return panel
+
+    def add_factor(
+        self,
+        factor_id: str,
+        dates: Sequence[datetime] | np.ndarray,
+        codes: Sequence[str],
+        values: Sequence[float] | np.ndarray,
+    ) -> None:
+        """Align factor observations onto the panel grid.
+
+        Accepts either parallel sequences of observations, or a
+        (dates x codes) block such as a columnar store ``FactorPanel``
+        when ``values`` is two-dimensional. Dates are matched by calendar
+        day; observations off the grid are dropped.
+        """
+        values = np.asarray(values, dtype=float)
+        day_index = pd.Index(self.dates.astype("datetime64[D]"))
+        code_index = pd.Index(self.codes)
+        rows = day_index.get_indexer(pd.to_datetime(np.asarray(dates)).to_numpy().astype("datetime64[D]"))
+        cols = code_index.get_indexer(list(codes))
+
+        matrix = np.full(self.close.shape, np.nan)
+        if values.ndim == 2:
+            keep_rows, keep_cols = rows >= 0, cols >= 0
+            matrix[np.ix_(rows[keep_rows], cols[keep_cols])] = values[np.ix_(keep_rows, keep_cols)]
+        else:
+            keep = (rows >= 0) & (cols >= 0)
+            matrix[rows[keep], cols[keep]] = values[keep]
+        self.factors[factor_id] = matrix
+        self._last_rows.pop(factor_id, None)
+
+    def between(self, start: datetime | None = None, end: datetime | None = None) -> "MarketPanel":
+        """Dates within [start, end], sharing memory with this panel."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start, "ns"), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.dates, np.datetime64(end, "ns"), side="right"))
+        return MarketPanel(
+            dates=self.dates[lo:hi],
+            codes=self.codes,
+            close=self.close[lo:hi],
+            fields={name: values[lo:hi] for name, values in self.fields.items()},
+            factors={name: values[lo:hi] for name, values in self.factors.items()},
+        )
+
+    def price_matrix(self) -> PriceMatrix:
+        """Close prices as a simulator input."""
+        return PriceMatrix(
+            dates=list(pd.DatetimeIndex(self.dates)),
+            codes=self.codes,
+            close=self.close,
+        )
+
+    def daily_frame(self, i: int) -> pd.DataFrame:
+        """Priced stocks of the ``i``-th date with their fields."""
+        priced = ~np.isnan(self.close[i])
+        data = {
+            "trade_date": pd.Timestamp(self.dates[i]),
+            "stock_code": np.asarray(self.codes, dtype=object)[priced],
+            "close": self.close[i, priced],
+        }
+        for name, values in self.fields.items():
+            data[name] = values[i, priced]
+        return pd.DataFrame(data)
+
+    def signals(self, strategy: Strategy, i: int) -> dict[str, float]:
+        """Signals of the ``i``-th date, combined like the strategy engine.
+
+        Single-factor strategies use their first factor; other types sum
+        factor signals times factor weights (equal weights by default). A
+        date without any value of a factor falls back to that factor's
+        latest earlier date. Without factor data the ``momentum_20`` field
+        is used.
+        """
+        if not self.factors:
+            momentum = self.fields.get("momentum_20")
+            if momentum is None:
+                return {}
+            return self._to_signals(momentum[i], ~np.isnan(self.close[i]))
+
+        if not strategy.factors:
+            return {}
+        if strategy.strategy_type == StrategyType.SINGLE_FACTOR:
+            row = self._factor_row(strategy.factors[0], i)
+            if row is None:
+                return {}
+            return self._to_signals(row, ~np.isnan(row))
+
+        weights = strategy.factor_weights or {
+            factor_id: 1.0 / len(strategy.factors) for factor_id in strategy.factors
+        }
+        combined = np.zeros(len(self.codes))
+        present = np.zeros(len(self.codes), dtype=bool)
+        for factor_id in strategy.factors:
+            row = self._factor_row(factor_id, i)
+            if row is None:
+                continue
+            finite = ~np.isnan(row)
+            combined[finite] += row[finite] * weights.get(factor_id, 0.0)
+            present |= finite
+        return self._to_signals(combined, present)
+
+    def _factor_row(self, factor_id: str, i: int) -> np.ndarray | None:
+        values = self.factors.get(factor_id)
+        if values is None:
+            return None
+        last_rows = self._last_rows.get(factor_id)
+        if last_rows is None:
+            has_data = ~np.isnan(values).all(axis=1)
+            last_rows = np.maximum.accumulate(np.where(has_data, np.arange(len(values)), -1))
+            self._last_rows[factor_id] = last_rows
+        j = last_rows[i]
+        return values[j] if j >= 0 else None
+
+    def _to_signals(self, row: np.ndarray, mask: np.ndarray) -> dict[str, float]:
+        idx = np.flatnonzero(mask)
+        return dict(zip([self.codes[j] for j in idx.tolist()], row[idx].tolist(), strict=True))
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """All arrays by block name."""
+        blocks = {"dates": self.dates, "close": self.close}
+        blocks.update({f"field:{name}": values for name, values in self.fields.items()})
+        blocks.update({f"factor:{name}": values for name, values in self.factors.items()})
+        return blocks
+
+    @classmethod
+    def from_arrays(cls, codes: list[str], blocks: dict[str, np.ndarray]) -> "MarketPanel":
+        """Inverse of ``arrays``."""
+        return cls(
+            dates=blocks["dates"],
+            codes=codes,
+            close=blocks["close"],
+            fields={k[6:]: v for k, v in blocks.items() if k.startswith("field:")},
+            factors={k[7:]: v for k, v in blocks.items() if k.startswith("factor:")},
+        )
+
+
+@dataclass(frozen=True)
+class SharedPanelHandle:
+    """Picklable description of a ``SharedMarketPanel``: block name, shape and dtype per array."""
+
+    codes: list[str]
+    blocks: dict[str, tuple[str, tuple[int, ...], str]]
+
+
+class SharedMarketPanel:
+    """
+    A ``MarketPanel`` whose arrays live in shared memory.
+
+    The creating process owns the blocks and unlinks them on ``close``;
+    other processes ``attach`` through the handle and only map them.
+    Attached arrays are read-only.
+    """
+
+    def __init__(self, panel: MarketPanel):
+        self._segments: list[shared_memory.SharedMemory] = []
+        self._owner = True
+        blocks = {}
+        views = {}
+        try:
+            for key, values in panel.arrays().items():
+                values = np.ascontiguousarray(values)
+                segment = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                self._segments.append(segment)
+                view = np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)
+                view[...] = values
+                blocks[key] = (segment.name, values.shape, values.dtype.str)
+                views[key] = view
+        except BaseException:
+            self.close()
+            raise
+        self.handle = SharedPanelHandle(codes=list(panel.codes), blocks=blocks)
+        self.panel = MarketPanel.from_arrays(self.handle.codes, views)
+
+    @classmethod
+    def attach(cls, handle: SharedPanelHandle) -> "SharedMarketPanel":
+        """Map the blocks of a panel shared by another process."""
+        shared = cls.__new__(cls)
+        shared._segments = []
+        shared._owner = False
+        shared.handle = handle
+        views = {}
+        for key, (name, shape, dtype) in handle.blocks.items():
+            segment = shared_memory.SharedMemory(name=name)
+            shared._segments.append(segment)
+            view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+            view.flags.writeable = False
+            views[key] = view
+        shared.panel = MarketPanel.from_arrays(handle.codes, views)
+        return shared
+
+    @property
+    def nbytes(self) -> int:
+        return sum(segment.size for segment in self._segments)
+
+    def close(self) -> None:
+        """Release the mapping; the owner also frees the blocks."""
+        self.panel = None
+        segments, self._segments = self._segments, []
+        for segment in segments:
+            try:
+                segment.close()
+            except BufferError:
+                logger.warning(f"Shared panel block {segment.name} still referenced")
+            if self._owner:
+                segment.unlink()
+
+    def __enter__(self) -> "SharedMarketPanel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,82 @@
+"""
+Market Panel Tests.
+
+Panel backtests must match BacktestEngine.run when factor data covers every
+rebalance date, and shared panels must round-trip through shared memory.
+"""
+
+import asyncio
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from openfinance.domain.models.quant import StrategyType, WeightMethod
+from openfinance.quant.backtest.engine import BacktestEngine
+from openfinance.quant.backtest.panel import MarketPanel, SharedMarketPanel
+from openfinance.quant.backtest.tests.test_simulation import (
+    _config,
+    _factor_values,
+    _price_frame,
+    _strategy,
+)
+
+
+class TestMarketPanel(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = _price_frame(n_dates=70, seed=2)
+        self.factor_values = _factor_values(self.frame, seed=3)
+        self.panel = MarketPanel.from_frame(self.frame, self.factor_values)
+
+    def test_matches_engine_run(self):
+        engine = BacktestEngine()
+        factor_values = _factor_values(self.frame, seed=3, weekdays=5)
+        panel = MarketPanel.from_frame(self.frame, factor_values)
+        for freq, method in (("weekly", WeightMethod.EQUAL), ("monthly", WeightMethod.MARKET_CAP)):
+            with self.subTest(freq=freq, method=method):
+                strategy = _strategy(freq, method)
+                expected = asyncio.run(engine.run(strategy, _config(), self.frame, factor_values))
+                result = engine.run_panel(strategy, _config(), panel)
+                self.assertEqual(
+                    [t.model_dump(exclude={"trade_id"}) for t in result.trades],
+                    [t.model_dump(exclude={"trade_id"}) for t in expected.trades],
+                )
+                self.assertEqual(result.equity_curve, expected.equity_curve)
+                self.assertEqual(result.metrics.sharpe_ratio, expected.metrics.sharpe_ratio)
+
+    def test_signals_fall_back_to_latest_earlier_date(self):
+        dates = pd.DatetimeIndex(self.panel.dates)
+        thursday = int(np.flatnonzero(dates.dayofweek == 3)[0])
+        strategy = _strategy("daily")
+        self.assertEqual(self.panel.signals(strategy, thursday), self.panel.signals(strategy, thursday - 1))
+
+        strategy = _strategy("daily").model_copy(update={
+            "strategy_type": StrategyType.MULTI_FACTOR,
+            "factors": ["factor_x", "missing"],
+            "factor_weights": {"factor_x": 2.0},
+        })
+        single = self.panel.signals(_strategy("daily"), 0)
+        combined = self.panel.signals(strategy, 0)
+        self.assertEqual(combined.keys(), single.keys())
+        self.assertAlmostEqual(combined["600000"], 2 * single["600000"])
+
+    def test_shared_round_trip(self):
+        with SharedMarketPanel(self.panel) as shared:
+            attached = SharedMarketPanel.attach(shared.handle)
+            np.testing.assert_array_equal(attached.panel.close, self.panel.close)
+            np.testing.assert_array_equal(attached.panel.dates, self.panel.dates)
+            np.testing.assert_array_equal(
+                attached.panel.factors["factor_x"], self.panel.factors["factor_x"],
+            )
+            self.assertEqual(sorted(attached.panel.fields), ["market_cap", "momentum_20"])
+            self.assertFalse(attached.panel.close.flags.writeable)
+
+            result = BacktestEngine().run_panel(_strategy("weekly"), _config(), attached.panel)
+            self.assertGreater(len(result.trades), 0)
+            attached.panel = result = None
+            attached.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
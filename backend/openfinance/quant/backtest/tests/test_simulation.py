@@ -0,0 +1,166 @@
+"""
+Backtest Simulation Tests.
+
+The vectorized core must reproduce the event loop record for record.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from openfinance.domain.models.quant import (
+    BacktestConfig,
+    BacktestStatus,
+    FactorValue,
+    Strategy,
+    StrategyType,
+    WeightMethod,
+)
+from openfinance.quant.backtest.engine import BacktestEngine
+from openfinance.quant.backtest.simulation import PriceMatrix
+
+
+def _price_frame(n_dates=90, n_stocks=40, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-02", periods=n_dates)
+    codes = [f"{600000 + j}" for j in range(n_stocks)]
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_dates, n_stocks)), axis=0))
+    frame = pd.DataFrame({
+        "trade_date": np.repeat(dates, n_stocks),
+        "stock_code": np.tile(codes, n_dates),
+        "close": close.ravel(),
+        "market_cap": rng.uniform(1e9, 1e11, n_dates * n_stocks),
+        "momentum_20": rng.normal(size=n_dates * n_stocks),
+    })
+    missing = rng.random(len(frame)) < 0.05
+    frame = frame[~missing]
+    return frame.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def _factor_values(frame, seed=1, weekdays=3):
+    rng = np.random.default_rng(seed)
+    rows = frame[frame["trade_date"].dt.dayofweek < weekdays]
+    return {
+        "factor_x": [
+            FactorValue(factor_id="factor_x", stock_code=code, trade_date=d, value=float(v))
+            for code, d, v in zip(rows["stock_code"], rows["trade_date"], rng.normal(size=len(rows)), strict=True)
+        ],
+    }
+
+
+def _strategy(freq, weight_method=WeightMethod.EQUAL, max_positions=10):
+    return Strategy(
+        name="test",
+        code="test",
+        strategy_type=StrategyType.SINGLE_FACTOR,
+        factors=["factor_x"],
+        weight_method=weight_method,
+        rebalance_freq=freq,
+        max_positions=max_positions,
+    )
+
+
+def _config():
+    return BacktestConfig(
+        backtest_id="bt_test",
+        strategy_id="test",
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 12, 31),
+        initial_capital=1_000_000.0,
+    )
+
+
+def _run(vectorized, strategy, frame, factor_values=None, benchmark=None):
+    engine = BacktestEngine(vectorized=vectorized)
+    return asyncio.run(engine.run(strategy, _config(), frame, factor_values, benchmark))
+
+
+class TestPriceMatrix(unittest.TestCase):
+
+    def test_pivot(self):
+        frame = pd.DataFrame({
+            "trade_date": pd.to_datetime(["2024-01-03", "2024-01-02", "2024-01-03", "2024-01-03"]),
+            "stock_code": ["b", "a", "a", "a"],
+            "close": [2.0, 1.0, 0.0, 3.0],
+        })
+        prices = PriceMatrix.from_frame(frame)
+        self.assertEqual(prices.codes, ["a", "b"])
+        np.testing.assert_array_equal(prices.close, [[1.0, np.nan], [3.0, 2.0]])
+        self.assertEqual(prices.daily_frame(1)["close"].tolist(), [2.0, 0.0, 3.0])
+
+
+class TestVectorizedMatchesEventLoop(unittest.TestCase):
+
+    def assertSameResult(self, fast, slow):
+        self.assertEqual(fast.status, BacktestStatus.COMPLETED, fast.error)
+        self.assertEqual(slow.status, BacktestStatus.COMPLETED, slow.error)
+        self.assertGreater(len(fast.trades), 0)
+        exclude = {"trade_id"}
+        self.assertEqual(
+            [t.model_dump(exclude=exclude) for t in fast.trades],
+            [t.model_dump(exclude=exclude) for t in slow.trades],
+        )
+        self.assertEqual(
+            [e.model_dump() for e in fast.equity_curve],
+            [e.model_dump() for e in slow.equity_curve],
+        )
+        self.assertEqual(
+            [p.model_dump() for p in fast.positions],
+            [p.model_dump() for p in slow.positions],
+        )
+        self.assertEqual(fast.metrics, slow.metrics)
+
+    def test_factor_strategies(self):
+        frame = _price_frame()
+        factor_values = _factor_values(frame)
+        cases = [
+            ("daily", WeightMethod.EQUAL),
+            ("weekly", WeightMethod.MARKET_CAP),
+            ("monthly", WeightMethod.RISK_PARITY),
+        ]
+        for freq, method in cases:
+            with self.subTest(freq=freq, method=method):
+                strategy = _strategy(freq, method)
+                self.assertSameResult(
+                    _run(True, strategy, frame, factor_values),
+                    _run(False, strategy, frame, factor_values),
+                )
+
+    def test_price_signals_and_benchmark(self):
+        frame = _price_frame(seed=3)
+        dates = sorted(frame["trade_date"].unique())
+        benchmark = pd.DataFrame({
+            "trade_date": dates[::2],
+            "daily_return": np.random.default_rng(4).normal(0, 0.01, len(dates[::2])),
+        })
+        strategy = _strategy("weekly", max_positions=5)
+        fast = _run(True, strategy, frame, benchmark=benchmark)
+        slow = _run(False, strategy, frame, benchmark=benchmark)
+        self.assertSameResult(fast, slow)
+        self.assertEqual(len(fast.benchmark_curve), len(dates[::2]))
+        self.assertEqual(
+            [e.model_dump() for e in fast.benchmark_curve],
+            [e.model_dump() for e in slow.benchmark_curve],
+        )
+
+    def test_random_signals(self):
+        frame = _price_frame(n_dates=40, seed=5).drop(columns=["momentum_20"])
+        strategy = _strategy("weekly")
+        np.random.seed(7)
+        fast = _run(True, strategy, frame)
+        np.random.seed(7)
+        slow = _run(False, strategy, frame)
+        self.assertSameResult(fast, slow)
+
+    def test_no_rebalance(self):
+        result = _run(True, _strategy("yearly"), _price_frame(n_dates=10))
+        self.assertEqual(result.trades, [])
+        self.assertEqual(len(result.equity_curve), 10)
+        self.assertTrue(all(e.equity == 1_000_000.0 for e in result.equity_curve))
+
+
+if __name__ == "__main__":
+    unittest.main()
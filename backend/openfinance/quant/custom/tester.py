@@ -21,6 +21,16 @@ from openfinance.domain.models.quant import (
 logger = logging.getLogger(__name__)
 
 
+def _grouped_corr(keys: pd.Series, x: pd.Series, y: pd.Series) -> np.ndarray:
+    """Pearson correlation of ``x`` and ``y`` within each key, NaN results dropped."""
+    dx = x - x.groupby(keys).transform("mean")
+    dy = y - y.groupby(keys).transform("mean")
+    sums = pd.DataFrame({"xy": dx * dy, "xx": dx * dx, "yy": dy * dy}).groupby(keys.to_numpy()).sum()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = (sums["xy"] / np.sqrt(sums["xx"] * sums["yy"])).to_numpy()
+    return corr[np.isfinite(corr)]
+
+
 class FactorTester:
     """Tester for factor performance.
 
@@ -31,6 +41,7 @@ class FactorTester:
     - Coverage analysis
     - Monotonicity test
     - Quantile return analysis
+    - Batched evaluation of many candidate factors
     """
 
     def __init__(self) -> None:
@@ -52,6 +63,54 @@ class FactorTester:
         Returns:
             FactorTestResult with performance metrics.
         """
+        return self._evaluate(
+            request.factor_id,
+            request.test_metrics,
+            factor_values,
+            self._prepare_returns(forward_returns),
+        )
+
+    def test_many(
+        self,
+        factors: dict[str, list[FactorValue]],
+        forward_returns: pd.DataFrame | None = None,
+        test_metrics: list[str] | None = None,
+    ) -> dict[str, FactorTestResult]:
+        """Test many candidate factors against the same forward returns.
+
+        The forward returns are cleaned, date-normalized and sorted once and
+        shared by every factor, so each extra candidate only costs its own
+        merge and groupby passes.
+
+        Args:
+            factors: Factor values by factor ID.
+            forward_returns: Forward returns data for IC calculation.
+            test_metrics: Metrics to calculate, as in FactorTestRequest.
+
+        Returns:
+            FactorTestResult by factor ID.
+        """
+        if test_metrics is None:
+            test_metrics = FactorTestRequest.model_fields["test_metrics"].get_default(
+                call_default_factory=True,
+            )
+        returns = self._prepare_returns(forward_returns)
+        results = {}
+        for factor_id, factor_values in factors.items():
+            try:
+                results[factor_id] = self._evaluate(factor_id, test_metrics, factor_values, returns)
+            except Exception as e:
+                logger.warning(f"Failed to test factor {factor_id}: {e}")
+        return results
+
+    def _evaluate(
+        self,
+        factor_id: str | None,
+        test_metrics: list[str],
+        factor_values: list[FactorValue],
+        returns: pd.DataFrame | None,
+    ) -> FactorTestResult:
+        """Compute every metric of one factor from one merged frame."""
         start_time = time.time()
         test_id = f"test_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
@@ -66,8 +125,15 @@ class FactorTester:
         monotonicity = None
         quantile_returns = None
 
-        if forward_returns is not None and not forward_returns.empty:
-            ic_results = self._calculate_ic(factor_values, forward_returns)
+        factor_df = self._factor_frame(factor_values)
+        merged = None
+        if returns is not None and not returns.empty and not factor_df.empty:
+            merged = factor_df.dropna(subset=["factor_value"]).merge(
+                returns, on=["trade_date", "stock_code"], how="inner",
+            )
+
+        if returns is not None and not returns.empty:
+            ic_results = self._calculate_ic(merged)
             ic_mean = ic_results.get("ic_mean")
             ic_std = ic_results.get("ic_std")
             ic_ir = ic_results.get("ic_ir")
@@ -75,13 +141,13 @@ class FactorTester:
             rank_ic_mean = ic_results.get("rank_ic_mean")
             rank_ic_std = ic_results.get("rank_ic_std")
 
-        coverage_mean = self._calculate_coverage(factor_values)
+        coverage_mean = self._calculate_coverage(factor_df)
 
-        if "turnover" in request.test_metrics:
-            turnover_mean = self._estimate_turnover(factor_values)
+        if "turnover" in test_metrics:
+            turnover_mean = self._estimate_turnover(factor_df)
 
-        if forward_returns is not None:
-            quantile_results = self._quantile_analysis(factor_values, forward_returns)
+        if returns is not None:
+            quantile_results = self._quantile_analysis(merged)
             monotonicity = quantile_results.get("monotonicity")
             quantile_returns = quantile_results.get("quantile_returns")
 
@@ -89,7 +155,7 @@ class FactorTester:
 
         return FactorTestResult(
             test_id=test_id,
-            factor_id=request.factor_id,
+            factor_id=factor_id,
             ic_mean=ic_mean,
             ic_std=ic_std,
             ic_ir=ic_ir,
@@ -103,12 +169,33 @@ class FactorTester:
             duration_ms=duration_ms,
         )
 
-    def _calculate_ic(
-        self,
-        factor_values: list[FactorValue],
-        forward_returns: pd.DataFrame,
-    ) -> dict[str, float]:
-        """Calculate Information Coefficient."""
+    def _prepare_returns(self, forward_returns: pd.DataFrame | None) -> pd.DataFrame | None:
+        """
+        Forward returns with normalized dates, sorted by date and stock.
+
+        Rows without a return are dropped here, so each date's sample count
+        and both factor and return ranks cover only the stocks that have a
+        factor value and a return (Rank IC over complete pairs).
+        """
+        if forward_returns is None:
+            return None
+        returns = forward_returns[["stock_code", "trade_date", "forward_return"]].dropna()
+        returns = returns.assign(trade_date=pd.to_datetime(returns["trade_date"]))
+        return returns.sort_values(["trade_date", "stock_code"], ignore_index=True)
+
+    def _factor_frame(self, factor_values: list[FactorValue]) -> pd.DataFrame:
+        """Factor values as one frame; missing values are kept as NaN."""
+        factor_df = pd.DataFrame({
+            "stock_code": [v.stock_code for v in factor_values],
+            "trade_date": pd.to_datetime([v.trade_date for v in factor_values]),
+            "factor_value": np.array(
+                [np.nan if v.value is None else v.value for v in factor_values], dtype=float,
+            ),
+        })
+        return factor_df.sort_values("trade_date", kind="stable", ignore_index=True)
+
+    def _calculate_ic(self, merged: pd.DataFrame | None) -> dict[str, float]:
+        """Calculate Information Coefficient for every date with one groupby."""
         results = {
             "ic_mean": 0.0,
             "ic_std": 0.0,
@@ -118,115 +205,74 @@ class FactorTester:
             "rank_ic_std": 0.0,
         }
 
-        if not factor_values or forward_returns.empty:
+        if merged is None or merged.empty:
             return results
 
-        factor_df = pd.DataFrame([
-            {
-                "stock_code": v.stock_code,
-                "trade_date": v.trade_date,
-                "factor_value": v.value,
-            }
-            for v in factor_values
-            if v.value is not None
-        ])
-
-        if factor_df.empty:
+        counts = merged.groupby("trade_date")["stock_code"].transform("size")
+        merged = merged[counts >= 5]
+        if merged.empty:
             return results
 
-        ic_values = []
-        rank_ic_values = []
-
-        for date in factor_df["trade_date"].unique():
-            date_factors = factor_df[factor_df["trade_date"] == date]
-            date_returns = forward_returns[forward_returns["trade_date"] == date]
+        ranks = merged.groupby("trade_date")[["factor_value", "forward_return"]].rank()
+        ic_values = _grouped_corr(merged["trade_date"], merged["factor_value"], merged["forward_return"])
+        rank_ic_values = _grouped_corr(merged["trade_date"], ranks["factor_value"], ranks["forward_return"])
 
-            if date_returns.empty:
-                continue
-
-            merged = pd.merge(
-                date_factors,
-                date_returns[["stock_code", "forward_return"]],
-                on="stock_code",
-                how="inner",
-            )
-
-            if len(merged) < 5:
-                continue
-
-            ic = merged["factor_value"].corr(merged["forward_return"])
-            if not np.isnan(ic):
-                ic_values.append(ic)
-
-            rank_ic = merged["factor_value"].rank().corr(
-                merged["forward_return"].rank()
-            )
-            if not np.isnan(rank_ic):
-                rank_ic_values.append(rank_ic)
-
-        if ic_values:
+        if len(ic_values):
             results["ic_mean"] = float(np.mean(ic_values))
             results["ic_std"] = float(np.std(ic_values))
             results["ic_ir"] = results["ic_mean"] / results["ic_std"] if results["ic_std"] > 0 else 0.0
-            results["ic_positive_ratio"] = float(sum(1 for ic in ic_values if ic > 0) / len(ic_values))
+            results["ic_positive_ratio"] = float(np.mean(ic_values > 0))
 
-        if rank_ic_values:
+        if len(rank_ic_values):
             results["rank_ic_mean"] = float(np.mean(rank_ic_values))
             results["rank_ic_std"] = float(np.std(rank_ic_values))
 
         return results
 
-    def _calculate_coverage(self, factor_values: list[FactorValue]) -> float:
+    def _calculate_coverage(self, factor_df: pd.DataFrame) -> float:
         """Calculate factor coverage."""
-        if not factor_values:
+        if factor_df.empty:
             return 0.0
 
-        valid_count = sum(1 for v in factor_values if v.value is not None)
-        return valid_count / len(factor_values)
+        return float(factor_df["factor_value"].notna().mean())
 
-    def _estimate_turnover(self, factor_values: list[FactorValue]) -> float:
-        """Estimate factor turnover."""
-        if len(factor_values) < 2:
+    def _estimate_turnover(self, factor_df: pd.DataFrame, top_n: int = 10) -> float:
+        """Estimate factor turnover of the top stocks between consecutive dates."""
+        if len(factor_df) < 2:
             return 0.0
 
-        by_date: dict[str, list[FactorValue]] = {}
-        for v in factor_values:
-            date_str = v.trade_date.strftime("%Y-%m-%d") if isinstance(v.trade_date, datetime) else str(v.trade_date)
-            if date_str not in by_date:
-                by_date[date_str] = []
-            by_date[date_str].append(v)
-
-        dates = sorted(by_date.keys())
-        if len(dates) < 2:
+        date_index = factor_df["trade_date"].rank(method="dense").astype(int)
+        if date_index.max() < 2:
             return 0.0
 
-        turnovers = []
-        for i in range(1, len(dates)):
-            prev_values = {v.stock_code: v.value for v in by_date[dates[i - 1]] if v.value is not None}
-            curr_values = {v.stock_code: v.value for v in by_date[dates[i]] if v.value is not None}
+        valid = factor_df.assign(date_index=date_index).dropna(subset=["factor_value"])
+        valid = valid[["date_index", "stock_code", "factor_value"]]
 
-            if not prev_values or not curr_values:
-                continue
-
-            prev_ranks = pd.Series(prev_values).rank()
-            curr_ranks = pd.Series(curr_values).rank()
-
-            common_stocks = set(prev_ranks.index) & set(curr_ranks.index)
-            if len(common_stocks) < 5:
-                continue
+        # Pairs (i - 1, i) need values on both dates and at least 5 common stocks.
+        following = valid[["date_index", "stock_code"]].assign(date_index=valid["date_index"] - 1)
+        common = valid.merge(following, on=["date_index", "stock_code"]).groupby("date_index").size()
+        pairs = common.index[common >= 5]
+        if not len(pairs):
+            return 0.0
 
-            prev_top = set(prev_ranks.nlargest(10).index)
-            curr_top = set(curr_ranks.nlargest(10).index)
+        ordered = valid.sort_values(
+            ["date_index", "factor_value"], ascending=[True, False], kind="stable",
+        )
+        top = ordered[ordered.groupby("date_index").cumcount() < top_n]
+        top_size = top.groupby("date_index").size()
+        top_next = top[["date_index", "stock_code"]].assign(date_index=top["date_index"] - 1)
+        kept = top.merge(top_next, on=["date_index", "stock_code"]).groupby("date_index").size()
 
-            turnover = len(prev_top.symmetric_difference(curr_top)) / 20
-            turnovers.append(turnover)
+        prev_size = top_size.reindex(pairs).to_numpy()
+        curr_size = top_size.reindex(pairs + 1).to_numpy()
+        overlap = kept.reindex(pairs, fill_value=0).to_numpy()
+        turnovers = (prev_size + curr_size - 2 * overlap) / (2 * top_n)
 
-        return float(np.mean(turnovers)) if turnovers else 0.0
+        return float(np.mean(turnovers))
 
     def _quantile_analysis(
         self,
-        factor_values: list[FactorValue],
-        forward_returns: pd.DataFrame,
+        merged: pd.DataFrame | None,
         n_quantiles: int = 5,
     ) -> dict[str, Any]:
         """Perform quantile analysis."""
@@ -235,49 +281,22 @@ class FactorTester:
             "quantile_returns": [],
         }
 
-        if not factor_values or forward_returns.empty:
+        if merged is None or merged.empty:
             return results
 
-        factor_df = pd.DataFrame([
-            {
-                "stock_code": v.stock_code,
-                "trade_date": v.trade_date,
-                "factor_value": v.value,
-            }
-            for v in factor_values
-            if v.value is not None
-        ])
-
-        if factor_df.empty:
-            return results
-
-        merged = pd.merge(
-            factor_df,
-            forward_returns[["stock_code", "trade_date", "forward_return"]],
-            on=["stock_code", "trade_date"],
-            how="inner",
-        )
-
-        if merged.empty:
-            return results
-
-        merged["quantile"] = pd.qcut(
+        quantile = pd.qcut(
             merged["factor_value"],
             n_quantiles,
             labels=False,
             duplicates="drop",
         )
 
-        quantile_returns = merged.groupby("quantile")["forward_return"].mean().tolist()
+        quantile_returns = merged["forward_return"].groupby(quantile).mean().tolist()
         results["quantile_returns"] = quantile_returns
 
         if len(quantile_returns) >= 2:
-            monotonic_count = 0
-            for i in range(1, len(quantile_returns)):
-                if quantile_returns[i] > quantile_returns[i - 1]:
-                    monotonic_count += 1
-
-            results["monotonicity"] = monotonic_count / (len(quantile_returns) - 1)
+            steps = np.diff(quantile_returns)
+            results["monotonicity"] = float(np.mean(steps > 0))
 
         return results
 
@@ -0,0 +1,111 @@
+"""
+Factor Tester Tests.
+
+The grouped implementation must match a straightforward per-date
+computation, and ``test_many`` must match testing each factor alone.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from itertools import pairwise
+
+import numpy as np
+import pandas as pd
+
+from openfinance.domain.models.quant import FactorTestRequest, FactorValue
+from openfinance.quant.custom.tester import FactorTester
+
+START = datetime(2024, 1, 1)
+
+
+def _make_values(n_codes=40, n_dates=15, seed=3, missing=0.05):
+    rng = np.random.default_rng(seed)
+    codes = [f"{600000 + j}" for j in range(n_codes)]
+    values, returns = [], []
+    for i in range(n_dates):
+        trade_date = START + timedelta(days=i)
+        for code in codes:
+            value = None if rng.random() < missing else float(np.round(rng.normal(), 1))
+            values.append(FactorValue(factor_id="f", stock_code=code, trade_date=trade_date, value=value))
+            if rng.random() < 0.9:
+                returns.append({"stock_code": code, "trade_date": trade_date, "forward_return": rng.normal(0, 0.02)})
+    return values, pd.DataFrame(returns)
+
+
+def _reference_ic(values, returns):
+    ics, rank_ics = [], []
+    for trade_date in sorted({v.trade_date for v in values}):
+        factor = pd.Series({v.stock_code: v.value for v in values if v.trade_date == trade_date and v.value is not None})
+        day = returns[returns["trade_date"] == trade_date].set_index("stock_code")["forward_return"]
+        common = factor.index.intersection(day.index)
+        if len(common) < 5:
+            continue
+        ics.append(factor[common].corr(day[common]))
+        rank_ics.append(factor[common].rank().corr(day[common].rank()))
+    return np.array(ics), np.array(rank_ics)
+
+
+def _reference_turnover(values, top_n=10):
+    dates = sorted({v.trade_date for v in values})
+    turnovers = []
+    for prev, curr in pairwise(dates):
+        a = pd.Series({v.stock_code: v.value for v in values if v.trade_date == prev and v.value is not None})
+        b = pd.Series({v.stock_code: v.value for v in values if v.trade_date == curr and v.value is not None})
+        if len(a.index.intersection(b.index)) < 5:
+            continue
+        top_a, top_b = set(a.rank().nlargest(top_n).index), set(b.rank().nlargest(top_n).index)
+        turnovers.append(len(top_a ^ top_b) / (2 * top_n))
+    return float(np.mean(turnovers))
+
+
+class TestFactorTester(unittest.TestCase):
+
+    def setUp(self):
+        self.values, self.returns = _make_values()
+        self.request = FactorTestRequest(factor_id="f", start_date=START, end_date=START + timedelta(days=30))
+
+    def test_matches_per_date_reference(self):
+        result = FactorTester().test(self.request, self.values, self.returns)
+        ics, rank_ics = _reference_ic(self.values, self.returns)
+
+        self.assertAlmostEqual(result.ic_mean, ics.mean())
+        self.assertAlmostEqual(result.ic_std, ics.std())
+        self.assertAlmostEqual(result.ic_positive_ratio, np.mean(ics > 0))
+        self.assertAlmostEqual(result.rank_ic_mean, rank_ics.mean())
+        self.assertAlmostEqual(result.rank_ic_std, rank_ics.std())
+        self.assertAlmostEqual(result.turnover_mean, _reference_turnover(self.values))
+        self.assertAlmostEqual(result.coverage_mean, np.mean([v.value is not None for v in self.values]))
+        self.assertEqual(len(result.quantile_returns), 5)
+
+    def test_missing_returns_are_left_out_of_ranks(self):
+        returns = self.returns.copy()
+        rng = np.random.default_rng(5)
+        returns.loc[rng.random(len(returns)) < 0.05, "forward_return"] = np.nan
+        result = FactorTester().test(self.request, self.values, returns)
+        ics, rank_ics = _reference_ic(self.values, returns.dropna())
+
+        self.assertAlmostEqual(result.ic_mean, ics.mean())
+        self.assertAlmostEqual(result.rank_ic_mean, rank_ics.mean())
+        self.assertAlmostEqual(result.rank_ic_std, rank_ics.std())
+
+    def test_many_matches_single(self):
+        other, _ = _make_values(seed=4)
+        tester = FactorTester()
+        results = tester.test_many({"a": self.values, "b": other}, self.returns)
+
+        self.assertEqual(sorted(results), ["a", "b"])
+        for factor_id, values in (("a", self.values), ("b", other)):
+            single = tester.test(self.request, values, self.returns)
+            self.assertEqual(results[factor_id].factor_id, factor_id)
+            for field in ("ic_mean", "rank_ic_mean", "turnover_mean", "coverage_mean", "monotonicity"):
+                self.assertAlmostEqual(getattr(results[factor_id], field), getattr(single, field))
+
+    def test_without_returns(self):
+        result = FactorTester().test(self.request, self.values)
+        self.assertIsNone(result.ic_mean)
+        self.assertIsNone(result.quantile_returns)
+        self.assertIsNotNone(result.turnover_mean)
+
+
+if __name__ == "__main__":
+    unittest.main()
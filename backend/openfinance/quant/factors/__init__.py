@@ -7,6 +7,7 @@ quantitative analysis with enhanced features:
 - FactorBase: Unified abstract base class for all factors
 - UnifiedFactorRegistry: Central registry with singleton pattern
 - FactorEngine: High-performance calculation engine
+- CrossSectionProcessor: Rank, normalize and neutralize universe results
 - Factor Analysis: Neutralization, Correlation, IC/IR
 - Storage: Database persistence and caching
 
@@ -41,6 +42,27 @@ from .engine import (
     get_factor_engine,
 )
 
+from .frame import (
+    KLineFrame,
+    KLineRow,
+    kline_column,
+)
+
+from .panel import PricePanel
+
+from .planner import (
+    CyclicDependencyError,
+    ExecutionPlan,
+    FactorPlanner,
+    PlanResult,
+)
+
+from .postprocess import (
+    CrossSectionConfig,
+    CrossSectionProcessor,
+    get_cross_section_processor,
+)
+
 from .data_source import (
     DataSourceConfig,
     KLineDataSource,
@@ -54,9 +76,13 @@ from .analysis import (
     FactorNeutralizer,
     FactorCorrelationAnalyzer,
     FactorICAnalyzer,
+    CorrelationAccumulator,
     CorrelationResult,
     ICResult,
+    ICSeries,
+    ICDecayPoint,
     IRResult,
+    forward_returns,
     get_neutralizer,
     get_correlation_analyzer,
     get_ic_analyzer,
@@ -85,6 +111,17 @@ __all__ = [
     "EngineConfig",
     "FactorEngine",
     "get_factor_engine",
+    "KLineFrame",
+    "KLineRow",
+    "kline_column",
+    "PricePanel",
+    "CyclicDependencyError",
+    "ExecutionPlan",
+    "FactorPlanner",
+    "PlanResult",
+    "CrossSectionConfig",
+    "CrossSectionProcessor",
+    "get_cross_section_processor",
     "DataSourceConfig",
     "KLineDataSource",
     "DataCenterDataSource",
@@ -94,9 +131,13 @@ __all__ = [
     "FactorNeutralizer",
     "FactorCorrelationAnalyzer",
     "FactorICAnalyzer",
+    "CorrelationAccumulator",
     "CorrelationResult",
     "ICResult",
+    "ICSeries",
+    "ICDecayPoint",
     "IRResult",
+    "forward_returns",
     "get_neutralizer",
     "get_correlation_analyzer",
     "get_ic_analyzer",
@@ -6,6 +6,7 @@ Provides factor analysis capabilities:
 - Correlation analysis
 - IC/IR calculation
 - Decay analysis
+- Panel (dates x stocks) modes for neutralization, IC and decay
 """
 
 import logging
@@ -37,6 +38,7 @@ class FactorNeutralizer:
     - Industry neutralization
     - Market cap neutralization
     - Combined neutralization
+    - Panel mode: every date of a (dates x stocks) panel in one pass
     """
     
     def __init__(self, config: NeutralizationConfig | None = None):
@@ -142,6 +144,82 @@ class FactorNeutralizer:
                 result[i] = values[i] - expected
         
         return result
+    
+    def neutralize_panel(
+        self,
+        factor_values: np.ndarray,
+        log_market_caps: np.ndarray | None = None,
+        industry_codes: np.ndarray | None = None,
+        min_stocks: int = 10,
+    ) -> np.ndarray:
+        """
+        Neutralize a (dates x stocks) factor panel in one pass.
+        
+        Each date's values are regressed jointly on industry dummies and log
+        market cap, and the residual is returned. The regression is solved
+        for all dates at once: values and log market caps are demeaned within
+        each (date, industry) group with ``np.bincount``, and the size slope
+        is the ratio of row-wise sums of the demeaned arrays. That is the
+        exact least-squares fit with industry dummies, by Frisch-Waugh-Lovell.
+        Industries with fewer than ``min_industry_stocks`` stocks on a date
+        are pooled into one group.
+        
+        Args:
+            factor_values: Factor panel (dates x stocks), NaN where missing
+            log_market_caps: Log market cap panel (dates x stocks), or one
+                row per stock applied to every date
+            industry_codes: Industry code per stock, (dates x stocks) or
+                (stocks,); labels of any sortable type
+            min_stocks: Minimum stocks in the regression for a date
+        
+        Returns:
+            Residual panel with NaN where the factor or a used log market
+            cap is missing, and on dates with fewer than ``min_stocks`` stocks
+        """
+        y = np.atleast_2d(np.asarray(factor_values, dtype=float))
+        n_dates, n_stocks = y.shape
+        
+        use_industry = self.config.industry_neutral and industry_codes is not None
+        use_size = self.config.market_cap_neutral and log_market_caps is not None
+        
+        valid = np.isfinite(y)
+        if use_size:
+            size = np.broadcast_to(np.asarray(log_market_caps, dtype=float), y.shape)
+            valid &= np.isfinite(size)
+        
+        if use_industry:
+            _, inverse = np.unique(np.asarray(industry_codes), return_inverse=True)
+            groups = np.broadcast_to(
+                inverse.reshape(np.shape(industry_codes)), y.shape,
+            ).astype(np.intp)
+            n_groups = int(groups.max()) + 2
+        else:
+            groups = np.zeros(y.shape, dtype=np.intp)
+            n_groups = 1
+        
+        offsets = np.arange(n_dates, dtype=np.intp)[:, None] * n_groups
+        flat = offsets + groups
+        size_of = np.bincount(flat[valid], minlength=n_dates * n_groups)
+        if use_industry:
+            small = size_of[flat] < self.config.min_industry_stocks
+            flat = np.where(small, offsets + n_groups - 1, flat)
+            size_of = np.bincount(flat[valid], minlength=n_dates * n_groups)
+        
+        def demean(x: np.ndarray) -> np.ndarray:
+            sums = np.bincount(flat[valid], weights=x[valid], minlength=n_dates * n_groups)
+            means = sums / np.maximum(size_of, 1)
+            return np.where(valid, x - means[flat], np.nan)
+        
+        residual = demean(y)
+        if use_size:
+            size_resid = demean(size)
+            num = np.nansum(residual * size_resid, axis=1)
+            den = np.nansum(size_resid * size_resid, axis=1)
+            slope = np.divide(num, den, out=np.zeros(n_dates), where=den > 0)
+            residual -= slope[:, None] * size_resid
+        
+        residual[valid.sum(axis=1) < min_stocks] = np.nan
+        return residual
 
 
 @dataclass
@@ -164,7 +242,7 @@ class FactorCorrelationAnalyzer:
     - Pearson correlation
     - Spearman correlation
     - Rolling correlation
-    - Correlation matrix
+    - Correlation matrix from stacked (stocks x factors) arrays
     """
     
     def calculate_correlation(
@@ -242,27 +320,229 @@ class FactorCorrelationAnalyzer:
         Returns:
             Correlation matrix as nested dict
         """
-        factor_ids = list(factor_values.keys())
-        n = len(factor_ids)
+        factor_ids, _, values = stack_factor_values(factor_values)
+        corr = self.correlation_matrix(values, method)
+        
+        return {
+            fid1: {fid2: float(corr[i, j]) for j, fid2 in enumerate(factor_ids)}
+            for i, fid1 in enumerate(factor_ids)
+        }
+    
+    def correlation_matrix(
+        self,
+        values: np.ndarray,
+        method: str = "pearson",
+        min_samples: int = 10,
+    ) -> np.ndarray:
+        """
+        Correlation matrix of a (stocks x factors) array in one pass.
+        
+        Pairs use the stocks where both factors are finite, as
+        ``calculate_correlation`` does, but all pairs come from five matrix
+        products over the zero-filled values and the validity mask instead of
+        one call per pair. For Spearman each factor is ranked over its own
+        valid stocks first, which matches per-pair ranking when no values
+        are missing; pairs whose common stocks are fewer than either
+        factor's own are re-ranked over those common stocks.
+        
+        Args:
+            values: Factor values (stocks x factors), NaN where missing
+            method: Correlation method (pearson or spearman)
+            min_samples: Pairs with fewer common stocks get 0.0
         
-        matrix = {fid: {} for fid in factor_ids}
+        Returns:
+            (factors x factors) matrix with 1.0 on the diagonal
+        """
+        x, mask, _ = _prepare_columns(values, method)
+        sums = _pair_sums(x, mask)
+        corr = _pair_correlation(*sums)
+        if method == "spearman":
+            _rerank_partial_pairs(values, mask, sums[0], corr)
+        corr[(sums[0] < min_samples) | ~np.isfinite(corr)] = 0.0
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+
+def stack_factor_values(
+    factor_values: dict[str, dict[str, float]],
+) -> tuple[list[str], list[str], np.ndarray]:
+    """
+    Stack per-factor ``{code: value}`` dicts into one (stocks x factors) array.
+    
+    Returns:
+        Factor IDs, stock codes (union, sorted) and the array, NaN where a
+        factor has no value for a stock
+    """
+    factor_ids = list(factor_values.keys())
+    codes = sorted(set().union(*(values.keys() for values in factor_values.values())))
+    index = {code: i for i, code in enumerate(codes)}
+    stacked = np.full((len(codes), len(factor_ids)), np.nan)
+    for j, fid in enumerate(factor_ids):
+        values = factor_values[fid]
+        rows = np.fromiter((index[code] for code in values), dtype=np.intp, count=len(values))
+        stacked[rows, j] = np.fromiter(
+            (np.nan if v is None else v for v in values.values()), dtype=float, count=len(values),
+        )
+    return factor_ids, codes, stacked
+
+
+def _prepare_columns(
+    values: np.ndarray,
+    method: str,
+    shift: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Zero-filled (ranked, for Spearman) columns, their validity mask and shift.
+    
+    Columns are shifted by ``shift`` (default: their own mean), which leaves
+    correlations unchanged but keeps the raw-sum formulas well conditioned.
+    """
+    x = np.asarray(values, dtype=float)
+    mask = np.isfinite(x)
+    if method == "spearman":
+        x = _row_ranks(x.T, mask.T).T
+    if shift is None:
+        shift = _column_means(x, mask)
+    return np.where(mask, x - shift, 0.0), mask, shift
+
+
+def _rerank_partial_pairs(
+    values: np.ndarray,
+    mask: np.ndarray,
+    count: np.ndarray,
+    corr: np.ndarray,
+) -> None:
+    """
+    Recompute, in place, Spearman correlations of pairs with missing values.
+    
+    Ranks from ``_prepare_columns`` span each factor's own valid stocks; a
+    pair that shares fewer stocks is ranked again over its common stocks,
+    all such pairs at once as rows of ``_row_ranks``.
+    """
+    own = np.diag(count)
+    i, j = np.nonzero(np.triu((count < own[:, None]) | (count < own[None, :]), k=1))
+    if not len(i):
+        return
+    values = np.asarray(values, dtype=float)
+    common = mask[:, i].T & mask[:, j].T
+    pair = _row_pearson(
+        _row_ranks(values[:, i].T, common),
+        _row_ranks(values[:, j].T, common),
+        common,
+    )
+    corr[i, j] = pair
+    corr[j, i] = pair
+
+
+def _column_means(x: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    count = mask.sum(axis=0)
+    total = np.where(mask, x, 0.0).sum(axis=0)
+    return np.divide(total, count, out=np.zeros(x.shape[1]), where=count > 0)
+
+
+def _pair_sums(x: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Pairwise-complete count, sums, sums of squares and cross products."""
+    m = mask.astype(float)
+    count = m.T @ m
+    sum_x = x.T @ m
+    sum_xx = (x * x).T @ m
+    sum_xy = x.T @ x
+    return count, sum_x, sum_xx, sum_xy
+
+
+def _pair_correlation(
+    count: np.ndarray,
+    sum_x: np.ndarray,
+    sum_xx: np.ndarray,
+    sum_xy: np.ndarray,
+) -> np.ndarray:
+    """Pearson correlation from pairwise sums; ``sum_x[i, j]`` sums factor i where j is valid."""
+    cov = count * sum_xy - sum_x * sum_x.T
+    var_i = count * sum_xx - sum_x ** 2
+    var_j = var_i.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cov / np.sqrt(np.clip(var_i, 0, None) * np.clip(var_j, 0, None))
+
+
+class CorrelationAccumulator:
+    """
+    Streaming correlation statistics across dates.
+    
+    Each ``update`` adds one date's (stocks x factors) cross-section, so the
+    long-run figures can be refreshed daily without revisiting history:
+    
+    - ``average()``: mean of the daily correlation matrices
+    - ``pooled()``: correlation over every (date, stock) observation,
+      from accumulated pairwise counts, sums and cross products
+    """
+    
+    def __init__(
+        self,
+        factor_ids: list[str],
+        method: str = "pearson",
+        min_samples: int = 10,
+    ):
+        self.factor_ids = list(factor_ids)
+        self.method = method
+        self.min_samples = min_samples
+        n = len(self.factor_ids)
+        self.dates = 0
+        self._shift: np.ndarray | None = None
+        self._corr_sum = np.zeros((n, n))
+        self._corr_count = np.zeros((n, n))
+        self._sums = [np.zeros((n, n)) for _ in range(4)]
+    
+    def update(self, values: np.ndarray | dict[str, dict[str, float]]) -> np.ndarray:
+        """
+        Add one date's cross-section.
         
-        for i in range(n):
-            for j in range(i, n):
-                fid1, fid2 = factor_ids[i], factor_ids[j]
-                
-                if i == j:
-                    matrix[fid1][fid2] = 1.0
-                else:
-                    result = self.calculate_correlation(
-                        factor_values[fid1],
-                        factor_values[fid2],
-                        method,
-                    )
-                    matrix[fid1][fid2] = result.correlation
-                    matrix[fid2][fid1] = result.correlation
+        Args:
+            values: (stocks x factors) array with columns in ``factor_ids``
+                order, or per-factor ``{code: value}`` dicts
         
-        return matrix
+        Returns:
+            That date's correlation matrix (NaN where undefined)
+        """
+        if isinstance(values, dict):
+            values = stack_factor_values({fid: values.get(fid, {}) for fid in self.factor_ids})[2]
+        # Pooled sums need one fixed shift per factor, taken from the first date.
+        x, mask, self._shift = _prepare_columns(values, self.method, self._shift)
+        sums = _pair_sums(x, mask)
+        for total, part in zip(self._sums, sums):
+            total += part
+        
+        corr = _pair_correlation(*sums)
+        if self.method == "spearman":
+            _rerank_partial_pairs(values, mask, sums[0], corr)
+        corr[sums[0] < self.min_samples] = np.nan
+        defined = np.isfinite(corr)
+        self._corr_sum += np.where(defined, corr, 0.0)
+        self._corr_count += defined
+        self.dates += 1
+        return corr
+    
+    def average(self) -> np.ndarray:
+        """Mean daily correlation per pair, over the dates where it was defined."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self._corr_sum / self._corr_count
+        mean[self._corr_count == 0] = 0.0
+        np.fill_diagonal(mean, 1.0)
+        return mean
+    
+    def pooled(self) -> np.ndarray:
+        """Correlation over all accumulated observations of each pair."""
+        corr = _pair_correlation(*self._sums)
+        corr[(self._sums[0] < self.min_samples) | ~np.isfinite(corr)] = 0.0
+        np.fill_diagonal(corr, 1.0)
+        return corr
+    
+    def to_dict(self, pooled: bool = False) -> dict[str, dict[str, float]]:
+        """Average (or pooled) correlation matrix as a nested dict."""
+        matrix = self.pooled() if pooled else self.average()
+        return {
+            fid1: {fid2: float(matrix[i, j]) for j, fid2 in enumerate(self.factor_ids)}
+            for i, fid1 in enumerate(self.factor_ids)
+        }
 
 
 @dataclass
@@ -288,6 +568,102 @@ class IRResult:
     sample_size: int
 
 
+@dataclass
+class ICSeries:
+    """IC and Rank IC for every date of a panel."""
+    
+    dates: np.ndarray
+    ic: np.ndarray
+    rank_ic: np.ndarray
+    p_value: np.ndarray
+    sample_size: np.ndarray
+    
+    def to_results(self) -> list[ICResult]:
+        """One ICResult per date with a defined IC."""
+        return [
+            ICResult(
+                date=self.dates[t],
+                ic=float(self.ic[t]),
+                rank_ic=float(self.rank_ic[t]),
+                p_value=float(self.p_value[t]),
+                sample_size=int(self.sample_size[t]),
+            )
+            for t in np.flatnonzero(np.isfinite(self.ic))
+        ]
+
+
+@dataclass
+class ICDecayPoint:
+    """IC statistics of one holding horizon."""
+    
+    period: int
+    mean_ic: float
+    mean_rank_ic: float
+    ir: float
+    rank_ir: float
+    t_stat: float
+    rank_t_stat: float
+    sample_size: int
+
+
+def _row_ranks(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Average ranks within each row over ``mask``; NaN elsewhere."""
+    filled = np.where(mask, values, np.inf)
+    order = np.argsort(filled, axis=1)
+    ordered = np.take_along_axis(filled, order, axis=1)
+    n_cols = ordered.shape[1]
+    position = np.broadcast_to(np.arange(1, n_cols + 1, dtype=float), ordered.shape)
+    # Ties share the mean of the first and last position of their run.
+    starts = np.ones(ordered.shape, dtype=bool)
+    starts[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    ends = np.ones(ordered.shape, dtype=bool)
+    ends[:, :-1] = starts[:, 1:]
+    first = np.maximum.accumulate(np.where(starts, position, 0.0), axis=1)
+    last = np.minimum.accumulate(np.where(ends, position, np.inf)[:, ::-1], axis=1)[:, ::-1]
+    ranks = np.empty(ordered.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2, axis=1)
+    return np.where(mask, ranks, np.nan)
+
+
+def _row_pearson(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Pearson correlation of each row of ``x`` and ``y`` over ``mask``."""
+    count = mask.sum(axis=1)
+    safe = np.maximum(count, 1)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    dx = np.where(mask, x - (x.sum(axis=1) / safe)[:, None], 0.0)
+    dy = np.where(mask, y - (y.sum(axis=1) / safe)[:, None], 0.0)
+    cov = np.einsum("ij,ij->i", dx, dy)
+    var = np.einsum("ij,ij->i", dx, dx) * np.einsum("ij,ij->i", dy, dy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(var > 0, cov / np.sqrt(var), np.nan)
+
+
+def _series_stats(ics: np.ndarray) -> tuple[float, float, float, int]:
+    """Mean, IR and t-statistic of an IC series, ignoring NaN."""
+    ics = ics[np.isfinite(ics)]
+    if not len(ics):
+        return 0.0, 0.0, 0.0, 0
+    mean, std = float(ics.mean()), float(ics.std())
+    ir = mean / std if std > 0 else 0.0
+    return mean, ir, ir * np.sqrt(len(ics)), len(ics)
+
+
+def forward_returns(prices: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Forward return over ``horizon`` rows of a (dates x stocks) price panel.
+    
+    Row ``t`` holds ``prices[t + horizon] / prices[t] - 1``; the last
+    ``horizon`` rows are NaN.
+    """
+    prices = np.asarray(prices, dtype=float)
+    result = np.full(prices.shape, np.nan)
+    if horizon < prices.shape[0]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[:-horizon] = prices[horizon:] / prices[:-horizon] - 1
+    return result
+
+
 class FactorICAnalyzer:
     """
     Factor IC/IR analysis.
@@ -297,6 +673,7 @@ class FactorICAnalyzer:
     - Rank IC
     - IR (Information Ratio)
     - IC decay
+    - Panel mode: every date of aligned (dates x stocks) panels in one pass
     """
     
     def calculate_ic(
@@ -438,6 +815,102 @@ class FactorICAnalyzer:
                 decay.append((period, ic_result.rank_ic))
         
         return decay
+    
+    def calculate_ic_panel(
+        self,
+        factor_panel: np.ndarray,
+        return_panel: np.ndarray,
+        dates: np.ndarray | list[date] | None = None,
+        min_stocks: int = 10,
+    ) -> ICSeries:
+        """
+        Calculate IC and Rank IC for every date of aligned panels.
+        
+        A stock counts on a date when both its factor value and its forward
+        return are finite. Pearson IC is computed row-wise on the masked
+        arrays, and Rank IC is the Pearson IC of row-wise average ranks, which
+        equals Spearman's rho.
+        
+        Args:
+            factor_panel: Factor values (dates x stocks)
+            return_panel: Forward returns (dates x stocks), aligned so row
+                ``t`` is the return earned after the factor value of row ``t``
+            dates: Optional date per row
+            min_stocks: Dates with fewer valid stocks get NaN IC
+        
+        Returns:
+            ICSeries with one entry per row
+        """
+        x = np.atleast_2d(np.asarray(factor_panel, dtype=float))
+        y = np.atleast_2d(np.asarray(return_panel, dtype=float))
+        if x.shape != y.shape:
+            raise ValueError(f"Panel shapes differ: {x.shape} vs {y.shape}")
+        
+        mask = np.isfinite(x) & np.isfinite(y)
+        count = mask.sum(axis=1)
+        ic = _row_pearson(x, y, mask)
+        rank_ic = _row_pearson(_row_ranks(x, mask), _row_ranks(y, mask), mask)
+        
+        enough = count >= min_stocks
+        ic = np.where(enough, ic, np.nan)
+        rank_ic = np.where(enough, rank_ic, np.nan)
+        
+        dof = np.maximum(count - 2, 1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = ic * np.sqrt(dof / np.maximum(1 - ic ** 2, 1e-300))
+        p_value = np.where(np.isfinite(t), 2 * stats.t.sf(np.abs(t), dof), np.nan)
+        
+        if dates is None:
+            dates = np.arange(x.shape[0])
+        return ICSeries(
+            dates=np.asarray(dates),
+            ic=ic,
+            rank_ic=rank_ic,
+            p_value=p_value,
+            sample_size=count,
+        )
+    
+    def calculate_ic_decay_panel(
+        self,
+        factor_panel: np.ndarray,
+        prices: np.ndarray,
+        max_periods: int = 20,
+        min_stocks: int = 10,
+    ) -> list[ICDecayPoint]:
+        """
+        Calculate IC decay for holding horizons 1..``max_periods``.
+        
+        For each horizon the factor at every date is correlated with the
+        forward return over that horizon, so each point summarizes all
+        dates rather than a single starting date.
+        
+        Args:
+            factor_panel: Factor values (dates x stocks)
+            prices: Close prices aligned with ``factor_panel``
+            max_periods: Longest horizon in rows
+            min_stocks: Dates with fewer valid stocks are skipped
+        
+        Returns:
+            One ICDecayPoint per horizon with mean IC, IR and t-statistics
+        """
+        decay = []
+        for period in range(1, max_periods + 1):
+            series = self.calculate_ic_panel(
+                factor_panel, forward_returns(prices, period), min_stocks=min_stocks,
+            )
+            mean_ic, ir, t_stat, n = _series_stats(series.ic)
+            mean_rank_ic, rank_ir, rank_t_stat, _ = _series_stats(series.rank_ic)
+            decay.append(ICDecayPoint(
+                period=period,
+                mean_ic=mean_ic,
+                mean_rank_ic=mean_rank_ic,
+                ir=ir,
+                rank_ir=rank_ir,
+                t_stat=float(t_stat),
+                rank_t_stat=float(rank_t_stat),
+                sample_size=n,
+            ))
+        return decay
 
 
 _neutralizer: FactorNeutralizer | None = None
@@ -22,6 +22,8 @@ import pandas as pd
 from pydantic import BaseModel, Field, field_validator
 
 from openfinance.datacenter.models.analytical import ADSKLineModel
+
+from .frame import KLineFrame
 from openfinance.domain.models.quant import (
     FactorType,
     FactorCategory,
@@ -254,14 +256,15 @@ class FactorBase(ABC, Generic[T]):
     @abstractmethod
     def _calculate(
         self,
-        klines: list[ADSKLineModel],
+        klines: list[ADSKLineModel] | KLineFrame,
         **params: Any,
     ) -> T | None:
         """
         Core calculation logic. Must be implemented by subclasses.
         
         Args:
-            klines: K-Line data (sorted by date, oldest first)
+            klines: K-Line data (sorted by date, oldest first), either a list
+                of models or a KLineFrame; read columns with ``kline_column``
             **params: Factor-specific parameters
         
         Returns:
@@ -271,7 +274,7 @@ class FactorBase(ABC, Generic[T]):
     
     def calculate(
         self,
-        klines: list[ADSKLineModel],
+        klines: list[ADSKLineModel] | KLineFrame,
         **params: Any,
     ) -> FactorResult | None:
         """Calculate factor with full result."""
@@ -304,7 +307,60 @@ class FactorBase(ABC, Generic[T]):
             
         except Exception:
             return None
-    
+
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel] | KLineFrame,
+        **params: Any,
+    ) -> np.ndarray | None:
+        """
+        Native full-history calculation. Override when the factor can be
+        computed for every bar in one pass.
+
+        Returns:
+            Array with one value per bar (NaN where ``_calculate`` would
+            return None), or None to use the generic prefix fallback
+        """
+        return None
+
+    def calculate_series(
+        self,
+        klines: list[ADSKLineModel] | KLineFrame,
+        **params: Any,
+    ) -> np.ndarray:
+        """
+        Calculate the factor at every bar of ``klines``.
+
+        Element ``i`` equals ``calculate(klines[:i + 1]).value``, with NaN
+        where that would be None. Factors overriding ``_calculate_series``
+        produce the whole history in one pass; others run ``_calculate`` on
+        every prefix of ``klines``, which skips building a FactorResult per
+        bar but is still one calculation per bar.
+
+        Args:
+            klines: K-Line data (sorted by date, oldest first)
+            **params: Factor-specific parameters
+
+        Returns:
+            Factor values as a float array aligned with ``klines``
+        """
+        _ = self.metadata
+        merged_params = {**self._config.parameters, **params}
+
+        values = self._calculate_series(klines, **merged_params)
+        if values is not None:
+            return np.asarray(values, dtype=float)
+
+        result = np.full(len(klines), np.nan)
+        for i in range(len(klines)):
+            try:
+                value = self._calculate(klines[:i + 1], **merged_params)
+                if value is not None:
+                    result[i] = float(value)
+            except Exception:
+                continue
+        return result
+
     def normalize(
         self,
         value: float,
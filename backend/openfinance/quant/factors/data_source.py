@@ -15,6 +15,9 @@ import numpy as np
 
 from openfinance.datacenter.models.analytical import ADSKLineModel
 
+from .frame import KLineFrame, _to_date
+from .panel import PricePanel
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +30,7 @@ class DataSourceConfig:
     cache_ttl: int = 300
     max_retries: int = 3
     retry_delay: float = 0.5
+    batch_chunk_size: int = 1000
 
 
 class KLineDataSource(ABC):
@@ -61,6 +65,37 @@ class KLineDataSource(ABC):
     ) -> dict[str, list[ADSKLineModel]]:
         """Get K-Line data for multiple stocks."""
         pass
+    
+    async def get_latest_frame(
+        self,
+        code: str,
+        count: int,
+    ) -> KLineFrame:
+        """Get latest N K-Lines for a stock as a columnar frame."""
+        return KLineFrame.from_klines(await self.get_latest_klines(code, count))
+    
+    async def get_latest_panel(
+        self,
+        codes: list[str],
+        count: int,
+        end_date: date | None = None,
+    ) -> PricePanel:
+        """
+        Get at least the last ``count`` bars of each stock as an aligned panel.
+        
+        A stock suspended inside the window still gets its own last
+        ``count`` bars, so the panel may reach further back for it than for
+        the rest; ``PricePanel.latest`` squeezes the gaps out. The default
+        implementation fetches each stock separately; sources backed by a
+        database should override it with bulk queries.
+        """
+        frames = []
+        for code in codes:
+            frame = await self.get_latest_frame(code, count)
+            if end_date is not None and len(frame):
+                frame = frame[:int(np.searchsorted(frame.dates, np.datetime64(end_date), side='right'))]
+            frames.append(frame)
+        return PricePanel.from_frames(frames)
 
 
 class DataCenterDataSource(KLineDataSource):
@@ -124,6 +159,70 @@ class DataCenterDataSource(KLineDataSource):
         
         return []
     
+    async def get_latest_frame(
+        self,
+        code: str,
+        count: int,
+    ) -> KLineFrame:
+        """Get latest N K-Lines straight from database rows, skipping model conversion."""
+        ads = self._get_ads_service()
+        
+        if ads:
+            try:
+                rows = await ads.get_kline_rows(code=code, limit=count)
+                return KLineFrame.from_rows(rows, code=code)
+            except Exception as e:
+                logger.error(f"Failed to get latest kline frame for {code}: {e}")
+        
+        return KLineFrame.from_rows([], code=code)
+    
+    async def get_latest_panel(
+        self,
+        codes: list[str],
+        count: int,
+        end_date: date | None = None,
+    ) -> PricePanel:
+        """
+        Get the last ``count`` trading days for many stocks in a few queries.
+        
+        The date window is resolved once from the trading calendar, then
+        rows are read ``batch_chunk_size`` codes per query instead of one
+        query per stock. Stocks that traded on the last date but missed
+        days inside the window are re-read on their own for their last
+        ``count`` bars.
+        """
+        ads = self._get_ads_service()
+        
+        if ads and codes:
+            try:
+                trading_dates = await ads.get_trading_dates(end_date=end_date, limit=count)
+                if trading_dates:
+                    start, end = min(trading_dates), max(trading_dates)
+                    chunk = max(self.config.batch_chunk_size, 1)
+                    rows = []
+                    for i in range(0, len(codes), chunk):
+                        rows.extend(await ads.get_kline_rows_batch(
+                            codes[i:i + chunk], start_date=start, end_date=end,
+                        ))
+                    
+                    bars: dict[str, int] = {}
+                    traded = set()
+                    last = _to_date(end)
+                    for row in rows:
+                        bars[row['code']] = bars.get(row['code'], 0) + 1
+                        if _to_date(row['trade_date']) == last:
+                            traded.add(row['code'])
+                    suspended = {code for code in traded if bars[code] < len(trading_dates)}
+                    if suspended:
+                        rows = [r for r in rows if r['code'] not in suspended]
+                        for code in suspended:
+                            rows.extend(await ads.get_kline_rows(code=code, end_date=end, limit=count))
+                    return PricePanel.from_rows(rows, codes=codes)
+            except Exception as e:
+                logger.error(f"Failed to get kline panel for {len(codes)} codes: {e}")
+        
+        return PricePanel.from_rows([], codes=codes)
+    
     async def get_klines_batch(
         self,
         codes: list[str],
@@ -5,30 +5,79 @@ Provides high-performance factor calculation with:
 - Parallel processing
 - Caching
 - Batch calculation
+- Universe-wide bulk calculation over an aligned price panel
+- Inline, thread-pool or process-pool execution backends
+- Dependency-aware planning that computes shared inputs once
+- Cross-sectional rank, normalization and neutralization of universe results
 """
 
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date
+from functools import partial
 from typing import Any, Callable
 
+import numpy as np
+
 from .base import FactorResult
-from .registry import get_factor_registry
+from .registry import FactorDefinition, get_factor_registry
 from .data_source import get_data_source
+from .panel import PricePanel
+from .planner import ExecutionPlan, FactorPlanner, PlanResult
+from .postprocess import get_cross_section_processor
 
 logger = logging.getLogger(__name__)
 
+BACKENDS = ("inline", "thread", "process")
+
 
 @dataclass
 class EngineConfig:
-    """Configuration for the calculation engine."""
+    """
+    Configuration for the calculation engine.
+    
+    ``backend`` picks where factor code runs: ``inline`` on the event loop,
+    ``thread`` in a thread pool, or ``process`` in a process pool where
+    panel calculations of class factors are sharded by stock code, about
+    ``shard_size`` stocks per shard so each round-trip carries real work.
+    """
     
     max_workers: int = 4
     use_cache: bool = True
     save_to_db: bool = True
     progress_callback: Callable[[int, int], None] | None = None
+    backend: str = "thread"
+    shard_size: int = 250
+
+
+def _calculate_shard(
+    factor_class: type,
+    codes: list[str],
+    dates: np.ndarray,
+    columns: dict[str, np.ndarray],
+    params: dict[str, Any],
+    bars: int,
+) -> list[FactorResult]:
+    """Run a class factor on every stock of a panel shard (process pool worker)."""
+    panel = PricePanel(codes, dates, columns)
+    factor_instance = factor_class()
+    results = []
+    for code in codes:
+        result = factor_instance.calculate(panel.frame(code)[-bars:], **params)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def _picklable(obj: Any) -> bool:
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
 
 
 class FactorEngine:
@@ -39,15 +88,26 @@ class FactorEngine:
     - Parallel factor calculation across multiple stocks
     - Automatic caching
     - Database persistence
+    - Factor code kept off the event loop (thread or process backend)
     """
     
     def __init__(self, config: EngineConfig | None = None):
         self.config = config or EngineConfig()
+        if self.config.backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown engine backend '{self.config.backend}', expected one of {BACKENDS}"
+            )
         self._registry = get_factor_registry()
         self._data_source = get_data_source()
         self._cache = None
         self._storage = None
-        self._executor = ThreadPoolExecutor(max_workers=self.config.max_workers)
+        self._planner = FactorPlanner(self._registry)
+        self._postprocessor = get_cross_section_processor()
+        self._executor: Executor | None = None
+        if self.config.backend == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=self.config.max_workers)
+        elif self.config.backend == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.config.max_workers)
     
     async def initialize(self) -> None:
         """Initialize engine components."""
@@ -92,13 +152,12 @@ class FactorEngine:
         if not factor_instance:
             return None
         
-        lookback = factor_def.lookback_period
-        klines = await self._data_source.get_latest_klines(code, lookback * 2)
+        klines = await self._data_source.get_latest_frame(code, factor_def.required_bars)
         
         if not klines:
             return None
         
-        result = factor_instance.calculate(klines, **(params or {}))
+        result = await self._run_local(factor_instance.calculate, klines, **(params or {}))
         
         if result and self._cache:
             await self._cache.set(result, params)
@@ -156,6 +215,335 @@ class FactorEngine:
         
         return results
     
+    async def calculate_bulk(
+        self,
+        factor_id: str,
+        codes: list[str],
+        trade_date: date,
+        params: dict[str, Any] | None = None,
+    ) -> list[FactorResult]:
+        """
+        Calculate factor for many stocks from one aligned price panel.
+        
+        Cached results are looked up for all codes in one batch; K-Lines for
+        the remaining codes are fetched in a few chunked queries instead of
+        one query per stock. Expression factors are evaluated once over the
+        whole panel; class factors run per stock on views of it. New results
+        are cached and written back with a single batch insert each.
+        
+        Args:
+            factor_id: Factor identifier
+            codes: List of stock codes
+            trade_date: Trading date (latest bar used)
+            params: Factor parameters
+        
+        Returns:
+            FactorResult for every stock that traded on the panel's last date
+        """
+        return await self._calculate_bulk(factor_id, codes, trade_date, params, persist=True)
+    
+    async def _calculate_bulk(
+        self,
+        factor_id: str,
+        codes: list[str],
+        trade_date: date,
+        params: dict[str, Any] | None,
+        persist: bool,
+    ) -> list[FactorResult]:
+        """``calculate_bulk``; with ``persist=False`` nothing is cached or saved."""
+        factor_def = self._registry.get(factor_id)
+        if not factor_def:
+            logger.error(f"Factor not found: {factor_id}")
+            return []
+        
+        cached = {}
+        if self._cache:
+            cached = await self._cache.get_many(factor_id, codes, trade_date, params)
+        missing = [code for code in codes if code not in cached]
+        if missing and factor_def.factor_class is None:
+            # Expressions may rank across stocks, so a partial universe is
+            # recomputed in full rather than mixed with cached values.
+            cached, missing = {}, codes
+        
+        results = []
+        if missing:
+            panel = await self._data_source.get_latest_panel(
+                missing, factor_def.required_bars, end_date=trade_date,
+            )
+            if len(panel) and panel.has_column('close'):
+                results = await self._evaluate_panel(factor_def, panel, params or {})
+        
+        if self.config.progress_callback:
+            self.config.progress_callback(len(codes), len(codes))
+        
+        if persist and self._cache and results:
+            await self._cache.set_many(results, params)
+        
+        if persist and self._storage and results:
+            await self._storage.save_factor_data_batch(results)
+        
+        if not cached:
+            return results
+        computed = {r.code: r for r in results}
+        return [
+            cached.get(code) or computed[code]
+            for code in codes
+            if code in cached or code in computed
+        ]
+    
+    async def calculate_fused(
+        self,
+        factor_ids: list[str],
+        codes: list[str],
+        trade_date: date,
+        params: dict[str, dict[str, Any]] | None = None,
+        persist: bool = True,
+    ) -> list[FactorResult]:
+        """
+        Calculate several factors for many stocks from one price panel.
+        
+        The panel is fetched once, sized to the largest lookback among the
+        factors, and each factor runs on its own window of it so results are
+        identical to ``calculate_bulk`` one factor at a time. A factor that
+        fails is logged and skipped without affecting the others.
+        
+        Args:
+            factor_ids: Factor identifiers
+            codes: List of stock codes
+            trade_date: Trading date (latest bar used)
+            params: Optional per-factor parameters keyed by factor ID
+            persist: Cache and save the results; callers that store them
+                themselves pass False
+        
+        Returns:
+            FactorResult for every (factor, stock) pair that produced a value
+        """
+        factor_defs = []
+        for factor_id in factor_ids:
+            factor_def = self._registry.get(factor_id)
+            if factor_def:
+                factor_defs.append(factor_def)
+            else:
+                logger.error(f"Factor not found: {factor_id}")
+        if not factor_defs:
+            return []
+        
+        lookback = max(factor_def.required_bars for factor_def in factor_defs)
+        panel = await self._data_source.get_latest_panel(codes, lookback, end_date=trade_date)
+        if not len(panel) or not panel.has_column('close'):
+            return []
+        
+        params = params or {}
+        outcomes = await asyncio.gather(
+            *(
+                self._evaluate_panel(
+                    factor_def,
+                    panel,
+                    params.get(factor_def.factor_id, {}),
+                )
+                for factor_def in factor_defs
+            ),
+            return_exceptions=True,
+        )
+        
+        results = []
+        for factor_def, outcome in zip(factor_defs, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Failed to calculate {factor_def.factor_id} on panel: {outcome}")
+            else:
+                results.extend(outcome)
+        
+        if self.config.progress_callback:
+            self.config.progress_callback(len(codes), len(codes))
+        
+        if persist and self._cache and results:
+            for factor_def in factor_defs:
+                await self._cache.set_many(
+                    [r for r in results if r.factor_id == factor_def.factor_id],
+                    params.get(factor_def.factor_id),
+                )
+        
+        if persist and self._storage and results:
+            await self._storage.save_factor_data_batch(results)
+        
+        return results
+    
+    def plan(self, factor_ids: list[str]) -> ExecutionPlan:
+        """
+        Resolve the dependency closure of factors in topological order.
+        
+        Raises:
+            ValueError: If a factor is unknown
+            CyclicDependencyError: If the definitions form a cycle
+        """
+        return self._planner.plan(factor_ids)
+    
+    async def calculate_planned(
+        self,
+        factor_ids: list[str],
+        codes: list[str],
+        trade_date: date,
+        params: dict[str, dict[str, Any]] | None = None,
+    ) -> PlanResult:
+        """
+        Calculate factors and everything they depend on from one price panel.
+        
+        Each factor in the dependency closure is evaluated once and its
+        values are passed to the factors that use it, so a composite factor
+        costs about as much as its inputs. Cycles are rejected before any
+        data is fetched.
+        
+        Args:
+            factor_ids: Requested factor identifiers
+            codes: List of stock codes
+            trade_date: Trading date (latest bar used)
+            params: Optional per-factor parameters keyed by factor ID
+        
+        Returns:
+            PlanResult with the plan, per-node timings and the requested
+            factors' results on the panel's last date
+        """
+        plan = self.plan(factor_ids)
+        panel = await self._data_source.get_latest_panel(
+            codes, plan.required_bars, end_date=trade_date,
+        )
+        if not len(panel) or not panel.has_column('close'):
+            return PlanResult(plan=plan)
+        
+        result = await self._run_local(self._planner.execute, plan, panel, params)
+        
+        if self.config.progress_callback:
+            self.config.progress_callback(len(codes), len(codes))
+        
+        if self._storage and result.results:
+            await self._storage.save_factor_data_batch(result.results)
+        
+        return result
+    
+    async def _run_local(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run CPU-bound work in this process without blocking the event loop.
+        
+        The process backend uses the loop's default thread pool here: jobs
+        that cannot be sharded or pickled are not worth shipping to a worker.
+        """
+        if self.config.backend == "inline":
+            return func(*args, **kwargs)
+        executor = self._executor if self.config.backend == "thread" else None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+    
+    async def _evaluate_panel(
+        self,
+        factor_def: FactorDefinition,
+        panel: PricePanel,
+        params: dict[str, Any],
+    ) -> list[FactorResult]:
+        """Evaluate one factor on the last date of a panel on the configured backend."""
+        if (
+            self.config.backend == "process"
+            and factor_def.factor_class is not None
+            and _picklable(factor_def.factor_class)
+        ):
+            return await self._calculate_sharded(factor_def, panel, params)
+        return await self._run_local(self._calculate_panel, factor_def, panel, params)
+    
+    async def _calculate_sharded(
+        self,
+        factor_def: FactorDefinition,
+        panel: PricePanel,
+        params: dict[str, Any],
+    ) -> list[FactorResult]:
+        """
+        Split a panel by stock code and run a class factor on the process pool.
+        
+        Each shard carries only contiguous float64 column slices and the date
+        index, and each worker returns its shard's results in one list. The
+        shard count follows from ``shard_size`` alone, not from how many
+        codes the caller passed or how many workers there are.
+        """
+        traded = np.flatnonzero(panel.traded())
+        if not len(traded):
+            return []
+        
+        n_shards = -(-len(traded) // max(self.config.shard_size, 1))
+        loop = asyncio.get_running_loop()
+        futures = []
+        for index in np.array_split(traded, n_shards):
+            columns = {
+                name: np.ascontiguousarray(panel.column(name)[:, index])
+                for name in panel.columns
+            }
+            futures.append(loop.run_in_executor(
+                self._executor,
+                _calculate_shard,
+                factor_def.factor_class,
+                [panel.codes[j] for j in index],
+                panel.dates,
+                columns,
+                params,
+                factor_def.required_bars,
+            ))
+        
+        results = []
+        for shard_results in await asyncio.gather(*futures):
+            results.extend(shard_results)
+        return results
+    
+    def _calculate_panel(
+        self,
+        factor_def: FactorDefinition,
+        panel: PricePanel,
+        params: dict[str, Any],
+    ) -> list[FactorResult]:
+        """
+        Evaluate one factor on the last date of a panel (runs off the event loop).
+        
+        Every stock traded on that date is evaluated over its own last
+        ``required_bars`` bars, so a suspension inside the window does not
+        leave gaps in its series.
+        """
+        traded = panel.traded()
+        
+        if factor_def.factor_class is None and factor_def.expression:
+            from .expression_engine import get_expression_engine
+            
+            window = panel.latest(factor_def.required_bars)
+            values = get_expression_engine().calculate_panel(
+                factor_def.expression,
+                open=window.column('open'),
+                high=window.column('high'),
+                low=window.column('low'),
+                close=window.column('close'),
+                volume=window.column('volume'),
+                amount=window.column('amount') if window.has_column('amount') else None,
+                parameters={**factor_def.default_params, **params},
+            )[-1]
+            last_date = panel.last_date
+            return [
+                FactorResult(
+                    factor_id=factor_def.factor_id,
+                    code=code,
+                    trade_date=last_date,
+                    value=float(values[j]),
+                )
+                for j, code in enumerate(panel.codes)
+                if traded[j] and np.isfinite(values[j])
+            ]
+        
+        factor_instance = self._registry.get_factor_instance(factor_def.factor_id)
+        if not factor_instance:
+            return []
+        
+        results = []
+        for j, code in enumerate(panel.codes):
+            if not traded[j]:
+                continue
+            result = factor_instance.calculate(panel.frame(code)[-factor_def.required_bars:], **params)
+            if result is not None:
+                results.append(result)
+        return results
+    
     async def calculate_universe(
         self,
         factor_id: str,
@@ -178,10 +566,73 @@ class FactorEngine:
         if universe is None:
             universe = await self._get_default_universe()
         
-        results = await self.calculate_batch(factor_id, universe, trade_date, params)
+        results = await self.calculate_bulk(factor_id, universe, trade_date, params)
         
         return {r.code: r.value for r in results if r.value is not None}
     
+    async def calculate_cross_section(
+        self,
+        factor_id: str,
+        trade_date: date,
+        params: dict[str, Any] | None = None,
+        universe: list[str] | None = None,
+        industry_map: dict[str, str] | None = None,
+        market_caps: dict[str, float] | None = None,
+    ) -> list[FactorResult]:
+        """
+        Calculate factor for a universe and fill its cross-sectional fields.
+        
+        Raw values come from ``calculate_bulk``; rank, percentile, the
+        winsorized normalized value and the neutralized value are then
+        computed over the whole cross-section, and the enriched rows are
+        cached and written back with a single batch upsert.
+        
+        Args:
+            factor_id: Factor identifier
+            trade_date: Trading date
+            params: Factor parameters
+            universe: Optional list of stock codes
+            industry_map: Stock code to industry, for neutralization
+            market_caps: Stock code to market cap, for neutralization
+        
+        Returns:
+            Enriched FactorResult for every stock that produced a value
+        """
+        if universe is None:
+            universe = await self._get_default_universe()
+        
+        results = await self._calculate_bulk(factor_id, universe, trade_date, params, persist=False)
+        if not results:
+            return []
+        
+        results = await self.process_cross_sections(results, industry_map, market_caps)
+        
+        if self._cache:
+            await self._cache.set_many(results, params)
+        
+        if self._storage:
+            await self._storage.save_factor_data_batch(results)
+        
+        return results
+    
+    async def process_cross_sections(
+        self,
+        results: list[FactorResult],
+        industry_map: dict[str, str] | None = None,
+        market_caps: dict[str, float] | None = None,
+    ) -> list[FactorResult]:
+        """
+        Fill rank, percentile, normalized and neutralized values in place.
+        
+        ``results`` should hold whole-universe cross-sections (any mix of
+        factors); nothing is cached or saved.
+        """
+        if not results:
+            return results
+        return await self._run_local(
+            self._postprocessor.process, results, industry_map, market_caps,
+        )
+    
     async def _get_default_universe(self) -> list[str]:
         """Get default stock universe."""
         return [
@@ -191,7 +642,8 @@ class FactorEngine:
     
     def close(self) -> None:
         """Close engine resources."""
-        self._executor.shutdown(wait=False)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
 
 
 _engine: FactorEngine | None = None
@@ -0,0 +1,318 @@
+"""
+Batch Expression Evaluation with Common-Subexpression Elimination.
+
+Many factor expressions share sub-terms such as ``sma(close, 20)`` or
+``std(returns, 20)``. This module canonicalizes a batch of expression ASTs
+into a single DAG of unique sub-expressions so each one is evaluated once
+per batch, and the results are reused by every expression that contains it.
+"""
+
+import ast
+import logging
+import operator
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .expression_engine import ExpressionContext, ExpressionEvaluator
+
+logger = logging.getLogger(__name__)
+
+
+_BINARY_OPERATORS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+}
+
+_COMMUTATIVE = (ast.Add, ast.Mult, ast.BitAnd, ast.BitOr, ast.BitXor)
+
+_UNARY_OPERATORS: dict[type, Callable[[Any], Any]] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Not: operator.not_,
+    ast.Invert: operator.invert,
+}
+
+_COMPARE_OPERATORS: dict[type, Callable[[Any, Any], Any]] = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+
+@dataclass
+class DAGNode:
+    """A unique sub-expression in the batch graph.
+
+    ``references`` counts the parent nodes that consume this node's value,
+    once per argument position.
+    """
+    node_id: int
+    kind: str
+    label: str
+    children: tuple[int, ...] = ()
+    keywords: tuple[str, ...] = ()
+    payload: Any = None
+    references: int = 0
+
+
+@dataclass
+class BatchResult:
+    """Results of evaluating a batch of expressions."""
+    values: dict[str, np.ndarray] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    total_nodes: int = 0
+    unique_nodes: int = 0
+
+    @property
+    def shared_nodes(self) -> int:
+        """Number of sub-expression evaluations saved by sharing."""
+        return self.total_nodes - self.unique_nodes
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "expressions": len(self.values) + len(self.errors),
+            "failed": len(self.errors),
+            "total_nodes": self.total_nodes,
+            "unique_nodes": self.unique_nodes,
+            "shared_nodes": self.shared_nodes,
+        }
+
+
+class ExpressionDAG:
+    """
+    Graph of unique sub-expressions for a batch of factor expressions.
+
+    Nodes are keyed by a canonical form of their AST built from the ids of
+    their (already canonical) children: operands of commutative operators
+    are ordered, keyword arguments are sorted and constants are keyed by type
+    and value, so ``sma(close, 20) + rank(volume)`` and
+    ``rank(volume) + sma(close, 20)`` share every node. Syntax the
+    graph does not model natively is kept as an opaque leaf and evaluated
+    as a whole.
+    """
+
+    def __init__(self):
+        self._nodes: list[DAGNode] = []
+        self._index: dict[Hashable, int] = {}
+        self.roots: dict[str, int] = {}
+        self.errors: dict[str, str] = {}
+        self.total_nodes = 0
+
+    @property
+    def nodes(self) -> list[DAGNode]:
+        return self._nodes
+
+    @property
+    def unique_nodes(self) -> int:
+        return len(self._nodes)
+
+    def add(self, expression: str) -> int | None:
+        """Add an expression to the graph, returning its root node id."""
+        if expression in self.roots:
+            return self.roots[expression]
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            self.errors[expression] = f"Invalid expression: Syntax error: {e}"
+            return None
+
+        root = self._visit(tree.body)
+        self.roots[expression] = root
+        return root
+
+    def _intern(self, key: Hashable, make: Callable[[int], DAGNode]) -> int:
+        self.total_nodes += 1
+        node_id = self._index.get(key)
+        if node_id is None:
+            node_id = len(self._nodes)
+            node = make(node_id)
+            self._nodes.append(node)
+            self._index[key] = node_id
+            for child in node.children:
+                self._nodes[child].references += 1
+        return node_id
+
+    def _visit(self, node: ast.AST) -> int:
+        if isinstance(node, ast.Name):
+            return self._intern(
+                ('name', node.id),
+                lambda i: DAGNode(i, 'name', node.id, payload=node.id),
+            )
+
+        if isinstance(node, ast.Constant):
+            value = node.value
+            return self._intern(
+                ('const', type(value).__name__, value),
+                lambda i: DAGNode(i, 'const', repr(value), payload=value),
+            )
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not any(
+            isinstance(a, ast.Starred) for a in node.args
+        ) and all(k.arg is not None for k in node.keywords):
+            args = tuple(self._visit(a) for a in node.args)
+            keywords = sorted((k.arg, self._visit(k.value)) for k in node.keywords)
+            names = tuple(k for k, _ in keywords)
+            children = args + tuple(v for _, v in keywords)
+            return self._intern(
+                ('call', node.func.id, args, tuple(keywords)),
+                lambda i: DAGNode(i, 'call', node.func.id, children, names, payload=node.func.id),
+            )
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            left, right = self._visit(node.left), self._visit(node.right)
+            if isinstance(node.op, _COMMUTATIVE) and right < left:
+                left, right = right, left
+            op = type(node.op)
+            return self._intern(
+                ('binop', op.__name__, left, right),
+                lambda i: DAGNode(i, 'binop', op.__name__, (left, right), payload=_BINARY_OPERATORS[op]),
+            )
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            operand = self._visit(node.operand)
+            op = type(node.op)
+            return self._intern(
+                ('unary', op.__name__, operand),
+                lambda i: DAGNode(i, 'unary', op.__name__, (operand,), payload=_UNARY_OPERATORS[op]),
+            )
+
+        if (
+            isinstance(node, ast.Compare)
+            and len(node.ops) == 1
+            and type(node.ops[0]) in _COMPARE_OPERATORS
+        ):
+            left, right = self._visit(node.left), self._visit(node.comparators[0])
+            op = type(node.ops[0])
+            return self._intern(
+                ('compare', op.__name__, left, right),
+                lambda i: DAGNode(i, 'compare', op.__name__, (left, right), payload=_COMPARE_OPERATORS[op]),
+            )
+
+        source = ast.unparse(node)
+        code = compile(ast.Expression(body=node), '<factor>', 'eval')
+        return self._intern(
+            ('opaque', ast.dump(node)),
+            lambda i: DAGNode(i, 'opaque', source, payload=code),
+        )
+
+    def evaluate(self, namespace: dict[str, Any]) -> tuple[dict[int, Any], dict[int, str]]:
+        """
+        Evaluate every node once, children before parents.
+
+        Node ids are assigned in post-order, so a single pass over the node
+        list respects dependencies. A failing node marks its dependents as
+        failed without stopping unrelated expressions.
+
+        Intermediate values are released as soon as their last parent has
+        been evaluated; only root values are returned.
+        """
+        values: dict[int, Any] = {}
+        failures: dict[int, str] = {}
+        remaining = [node.references for node in self._nodes]
+        roots = set(self.roots.values())
+
+        for node in self._nodes:
+            failed = next((failures[c] for c in node.children if c in failures), None)
+            if failed is not None:
+                failures[node.node_id] = failed
+            else:
+                args = [values[c] for c in node.children]
+                try:
+                    with np.errstate(invalid='ignore', divide='ignore'):
+                        values[node.node_id] = self._apply(node, args, namespace)
+                except Exception as e:
+                    failures[node.node_id] = f"{node.label}: {e}"
+
+            for c in node.children:
+                remaining[c] -= 1
+                if remaining[c] == 0 and c not in roots:
+                    values.pop(c, None)
+
+        return values, failures
+
+    @staticmethod
+    def _apply(node: DAGNode, args: list[Any], namespace: dict[str, Any]) -> Any:
+        if node.kind == 'name':
+            if node.payload not in namespace:
+                raise NameError(f"name '{node.payload}' is not defined")
+            return namespace[node.payload]
+        if node.kind == 'const':
+            return node.payload
+        if node.kind == 'call':
+            func = namespace.get(node.payload)
+            if func is None:
+                raise NameError(f"name '{node.payload}' is not defined")
+            positional = len(args) - len(node.keywords)
+            return func(*args[:positional], **dict(zip(node.keywords, args[positional:], strict=True)))
+        if node.kind == 'opaque':
+            return eval(node.payload, {"__builtins__": {}}, namespace)
+        return node.payload(*args)
+
+
+class BatchExpressionEvaluator:
+    """Evaluates many expressions against one context with shared sub-terms."""
+
+    def __init__(self, evaluator: ExpressionEvaluator | None = None):
+        self._evaluator = evaluator or ExpressionEvaluator()
+
+    def build(self, expressions: list[str]) -> ExpressionDAG:
+        """Build the shared DAG for a batch without evaluating it."""
+        dag = ExpressionDAG()
+        for expression in expressions:
+            dag.add(expression)
+        return dag
+
+    def evaluate(
+        self,
+        expressions: list[str],
+        context: ExpressionContext,
+        parameters: dict[str, Any] | None = None,
+    ) -> BatchResult:
+        """
+        Evaluate a batch of expressions.
+
+        Args:
+            expressions: Factor expression strings
+            context: Evaluation context (single stock or panel)
+            parameters: Additional parameters shared by the batch
+
+        Returns:
+            BatchResult with per-expression values or errors and sharing stats
+        """
+        dag = self.build(expressions)
+        namespace = self._evaluator.namespace(context, parameters)
+        values, failures = dag.evaluate(namespace)
+
+        result = BatchResult(
+            errors=dict(dag.errors),
+            total_nodes=dag.total_nodes,
+            unique_nodes=dag.unique_nodes,
+        )
+        for expression, root in dag.roots.items():
+            if root in failures:
+                result.errors[expression] = failures[root]
+                continue
+            try:
+                result.values[expression] = self._evaluator.to_array(values[root], context)
+            except Exception as e:
+                result.errors[expression] = str(e)
+
+        logger.debug(
+            f"Evaluated {len(dag.roots)} expressions with {dag.unique_nodes} unique nodes "
+            f"({result.shared_nodes} shared)"
+        )
+        return result
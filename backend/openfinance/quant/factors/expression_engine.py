@@ -10,17 +10,27 @@ import ast
 import logging
 import operator
 import re
+import threading
+import warnings
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import date
 from decimal import Decimal
 from enum import Enum
-from typing import Any, Callable, Protocol
+from types import CodeType, MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Protocol
 
 import numpy as np
 import pandas as pd
 
 from openfinance.datacenter.models.analytical import ADSKLineModel
 
+from . import jit, kernels
+from .frame import KLineFrame, kline_column
+
+if TYPE_CHECKING:
+    from .expression_dag import BatchResult
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,7 +44,14 @@ class ExpressionType(str, Enum):
 
 @dataclass
 class ExpressionContext:
-    """Context for expression evaluation."""
+    """
+    Context for expression evaluation.
+    
+    Fields hold either one stock's series (1-D) or a (dates x stocks)
+    panel (2-D). Time-series functions always run along axis 0 and the
+    ``cs_*`` functions along axis 1, so the same expression works in both
+    modes.
+    """
     open: np.ndarray
     high: np.ndarray
     low: np.ndarray
@@ -53,6 +70,47 @@ class ExpressionContext:
     def get_field(self, name: str) -> np.ndarray | None:
         """Get field by name."""
         return getattr(self, name, None)
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        amount: np.ndarray | None = None,
+        pre_close: np.ndarray | None = None,
+        trade_date: date | None = None,
+        code: str | None = None,
+    ) -> "ExpressionContext":
+        """Build a context from OHLCV arrays, deriving vwap and returns along axis 0."""
+        close = np.asarray(close, dtype=float)
+        volume = np.asarray(volume, dtype=float)
+        if amount is not None:
+            amount = np.asarray(amount, dtype=float)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = np.where(volume > 0, amount / volume, close) if amount is not None else None
+            returns = np.full_like(close, np.nan)
+            returns[1:] = np.diff(close, axis=0) / close[:-1]
+            log_returns = np.full_like(close, np.nan)
+            log_returns[1:] = np.log(close[1:] / close[:-1])
+        
+        return cls(
+            open=np.asarray(open, dtype=float),
+            high=np.asarray(high, dtype=float),
+            low=np.asarray(low, dtype=float),
+            close=close,
+            volume=volume,
+            amount=amount,
+            pre_close=np.asarray(pre_close, dtype=float) if pre_close is not None else None,
+            vwap=vwap,
+            returns=returns,
+            log_returns=log_returns,
+            trade_date=trade_date,
+            code=code,
+        )
 
 
 @dataclass
@@ -66,6 +124,15 @@ class ParsedExpression:
     error: str | None = None
 
 
+@dataclass
+class CompiledExpression:
+    """Validated and compiled expression, reusable across evaluations."""
+    parsed: ParsedExpression
+    code: CodeType
+    dependencies: frozenset[str]
+    functions: frozenset[str]
+
+
 class FunctionRegistry:
     """Registry for factor calculation functions."""
     
@@ -75,6 +142,8 @@ class FunctionRegistry:
         if cls._instance is None:
             cls._instance = super().__new__(cls)
             cls._instance._functions = {}
+            cls._instance._version = 0
+            cls._instance._namespace = None
             cls._instance._register_builtin_functions()
         return cls._instance
     
@@ -128,6 +197,11 @@ class FunctionRegistry:
             'max_drawdown': self._max_drawdown,
             'calmar': self._calmar,
             'if': self._if_else,
+            'cs_rank': kernels.cs_rank,
+            'cs_zscore': kernels.cs_zscore,
+            'cs_demean': kernels.cs_demean,
+            'cs_winsorize': kernels.cs_winsorize,
+            'cs_neutralize': kernels.cs_neutralize,
             'abs': np.abs,
             'sqrt': np.sqrt,
             'log': np.log,
@@ -144,15 +218,34 @@ class FunctionRegistry:
             'isinf': np.isinf,
             'nan_to_num': np.nan_to_num,
         }
+        if jit.NUMBA_AVAILABLE:
+            self._functions.update(jit.JIT_FUNCTIONS)
+            logger.debug(f"Using numba kernels for: {', '.join(jit.JIT_FUNCTIONS)}")
     
     def register(self, name: str, func: Callable) -> None:
         """Register a custom function."""
         self._functions[name.lower()] = func
+        self._version += 1
+        self._namespace = None
     
     def get(self, name: str) -> Callable | None:
         """Get function by name."""
         return self._functions.get(name.lower())
     
+    def __contains__(self, name: str) -> bool:
+        return name in self._functions
+    
+    @property
+    def version(self) -> int:
+        """Counter bumped on every registration, used to invalidate caches."""
+        return self._version
+    
+    def namespace(self) -> Mapping[str, Callable]:
+        """Read-only name -> function mapping, rebuilt only after registration."""
+        if self._namespace is None:
+            self._namespace = MappingProxyType(dict(self._functions))
+        return self._namespace
+    
     def list_functions(self) -> list[str]:
         """List all registered functions."""
         return list(self._functions.keys())
@@ -160,116 +253,64 @@ class FunctionRegistry:
     @staticmethod
     def _sma(data: np.ndarray, period: int) -> np.ndarray:
         """Simple Moving Average."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        cumsum = np.cumsum(data)
-        result[period-1:] = (cumsum[period-1:] - np.concatenate([[0], cumsum[:-period]])) / period
-        return result
+        return kernels.rolling_sum(data, period) / period
     
     @staticmethod
     def _ema(data: np.ndarray, period: int) -> np.ndarray:
         """Exponential Moving Average."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        alpha = 2 / (period + 1)
-        result[period-1] = np.mean(data[:period])
-        for i in range(period, len(data)):
-            result[i] = alpha * data[i] + (1 - alpha) * result[i-1]
-        return result
+        return kernels.ema(data, period)
     
     @staticmethod
     def _wma(data: np.ndarray, period: int) -> np.ndarray:
         """Weighted Moving Average."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        weights = np.arange(1, period + 1)
-        for i in range(period - 1, len(data)):
-            result[i] = np.sum(data[i-period+1:i+1] * weights) / weights.sum()
-        return result
+        return kernels.rolling_wma(data, period)
     
     @staticmethod
     def _std(data: np.ndarray, period: int, ddof: int = 1) -> np.ndarray:
         """Rolling Standard Deviation."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        for i in range(period - 1, len(data)):
-            result[i] = np.std(data[i-period+1:i+1], ddof=ddof)
-        return result
+        return kernels.rolling_std(data, period, ddof)
     
     @staticmethod
     def _var(data: np.ndarray, period: int, ddof: int = 1) -> np.ndarray:
         """Rolling Variance."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        for i in range(period - 1, len(data)):
-            result[i] = np.var(data[i-period+1:i+1], ddof=ddof)
-        return result
+        return kernels.rolling_var(data, period, ddof)
     
     @staticmethod
     def _rolling_max(data: np.ndarray, period: int) -> np.ndarray:
         """Rolling Maximum."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        for i in range(period - 1, len(data)):
-            result[i] = np.max(data[i-period+1:i+1])
-        return result
+        return kernels.rolling_max(data, period)
     
     @staticmethod
     def _rolling_min(data: np.ndarray, period: int) -> np.ndarray:
         """Rolling Minimum."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        for i in range(period - 1, len(data)):
-            result[i] = np.min(data[i-period+1:i+1])
-        return result
+        return kernels.rolling_min(data, period)
     
     @staticmethod
     def _rolling_sum(data: np.ndarray, period: int) -> np.ndarray:
         """Rolling Sum."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        cumsum = np.cumsum(data)
-        result[period-1:] = cumsum[period-1:] - np.concatenate([[0], cumsum[:-period]])
-        return result
+        return kernels.rolling_sum(data, period)
     
     @staticmethod
     def _rolling_prod(data: np.ndarray, period: int) -> np.ndarray:
         """Rolling Product."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        for i in range(period - 1, len(data)):
-            result[i] = np.prod(data[i-period+1:i+1])
-        return result
+        return kernels.rolling_prod(data, period)
     
     @staticmethod
     def _rolling_count(data: np.ndarray, period: int) -> np.ndarray:
         """Rolling Count of non-NaN values."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        for i in range(period - 1, len(data)):
-            result[i] = np.sum(~np.isnan(data[i-period+1:i+1]))
-        return result
+        return kernels.rolling_count(data, period)
     
     @staticmethod
     def _rank(data: np.ndarray) -> np.ndarray:
-        """Rank values (percentile)."""
+        """Rank values (percentile) over time."""
         valid_mask = ~np.isnan(data)
         result = np.full_like(data, np.nan, dtype=float)
         if not np.any(valid_mask):
             return result
-        valid_data = data[valid_mask]
-        ranks = np.argsort(np.argsort(valid_data)) / (len(valid_data) - 1)
-        result[valid_mask] = ranks
+        order = np.argsort(data, axis=0, kind='stable')
+        ranks = np.argsort(order, axis=0, kind='stable')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(valid_mask, ranks / (valid_mask.sum(axis=0) - 1), np.nan)
         return result
     
     @staticmethod
@@ -296,83 +337,63 @@ class FunctionRegistry:
         result = np.full_like(data, np.nan, dtype=float)
         if len(data) <= n:
             return result
-        result[n:] = np.diff(data, n=n)
+        result[n:] = np.diff(data, n=n, axis=0)
         return result
     
     @staticmethod
     def _shift(data: np.ndarray, periods: int) -> np.ndarray:
         """Shift data by N periods."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if periods > 0:
-            if len(data) > periods:
-                result[periods:] = data[:-periods]
-        elif periods < 0:
-            if len(data) > abs(periods):
-                result[:periods] = data[-periods:]
-        else:
-            result[:] = data
-        return result
+        return kernels.shift(data, periods)
     
     @staticmethod
     def _cumsum(data: np.ndarray) -> np.ndarray:
         """Cumulative sum."""
-        result = np.full_like(data, np.nan, dtype=float)
         valid_mask = ~np.isnan(data)
-        if not np.any(valid_mask):
-            return result
-        cumsum = np.cumsum(data[valid_mask])
-        result[valid_mask] = cumsum
-        return result
+        filled = np.where(valid_mask, data, 0.0)
+        return np.where(valid_mask, np.cumsum(filled, axis=0), np.nan)
     
     @staticmethod
     def _cumprod(data: np.ndarray) -> np.ndarray:
         """Cumulative product."""
-        result = np.full_like(data, np.nan, dtype=float)
         valid_mask = ~np.isnan(data)
-        if not np.any(valid_mask):
-            return result
-        cumprod = np.cumprod(data[valid_mask])
-        result[valid_mask] = cumprod
-        return result
+        filled = np.where(valid_mask, data, 1.0)
+        return np.where(valid_mask, np.cumprod(filled, axis=0), np.nan)
     
     @staticmethod
     def _cummax(data: np.ndarray) -> np.ndarray:
         """Cumulative maximum."""
-        result = np.full_like(data, np.nan, dtype=float)
         valid_mask = ~np.isnan(data)
-        if not np.any(valid_mask):
-            return result
-        cummax = np.maximum.accumulate(data[valid_mask])
-        result[valid_mask] = cummax
-        return result
+        filled = np.where(valid_mask, data, -np.inf)
+        return np.where(valid_mask, np.maximum.accumulate(filled, axis=0), np.nan)
     
     @staticmethod
     def _cummin(data: np.ndarray) -> np.ndarray:
         """Cumulative minimum."""
-        result = np.full_like(data, np.nan, dtype=float)
         valid_mask = ~np.isnan(data)
-        if not np.any(valid_mask):
-            return result
-        cummin = np.minimum.accumulate(data[valid_mask])
-        result[valid_mask] = cummin
-        return result
+        filled = np.where(valid_mask, data, np.inf)
+        return np.where(valid_mask, np.minimum.accumulate(filled, axis=0), np.nan)
     
     @staticmethod
     def _rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
         """Relative Strength Index."""
+        return kernels.from_first_valid(lambda c: FunctionRegistry._rsi_from_start(c, period), close)
+    
+    @staticmethod
+    def _rsi_from_start(close: np.ndarray, period: int = 14) -> np.ndarray:
+        """Relative Strength Index, with its state seeded on row 0."""
         result = np.full_like(close, np.nan, dtype=float)
         if len(close) < period + 1:
             return result
         
-        delta = np.diff(close)
+        delta = np.diff(close, axis=0)
         gains = np.where(delta > 0, delta, 0)
         losses = np.where(delta < 0, -delta, 0)
         
-        avg_gain = np.zeros(len(delta))
-        avg_loss = np.zeros(len(delta))
+        avg_gain = np.zeros_like(delta, dtype=float)
+        avg_loss = np.zeros_like(delta, dtype=float)
         
-        avg_gain[period-1] = np.mean(gains[:period])
-        avg_loss[period-1] = np.mean(losses[:period])
+        avg_gain[period-1] = np.mean(gains[:period], axis=0)
+        avg_loss[period-1] = np.mean(losses[:period], axis=0)
         
         for i in range(period, len(delta)):
             avg_gain[i] = (avg_gain[i-1] * (period - 1) + gains[i]) / period
@@ -390,12 +411,8 @@ class FunctionRegistry:
         ema_fast = FunctionRegistry._ema(close, fast)
         ema_slow = FunctionRegistry._ema(close, slow)
         macd_line = ema_fast - ema_slow
-        signal_line = FunctionRegistry._ema(macd_line[~np.isnan(macd_line)], signal)
         
-        result_signal = np.full_like(close, np.nan, dtype=float)
-        valid_start = np.where(~np.isnan(macd_line))[0]
-        if len(valid_start) > signal - 1:
-            result_signal[valid_start[signal-1]:] = signal_line
+        result_signal = FunctionRegistry._ema(macd_line, signal)
         
         hist = macd_line - result_signal
         return macd_line, result_signal, hist
@@ -404,6 +421,14 @@ class FunctionRegistry:
     def _kdj(high: np.ndarray, low: np.ndarray, close: np.ndarray, 
              n: int = 9, m1: int = 3, m2: int = 3) -> tuple:
         """KDJ indicator."""
+        return kernels.from_first_valid(
+            lambda h, lo, c: FunctionRegistry._kdj_from_start(h, lo, c, n, m1, m2), high, low, close,
+        )
+    
+    @staticmethod
+    def _kdj_from_start(high: np.ndarray, low: np.ndarray, close: np.ndarray, 
+                        n: int = 9, m1: int = 3, m2: int = 3) -> tuple:
+        """KDJ indicator, with its state seeded on row 0."""
         k = np.full_like(close, np.nan, dtype=float)
         d = np.full_like(close, np.nan, dtype=float)
         j = np.full_like(close, np.nan, dtype=float)
@@ -411,12 +436,8 @@ class FunctionRegistry:
         if len(close) < n:
             return k, d, j
         
-        lowest_low = np.zeros(len(close))
-        highest_high = np.zeros(len(close))
-        
-        for i in range(n - 1, len(close)):
-            lowest_low[i] = np.min(low[i-n+1:i+1])
-            highest_high[i] = np.max(high[i-n+1:i+1])
+        lowest_low = kernels.rolling_min(low, n)
+        highest_high = kernels.rolling_max(high, n)
         
         rsv = np.where(highest_high != lowest_low,
                        (close - lowest_low) / (highest_high - lowest_low) * 100,
@@ -445,11 +466,18 @@ class FunctionRegistry:
     @staticmethod
     def _atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
         """Average True Range."""
+        return kernels.from_first_valid(
+            lambda h, lo, c: FunctionRegistry._atr_from_start(h, lo, c, period), high, low, close,
+        )
+    
+    @staticmethod
+    def _atr_from_start(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+        """Average True Range, with its state seeded on row 0."""
         result = np.full_like(close, np.nan, dtype=float)
         if len(close) < period + 1:
             return result
         
-        prev_close = np.concatenate([[np.nan], close[:-1]])
+        prev_close = kernels.shift(close, 1)
         tr = np.maximum(
             high - low,
             np.maximum(
@@ -458,7 +486,7 @@ class FunctionRegistry:
             )
         )
         
-        result[period] = np.mean(tr[1:period+1])
+        result[period] = np.mean(tr[1:period+1], axis=0)
         for i in range(period + 1, len(close)):
             result[i] = (result[i-1] * (period - 1) + tr[i]) / period
         
@@ -467,13 +495,18 @@ class FunctionRegistry:
     @staticmethod
     def _obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
         """On-Balance Volume."""
+        return kernels.from_first_valid(FunctionRegistry._obv_from_start, close, volume)
+    
+    @staticmethod
+    def _obv_from_start(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """On-Balance Volume, with its state seeded on row 0."""
         result = np.zeros_like(close, dtype=float)
         if len(close) < 2:
             return result
         
-        direction = np.sign(np.diff(close))
-        direction = np.concatenate([[0], direction])
-        result = np.cumsum(direction * volume)
+        direction = np.sign(np.diff(close, axis=0))
+        direction = np.concatenate([np.zeros_like(direction[:1]), direction])
+        result = np.cumsum(direction * volume, axis=0)
         return result
     
     @staticmethod
@@ -487,9 +520,9 @@ class FunctionRegistry:
         sma_tp = FunctionRegistry._sma(tp, period)
         
         for i in range(period - 1, len(close)):
-            mean_dev = np.mean(np.abs(tp[i-period+1:i+1] - sma_tp[i]))
-            if mean_dev != 0:
-                result[i] = (tp[i] - sma_tp[i]) / (0.015 * mean_dev)
+            mean_dev = np.mean(np.abs(tp[i-period+1:i+1] - sma_tp[i]), axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[i] = np.where(mean_dev != 0, (tp[i] - sma_tp[i]) / (0.015 * mean_dev), np.nan)
         
         return result
     
@@ -500,27 +533,28 @@ class FunctionRegistry:
         if len(close) < period:
             return result
         
-        for i in range(period - 1, len(close)):
-            highest = np.max(high[i-period+1:i+1])
-            lowest = np.min(low[i-period+1:i+1])
-            if highest != lowest:
-                result[i] = (highest - close[i]) / (highest - lowest) * -100
+        highest = kernels.rolling_max(high, period)
+        lowest = kernels.rolling_min(low, period)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(highest != lowest, (highest - close) / (highest - lowest) * -100, np.nan)
         
         return result
     
     @staticmethod
     def _ad(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
         """Accumulation/Distribution Line."""
+        return kernels.from_first_valid(FunctionRegistry._ad_from_start, high, low, close, volume)
+    
+    @staticmethod
+    def _ad_from_start(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """Accumulation/Distribution Line, with its state seeded on row 0."""
         result = np.zeros_like(close, dtype=float)
         if len(close) < 1:
             return result
         
-        for i in range(len(close)):
-            if high[i] != low[i]:
-                clv = ((close[i] - low[i]) - (high[i] - close[i])) / (high[i] - low[i])
-            else:
-                clv = 0
-            result[i] = result[i-1] + clv * volume[i] if i > 0 else clv * volume[i]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            clv = np.where(high != low, ((close - low) - (high - close)) / (high - low), 0)
+        result = np.cumsum(clv * volume, axis=0)
         
         return result
     
@@ -535,20 +569,19 @@ class FunctionRegistry:
         tp = (high + low + close) / 3
         mf = tp * volume
         
-        positive_mf = np.zeros_like(close)
-        negative_mf = np.zeros_like(close)
+        positive_mf = np.zeros_like(close, dtype=float)
+        negative_mf = np.zeros_like(close, dtype=float)
         
-        for i in range(1, len(close)):
-            if tp[i] > tp[i-1]:
-                positive_mf[i] = mf[i]
-            elif tp[i] < tp[i-1]:
-                negative_mf[i] = mf[i]
+        rising = tp[1:] > tp[:-1]
+        falling = tp[1:] < tp[:-1]
+        positive_mf[1:] = np.where(rising, mf[1:], 0)
+        negative_mf[1:] = np.where(falling, mf[1:], 0)
         
-        for i in range(period, len(close)):
-            pos_sum = np.sum(positive_mf[i-period+1:i+1])
-            neg_sum = np.sum(negative_mf[i-period+1:i+1])
-            if pos_sum + neg_sum != 0:
-                result[i] = 100 * pos_sum / (pos_sum + neg_sum)
+        pos_sum = kernels.rolling_sum(positive_mf, period)
+        neg_sum = kernels.rolling_sum(negative_mf, period)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(pos_sum + neg_sum != 0, 100 * pos_sum / (pos_sum + neg_sum), np.nan)
+        result[:period] = np.nan
         
         return result
     
@@ -574,7 +607,7 @@ class FunctionRegistry:
     def _volatility(close: np.ndarray, period: int = 20, annualize: bool = True) -> np.ndarray:
         """Historical Volatility."""
         returns = np.full_like(close, np.nan, dtype=float)
-        returns[1:] = np.diff(close) / close[:-1]
+        returns[1:] = np.diff(close, axis=0) / close[:-1]
         
         result = FunctionRegistry._std(returns, period)
         if annualize:
@@ -584,54 +617,17 @@ class FunctionRegistry:
     @staticmethod
     def _skewness(data: np.ndarray, period: int = 20) -> np.ndarray:
         """Rolling Skewness."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        
-        for i in range(period - 1, len(data)):
-            window = data[i-period+1:i+1]
-            window = window[~np.isnan(window)]
-            if len(window) >= 3:
-                mean = np.mean(window)
-                std = np.std(window)
-                if std > 0:
-                    result[i] = np.mean(((window - mean) / std) ** 3)
-        
-        return result
+        return kernels.rolling_skew(data, period)
     
     @staticmethod
     def _kurtosis(data: np.ndarray, period: int = 20) -> np.ndarray:
         """Rolling Kurtosis."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        
-        for i in range(period - 1, len(data)):
-            window = data[i-period+1:i+1]
-            window = window[~np.isnan(window)]
-            if len(window) >= 4:
-                mean = np.mean(window)
-                std = np.std(window)
-                if std > 0:
-                    result[i] = np.mean(((window - mean) / std) ** 4) - 3
-        
-        return result
+        return kernels.rolling_kurt(data, period)
     
     @staticmethod
     def _zscore(data: np.ndarray, period: int = 20) -> np.ndarray:
         """Rolling Z-Score."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        
-        for i in range(period - 1, len(data)):
-            window = data[i-period+1:i+1]
-            mean = np.mean(window)
-            std = np.std(window)
-            if std > 0:
-                result[i] = (data[i] - mean) / std
-        
-        return result
+        return kernels.rolling_zscore(data, period)
     
     @staticmethod
     def _normalize(data: np.ndarray, period: int = 20) -> np.ndarray:
@@ -640,26 +636,24 @@ class FunctionRegistry:
         if len(data) < period:
             return result
         
-        for i in range(period - 1, len(data)):
-            window = data[i-period+1:i+1]
-            min_val = np.min(window)
-            max_val = np.max(window)
-            if max_val != min_val:
-                result[i] = (data[i] - min_val) / (max_val - min_val)
+        max_val = kernels.rolling_max(data, period)
+        min_val = kernels.rolling_min(data, period)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = np.where(max_val != min_val, (data - min_val) / (max_val - min_val), np.nan)
         
         return result
     
     @staticmethod
     def _winsorize(data: np.ndarray, lower: float = 0.01, upper: float = 0.99) -> np.ndarray:
-        """Winsorize data."""
+        """Winsorize data over time."""
         result = data.copy()
         valid_mask = ~np.isnan(data)
         if not np.any(valid_mask):
             return result
         
-        valid_data = data[valid_mask]
-        lower_bound = np.quantile(valid_data, lower)
-        upper_bound = np.quantile(valid_data, upper)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            lower_bound, upper_bound = np.nanquantile(data, [lower, upper], axis=0)
         
         result = np.clip(result, lower_bound, upper_bound)
         return result
@@ -667,68 +661,22 @@ class FunctionRegistry:
     @staticmethod
     def _quantile(data: np.ndarray, q: float, period: int = 20) -> np.ndarray:
         """Rolling Quantile."""
-        result = np.full_like(data, np.nan, dtype=float)
-        if len(data) < period:
-            return result
-        
-        for i in range(period - 1, len(data)):
-            window = data[i-period+1:i+1]
-            window = window[~np.isnan(window)]
-            if len(window) > 0:
-                result[i] = np.quantile(window, q)
-        
-        return result
+        return kernels.rolling_quantile(data, q, period)
     
     @staticmethod
     def _corr(x: np.ndarray, y: np.ndarray, period: int = 20) -> np.ndarray:
         """Rolling Correlation."""
-        result = np.full_like(x, np.nan, dtype=float)
-        if len(x) < period:
-            return result
-        
-        for i in range(period - 1, len(x)):
-            x_window = x[i-period+1:i+1]
-            y_window = y[i-period+1:i+1]
-            valid_mask = ~np.isnan(x_window) & ~np.isnan(y_window)
-            if np.sum(valid_mask) >= 2:
-                result[i] = np.corrcoef(x_window[valid_mask], y_window[valid_mask])[0, 1]
-        
-        return result
+        return kernels.rolling_corr(x, y, period)
     
     @staticmethod
     def _cov(x: np.ndarray, y: np.ndarray, period: int = 20) -> np.ndarray:
         """Rolling Covariance."""
-        result = np.full_like(x, np.nan, dtype=float)
-        if len(x) < period:
-            return result
-        
-        for i in range(period - 1, len(x)):
-            x_window = x[i-period+1:i+1]
-            y_window = y[i-period+1:i+1]
-            valid_mask = ~np.isnan(x_window) & ~np.isnan(y_window)
-            if np.sum(valid_mask) >= 2:
-                result[i] = np.cov(x_window[valid_mask], y_window[valid_mask])[0, 1]
-        
-        return result
+        return kernels.rolling_cov(x, y, period)
     
     @staticmethod
     def _beta(stock_returns: np.ndarray, market_returns: np.ndarray, period: int = 60) -> np.ndarray:
         """Rolling Beta."""
-        result = np.full_like(stock_returns, np.nan, dtype=float)
-        if len(stock_returns) < period:
-            return result
-        
-        for i in range(period - 1, len(stock_returns)):
-            stock_window = stock_returns[i-period+1:i+1]
-            market_window = market_returns[i-period+1:i+1]
-            valid_mask = ~np.isnan(stock_window) & ~np.isnan(market_window)
-            if np.sum(valid_mask) >= 2:
-                cov = np.cov(stock_window[valid_mask], market_window[valid_mask])[0, 1]
-                var = np.var(market_window[valid_mask])
-                if var > 0:
-                    result[i] = cov / var
-        
-        return result
+        return kernels.rolling_beta(stock_returns, market_returns, period)
     
     @staticmethod
     def _alpha(stock_returns: np.ndarray, market_returns: np.ndarray, 
@@ -759,17 +707,18 @@ class FunctionRegistry:
         if len(returns) < period:
             return result
         
-        for i in range(period - 1, len(returns)):
-            window = returns[i-period+1:i+1]
-            valid_mask = ~np.isnan(window)
-            if np.sum(valid_mask) >= 2:
-                valid_returns = window[valid_mask]
-                mean_ret = np.mean(valid_returns)
-                downside = valid_returns[valid_returns < 0]
-                if len(downside) > 0:
-                    downside_std = np.sqrt(np.mean(downside ** 2))
-                    if downside_std > 0:
-                        result[i] = (mean_ret - risk_free) / downside_std
+        valid_mask = ~np.isnan(returns)
+        downside_mask = returns < 0
+        count = kernels.rolling_sum(valid_mask.astype(float), period)
+        total = kernels.rolling_sum(np.where(valid_mask, returns, 0.0), period)
+        downside_count = kernels.rolling_sum(downside_mask.astype(float), period)
+        downside_sq = kernels.rolling_sum(np.where(downside_mask, returns ** 2, 0.0), period)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_ret = total / count
+            downside_std = np.sqrt(downside_sq / downside_count)
+            usable = (count >= 2) & (downside_count > 0) & (downside_std > 0)
+            result = np.where(usable, (mean_ret - risk_free) / downside_std, np.nan)
         
         return result
     
@@ -783,11 +732,9 @@ class FunctionRegistry:
         for i in range(period - 1, len(equity)):
             window = equity[i-period+1:i+1]
             valid_mask = ~np.isnan(window)
-            if np.sum(valid_mask) >= 2:
-                valid_equity = window[valid_mask]
-                cummax = np.maximum.accumulate(valid_equity)
-                drawdown = (cummax - valid_equity) / cummax
-                result[i] = np.max(drawdown)
+            cummax = np.fmax.accumulate(window, axis=0)
+            drawdown = np.where(valid_mask, (cummax - window) / cummax, -np.inf)
+            result[i] = np.where(valid_mask.sum(axis=0) >= 2, np.max(drawdown, axis=0), np.nan)
         
         return result
     
@@ -832,7 +779,7 @@ class ExpressionParser:
             for node in ast.walk(tree):
                 if isinstance(node, ast.Name):
                     name = node.id
-                    if name in self._function_registry.list_functions():
+                    if name in self._function_registry:
                         if name not in result.functions:
                             result.functions.append(name)
                     elif name not in self.ALLOWED_NAMES:
@@ -862,11 +809,87 @@ class ExpressionParser:
 
 
 class ExpressionEvaluator:
-    """Evaluator for factor expressions."""
+    """
+    Evaluator for factor expressions.
     
-    def __init__(self):
+    Parsed and compiled expressions are kept in a bounded LRU cache keyed by
+    expression text, so repeated evaluation of the same expression (e.g. one
+    factor over thousands of stocks) skips parsing, validation and
+    compilation. The cache is dropped whenever the function registry
+    changes, since registration can change how names resolve.
+    """
+    
+    CONSTANTS = {
+        'np': np,
+        'nan': np.nan,
+        'inf': np.inf,
+        'True': True,
+        'False': False,
+        'None': None,
+    }
+    
+    def __init__(self, cache_size: int = 1024):
         self._function_registry = FunctionRegistry()
         self._parser = ExpressionParser()
+        self._cache: OrderedDict[str, CompiledExpression] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_version = self._function_registry.version
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    def compile(self, expression: str) -> CompiledExpression:
+        """
+        Parse, validate and compile an expression, using the cache.
+        
+        Raises:
+            ValueError: If the expression cannot be parsed
+        """
+        with self._lock:
+            if self._cache_version != self._function_registry.version:
+                self._cache.clear()
+                self._cache_version = self._function_registry.version
+            
+            compiled = self._cache.get(expression)
+            if compiled is not None:
+                self._cache.move_to_end(expression)
+                self._hits += 1
+                return compiled
+            self._misses += 1
+        
+        parsed = self._parser.parse(expression)
+        if not parsed.is_valid:
+            raise ValueError(f"Invalid expression: {parsed.error}")
+        
+        compiled = CompiledExpression(
+            parsed=parsed,
+            code=compile(parsed.ast_tree, '<factor>', 'eval'),
+            dependencies=frozenset(parsed.dependencies),
+            functions=frozenset(parsed.functions),
+        )
+        
+        with self._lock:
+            self._cache[expression] = compiled
+            self._cache.move_to_end(expression)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        
+        return compiled
+    
+    def cache_info(self) -> dict[str, int]:
+        """Get compiled-expression cache statistics."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._cache),
+                "max_size": self._cache_size,
+            }
+    
+    def clear_cache(self) -> None:
+        """Drop all compiled expressions."""
+        with self._lock:
+            self._cache.clear()
     
     def evaluate(
         self,
@@ -885,10 +908,17 @@ class ExpressionEvaluator:
         Returns:
             Calculated factor values as numpy array
         """
-        parsed = self._parser.parse(expression)
-        if not parsed.is_valid:
-            raise ValueError(f"Invalid expression: {parsed.error}")
-        
+        compiled = self.compile(expression)
+        local_vars = self.namespace(context, parameters)
+        result = eval(compiled.code, {"__builtins__": {}}, local_vars)
+        return self.to_array(result, context)
+    
+    def namespace(
+        self,
+        context: ExpressionContext,
+        parameters: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        """Build the name -> value mapping an expression is evaluated against."""
         local_vars = {
             'open': context.open,
             'high': context.high,
@@ -900,24 +930,20 @@ class ExpressionEvaluator:
             'vwap': context.vwap,
             'returns': context.returns,
             'log_returns': context.log_returns,
-            'np': np,
-            'nan': np.nan,
-            'inf': np.inf,
-            'True': True,
-            'False': False,
-            'None': None,
+            **self.CONSTANTS,
+            **self._function_registry.namespace(),
         }
         
-        for func_name in self._function_registry.list_functions():
-            local_vars[func_name] = self._function_registry.get(func_name)
-        
         if parameters:
             local_vars.update(parameters)
         
-        result = eval(expression, {"__builtins__": {}}, local_vars)
-        
+        return local_vars
+    
+    @staticmethod
+    def to_array(result: Any, context: ExpressionContext) -> np.ndarray:
+        """Coerce an evaluation result to a float array shaped like the context."""
         if isinstance(result, (int, float)):
-            result = np.full(len(context.close), result, dtype=float)
+            result = np.full(np.shape(context.close), result, dtype=float)
         
         return np.asarray(result, dtype=float)
 
@@ -953,7 +979,7 @@ class FactorExpressionEngine:
     def calculate(
         self,
         expression: str,
-        klines: list[ADSKLineModel],
+        klines: list[ADSKLineModel] | KLineFrame,
         parameters: dict[str, Any] | None = None,
     ) -> np.ndarray:
         """
@@ -961,45 +987,137 @@ class FactorExpressionEngine:
         
         Args:
             expression: Factor expression
-            klines: List of K-Line data
+            klines: List of K-Line data or a KLineFrame
             parameters: Additional parameters
         
         Returns:
             Factor values as numpy array
         """
-        if not klines:
+        context = self._context_from_klines(klines)
+        return self._evaluator.evaluate(expression, context, parameters)
+    
+    def calculate_many(
+        self,
+        expressions: list[str],
+        data: ExpressionContext | list[ADSKLineModel] | KLineFrame,
+        parameters: dict[str, Any] | None = None,
+    ) -> "BatchResult":
+        """
+        Calculate several factor expressions over the same data.
+        
+        Sub-expressions shared between the expressions (``sma(close, 20)``,
+        ``std(returns, 20)``, ...) are evaluated once for the whole batch.
+        A failing expression is reported in ``errors`` and does not stop
+        the others.
+        
+        Args:
+            expressions: Factor expressions
+            data: K-Line data, or a prepared (single stock or panel) context
+            parameters: Additional parameters shared by the batch
+        
+        Returns:
+            BatchResult with values and errors keyed by expression
+        """
+        from .expression_dag import BatchExpressionEvaluator
+        
+        context = data if isinstance(data, ExpressionContext) else self._context_from_klines(data)
+        return BatchExpressionEvaluator(self._evaluator).evaluate(expressions, context, parameters)
+    
+    def infer_lookback(self, expression: str, parameters: dict[str, Any] | None = None) -> int:
+        """
+        Number of bars an expression needs to produce its latest value.
+        
+        Raises:
+            ValueError: If the expression cannot be analysed
+        """
+        from .lookback import infer_lookback
+        
+        return infer_lookback(expression, parameters)
+    
+    @staticmethod
+    def _context_from_klines(klines: list[ADSKLineModel] | KLineFrame) -> ExpressionContext:
+        if not len(klines):
             raise ValueError("No K-Line data provided")
         
-        open_arr = np.array([k.open for k in klines], dtype=float)
-        high_arr = np.array([k.high for k in klines], dtype=float)
-        low_arr = np.array([k.low for k in klines], dtype=float)
-        close_arr = np.array([k.close for k in klines], dtype=float)
-        volume_arr = np.array([k.volume for k in klines], dtype=float)
+        if isinstance(klines, KLineFrame):
+            return ExpressionContext(
+                open=klines.column('open'),
+                high=klines.column('high'),
+                low=klines.column('low'),
+                close=klines.column('close'),
+                volume=klines.column('volume'),
+                amount=klines.column('amount') if klines.has_column('amount') else None,
+                pre_close=klines.column('pre_close') if klines.has_column('pre_close') else None,
+                vwap=klines.vwap,
+                returns=klines.returns,
+                log_returns=klines.log_returns,
+                trade_date=klines[-1].trade_date,
+                code=klines.code,
+            )
         
         amount_arr = None
         pre_close_arr = None
         if hasattr(klines[0], 'amount'):
-            amount_arr = np.array([k.amount for k in klines], dtype=float)
+            amount_arr = kline_column(klines, 'amount')
         if hasattr(klines[0], 'pre_close'):
-            pre_close_arr = np.array([k.pre_close for k in klines], dtype=float)
-        
-        vwap_arr = np.where(volume_arr > 0, amount_arr / volume_arr, close_arr) if amount_arr is not None else None
-        returns_arr = np.concatenate([[np.nan], np.diff(close_arr) / close_arr[:-1]])
-        log_returns_arr = np.concatenate([[np.nan], np.log(close_arr[1:] / close_arr[:-1])])
-        
-        context = ExpressionContext(
-            open=open_arr,
-            high=high_arr,
-            low=low_arr,
-            close=close_arr,
-            volume=volume_arr,
+            pre_close_arr = kline_column(klines, 'pre_close')
+        
+        return ExpressionContext.from_arrays(
+            open=kline_column(klines, 'open'),
+            high=kline_column(klines, 'high'),
+            low=kline_column(klines, 'low'),
+            close=kline_column(klines, 'close'),
+            volume=kline_column(klines, 'volume'),
             amount=amount_arr,
             pre_close=pre_close_arr,
-            vwap=vwap_arr,
-            returns=returns_arr,
-            log_returns=log_returns_arr,
-            trade_date=klines[-1].trade_date if klines else None,
-            code=klines[-1].code if klines else None,
+            trade_date=klines[-1].trade_date,
+            code=klines[-1].code,
+        )
+    
+    def calculate_panel(
+        self,
+        expression: str,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        amount: np.ndarray | None = None,
+        parameters: dict[str, Any] | None = None,
+    ) -> np.ndarray:
+        """
+        Calculate factor values for a whole universe at once.
+        
+        Every input is a (dates x stocks) array with dates ascending; a stock
+        that is not trading on a date carries NaN. Time-series functions run
+        down each column and ``cs_*`` functions across each row, so the
+        expression is evaluated once instead of once per stock.
+        
+        Args:
+            expression: Factor expression
+            open, high, low, close, volume: OHLCV panels
+            amount: Optional turnover panel (enables vwap)
+            parameters: Additional parameters
+        
+        Returns:
+            Factor values as a (dates x stocks) numpy array
+        """
+        panels = [open, high, low, close, volume] + ([amount] if amount is not None else [])
+        shape = np.shape(close)
+        if len(shape) != 2:
+            raise ValueError("Panel inputs must be 2-D (dates x stocks) arrays")
+        if any(np.shape(panel) != shape for panel in panels):
+            raise ValueError("Panel inputs must all have the same shape")
+        if shape[0] == 0:
+            raise ValueError("No K-Line data provided")
+        
+        context = ExpressionContext.from_arrays(
+            open=open,
+            high=high,
+            low=low,
+            close=close,
+            volume=volume,
+            amount=amount,
         )
         
         return self._evaluator.evaluate(expression, context, parameters)
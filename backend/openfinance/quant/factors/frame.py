@@ -0,0 +1,265 @@
+"""
+Columnar K-Line Container.
+
+``KLineFrame`` holds one stock's K-Line history as contiguous float64
+columns plus a date index, so factor code can read ``close`` or ``volume``
+as an array without building Pydantic models first and then unpacking them
+again. It behaves like the ``list[ADSKLineModel]`` it replaces: ``len``,
+iteration, ``frame[-1].close`` and ``frame[-20:]`` all work, and slices are
+views that share the parent's buffers. Every numeric ``ADSKLineModel``
+field is carried as a column; a bar's other attributes (model properties
+such as ``typical_price``) are read from the materialized model.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from datetime import date
+from functools import cached_property
+from typing import Any, overload
+
+import numpy as np
+
+from openfinance.datacenter.models.analytical import ADSKLineModel
+
+__all__ = [
+    'KLineFrame',
+    'KLineRow',
+    'kline_column',
+]
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'amount', 'pre_close')
+KLINE_FIELDS = PRICE_FIELDS + (
+    'change', 'change_pct', 'turnover_rate', 'amplitude', 'market_cap', 'circulating_market_cap',
+)
+
+
+def _to_date(value: Any) -> date:
+    if isinstance(value, np.datetime64):
+        return value.astype('datetime64[D]').item()
+    if hasattr(value, 'date') and callable(value.date):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _column_from(values: Iterable[Any], count: int) -> np.ndarray:
+    return np.array(list(values), dtype=float) if count else np.empty(0, dtype=float)
+
+
+class KLineRow:
+    """Read-only view of one bar in a ``KLineFrame`` with ``ADSKLineModel`` attribute names."""
+
+    __slots__ = ('_frame', '_index')
+
+    def __init__(self, frame: "KLineFrame", index: int):
+        self._frame = frame
+        self._index = index
+
+    @property
+    def code(self) -> str:
+        return self._frame.code
+
+    @property
+    def trade_date(self) -> date:
+        return _to_date(self._frame.dates[self._index])
+
+    @property
+    def name(self) -> str | None:
+        return self._frame.name
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._frame.has_column(name):
+            value = self._frame.column(name)[self._index]
+            if np.isnan(value):
+                return None
+            return int(value) if name == 'volume' else float(value)
+        if name in KLINE_FIELDS:
+            return None
+        return getattr(self.to_model(), name)
+
+    def to_model(self) -> ADSKLineModel:
+        """Materialize the bar as an ``ADSKLineModel``."""
+        values = {name: getattr(self, name) for name in self._frame.columns}
+        return ADSKLineModel(code=self.code, trade_date=self.trade_date, name=self.name, **values)
+
+    def __repr__(self) -> str:
+        return f"KLineRow(code={self.code!r}, trade_date={self.trade_date}, close={self.close})"
+
+
+class KLineFrame(Sequence):
+    """
+    One stock's K-Line history in columnar form, oldest bar first.
+
+    Columns are float64 with NaN for missing values. Derived columns
+    (``returns``, ``log_returns``, ``vwap``) are computed on first access
+    and cached; a frame is treated as immutable once built.
+    """
+
+    def __init__(
+        self,
+        code: str,
+        dates: np.ndarray | Sequence[date],
+        columns: Mapping[str, np.ndarray | Sequence[float]],
+        name: str | None = None,
+    ):
+        self.code = code
+        self.name = name
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self._columns: dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            array = np.ascontiguousarray(values, dtype=float)
+            if array.shape != self.dates.shape:
+                raise ValueError(
+                    f"Column '{name}' has {array.shape[0]} rows, expected {self.dates.shape[0]}"
+                )
+            self._columns[name] = array
+
+    @classmethod
+    def from_klines(cls, klines: "Sequence[ADSKLineModel] | KLineFrame") -> "KLineFrame":
+        """Build a frame from K-Line models (returned as-is if already a frame)."""
+        if isinstance(klines, KLineFrame):
+            return klines
+        count = len(klines)
+        code = klines[-1].code if count else ""
+        columns = {
+            name: _column_from((getattr(k, name, None) for k in klines), count)
+            for name in KLINE_FIELDS
+        }
+        stock_name = getattr(klines[-1], 'name', None) if count else None
+        return cls(code, [k.trade_date for k in klines], columns, name=stock_name)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Mapping[str, Any]],
+        code: str | None = None,
+        fields: Sequence[str] = KLINE_FIELDS,
+    ) -> "KLineFrame":
+        """
+        Build a frame directly from database rows.
+
+        Args:
+            rows: Mappings (dicts, SQLAlchemy ``RowMapping``, asyncpg ``Record``)
+                with ``trade_date`` and price columns, optionally ``name``;
+                Decimal and None are fine
+            code: Stock code (taken from the rows' ``code`` column if omitted)
+            fields: Columns to load; columns absent from the rows are skipped
+
+        Returns:
+            KLineFrame sorted by trade date
+        """
+        rows = list(rows)
+        if code is None:
+            code = rows[0]['code'] if rows else ""
+        dates = np.array([_to_date(r['trade_date']) for r in rows], dtype='datetime64[D]')
+        present = set(rows[0].keys()) if rows else set(fields)
+        columns = {
+            name: _column_from((r[name] for r in rows), len(rows))
+            for name in fields if name in present
+        }
+
+        stock_name = rows[int(np.argmax(dates))]['name'] if rows and 'name' in present else None
+
+        if len(dates) > 1 and np.any(dates[1:] < dates[:-1]):
+            order = np.argsort(dates, kind='stable')
+            dates = dates[order]
+            columns = {name: values[order] for name, values in columns.items()}
+        return cls(code, dates, columns, name=stock_name)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a raw or derived column as a float64 array."""
+        if name in self._columns:
+            return self._columns[name]
+        if name in ('returns', 'log_returns', 'vwap'):
+            return getattr(self, name)
+        raise AttributeError(f"KLineFrame has no column '{name}'")
+
+    def has_column(self, name: str) -> bool:
+        return name in self._columns
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        columns = self.__dict__.get('_columns')
+        if columns is not None and name in columns:
+            return columns[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    @cached_property
+    def returns(self) -> np.ndarray:
+        close = self.column('close')
+        result = np.full_like(close, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[1:] = np.diff(close) / close[:-1]
+        return result
+
+    @cached_property
+    def log_returns(self) -> np.ndarray:
+        close = self.column('close')
+        result = np.full_like(close, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[1:] = np.log(close[1:] / close[:-1])
+        return result
+
+    @cached_property
+    def vwap(self) -> np.ndarray | None:
+        if 'amount' not in self._columns:
+            return None
+        volume = self.column('volume')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(volume > 0, self._columns['amount'] / volume, self.column('close'))
+
+    @property
+    def trade_dates(self) -> list[date]:
+        return self.dates.astype(object).tolist()
+
+    def __len__(self) -> int:
+        return self.dates.shape[0]
+
+    @overload
+    def __getitem__(self, index: int) -> KLineRow: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "KLineFrame": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return KLineFrame(
+                self.code,
+                self.dates[index],
+                {name: values[index] for name, values in self._columns.items()},
+                name=self.name,
+            )
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("KLineFrame index out of range")
+        return KLineRow(self, index)
+
+    def __iter__(self) -> Iterator[KLineRow]:
+        return (KLineRow(self, i) for i in range(len(self)))
+
+    def to_klines(self) -> list[ADSKLineModel]:
+        """Materialize every bar as an ``ADSKLineModel``."""
+        return [row.to_model() for row in self]
+
+    def __repr__(self) -> str:
+        span = f"{self.dates[0]}..{self.dates[-1]}" if len(self) else "empty"
+        return f"KLineFrame(code={self.code!r}, bars={len(self)}, {span})"
+
+
+def kline_column(klines: "Sequence[ADSKLineModel] | KLineFrame", name: str) -> np.ndarray:
+    """
+    Get one field of a K-Line sequence as a float64 array.
+
+    Zero-copy for a ``KLineFrame``; for a list of models, missing values
+    become NaN.
+    """
+    if isinstance(klines, KLineFrame):
+        return klines.column(name)
+    return _column_from((getattr(k, name, None) for k in klines), len(klines))
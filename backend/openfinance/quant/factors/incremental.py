@@ -0,0 +1,480 @@
+"""
+Incremental Indicator Updates.
+
+Streaming counterparts of the recursive indicators in ``FunctionRegistry``
+(EMA, RSI, MACD, KDJ, ATR, OBV), plus variants matching the registered
+``factor_rsi`` and ``factor_kdj`` factors in ``indicators/``, which use a
+different formula. Each indicator keeps a small serializable
+state - the last EMA value, the Wilder-smoothed gain/loss, the previous
+close - so a new bar costs O(1) instead of a recomputation over the whole
+history. ``update(bar)`` returns the same value the full-history function
+returns for that bar, to floating point tolerance.
+
+Bars may be ``ADSKLineModel`` instances or mappings with the same field
+names. Values that are still warming up are returned as ``None``.
+"""
+
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from datetime import date
+from typing import Any, ClassVar
+
+import numpy as np
+
+__all__ = [
+    'IncrementalIndicator',
+    'IncrementalEMA',
+    'IncrementalRSI',
+    'IncrementalRSIFactor',
+    'IncrementalMACD',
+    'IncrementalKDJ',
+    'IncrementalKDJFactor',
+    'IncrementalATR',
+    'IncrementalOBV',
+    'INCREMENTAL_INDICATORS',
+    'create_indicator',
+    'indicator_from_dict',
+    'bar_field',
+    'bar_date',
+]
+
+
+def bar_field(bar: Any, name: str) -> float:
+    """Read a numeric field from a K-Line model or mapping as float."""
+    value = bar.get(name) if isinstance(bar, dict) else getattr(bar, name, None)
+    return float('nan') if value is None else float(value)
+
+
+def bar_date(bar: Any) -> date | None:
+    """Read the trade date of a bar, if it has one."""
+    value = bar.get('trade_date') if isinstance(bar, dict) else getattr(bar, 'trade_date', None)
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def _output(value: float) -> float | None:
+    return None if value is None or math.isnan(value) else float(value)
+
+
+class IncrementalIndicator(ABC):
+    """
+    Base class for streaming indicators.
+
+    Subclasses declare their constructor parameters in ``params`` and their
+    mutable state in ``state_fields``; both must be JSON-serializable so a
+    state can be persisted between sessions and resumed with ``from_dict``.
+    """
+
+    name: ClassVar[str] = ""
+    params: ClassVar[tuple[str, ...]] = ()
+    state_fields: ClassVar[tuple[str, ...]] = ()
+
+    def __init__(self):
+        self.count = 0
+        self.last: Any = None
+
+    @abstractmethod
+    def _step(self, bar: Any) -> Any:
+        """Consume one bar and return the new indicator value."""
+        pass
+
+    def update(self, bar: Any) -> Any:
+        """
+        Feed the next bar.
+
+        Args:
+            bar: K-Line model or mapping with OHLCV fields
+
+        Returns:
+            Indicator value for this bar, or None while warming up
+        """
+        self.last = self._step(bar)
+        self.count += 1
+        return self.last
+
+    def update_many(self, bars: Iterable[Any]) -> list[Any]:
+        """Feed bars in order and return the value for each."""
+        return [self.update(bar) for bar in bars]
+
+    @property
+    def value(self) -> Any:
+        """Value after the most recent bar."""
+        return self.last
+
+    def get_state(self) -> dict[str, Any]:
+        state = {name: getattr(self, name) for name in self.state_fields}
+        state['count'] = self.count
+        state['last'] = list(self.last) if isinstance(self.last, tuple) else self.last
+        return state
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        for name in self.state_fields:
+            setattr(self, name, state[name])
+        self.count = state['count']
+        last = state['last']
+        self.last = tuple(last) if isinstance(last, list) else last
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize parameters and state."""
+        return {
+            'indicator': self.name,
+            'params': {name: getattr(self, name) for name in self.params},
+            'state': self.get_state(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "IncrementalIndicator":
+        """Restore an indicator serialized with ``to_dict``."""
+        indicator = cls(**data.get('params', {}))
+        indicator.set_state(data['state'])
+        return indicator
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.params)
+        return f"{type(self).__name__}({params}, count={self.count})"
+
+
+class IncrementalEMA(IncrementalIndicator):
+    """
+    EMA seeded with the mean of its first window, like ``kernels.ema``.
+
+    Leading NaN bars are skipped; a NaN after the series has started
+    propagates to every later value.
+    """
+
+    name = "ema"
+    params = ("period", "field")
+    state_fields = ("observed", "seed_sum", "ema")
+
+    def __init__(self, period: int = 20, field: str = "close"):
+        super().__init__()
+        self.period = period
+        self.field = field
+        self.observed = 0
+        self.seed_sum = 0.0
+        self.ema: float | None = None
+
+    def _step(self, bar: Any) -> float | None:
+        return self.push(bar_field(bar, self.field))
+
+    def push(self, x: float) -> float | None:
+        """Feed a raw value instead of a bar."""
+        if self.observed == 0 and math.isnan(x):
+            return None
+        self.observed += 1
+
+        if self.observed < self.period:
+            self.seed_sum += x
+            return None
+        if self.observed == self.period:
+            self.ema = (self.seed_sum + x) / self.period
+        else:
+            alpha = 2 / (self.period + 1)
+            self.ema = alpha * x + (1 - alpha) * self.ema
+        return _output(self.ema)
+
+
+class IncrementalRSI(IncrementalIndicator):
+    """
+    Wilder RSI matching ``FunctionRegistry._rsi``.
+
+    The first average gain/loss is the simple mean of the first ``period``
+    deltas; a NaN close counts as no change.
+    """
+
+    name = "rsi"
+    params = ("period",)
+    state_fields = ("prev_close", "deltas", "avg_gain", "avg_loss")
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: float | None = None
+        self.deltas = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _step(self, bar: Any) -> float | None:
+        close = bar_field(bar, 'close')
+        prev, self.prev_close = self.prev_close, close
+        if prev is None:
+            return None
+
+        delta = close - prev
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        self.deltas += 1
+
+        if self.deltas <= self.period:
+            self.avg_gain += gain
+            self.avg_loss += loss
+            if self.deltas < self.period:
+                return None
+            self.avg_gain /= self.period
+            self.avg_loss /= self.period
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        rs = self.avg_gain / self.avg_loss if self.avg_loss != 0 else 0.0
+        return float(100 - 100 / (1 + rs))
+
+
+class IncrementalRSIFactor(IncrementalIndicator):
+    """
+    RSI matching ``indicators.rsi.calculate_rsi`` (the ``factor_rsi`` factor).
+
+    Average gain and loss are simple means of the last ``period`` deltas,
+    and the RSI is 100 when there is no loss in the window. A NaN close
+    counts as no change.
+    """
+
+    name = "rsi_factor"
+    params = ("period",)
+    state_fields = ("prev_close", "gains", "losses")
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: float | None = None
+        self.gains: list[float] = []
+        self.losses: list[float] = []
+
+    def _step(self, bar: Any) -> float | None:
+        close = bar_field(bar, 'close')
+        prev, self.prev_close = self.prev_close, close
+        if prev is None:
+            return None
+
+        delta = close - prev
+        self.gains.append(delta if delta > 0 else 0.0)
+        self.losses.append(-delta if delta < 0 else 0.0)
+        if len(self.gains) > self.period:
+            del self.gains[0], self.losses[0]
+        if len(self.gains) < self.period:
+            return None
+
+        avg_gain = float(np.mean(self.gains))
+        avg_loss = float(np.mean(self.losses))
+        if avg_loss == 0:
+            return 100.0
+        return float(100 - 100 / (1 + avg_gain / avg_loss))
+
+
+class IncrementalMACD(IncrementalIndicator):
+    """MACD line, signal line and histogram from three streaming EMAs."""
+
+    name = "macd"
+    params = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self._fast = IncrementalEMA(fast)
+        self._slow = IncrementalEMA(slow)
+        self._signal = IncrementalEMA(signal)
+
+    def _step(self, bar: Any) -> tuple[float | None, float | None, float | None]:
+        close = bar_field(bar, 'close')
+        fast = self._fast.push(close)
+        slow = self._slow.push(close)
+        if fast is None or slow is None:
+            # Once both legs are seeded a NaN keeps the line NaN for good.
+            seeded = self._fast.observed >= self.fast and self._slow.observed >= self.slow
+            line = float('nan') if seeded else None
+        else:
+            line = fast - slow
+        signal = self._signal.push(line) if line is not None else None
+        hist = line - signal if line is not None and signal is not None else None
+        return _output(line), signal, _output(hist)
+
+    def get_state(self) -> dict[str, Any]:
+        state = super().get_state()
+        state.update({
+            'fast_ema': self._fast.get_state(),
+            'slow_ema': self._slow.get_state(),
+            'signal_ema': self._signal.get_state(),
+        })
+        return state
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        super().set_state(state)
+        self._fast.set_state(state['fast_ema'])
+        self._slow.set_state(state['slow_ema'])
+        self._signal.set_state(state['signal_ema'])
+
+
+class IncrementalKDJ(IncrementalIndicator):
+    """
+    KDJ matching ``FunctionRegistry._kdj``.
+
+    Keeps the last ``n`` highs and lows for the RSV window; K and D start at
+    50 on bar ``n`` and are smoothed with ``1/m1`` and ``1/m2``.
+    """
+
+    name = "kdj"
+    params = ("n", "m1", "m2")
+    state_fields = ("highs", "lows", "k", "d")
+
+    def __init__(self, n: int = 9, m1: int = 3, m2: int = 3):
+        super().__init__()
+        self.n = n
+        self.m1 = m1
+        self.m2 = m2
+        self.highs: list[float] = []
+        self.lows: list[float] = []
+        self.k = 50.0
+        self.d = 50.0
+
+    def _step(self, bar: Any) -> tuple[float | None, float | None, float | None]:
+        self.highs.append(bar_field(bar, 'high'))
+        self.lows.append(bar_field(bar, 'low'))
+        if len(self.highs) > self.n:
+            del self.highs[0], self.lows[0]
+
+        position = self.count + 1
+        if position < self.n:
+            return None, None, None
+        if position == self.n:
+            return 50.0, 50.0, 50.0
+
+        highest = max(self.highs) if not any(math.isnan(h) for h in self.highs) else float('nan')
+        lowest = min(self.lows) if not any(math.isnan(v) for v in self.lows) else float('nan')
+        close = bar_field(bar, 'close')
+        rsv = (close - lowest) / (highest - lowest) * 100 if highest != lowest else 50.0
+
+        alpha1, alpha2 = 1 / self.m1, 1 / self.m2
+        self.k = alpha1 * rsv + (1 - alpha1) * self.k
+        self.d = alpha2 * self.k + (1 - alpha2) * self.d
+        return _output(self.k), _output(self.d), _output(3 * self.k - 2 * self.d)
+
+
+class IncrementalKDJFactor(IncrementalIndicator):
+    """
+    KDJ matching ``indicators.kdj.calculate_kdj`` (the ``factor_kdj`` factor).
+
+    Unlike ``IncrementalKDJ``, K and D start from 50 and are smoothed from
+    bar ``n`` itself with fixed 1/3 weights; ``m1`` and ``m2`` only set the
+    warm-up, so values start on bar ``n - 1 + max(m1, m2)``.
+    """
+
+    name = "kdj_factor"
+    params = ("n", "m1", "m2")
+    state_fields = ("highs", "lows", "k", "d")
+
+    def __init__(self, n: int = 9, m1: int = 3, m2: int = 3):
+        super().__init__()
+        self.n = n
+        self.m1 = m1
+        self.m2 = m2
+        self.highs: list[float] = []
+        self.lows: list[float] = []
+        self.k = 50.0
+        self.d = 50.0
+
+    def _step(self, bar: Any) -> tuple[float | None, float | None, float | None]:
+        self.highs.append(bar_field(bar, 'high'))
+        self.lows.append(bar_field(bar, 'low'))
+        if len(self.highs) > self.n:
+            del self.highs[0], self.lows[0]
+
+        position = self.count + 1
+        if position < self.n:
+            return None, None, None
+
+        highest = max(self.highs) if not any(math.isnan(h) for h in self.highs) else float('nan')
+        lowest = min(self.lows) if not any(math.isnan(v) for v in self.lows) else float('nan')
+        close = bar_field(bar, 'close')
+        rsv = 50.0 if highest == lowest else (close - lowest) / (highest - lowest) * 100
+
+        self.k = (2 / 3) * self.k + (1 / 3) * rsv
+        self.d = (2 / 3) * self.d + (1 / 3) * self.k
+        if position < self.n - 1 + max(self.m1, self.m2):
+            return None, None, None
+        return _output(self.k), _output(self.d), _output(3 * self.k - 2 * self.d)
+
+
+class IncrementalATR(IncrementalIndicator):
+    """Wilder ATR matching ``FunctionRegistry._atr``."""
+
+    name = "atr"
+    params = ("period",)
+    state_fields = ("prev_close", "ranges", "atr")
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.prev_close: float | None = None
+        self.ranges = 0
+        self.atr = 0.0
+
+    def _step(self, bar: Any) -> float | None:
+        high, low, close = bar_field(bar, 'high'), bar_field(bar, 'low'), bar_field(bar, 'close')
+        prev, self.prev_close = self.prev_close, close
+        if prev is None:
+            return None
+
+        tr = float(np.maximum(high - low, np.maximum(abs(high - prev), abs(low - prev))))
+        self.ranges += 1
+        if self.ranges <= self.period:
+            self.atr += tr
+            if self.ranges < self.period:
+                return None
+            self.atr /= self.period
+        else:
+            self.atr = (self.atr * (self.period - 1) + tr) / self.period
+        return _output(self.atr)
+
+
+class IncrementalOBV(IncrementalIndicator):
+    """On-Balance Volume matching ``FunctionRegistry._obv``."""
+
+    name = "obv"
+    state_fields = ("prev_close", "obv")
+
+    def __init__(self):
+        super().__init__()
+        self.prev_close: float | None = None
+        self.obv = 0.0
+
+    def _step(self, bar: Any) -> float | None:
+        close, volume = bar_field(bar, 'close'), bar_field(bar, 'volume')
+        prev, self.prev_close = self.prev_close, close
+        direction = 0.0 if prev is None else float(np.sign(close - prev))
+        self.obv += direction * volume
+        return _output(self.obv)
+
+
+INCREMENTAL_INDICATORS: dict[str, type[IncrementalIndicator]] = {
+    cls.name: cls
+    for cls in (
+        IncrementalEMA,
+        IncrementalRSI,
+        IncrementalRSIFactor,
+        IncrementalMACD,
+        IncrementalKDJ,
+        IncrementalKDJFactor,
+        IncrementalATR,
+        IncrementalOBV,
+    )
+}
+
+
+def create_indicator(name: str, **params: Any) -> IncrementalIndicator:
+    """Create a streaming indicator by name (``ema``, ``rsi``, ``macd``, ...)."""
+    cls = INCREMENTAL_INDICATORS.get(name.lower())
+    if cls is None:
+        raise ValueError(f"Unknown incremental indicator: {name}")
+    return cls(**params)
+
+
+def indicator_from_dict(data: dict[str, Any]) -> IncrementalIndicator:
+    """Restore any streaming indicator serialized with ``to_dict``."""
+    cls = INCREMENTAL_INDICATORS.get(data.get('indicator', ''))
+    if cls is None:
+        raise ValueError(f"Unknown incremental indicator: {data.get('indicator')}")
+    return cls.from_dict(data)
@@ -22,6 +22,8 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
+from ..kernels import rolling_sum
 from ..registry import register_factor
 
 
@@ -42,19 +44,14 @@ def calculate_atr(
     if len(klines) < period + 1:
         return None
     
-    true_ranges = []
+    high = kline_column(klines, "high")[1:]
+    low = kline_column(klines, "low")[1:]
+    prev_close = kline_column(klines, "close")[:-1]
     
-    for i in range(1, len(klines)):
-        high = klines[i].high
-        low = klines[i].low
-        prev_close = klines[i - 1].close
-        
-        tr = max(
-            high - low,
-            abs(high - prev_close),
-            abs(low - prev_close),
-        )
-        true_ranges.append(tr)
+    true_ranges = np.maximum(
+        high - low,
+        np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)),
+    )
     
     if len(true_ranges) < period:
         return None
@@ -62,6 +59,28 @@ def calculate_atr(
     return float(np.mean(true_ranges[-period:]))
 
 
+def calculate_atr_series(klines: list[ADSKLineModel], period: int = 14) -> np.ndarray:
+    """
+    Calculate ATR at every bar in one pass.
+    
+    Element ``i`` equals ``calculate_atr(klines[:i + 1], period)``, NaN
+    where that returns None.
+    """
+    high = kline_column(klines, "high")
+    low = kline_column(klines, "low")
+    close = kline_column(klines, "close")
+    
+    true_ranges = np.full(len(close), np.nan)
+    true_ranges[1:] = np.maximum(
+        high[1:] - low[1:],
+        np.maximum(np.abs(high[1:] - close[:-1]), np.abs(low[1:] - close[:-1])),
+    )
+    
+    result = rolling_sum(true_ranges, period) / period
+    result[:period] = np.nan
+    return result
+
+
 def atr(
     high: np.ndarray | list,
     low: np.ndarray | list,
@@ -199,6 +218,15 @@ class ATRFactor(FactorBase):
         period = kwargs.get("period", self._config.lookback_period)
         return calculate_atr(klines, period=period)
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate ATR for every bar."""
+        period = kwargs.get("period", self._config.lookback_period)
+        return calculate_atr_series(klines, period=period)
+    
     def calculate_full(
         self,
         klines: list[ADSKLineModel],
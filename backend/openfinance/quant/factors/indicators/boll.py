@@ -23,6 +23,8 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
+from ..kernels import rolling_sum
 from ..registry import register_factor
 
 
@@ -45,7 +47,7 @@ def calculate_boll(
     if len(klines) < period:
         return None, None, None
     
-    closes = np.array([k.close for k in klines])
+    closes = kline_column(klines, "close")
     
     middle = np.mean(closes[-period:])
     std = np.std(closes[-period:], ddof=1)
@@ -56,6 +58,16 @@ def calculate_boll(
     return float(upper), float(middle), float(lower)
 
 
+def calculate_boll_series(klines: list[ADSKLineModel], period: int = 20) -> np.ndarray:
+    """
+    Calculate the middle band at every bar in one pass.
+    
+    Element ``i`` equals the middle band of ``calculate_boll(klines[:i + 1])``,
+    NaN where that returns None.
+    """
+    return rolling_sum(kline_column(klines, "close"), period) / period
+
+
 def boll(
     close: np.ndarray | list,
     period: int = 20,
@@ -166,6 +178,15 @@ class BOLLFactor(FactorBase):
         _, middle, _ = calculate_boll(klines, period=period, std_dev=std_dev)
         return middle
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate the middle band for every bar."""
+        period = kwargs.get("period", self._config.lookback_period)
+        return calculate_boll_series(klines, period=period)
+    
     def calculate_full(
         self,
         klines: list[ADSKLineModel],
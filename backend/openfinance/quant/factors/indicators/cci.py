@@ -12,6 +12,7 @@ from dataclasses import dataclass
 from typing import Any
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 from openfinance.datacenter.models.analytical import ADSKLineModel
 from ..base import (
@@ -22,6 +23,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -42,12 +44,14 @@ def calculate_cci(
     if len(klines) < period:
         return None
     
-    tp_values = [(k.high + k.low + k.close) / 3 for k in klines]
+    tp_values = (
+        kline_column(klines, "high") + kline_column(klines, "low") + kline_column(klines, "close")
+    ) / 3
     
     tp_window = tp_values[-period:]
     sma_tp = np.mean(tp_window)
     
-    mean_deviation = np.mean([abs(tp - sma_tp) for tp in tp_window])
+    mean_deviation = np.mean(np.abs(tp_window - sma_tp))
     
     if mean_deviation == 0:
         return 0.0
@@ -58,6 +62,30 @@ def calculate_cci(
     return float(cci)
 
 
+def calculate_cci_series(klines: list[ADSKLineModel], period: int = 20) -> np.ndarray:
+    """
+    Calculate CCI at every bar in one pass.
+    
+    Element ``i`` equals ``calculate_cci(klines[:i + 1], period)``, NaN
+    where that returns None.
+    """
+    tp_values = (
+        kline_column(klines, "high") + kline_column(klines, "low") + kline_column(klines, "close")
+    ) / 3
+    result = np.full(len(tp_values), np.nan)
+    if len(tp_values) < period:
+        return result
+    
+    windows = sliding_window_view(tp_values, period)
+    sma_tp = windows.mean(axis=1)
+    mean_deviation = np.abs(windows - sma_tp[:, np.newaxis]).mean(axis=1)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cci = (tp_values[period - 1:] - sma_tp) / (0.015 * mean_deviation)
+    result[period - 1:] = np.where(mean_deviation == 0, 0.0, cci)
+    return result
+
+
 def cci(
     high: np.ndarray | list,
     low: np.ndarray | list,
@@ -165,6 +193,15 @@ class CCIFactor(FactorBase):
         period = kwargs.get("period", self._config.lookback_period)
         return calculate_cci(klines, period=period)
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate CCI for every bar."""
+        period = kwargs.get("period", self._config.lookback_period)
+        return calculate_cci_series(klines, period=period)
+    
     def calculate_full(
         self,
         klines: list[ADSKLineModel],
@@ -23,6 +23,8 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
+from ..kernels import rolling_max, rolling_min
 from ..registry import register_factor
 
 
@@ -47,17 +49,20 @@ def calculate_kdj(
     if len(klines) < n:
         return None, None, None
     
+    highs = kline_column(klines, "high")
+    lows = kline_column(klines, "low")
+    closes = kline_column(klines, "close")
+    
     rsv_values = []
     
     for i in range(n - 1, len(klines)):
-        window = klines[i - n + 1:i + 1]
-        high_n = max(k.high for k in window)
-        low_n = min(k.low for k in window)
+        high_n = highs[i - n + 1:i + 1].max()
+        low_n = lows[i - n + 1:i + 1].min()
         
         if high_n == low_n:
             rsv = 50.0
         else:
-            rsv = (klines[i].close - low_n) / (high_n - low_n) * 100
+            rsv = (closes[i] - low_n) / (high_n - low_n) * 100
         
         rsv_values.append(rsv)
     
@@ -85,6 +90,37 @@ def calculate_kdj(
     return float(k_final), float(d_final), float(j_final)
 
 
+def calculate_kdj_series(
+    klines: list[ADSKLineModel],
+    n: int = 9,
+    m1: int = 3,
+    m2: int = 3,
+) -> np.ndarray:
+    """
+    Calculate K at every bar in one pass.
+    
+    Element ``i`` equals the K value of ``calculate_kdj(klines[:i + 1])``,
+    NaN where that returns None.
+    """
+    closes = kline_column(klines, "close")
+    result = np.full(len(closes), np.nan)
+    if len(closes) < n:
+        return result
+    
+    high_n = rolling_max(kline_column(klines, "high"), n)
+    low_n = rolling_min(kline_column(klines, "low"), n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsv = np.where(high_n == low_n, 50.0, (closes - low_n) / (high_n - low_n) * 100)
+    
+    k = 50.0
+    for i in range(n - 1, len(closes)):
+        k = (2 / 3) * k + (1 / 3) * rsv[i]
+        result[i] = k
+    
+    result[:n - 2 + max(m1, m2)] = np.nan
+    return result
+
+
 def kdj(
     high: np.ndarray | list,
     low: np.ndarray | list,
@@ -213,6 +249,17 @@ class KDJFactor(FactorBase):
         k, _, _ = calculate_kdj(klines, n=n, m1=m1, m2=m2)
         return k
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate K for every bar."""
+        n = kwargs.get("n", self._config.lookback_period)
+        m1 = kwargs.get("m1", 3)
+        m2 = kwargs.get("m2", 3)
+        return calculate_kdj_series(klines, n=n, m1=m1, m2=m2)
+    
     def calculate_full(
         self,
         klines: list[ADSKLineModel],
@@ -19,6 +19,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -36,7 +37,7 @@ def calculate_sma(klines: list[ADSKLineModel], period: int = 20) -> float | None
     if len(klines) < period:
         return None
     
-    closes = np.array([k.close for k in klines])
+    closes = kline_column(klines, "close")
     return float(np.mean(closes[-period:]))
 
 
@@ -54,7 +55,7 @@ def calculate_ema(klines: list[ADSKLineModel], period: int = 20) -> float | None
     if len(klines) < period:
         return None
     
-    closes = np.array([k.close for k in klines])
+    closes = kline_column(klines, "close")
     alpha = 2 / (period + 1)
     
     ema = np.mean(closes[:period])
@@ -23,6 +23,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -47,7 +48,7 @@ def calculate_macd(
     if len(klines) < slow + signal:
         return None, None, None
     
-    closes = np.array([k.close for k in klines])
+    closes = kline_column(klines, "close")
     
     ema_fast = _calculate_ema_array(closes, fast)
     ema_slow = _calculate_ema_array(closes, slow)
@@ -75,6 +76,25 @@ def calculate_macd(
     return macd_val, signal_val, hist_val
 
 
+def calculate_macd_series(
+    klines: list[ADSKLineModel],
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+) -> np.ndarray:
+    """
+    Calculate the MACD line at every bar in one pass.
+    
+    Element ``i`` equals the MACD line of ``calculate_macd(klines[:i + 1])``,
+    NaN where that returns None. The EMAs are seeded at the first bar, so
+    every prefix sees the same EMA values.
+    """
+    closes = kline_column(klines, "close")
+    macd_line = _calculate_ema_array(closes, fast) - _calculate_ema_array(closes, slow)
+    macd_line[:slow + signal - 1] = np.nan
+    return macd_line
+
+
 def _calculate_ema_array(data: np.ndarray, period: int) -> np.ndarray:
     """
     Calculate EMA for an array.
@@ -207,6 +227,17 @@ class MACDFactor(FactorBase):
         macd_val, _, _ = calculate_macd(klines, fast=fast, slow=slow, signal=signal)
         return macd_val
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate the MACD line for every bar."""
+        fast = kwargs.get("fast", 12)
+        slow = kwargs.get("slow", 26)
+        signal = kwargs.get("signal", 9)
+        return calculate_macd_series(klines, fast=fast, slow=slow, signal=signal)
+    
     def calculate_full(
         self,
         klines: list[ADSKLineModel],
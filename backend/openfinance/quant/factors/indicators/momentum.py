@@ -14,6 +14,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -33,7 +34,7 @@ def calculate_momentum(klines: list[ADSKLineModel], period: int = 20) -> float |
     if len(klines) < period + 1:
         return None
     
-    closes = np.array([k.close for k in klines])
+    closes = kline_column(klines, "close")
     current_price = closes[-1]
     past_price = closes[-period - 1]
     
@@ -44,6 +45,25 @@ def calculate_momentum(klines: list[ADSKLineModel], period: int = 20) -> float |
     return float(momentum)
 
 
+def calculate_momentum_series(klines: list[ADSKLineModel], period: int = 20) -> np.ndarray:
+    """
+    Calculate momentum at every bar in one pass.
+    
+    Element ``i`` equals ``calculate_momentum(klines[:i + 1], period)``,
+    NaN where that returns None.
+    """
+    closes = kline_column(klines, "close")
+    result = np.full(len(closes), np.nan)
+    if len(closes) < period + 1:
+        return result
+    
+    past_price = closes[:-period]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        momentum = (closes[period:] - past_price) / past_price * 100
+    result[period:] = np.where(past_price > 0, momentum, np.nan)
+    return result
+
+
 @register_factor(is_builtin=True)
 class MomentumFactor(FactorBase):
     """
@@ -75,3 +95,12 @@ class MomentumFactor(FactorBase):
         """Calculate momentum value."""
         period = kwargs.get("period", self._config.lookback_period)
         return calculate_momentum(klines, period=period)
+    
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate momentum for every bar."""
+        period = kwargs.get("period", self._config.lookback_period)
+        return calculate_momentum_series(klines, period=period)
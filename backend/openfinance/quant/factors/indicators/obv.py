@@ -23,6 +23,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -41,15 +42,28 @@ def calculate_obv(
     if len(klines) < 2:
         return None
     
-    obv = 0.0
+    closes = kline_column(klines, "close")
+    volumes = kline_column(klines, "volume")
+    direction = np.sign(np.diff(closes))
     
-    for i in range(1, len(klines)):
-        if klines[i].close > klines[i - 1].close:
-            obv += klines[i].volume
-        elif klines[i].close < klines[i - 1].close:
-            obv -= klines[i].volume
+    return float(np.sum(direction * volumes[1:]))
+
+
+def calculate_obv_series(klines: list[ADSKLineModel]) -> np.ndarray:
+    """
+    Calculate OBV at every bar in one pass.
+    
+    Element ``i`` equals ``calculate_obv(klines[:i + 1])``, NaN where that
+    returns None.
+    """
+    closes = kline_column(klines, "close")
+    volumes = kline_column(klines, "volume")
+    result = np.full(len(closes), np.nan)
+    if len(closes) < 2:
+        return result
     
-    return float(obv)
+    result[1:] = np.cumsum(np.sign(np.diff(closes)) * volumes[1:])
+    return result
 
 
 def obv(
@@ -141,6 +155,14 @@ class OBVFactor(FactorBase):
         """
         return calculate_obv(klines)
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate OBV for every bar."""
+        return calculate_obv_series(klines)
+    
     def calculate_full(
         self,
         klines: list[ADSKLineModel],
@@ -14,6 +14,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -40,7 +41,7 @@ def calculate_relative_strength(
     if len(klines) < period:
         return None
     
-    closes = np.array([k.close for k in klines[-period:]])
+    closes = kline_column(klines[-period:], "close")
     
     if len(closes) < 2:
         return None
@@ -21,6 +21,8 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
+from ..kernels import rolling_sum
 from ..registry import register_factor
 
 
@@ -38,7 +40,7 @@ def calculate_rsi(klines: list[ADSKLineModel], period: int = 14) -> float | None
     if len(klines) < period + 1:
         return None
     
-    closes = np.array([k.close for k in klines])
+    closes = kline_column(klines, "close")
     deltas = np.diff(closes)
     
     gains = np.where(deltas > 0, deltas, 0)
@@ -56,6 +58,28 @@ def calculate_rsi(klines: list[ADSKLineModel], period: int = 14) -> float | None
     return float(rsi)
 
 
+def calculate_rsi_series(klines: list[ADSKLineModel], period: int = 14) -> np.ndarray:
+    """
+    Calculate RSI at every bar in one pass.
+    
+    Element ``i`` equals ``calculate_rsi(klines[:i + 1], period)``, NaN
+    where that returns None.
+    """
+    closes = kline_column(klines, "close")
+    result = np.full(len(closes), np.nan)
+    if len(closes) < period + 1:
+        return result
+    
+    deltas = np.diff(closes)
+    avg_gain = rolling_sum(np.where(deltas > 0, deltas, 0), period) / period
+    avg_loss = rolling_sum(np.where(deltas < 0, -deltas, 0), period) / period
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+    result[period:] = rsi[period - 1:]
+    return result
+
+
 @register_factor(is_builtin=True)
 class RSIFactor(FactorBase):
     """
@@ -100,6 +124,15 @@ class RSIFactor(FactorBase):
         period = kwargs.get("period", self._config.lookback_period)
         return calculate_rsi(klines, period=period)
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate RSI for every bar."""
+        period = kwargs.get("period", self._config.lookback_period)
+        return calculate_rsi_series(klines, period=period)
+    
     def generate_signal(
         self,
         value: float,
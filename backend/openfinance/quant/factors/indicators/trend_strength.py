@@ -14,6 +14,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -39,10 +40,10 @@ def calculate_trend_strength(
     
     recent_klines = klines[-period:]
     
-    highs = np.array([k.high for k in recent_klines])
-    lows = np.array([k.low for k in recent_klines])
-    closes = np.array([k.close for k in recent_klines])
-    volumes = np.array([k.volume for k in recent_klines])
+    highs = kline_column(recent_klines, "high")
+    lows = kline_column(recent_klines, "low")
+    closes = kline_column(recent_klines, "close")
+    volumes = kline_column(recent_klines, "volume")
     
     if len(closes) < 2:
         return None
@@ -14,6 +14,7 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
 from ..registry import register_factor
 
 
@@ -39,8 +40,8 @@ def calculate_volume_strength(
     
     recent_klines = klines[-period:]
     
-    volumes = np.array([k.volume for k in recent_klines])
-    closes = np.array([k.close for k in recent_klines])
+    volumes = kline_column(recent_klines, "volume")
+    closes = kline_column(recent_klines, "close")
     
     if len(volumes) < 2:
         return None
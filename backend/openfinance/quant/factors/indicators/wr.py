@@ -21,6 +21,8 @@ from ..base import (
     FactorType,
     FactorCategory,
 )
+from ..frame import kline_column
+from ..kernels import rolling_max, rolling_min
 from ..registry import register_factor
 
 
@@ -42,8 +44,8 @@ def calculate_wr(
         return None
     
     window = klines[-period:]
-    highest_high = max(k.high for k in window)
-    lowest_low = min(k.low for k in window)
+    highest_high = float(np.max(kline_column(window, "high")))
+    lowest_low = float(np.min(kline_column(window, "low")))
     close = klines[-1].close
     
     if highest_high == lowest_low:
@@ -54,6 +56,22 @@ def calculate_wr(
     return float(wr)
 
 
+def calculate_wr_series(klines: list[ADSKLineModel], period: int = 14) -> np.ndarray:
+    """
+    Calculate Williams %R at every bar in one pass.
+    
+    Element ``i`` equals ``calculate_wr(klines[:i + 1], period)``, NaN
+    where that returns None.
+    """
+    highest_high = rolling_max(kline_column(klines, "high"), period)
+    lowest_low = rolling_min(kline_column(klines, "low"), period)
+    close = kline_column(klines, "close")
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        wr = (highest_high - close) / (highest_high - lowest_low) * (-100)
+    return np.where(highest_high == lowest_low, -50.0, wr)
+
+
 def wr(
     high: np.ndarray | list,
     low: np.ndarray | list,
@@ -158,6 +176,15 @@ class WRFactor(FactorBase):
         period = kwargs.get("period", self._config.lookback_period)
         return calculate_wr(klines, period=period)
     
+    def _calculate_series(
+        self,
+        klines: list[ADSKLineModel],
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Calculate Williams %R for every bar."""
+        period = kwargs.get("period", self._config.lookback_period)
+        return calculate_wr_series(klines, period=period)
+    
     def calculate_full(
         self,
         klines: list[ADSKLineModel],
@@ -0,0 +1,201 @@
+"""
+Optional JIT Backend for Recursive Indicator Kernels.
+
+EMA, Wilder smoothing (RSI, ATR) and the KDJ recursion depend on their own
+previous value, so the NumPy kernels have to step through the rows in
+Python. When numba is installed, the loops below are compiled to machine
+code and ``FunctionRegistry`` registers the compiled versions of ``ema``,
+``rsi``, ``macd``, ``kdj`` and ``atr`` in place of the NumPy ones. Without
+numba nothing changes.
+
+The public functions accept a single series (1-D) or a (dates x stocks)
+panel (2-D) and reproduce the ``FunctionRegistry`` results, including
+their NaN layout and each column's start at its first valid row. They also
+run, slowly, as plain Python when numba is missing, which keeps them
+testable everywhere.
+"""
+
+from collections.abc import Callable
+
+import numpy as np
+
+from . import kernels
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+__all__ = [
+    'NUMBA_AVAILABLE',
+    'ema',
+    'rsi',
+    'macd',
+    'kdj',
+    'atr',
+    'JIT_FUNCTIONS',
+]
+
+
+def _ema_loop(data, start, period, out):
+    n, m = data.shape
+    alpha = 2.0 / (period + 1)
+    for j in range(m):
+        seed_row = start[j] + period - 1
+        if seed_row >= n:
+            continue
+        acc = 0.0
+        for i in range(start[j], seed_row + 1):
+            acc += data[i, j]
+        value = acc / period
+        out[seed_row, j] = value
+        for i in range(seed_row + 1, n):
+            value = alpha * data[i, j] + (1.0 - alpha) * value
+            out[i, j] = value
+
+
+def _wilder_loop(data, first, period, out):
+    n, m = data.shape
+    for j in range(m):
+        seed_row = first[j] + period - 1
+        if seed_row >= n:
+            continue
+        acc = 0.0
+        for i in range(first[j], seed_row + 1):
+            acc += data[i, j]
+        value = acc / period
+        out[seed_row, j] = value
+        for i in range(seed_row + 1, n):
+            value = (value * (period - 1) + data[i, j]) / period
+            out[i, j] = value
+
+
+def _kdj_loop(rsv, first, n_period, alpha1, alpha2, k_out, d_out):
+    n, m = rsv.shape
+    for j in range(m):
+        start = first[j] + n_period - 1
+        if start >= n:
+            continue
+        k = 50.0
+        d = 50.0
+        k_out[start, j] = k
+        d_out[start, j] = d
+        for i in range(start + 1, n):
+            k = alpha1 * rsv[i, j] + (1.0 - alpha1) * k
+            d = alpha2 * k + (1.0 - alpha2) * d
+            k_out[i, j] = k
+            d_out[i, j] = d
+
+
+if NUMBA_AVAILABLE:
+    _ema_loop = numba.njit(cache=True, nogil=True)(_ema_loop)
+    _wilder_loop = numba.njit(cache=True, nogil=True)(_wilder_loop)
+    _kdj_loop = numba.njit(cache=True, nogil=True)(_kdj_loop)
+
+
+def _as_panel(data: np.ndarray) -> np.ndarray:
+    data = np.asarray(data, dtype=float)
+    return np.ascontiguousarray(data[:, np.newaxis] if data.ndim == 1 else data)
+
+
+def _like(panel: np.ndarray, data: np.ndarray) -> np.ndarray:
+    return panel.reshape(np.shape(data))
+
+
+def _first_valid(*panels: np.ndarray) -> np.ndarray:
+    """First row where every input is valid, per column (see ``kernels.from_first_valid``)."""
+    return np.ascontiguousarray(np.max([kernels.first_valid(p) for p in panels], axis=0), dtype=np.int64)
+
+
+def ema(data: np.ndarray, period: int, start: np.ndarray | int | None = None) -> np.ndarray:
+    """Exponential Moving Average, same contract as ``kernels.ema``."""
+    panel = _as_panel(data)
+    out = np.full(panel.shape, np.nan)
+    if period < 1 or panel.shape[0] == 0:
+        return _like(out, data)
+    if start is None:
+        start = kernels.first_valid(panel)
+    start = np.ascontiguousarray(np.broadcast_to(np.asarray(start, dtype=np.int64).ravel(), panel.shape[1:]))
+    _ema_loop(panel, start, period, out)
+    return _like(out, data)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index, same contract as ``FunctionRegistry._rsi``."""
+    panel = _as_panel(close)
+    result = np.full(panel.shape, np.nan)
+    if panel.shape[0] < period + 1:
+        return _like(result, close)
+
+    delta = np.diff(panel, axis=0)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    avg_gain = np.full(delta.shape, np.nan)
+    avg_loss = np.full(delta.shape, np.nan)
+    first = _first_valid(panel)
+    _wilder_loop(gains, first, period, avg_gain)
+    _wilder_loop(losses, first, period, avg_loss)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rs = np.where(avg_loss != 0, avg_gain / avg_loss, 0)
+    result[period:] = (100 - (100 / (1 + rs)))[period - 1:]
+    return _like(result, close)
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> tuple:
+    """MACD indicator, same contract as ``FunctionRegistry._macd``."""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def kdj(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+        n: int = 9, m1: int = 3, m2: int = 3) -> tuple:
+    """KDJ indicator, same contract as ``FunctionRegistry._kdj``."""
+    close_panel = _as_panel(close)
+    k = np.full(close_panel.shape, np.nan)
+    d = np.full(close_panel.shape, np.nan)
+    if close_panel.shape[0] < n:
+        j = np.full(close_panel.shape, np.nan)
+        return _like(k, close), _like(d, close), _like(j, close)
+
+    lowest_low = kernels.rolling_min(_as_panel(low), n)
+    highest_high = kernels.rolling_max(_as_panel(high), n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsv = np.where(highest_high != lowest_low,
+                       (close_panel - lowest_low) / (highest_high - lowest_low) * 100,
+                       50)
+    first = _first_valid(_as_panel(high), _as_panel(low), close_panel)
+    _kdj_loop(np.ascontiguousarray(rsv), first, n, 1 / m1, 1 / m2, k, d)
+
+    j = 3 * k - 2 * d
+    return _like(k, close), _like(d, close), _like(j, close)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average True Range, same contract as ``FunctionRegistry._atr``."""
+    close_panel = _as_panel(close)
+    result = np.full(close_panel.shape, np.nan)
+    if close_panel.shape[0] < period + 1:
+        return _like(result, close)
+
+    high_panel, low_panel = _as_panel(high), _as_panel(low)
+    prev_close = kernels.shift(close_panel, 1)
+    tr = np.maximum(
+        high_panel - low_panel,
+        np.maximum(np.abs(high_panel - prev_close), np.abs(low_panel - prev_close)),
+    )
+    first = _first_valid(high_panel, low_panel, close_panel)
+    _wilder_loop(tr, first + 1, period, result)
+    return _like(result, close)
+
+
+JIT_FUNCTIONS: dict[str, Callable] = {
+    'ema': ema,
+    'rsi': rsi,
+    'macd': macd,
+    'kdj': kdj,
+    'atr': atr,
+}
@@ -0,0 +1,590 @@
+"""
+Vectorized Rolling Kernels.
+
+Provides O(n) rolling-window kernels used by the factor expression engine.
+All kernels operate along axis 0, so they accept a single series (1-D) as
+well as a (dates x stocks) panel (2-D), and return float arrays with the
+same shape as the input where the first ``period - 1`` rows are NaN.
+
+Window sums are computed with block-local prefix/suffix scans (van Herk /
+Gil-Werman decomposition) rather than a single running cumsum, so every
+window only accumulates rounding error from its own elements and long
+series do not drift. Moment kernels additionally center each block on its
+own mean, which keeps trending price series from losing precision.
+"""
+
+import warnings
+from collections.abc import Callable
+from math import comb
+from typing import Any
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
+
+__all__ = [
+    'rolling_sum',
+    'rolling_count',
+    'rolling_max',
+    'rolling_min',
+    'rolling_prod',
+    'rolling_wma',
+    'rolling_var',
+    'rolling_std',
+    'rolling_zscore',
+    'rolling_skew',
+    'rolling_kurt',
+    'rolling_cov',
+    'rolling_corr',
+    'rolling_quantile',
+    'rolling_beta',
+    'shift',
+    'ema',
+    'first_valid',
+    'from_first_valid',
+    'cs_rank',
+    'cs_demean',
+    'cs_zscore',
+    'cs_winsorize',
+    'cs_neutralize',
+    'batched_ols_residuals',
+]
+
+_EPS = np.finfo(float).eps
+
+
+def _as_float(data: np.ndarray) -> np.ndarray:
+    return np.asarray(data, dtype=float)
+
+
+def _empty_like(data: np.ndarray) -> np.ndarray:
+    return np.full(data.shape, np.nan, dtype=float)
+
+
+def _blocked(values: np.ndarray, period: int) -> np.ndarray:
+    """Zero-pad along axis 0 to whole blocks and reshape to (blocks, period, ...)."""
+    n = values.shape[0]
+    nblocks = -(-n // period)
+    pad = nblocks * period - n
+    if pad:
+        filler = np.zeros((pad,) + values.shape[1:], dtype=float)
+        values = np.concatenate([values, filler])
+    return values.reshape((nblocks, period) + values.shape[1:])
+
+
+def _block_scans(values: np.ndarray, period: int, ufunc: np.ufunc) -> tuple[np.ndarray, np.ndarray]:
+    """Per-block prefix and suffix scans of ``values``, laid back out row by row."""
+    n = values.shape[0]
+    blocks = _blocked(values, period)
+    flat_shape = (-1,) + values.shape[1:]
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(flat_shape)[:n]
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(flat_shape)[:n]
+    return prefix, suffix
+
+
+def _aligned(n: int, period: int, ndim: int) -> np.ndarray:
+    """Mask of windows whose first row starts a block (the window is one whole block)."""
+    m = n - period + 1
+    return (np.arange(m) % period == 0).reshape((m,) + (1,) * (ndim - 1))
+
+
+def _window_reduce(values: np.ndarray, period: int, ufunc: np.ufunc) -> np.ndarray:
+    """
+    Reduce every trailing window of ``period`` rows with ``ufunc``.
+
+    The series is split into blocks of ``period`` rows. A window ending at
+    row ``i`` is the union of the suffix of the block containing its first
+    row and the prefix of the block containing ``i``, so two scans per block
+    answer every window in O(n). NaN propagates exactly as it would for a
+    direct reduction over the window.
+    """
+    n = values.shape[0]
+    result = _empty_like(values)
+    if period < 1 or n < period:
+        return result
+
+    prefix, suffix = _block_scans(values, period, ufunc)
+    m = n - period + 1
+    head = prefix[period - 1:]
+    result[period - 1:] = np.where(_aligned(n, period, values.ndim), head, ufunc(suffix[:m], head))
+    return result
+
+
+def _block_pivots(values: np.ndarray, valid: np.ndarray, period: int) -> np.ndarray:
+    """
+    Mean of the valid values of each row's block, used as a local pivot.
+
+    Blocks without valid values borrow the nearest earlier (else later) pivot.
+    """
+    n = values.shape[0]
+    count = _blocked(valid.astype(float), period).sum(axis=1)
+    total = _blocked(np.where(valid, values, 0.0), period).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pivot = total / count
+
+    for direction in (1, -1):
+        ordered = pivot[::direction]
+        index = np.arange(len(ordered)).reshape((-1,) + (1,) * (values.ndim - 1))
+        index = np.maximum.accumulate(np.where(np.isnan(ordered), 0, index), axis=0)
+        pivot = np.take_along_axis(ordered, index, axis=0)[::direction]
+    pivot = np.where(np.isnan(pivot), 0.0, pivot)
+    return np.repeat(pivot, period, axis=0)[:n]
+
+
+def _window_power_sums(
+    values: np.ndarray,
+    valid: np.ndarray,
+    period: int,
+    orders: int,
+) -> tuple[np.ndarray, list[np.ndarray]]:
+    """
+    Window power sums of deviations from a pivot near each window.
+
+    Returns ``(pivot, sums)`` for the ``n - period + 1`` complete windows,
+    where ``sums[0]`` is the count of valid rows and ``sums[k]`` is the sum
+    of ``(x - pivot) ** k`` over them. The older block's partial sums are
+    shifted binomially onto the pivot of the block holding the window's last
+    row, so the pivot always sits within two blocks of the data it centers.
+    """
+    n = values.shape[0]
+    m = n - period + 1
+    pivot = _block_pivots(values, valid, period)
+    centered = np.where(valid, values - pivot, 0.0)
+    aligned = _aligned(n, period, values.ndim)
+
+    heads, tails = [], []
+    power = valid.astype(float)
+    for _ in range(orders + 1):
+        prefix, suffix = _block_scans(power, period, np.add)
+        heads.append(prefix[period - 1:])
+        tails.append(np.where(aligned, 0.0, suffix[:m]))
+        power = power * centered
+
+    delta = pivot[:m] - pivot[period - 1:]
+    sums = []
+    for k in range(orders + 1):
+        shifted = sum(comb(k, r) * delta ** (k - r) * tails[r] for r in range(k + 1))
+        sums.append(heads[k] + shifted)
+    return pivot[period - 1:], sums
+
+
+def _is_flat(dispersion: np.ndarray, scale: np.ndarray, period: int) -> np.ndarray:
+    """Whether a window's sum of squared deviations is indistinguishable from zero."""
+    return dispersion <= 8 * period * _EPS * scale
+
+
+def rolling_sum(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Sum (NaN in the window propagates)."""
+    return _window_reduce(_as_float(data), period, np.add)
+
+
+def rolling_count(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Count of non-NaN values."""
+    data = _as_float(data)
+    return _window_reduce((~np.isnan(data)).astype(float), period, np.add)
+
+
+def rolling_max(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Maximum (NaN in the window propagates)."""
+    return _window_reduce(_as_float(data), period, np.maximum)
+
+
+def rolling_min(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Minimum (NaN in the window propagates)."""
+    return _window_reduce(_as_float(data), period, np.minimum)
+
+
+def rolling_prod(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Product."""
+    data = _as_float(data)
+    result = _empty_like(data)
+    if period < 1 or data.shape[0] < period:
+        return result
+    result[period - 1:] = sliding_window_view(data, period, axis=0).prod(axis=-1)
+    return result
+
+
+def rolling_wma(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling linearly Weighted Moving Average (weights 1..period)."""
+    data = _as_float(data)
+    result = _empty_like(data)
+    if period < 1 or data.shape[0] < period:
+        return result
+    weights = np.arange(1, period + 1, dtype=float)
+    windows = sliding_window_view(data, period, axis=0)
+    result[period - 1:] = (windows @ weights) / weights.sum()
+    return result
+
+
+def rolling_var(data: np.ndarray, period: int, ddof: int = 1) -> np.ndarray:
+    """Rolling Variance (NaN in the window propagates)."""
+    data = _as_float(data)
+    result = _empty_like(data)
+    if period < 1 or data.shape[0] < period:
+        return result
+
+    valid = ~np.isnan(data)
+    _, (count, s1, s2) = _window_power_sums(data, valid, period, 2)
+    dispersion = np.maximum(s2 - s1 * s1 / period, 0.0)
+    dispersion[_is_flat(dispersion, s2, period)] = 0.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = dispersion / (period - ddof)
+    result[period - 1:] = np.where(count == period, variance, np.nan)
+    return result
+
+
+def rolling_std(data: np.ndarray, period: int, ddof: int = 1) -> np.ndarray:
+    """Rolling Standard Deviation (NaN in the window propagates)."""
+    return np.sqrt(rolling_var(data, period, ddof))
+
+
+def rolling_zscore(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Z-Score of the last value against its window (population std)."""
+    data = _as_float(data)
+    result = _empty_like(data)
+    if period < 1 or data.shape[0] < period:
+        return result
+
+    valid = ~np.isnan(data)
+    pivot, (count, s1, s2) = _window_power_sums(data, valid, period, 2)
+    dispersion = s2 - s1 * s1 / period
+    usable = (count == period) & ~_is_flat(dispersion, s2, period) & (dispersion > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        deviation = (data[period - 1:] - pivot) - s1 / period
+        zscore = deviation / np.sqrt(dispersion / period)
+    result[period - 1:] = np.where(usable, zscore, np.nan)
+    return result
+
+
+def _standardized_moment(data: np.ndarray, period: int, order: int, min_count: int) -> np.ndarray:
+    """Rolling population standardized moment over the non-NaN values of each window."""
+    data = _as_float(data)
+    result = _empty_like(data)
+    if period < 1 or data.shape[0] < period:
+        return result
+
+    valid = ~np.isnan(data)
+    _, sums = _window_power_sums(data, valid, period, order)
+    count = sums[0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        raw = [s / count for s in sums[1:]]
+        mean = raw[0]
+        m2 = raw[1] - mean ** 2
+        if order == 3:
+            moment = raw[2] - 3 * mean * raw[1] + 2 * mean ** 3
+        else:
+            moment = (
+                raw[3] - 4 * mean * raw[2]
+                + 6 * mean ** 2 * raw[1] - 3 * mean ** 4
+            )
+        flat = _is_flat(m2 * count, sums[2], period) | ~(m2 > 0)
+        standardized = moment / m2 ** (order / 2)
+    result[period - 1:] = np.where((count >= min_count) & ~flat, standardized, np.nan)
+    return result
+
+
+def rolling_skew(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Skewness over the non-NaN values of each window (needs 3)."""
+    return _standardized_moment(data, period, 3, 3)
+
+
+def rolling_kurt(data: np.ndarray, period: int) -> np.ndarray:
+    """Rolling excess Kurtosis over the non-NaN values of each window (needs 4)."""
+    return _standardized_moment(data, period, 4, 4) - 3
+
+
+def _pair_moments(
+    x: np.ndarray,
+    y: np.ndarray,
+    period: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Window count, co-moment and the two second moments over pairwise-valid rows.
+
+    Uses the same block-local pivots as :func:`_window_power_sums`, shifting
+    the older block's cross sums onto the newer block's pivots.
+    """
+    n = x.shape[0]
+    m = n - period + 1
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    px = _block_pivots(x, valid, period)
+    py = _block_pivots(y, valid, period)
+    cx = np.where(valid, x - px, 0.0)
+    cy = np.where(valid, y - py, 0.0)
+    aligned = _aligned(n, period, x.ndim)
+
+    def window(values):
+        prefix, suffix = _block_scans(values, period, np.add)
+        return prefix[period - 1:], np.where(aligned, 0.0, suffix[:m])
+
+    (hn, tn), (hx, tx), (hy, ty) = window(valid.astype(float)), window(cx), window(cy)
+    (hxx, txx), (hyy, tyy), (hxy, txy) = window(cx * cx), window(cy * cy), window(cx * cy)
+
+    dx = px[:m] - px[period - 1:]
+    dy = py[:m] - py[period - 1:]
+    count = hn + tn
+    sx = hx + tx + dx * tn
+    sy = hy + ty + dy * tn
+    sxx = hxx + txx + 2 * dx * tx + dx * dx * tn
+    syy = hyy + tyy + 2 * dy * ty + dy * dy * tn
+    sxy = hxy + txy + dx * ty + dy * tx + dx * dy * tn
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cxy = sxy - sx * sy / count
+        dxx = sxx - sx * sx / count
+        dyy = syy - sy * sy / count
+    dxx[_is_flat(dxx, sxx, period)] = 0.0
+    dyy[_is_flat(dyy, syy, period)] = 0.0
+    return count, cxy, dxx, dyy
+
+
+def rolling_cov(x: np.ndarray, y: np.ndarray, period: int) -> np.ndarray:
+    """Rolling sample Covariance over pairwise non-NaN rows (needs 2)."""
+    x, y = _as_float(x), _as_float(y)
+    result = _empty_like(x)
+    if period < 1 or x.shape[0] < period:
+        return result
+    count, cxy, _, _ = _pair_moments(x, y, period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result[period - 1:] = np.where(count >= 2, cxy / (count - 1), np.nan)
+    return result
+
+
+def rolling_corr(x: np.ndarray, y: np.ndarray, period: int) -> np.ndarray:
+    """Rolling Pearson Correlation over pairwise non-NaN rows (needs 2)."""
+    x, y = _as_float(x), _as_float(y)
+    result = _empty_like(x)
+    if period < 1 or x.shape[0] < period:
+        return result
+    count, cxy, dxx, dyy = _pair_moments(x, y, period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = np.clip(cxy / np.sqrt(dxx * dyy), -1.0, 1.0)
+    usable = (count >= 2) & (dxx > 0) & (dyy > 0)
+    result[period - 1:] = np.where(usable, corr, np.nan)
+    return result
+
+
+def rolling_quantile(data: np.ndarray, q: float, period: int) -> np.ndarray:
+    """Rolling Quantile over the non-NaN values of each window."""
+    data = _as_float(data)
+    result = _empty_like(data)
+    if period < 1 or data.shape[0] < period:
+        return result
+    windows = sliding_window_view(data, period, axis=0)
+    if np.isnan(data).any():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            result[period - 1:] = np.nanquantile(windows, q, axis=-1)
+    else:
+        result[period - 1:] = np.quantile(windows, q, axis=-1)
+    return result
+
+
+def shift(data: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shift rows forward by ``periods`` (backward if negative), filling with NaN."""
+    data = _as_float(data)
+    result = _empty_like(data)
+    n = data.shape[0]
+    if periods == 0:
+        result[:] = data
+    elif 0 < periods < n:
+        result[periods:] = data[:-periods]
+    elif 0 < -periods < n:
+        result[:periods] = data[-periods:]
+    return result
+
+
+def first_valid(data: np.ndarray) -> np.ndarray:
+    """Row index of the first non-NaN value in each column (``len(data)`` if none)."""
+    valid = ~np.isnan(_as_float(data))
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), valid.shape[0])
+
+
+def from_first_valid(func: Callable[..., Any], *data: np.ndarray) -> Any:
+    """
+    Apply a row recursion to each column from its own first valid row.
+
+    ``func`` takes the input arrays and returns an array (or tuple of
+    arrays) of the same rows, seeding its state on row 0. Columns are
+    grouped by the first row where every input is valid and each group is
+    passed only its rows from there, so a late-listed stock in a panel
+    gets the same values as the stock evaluated alone; earlier rows are NaN.
+    """
+    arrays = [_as_float(d) for d in data]
+    vector = arrays[0].ndim == 1
+    if vector:
+        arrays = [a[:, np.newaxis] for a in arrays]
+    n = arrays[0].shape[0]
+    start = np.max([first_valid(a) for a in arrays], axis=0)
+
+    parts = func(*(a[:0] for a in arrays))
+    single = not isinstance(parts, tuple)
+    results = [_empty_like(arrays[0]) for _ in ((parts,) if single else parts)]
+    for row in np.unique(start[start < n]):
+        cols = np.flatnonzero(start == row)
+        parts = func(*(a[row:, cols] for a in arrays))
+        for result, part in zip(results, (parts,) if single else parts, strict=True):
+            result[row:, cols] = part
+
+    if vector:
+        results = [r[:, 0] for r in results]
+    return results[0] if single else tuple(results)
+
+
+def ema(data: np.ndarray, period: int, start: np.ndarray | int | None = None) -> np.ndarray:
+    """
+    Exponential Moving Average seeded with the simple mean of its first window.
+
+    ``start`` is the row at which each column's series begins and defaults
+    to its first non-NaN row, so late-listed stocks in a panel get their own
+    warm-up. The seed lands on row ``start + period - 1`` and rows before it
+    are NaN. A NaN inside the series propagates to every later row.
+    """
+    data = _as_float(data)
+    result = _empty_like(data)
+    n = data.shape[0]
+    if period < 1:
+        return result
+
+    if start is None:
+        start = first_valid(data)
+    start = np.broadcast_to(np.asarray(start, dtype=int), data.shape[1:])
+    seed_row = start + period - 1
+    reachable = seed_row < n
+    if not np.any(reachable):
+        return result
+
+    missing = np.isnan(data)
+    filled = np.concatenate([np.zeros((1,) + data.shape[1:]), np.cumsum(np.where(missing, 0.0, data), axis=0)])
+    holes = np.concatenate([np.zeros((1,) + data.shape[1:]), np.cumsum(missing, axis=0)])
+    last = np.minimum(seed_row, n - 1)[np.newaxis]
+    first = start[np.newaxis]
+    window_sum = (np.take_along_axis(filled, last + 1, axis=0) - np.take_along_axis(filled, first, axis=0))[0]
+    window_holes = (np.take_along_axis(holes, last + 1, axis=0) - np.take_along_axis(holes, first, axis=0))[0]
+    seed = np.where(reachable & (window_holes == 0), window_sum / period, np.nan)
+
+    alpha = 2 / (period + 1)
+    if data.ndim == 1:
+        row = int(seed_row)
+        result[row] = seed
+        for i in range(row + 1, n):
+            result[i] = alpha * data[i] + (1 - alpha) * result[i - 1]
+        return result
+
+    for i in range(int(seed_row[reachable].min()), n):
+        recursed = alpha * data[i] + (1 - alpha) * result[i - 1]
+        result[i] = np.where(seed_row == i, seed, np.where(seed_row < i, recursed, np.nan))
+    return result
+
+
+def rolling_beta(y: np.ndarray, x: np.ndarray, period: int) -> np.ndarray:
+    """
+    Rolling Beta of ``y`` on ``x`` over pairwise non-NaN rows (needs 2).
+
+    Sample covariance over population variance of ``x``, as the expression
+    engine has always defined it.
+    """
+    y, x = _as_float(y), _as_float(x)
+    result = _empty_like(y)
+    if period < 1 or y.shape[0] < period:
+        return result
+    count, cxy, dxx, _ = _pair_moments(x, y, period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        beta = (cxy / (count - 1)) / (dxx / count)
+    result[period - 1:] = np.where((count >= 2) & (dxx > 0), beta, np.nan)
+    return result
+
+
+def _cross_section(data: np.ndarray) -> np.ndarray:
+    """View a single cross-section (1-D) as a one-row panel."""
+    data = _as_float(data)
+    return data[np.newaxis] if data.ndim == 1 else data
+
+
+def cs_rank(data: np.ndarray) -> np.ndarray:
+    """
+    Cross-sectional percentile rank in [0, 1] along axis 1.
+
+    Ties share their average rank; NaN stays NaN. A 1-D input is treated as
+    one cross-section.
+    """
+    panel = _cross_section(data)
+    valid = ~np.isnan(panel)
+    count = valid.sum(axis=1, keepdims=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        ranks = stats.rankdata(panel, axis=1, nan_policy='omit')
+        result = np.where(valid, (ranks - 1) / (count - 1), np.nan)
+    return result.reshape(np.shape(data))
+
+
+def cs_demean(data: np.ndarray) -> np.ndarray:
+    """Subtract the cross-sectional mean of each row (NaN ignored)."""
+    panel = _cross_section(data)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        result = panel - np.nanmean(panel, axis=1, keepdims=True)
+    return result.reshape(np.shape(data))
+
+
+def cs_zscore(data: np.ndarray) -> np.ndarray:
+    """Cross-sectional z-score of each row (population std, NaN ignored)."""
+    panel = _cross_section(data)
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        std = np.nanstd(panel, axis=1, keepdims=True)
+        result = np.where(std > 0, cs_demean(panel) / std, np.nan)
+    return result.reshape(np.shape(data))
+
+
+def cs_winsorize(data: np.ndarray, lower: float = 0.01, upper: float = 0.99) -> np.ndarray:
+    """Clip each row to its own ``lower``/``upper`` quantiles (NaN ignored)."""
+    panel = _cross_section(data)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        bounds = np.nanquantile(panel, [lower, upper], axis=1, keepdims=True)
+    result = np.clip(panel, bounds[0], bounds[1])
+    return result.reshape(np.shape(data))
+
+
+def batched_ols_residuals(y: np.ndarray, exposures: list[np.ndarray]) -> np.ndarray:
+    """
+    Residuals of one least-squares fit per row: ``y[t] ~ 1 + exposures[t]``.
+
+    ``y`` is (rows x names) and each exposure either matches it or is
+    (rows x names x k) for a block of columns such as industry dummies. All
+    rows are solved at once through their normal equations; names with NaN
+    in ``y`` or any exposure are left out of the fit and come back NaN.
+    Rank-deficient rows (e.g. an industry with no members that day) fall
+    back to the pseudo-inverse.
+    """
+    y = _as_float(y)
+    columns = [np.ones(y.shape + (1,))]
+    for exposure in exposures:
+        exposure = _as_float(exposure)
+        columns.append(exposure[..., np.newaxis] if exposure.ndim == y.ndim else exposure)
+    design = np.concatenate(columns, axis=-1)
+
+    valid = ~np.isnan(y) & ~np.isnan(design).any(axis=-1)
+    design_v = np.where(valid[..., np.newaxis], design, 0.0)
+    y_v = np.where(valid, y, 0.0)
+
+    gram = np.einsum('tnk,tnl->tkl', design_v, design_v)
+    moment = np.einsum('tnk,tn->tk', design_v, y_v)
+    coef = np.einsum('tkl,tl->tk', np.linalg.pinv(gram), moment)
+    residual = y - np.einsum('tnk,tk->tn', design, coef)
+    return np.where(valid, residual, np.nan)
+
+
+def cs_neutralize(data: np.ndarray, *exposures: np.ndarray) -> np.ndarray:
+    """
+    Cross-sectional regression residual of each row on ``exposures``.
+
+    With no exposures this is plain demeaning. A 1-D input is treated as one
+    cross-section.
+    """
+    single = np.ndim(data) == 1
+    panel = _cross_section(data)
+    blocks = [_as_float(e)[np.newaxis] if single else _as_float(e) for e in exposures]
+    result = batched_ols_residuals(panel, blocks)
+    return result.reshape(np.shape(data))
@@ -16,6 +16,8 @@ from openfinance.quant.factors.base import (
     FactorType,
     FactorCategory,
 )
+from openfinance.quant.factors.frame import kline_column
+from openfinance.quant.factors.kernels import rolling_std
 from openfinance.quant.factors.registry import register_factor
 from openfinance.datacenter.models.analytical import ADSKLineModel
 from typing import Any
@@ -43,8 +45,19 @@ class MomentumFactor(FactorBase):
         if len(klines) < period + 1:
             return None
         
-        closes = np.array([k.close for k in klines])
+        closes = kline_column(klines, "close")
         return float((closes[-1] - closes[-period - 1]) / closes[-period - 1])
+    
+    def _calculate_series(self, klines: list[ADSKLineModel], **kwargs) -> np.ndarray:
+        period = kwargs.get("period", self._config.lookback_period)
+        closes = kline_column(klines, "close")
+        result = np.full(len(closes), np.nan)
+        if len(closes) < period + 1:
+            return result
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result[period:] = (closes[period:] - closes[:-period]) / closes[:-period]
+        return result
 
 
 @register_factor(is_builtin=True)
@@ -68,7 +81,7 @@ class RiskAdjustedMomentumFactor(FactorBase):
         if len(klines) < period + 1:
             return None
         
-        closes = np.array([k.close for k in klines])
+        closes = kline_column(klines, "close")
         returns = np.diff(closes[-period - 1:]) / closes[-period - 1:-1]
         
         momentum = (closes[-1] - closes[-period - 1]) / closes[-period - 1]
@@ -163,10 +176,19 @@ class VolatilityFactor(FactorBase):
         if len(klines) < period + 1:
             return None
         
-        closes = np.array([k.close for k in klines])
+        closes = kline_column(klines, "close")
         returns = np.diff(closes[-period - 1:]) / closes[-period - 1:-1]
         
         return float(np.std(returns) * np.sqrt(252))
+    
+    def _calculate_series(self, klines: list[ADSKLineModel], **kwargs) -> np.ndarray:
+        period = kwargs.get("period", self._config.lookback_period)
+        closes = kline_column(klines, "close")
+        returns = np.full(len(closes), np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns[1:] = np.diff(closes) / closes[:-1]
+        
+        return rolling_std(returns, period, ddof=0) * np.sqrt(252)
 
 
 @register_factor(is_builtin=True)
@@ -190,7 +212,7 @@ class IdiosyncraticVolatilityFactor(FactorBase):
         if len(klines) < period + 1:
             return None
         
-        closes = np.array([k.close for k in klines])
+        closes = kline_column(klines, "close")
         returns = np.diff(closes[-period - 1:]) / closes[-period - 1:-1]
         
         market_return = np.mean(returns)
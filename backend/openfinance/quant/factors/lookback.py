@@ -0,0 +1,221 @@
+"""
+Lookback Inference for Factor Expressions.
+
+Walks an expression AST and works out how many leading bars come out as NaN
+before the expression produces its first usable value (its *warm-up*).
+Warm-ups compose: ``sma(ema(close, 12), 20)`` needs 11 bars of warm-up
+for the EMA and another 19 for the SMA on top of that, so it needs
+``11 + 19 + 1 = 31`` bars to produce one value. The number of bars an
+expression needs is its warm-up plus one.
+
+Window arguments are read from literals, from the expression's parameters,
+or from the function's default. Cumulative functions (``cumsum``,
+``obv``, time-series ``rank``, ...) add no warm-up of their own. Their
+values still depend on how much history is supplied.
+"""
+
+import ast
+import inspect
+from collections.abc import Mapping
+from typing import Any
+
+from .expression_engine import FunctionRegistry
+
+__all__ = [
+    'infer_warmup',
+    'infer_lookback',
+]
+
+Warmup = int | tuple[int, ...]
+
+_FIELD_WARMUP = {
+    'open': 0, 'high': 0, 'low': 0, 'close': 0, 'volume': 0, 'amount': 0,
+    'pre_close': 0, 'vwap': 0, 'returns': 1, 'log_returns': 1,
+}
+
+# name -> (window parameter, extra bars beyond the input's warm-up)
+# A rolling window of ``p`` needs ``p - 1`` extra bars; a lag of ``p``
+# (or a Wilder/diff-based indicator seeded after ``p`` changes) needs ``p``.
+_WINDOW_RULES: dict[str, tuple[str, int]] = {
+    **dict.fromkeys((
+        'sma', 'ema', 'wma', 'std', 'var', 'max', 'min', 'sum', 'prod', 'count',
+        'skewness', 'kurtosis', 'zscore', 'normalize', 'quantile', 'cci', 'wr',
+        'corr', 'cov', 'beta', 'alpha', 'sharpe', 'sortino', 'max_drawdown', 'calmar',
+    ), ('period', -1)),
+    **dict.fromkeys((
+        'delta', 'pct_change', 'roc', 'momentum', 'rsi', 'atr', 'mfi', 'volatility',
+    ), ('period', 0)),
+    'diff': ('n', 0),
+    'shift': ('periods', 0),
+}
+
+_PASSTHROUGH = frozenset({
+    'rank', 'cumsum', 'cumprod', 'cummax', 'cummin', 'obv', 'ad', 'winsorize', 'if',
+    'cs_rank', 'cs_zscore', 'cs_demean', 'cs_winsorize', 'cs_neutralize',
+    'abs', 'sqrt', 'log', 'log10', 'exp', 'power', 'sign', 'floor', 'ceil', 'round',
+    'clip', 'where', 'isnan', 'isinf', 'nan_to_num',
+})
+
+
+def infer_warmup(expression: str, parameters: Mapping[str, Any] | None = None) -> Warmup:
+    """
+    Number of leading bars for which an expression yields NaN.
+
+    Args:
+        expression: Factor expression
+        parameters: Values for parameter names used in the expression
+
+    Returns:
+        Warm-up in bars, or a tuple of warm-ups for tuple-valued
+        expressions such as ``macd(close)``
+
+    Raises:
+        ValueError: If the expression cannot be parsed or a window
+            argument cannot be resolved to a number
+    """
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e}") from e
+    return _LookbackVisitor(parameters or {}).visit(tree.body)
+
+
+def infer_lookback(expression: str, parameters: Mapping[str, Any] | None = None) -> int:
+    """
+    Number of bars needed for an expression to produce its latest value.
+
+    Args:
+        expression: Factor expression
+        parameters: Values for parameter names used in the expression
+
+    Returns:
+        Bars to fetch (warm-up plus one)
+
+    Raises:
+        ValueError: If the expression cannot be analysed
+    """
+    return _collapse(infer_warmup(expression, parameters)) + 1
+
+
+def _collapse(warmup: Warmup) -> int:
+    return max(warmup) if isinstance(warmup, tuple) else warmup
+
+
+def _max_of(warmups: list[Warmup]) -> int:
+    return max((_collapse(w) for w in warmups), default=0)
+
+
+class _LookbackVisitor:
+    """Computes the warm-up of each AST node bottom-up."""
+
+    def __init__(self, parameters: Mapping[str, Any]):
+        self._parameters = parameters
+        self._registry = FunctionRegistry()
+
+    def visit(self, node: ast.AST) -> Warmup:
+        if isinstance(node, ast.Constant):
+            return 0
+        if isinstance(node, ast.Name):
+            return _FIELD_WARMUP.get(node.id, 0)
+        if isinstance(node, ast.Attribute):
+            return 0
+        if isinstance(node, ast.Call):
+            return self._visit_call(node)
+        if isinstance(node, ast.Subscript):
+            return self._visit_subscript(node)
+        return _max_of([self.visit(child) for child in ast.iter_child_nodes(node)
+                        if isinstance(child, ast.expr)])
+
+    def _visit_subscript(self, node: ast.Subscript) -> Warmup:
+        value = self.visit(node.value)
+        if isinstance(value, tuple):
+            try:
+                index = self._resolve(node.slice)
+            except ValueError:
+                return max(value)
+            if isinstance(index, int) and -len(value) <= index < len(value):
+                return value[index]
+            return max(value)
+        return value
+
+    def _visit_call(self, node: ast.Call) -> Warmup:
+        name = node.func.id.lower() if isinstance(node.func, ast.Name) else None
+        inputs = _max_of(
+            [self.visit(arg) for arg in node.args]
+            + [self.visit(kw.value) for kw in node.keywords]
+        )
+
+        if name in _WINDOW_RULES:
+            param, offset = _WINDOW_RULES[name]
+            window = self._argument(name, node, param)
+            if name == 'shift':
+                window = max(window, 0)
+            return inputs + max(window + offset, 0)
+        if name == 'macd':
+            fast = self._argument(name, node, 'fast')
+            slow = self._argument(name, node, 'slow')
+            signal = self._argument(name, node, 'signal')
+            line = inputs + max(fast, slow) - 1
+            return (line, line + signal - 1, line + signal - 1)
+        if name == 'kdj':
+            return (inputs + self._argument(name, node, 'n') - 1,) * 3
+        if name == 'boll':
+            return (inputs + self._argument(name, node, 'period') - 1,) * 3
+        if name in _PASSTHROUGH or name is None:
+            return inputs
+
+        # Unknown (user-registered) function: assume its largest integer
+        # argument is a window so the estimate errs towards fetching more.
+        literals = [self._literal_int(arg) for arg in node.args]
+        literals += [self._literal_int(kw.value) for kw in node.keywords]
+        return inputs + max((v for v in literals if v is not None), default=0)
+
+    def _argument(self, name: str, node: ast.Call, param: str) -> int:
+        """Resolve a numeric argument by name from the call or the function default."""
+        func = self._registry.get(name)
+        try:
+            bound = inspect.signature(func).bind_partial(*node.args, **{
+                kw.arg: kw.value for kw in node.keywords if kw.arg
+            })
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Cannot bind arguments of {name}(): {e}") from e
+
+        if param in bound.arguments:
+            value = self._resolve(bound.arguments[param])
+        else:
+            default = inspect.signature(func).parameters.get(param)
+            if default is None or default.default is inspect.Parameter.empty:
+                raise ValueError(f"{name}() is missing its '{param}' argument")
+            value = default.default
+
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            raise ValueError(f"{name}() argument '{param}' is not numeric: {value!r}")
+        return int(value)
+
+    def _resolve(self, node: ast.AST) -> Any:
+        """Evaluate a constant sub-expression (literals, parameters, arithmetic)."""
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.Name) and node.id in self._parameters:
+            return self._parameters[node.id]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = self._resolve(node.operand)
+            return -value if isinstance(node.op, ast.USub) else value
+        if isinstance(node, ast.BinOp):
+            left, right = self._resolve(node.left), self._resolve(node.right)
+            if isinstance(node.op, ast.Add):
+                return left + right
+            if isinstance(node.op, ast.Sub):
+                return left - right
+            if isinstance(node.op, ast.Mult):
+                return left * right
+            if isinstance(node.op, ast.FloorDiv):
+                return left // right
+        raise ValueError(f"Cannot resolve '{ast.unparse(node)}' to a constant")
+
+    def _literal_int(self, node: ast.AST) -> int | None:
+        try:
+            value = self._resolve(node)
+        except ValueError:
+            return None
+        return value if isinstance(value, int) and not isinstance(value, bool) else None
@@ -0,0 +1,185 @@
+"""
+Aligned Price Panel.
+
+``PricePanel`` holds K-Line data for a whole universe as (dates x stocks)
+float64 arrays on a shared trading-date index, which is the layout
+``FactorExpressionEngine.calculate_panel`` evaluates in one pass. A stock
+that has no bar on a date carries NaN in every column for that row;
+``latest`` closes those gaps so that a stock suspended mid-window still
+gets a full window of its own bars.
+"""
+
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from .frame import KLINE_FIELDS, KLineFrame, _to_date
+
+__all__ = [
+    'PricePanel',
+]
+
+
+class PricePanel:
+    """
+    K-Line data for many stocks aligned on one date index, oldest date first.
+
+    Columns are (dates x stocks) float64 arrays; ``codes[j]`` names column
+    ``j`` of every field.
+    """
+
+    def __init__(
+        self,
+        codes: Sequence[str],
+        dates: np.ndarray | Sequence[date],
+        columns: Mapping[str, np.ndarray],
+    ):
+        self.codes = list(codes)
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self._index = {code: j for j, code in enumerate(self.codes)}
+        shape = (self.dates.shape[0], len(self.codes))
+        self._columns: dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            array = np.asarray(values, dtype=float)
+            if array.shape != shape:
+                raise ValueError(f"Column '{name}' has shape {array.shape}, expected {shape}")
+            self._columns[name] = array
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Mapping[str, Any]],
+        codes: Sequence[str] | None = None,
+        fields: Sequence[str] = KLINE_FIELDS,
+    ) -> "PricePanel":
+        """
+        Build a panel from database rows of many stocks.
+
+        Args:
+            rows: Mappings with ``code``, ``trade_date`` and price columns,
+                in any order; Decimal and None are fine
+            codes: Column order of the panel (defaults to the sorted codes
+                found in the rows); codes without rows become all-NaN columns
+            fields: Columns to load; columns absent from the rows are skipped
+
+        Returns:
+            PricePanel over every trade date present in the rows
+        """
+        rows = list(rows)
+        if codes is None:
+            codes = sorted({r['code'] for r in rows})
+        index = {code: j for j, code in enumerate(codes)}
+        rows = [r for r in rows if r['code'] in index]
+
+        raw_dates = np.array([_to_date(r['trade_date']) for r in rows], dtype='datetime64[D]')
+        dates, date_pos = np.unique(raw_dates, return_inverse=True)
+        code_pos = np.fromiter((index[r['code']] for r in rows), dtype=np.intp, count=len(rows))
+
+        present = set(rows[0].keys()) if rows else set()
+        columns = {}
+        for name in fields:
+            if name not in present:
+                continue
+            values = np.array([r[name] for r in rows], dtype=float)
+            panel = np.full((dates.shape[0], len(codes)), np.nan)
+            panel[date_pos, code_pos] = values
+            columns[name] = panel
+        return cls(codes, dates, columns)
+
+    @classmethod
+    def from_frames(cls, frames: Iterable[KLineFrame]) -> "PricePanel":
+        """Align per-stock frames on the union of their dates."""
+        frames = [f for f in frames if len(f)]
+        codes = [f.code for f in frames]
+        dates = np.unique(np.concatenate([f.dates for f in frames])) if frames else np.empty(0, 'datetime64[D]')
+        names = [n for n in KLINE_FIELDS if frames and all(f.has_column(n) for f in frames)]
+        columns = {name: np.full((dates.shape[0], len(frames)), np.nan) for name in names}
+        for j, frame in enumerate(frames):
+            rows = np.searchsorted(dates, frame.dates)
+            for name in names:
+                columns[name][rows, j] = frame.column(name)
+        return cls(codes, dates, columns)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.dates.shape[0], len(self.codes)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a (dates x stocks) field."""
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise AttributeError(f"PricePanel has no column '{name}'") from None
+
+    def has_column(self, name: str) -> bool:
+        return name in self._columns
+
+    @property
+    def last_date(self) -> date | None:
+        return self.dates[-1].item() if len(self) else None
+
+    def traded(self, row: int = -1) -> np.ndarray:
+        """Boolean mask of stocks with a bar on the given date row."""
+        return ~np.isnan(self.column('close')[row])
+
+    def tail(self, count: int) -> "PricePanel":
+        """Last ``count`` dates (views of this panel's buffers)."""
+        start = max(len(self) - count, 0)
+        return PricePanel(
+            self.codes,
+            self.dates[start:],
+            {name: values[start:] for name, values in self._columns.items()},
+        )
+
+    def latest(self, count: int) -> "PricePanel":
+        """
+        Each stock's last ``count`` traded bars, right-aligned on the last row.
+
+        Dates a stock did not trade are squeezed out of its column, so
+        time-series operators see consecutive bars; stocks that traded on
+        every date are unchanged from ``tail``. Stocks without a bar on the
+        last date come back all NaN, so they stay out of cross-sectional
+        operators. Row labels are the panel's last ``count`` dates, which
+        are exact only for gap-free stocks and for the last row.
+        """
+        rows = min(count, len(self))
+        if not self._columns or not rows:
+            return self.tail(rows)
+        traded = ~np.isnan(self.column('close'))
+        traded &= traded[-1]
+        order = np.argsort(traded, axis=0, kind='stable')[len(self) - rows:]
+        kept = np.take_along_axis(traded, order, axis=0)
+        columns = {}
+        for name, values in self._columns.items():
+            shifted = np.take_along_axis(values, order, axis=0)
+            shifted[~kept] = np.nan
+            columns[name] = shifted
+        return PricePanel(self.codes, self.dates[len(self) - rows:], columns)
+
+    def frame(self, code: str) -> KLineFrame:
+        """One stock's bars as a ``KLineFrame``, skipping dates it did not trade."""
+        j = self._index[code]
+        if not self._columns:
+            return KLineFrame(code, self.dates[:0], {})
+        mask = ~np.isnan(self.column('close')[:, j])
+        return KLineFrame(
+            code,
+            self.dates[mask],
+            {name: values[mask, j] for name, values in self._columns.items()},
+        )
+
+    def __len__(self) -> int:
+        return self.dates.shape[0]
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._index
+
+    def __repr__(self) -> str:
+        span = f"{self.dates[0]}..{self.dates[-1]}" if len(self) else "empty"
+        return f"PricePanel(stocks={len(self.codes)}, dates={len(self)}, {span})"
@@ -0,0 +1,318 @@
+"""
+Dependency-Aware Factor Planning.
+
+Composite factors are built from other factors: an expression may refer to
+another factor by its ID or code (``0.5 * cs_rank(factor_rsi) + ...``), and
+``FactorTypeRegistry`` records declared factor-to-factor dependencies.
+``FactorPlanner`` resolves the dependency closure of the requested factors,
+orders it topologically and evaluates every node once over a price panel,
+feeding each node's (dates x stocks) values to its dependents.
+"""
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .base import FactorResult
+from .panel import PricePanel
+from .registry import FactorDefinition, UnifiedFactorRegistry, get_factor_registry
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    'CyclicDependencyError',
+    'ExecutionPlan',
+    'FactorPlanner',
+    'PlanNode',
+    'PlanResult',
+]
+
+
+class CyclicDependencyError(ValueError):
+    """Raised when factor definitions depend on each other in a cycle."""
+
+    def __init__(self, cycle: list[str]):
+        self.cycle = cycle
+        super().__init__(f"Cyclic factor dependency: {' -> '.join(cycle)}")
+
+
+@dataclass
+class PlanNode:
+    """One factor in an execution plan."""
+    factor_id: str
+    inputs: dict[str, str] = field(default_factory=dict)
+    fields: list[str] = field(default_factory=list)
+    required_bars: int = 1
+    requested: bool = False
+    needs_series: bool = False
+
+    @property
+    def dependencies(self) -> list[str]:
+        """Upstream factor IDs, without duplicates."""
+        return list(dict.fromkeys(self.inputs.values()))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "factor_id": self.factor_id,
+            "dependencies": self.dependencies,
+            "inputs": self.inputs,
+            "fields": self.fields,
+            "required_bars": self.required_bars,
+            "requested": self.requested,
+        }
+
+
+@dataclass
+class ExecutionPlan:
+    """Factors in dependency order; every node comes after its inputs."""
+    nodes: list[PlanNode]
+    requested: list[str]
+
+    @property
+    def factor_ids(self) -> list[str]:
+        return [node.factor_id for node in self.nodes]
+
+    @property
+    def required_bars(self) -> int:
+        """Panel length that lets every node produce a value on the last date."""
+        return max((node.required_bars for node in self.nodes), default=1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "requested": self.requested,
+            "order": self.factor_ids,
+            "required_bars": self.required_bars,
+            "nodes": [node.to_dict() for node in self.nodes],
+        }
+
+
+@dataclass
+class PlanResult:
+    """Values and per-node timings of one plan execution."""
+    plan: ExecutionPlan
+    values: dict[str, np.ndarray] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    results: list[FactorResult] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "plan": self.plan.to_dict(),
+            "timings_ms": self.timings,
+            "errors": self.errors,
+            "results": len(self.results),
+        }
+
+
+def _metadata_dependencies(factor_def: FactorDefinition) -> list[str]:
+    """Dependencies declared in ``FactorTypeRegistry`` under the factor's ID or code."""
+    from openfinance.domain.metadata.registry import FactorTypeRegistry
+
+    names = FactorTypeRegistry.get_dependencies(factor_def.factor_id)
+    if not names:
+        names = FactorTypeRegistry.get_dependencies(factor_def.code)
+    return list(names)
+
+
+class FactorPlanner:
+    """
+    Plans and runs a set of factors so shared inputs are computed once.
+
+    Dependencies of a factor are the names it refers to that resolve to
+    registered factors (by ID or code): variables of its expression plus
+    the entries of ``dependency_source``, which defaults to
+    ``FactorTypeRegistry.get_dependencies``. Other declared names, such as
+    ``close``, are raw fields. Class factors compute from prices alone, so
+    only expression factors get upstream factors as inputs.
+    """
+
+    def __init__(
+        self,
+        registry: UnifiedFactorRegistry | None = None,
+        dependency_source: Callable[[FactorDefinition], list[str]] | None = None,
+    ):
+        self._registry = registry or get_factor_registry()
+        self._dependency_source = dependency_source or _metadata_dependencies
+
+    def _resolve(self, name: str) -> FactorDefinition | None:
+        return self._registry.get(name) or self._registry.get_by_code(name)
+
+    def _definition(self, factor_id: str) -> FactorDefinition:
+        factor_def = self._resolve(factor_id)
+        if factor_def is None:
+            raise ValueError(f"Factor not found: {factor_id}")
+        return factor_def
+
+    def node(self, factor_def: FactorDefinition) -> PlanNode:
+        """Resolve one factor's direct inputs."""
+        names = []
+        if factor_def.expression:
+            from .expression_engine import ExpressionParser
+
+            parsed = ExpressionParser().parse(factor_def.expression)
+            names.extend(n for n in parsed.dependencies if n not in factor_def.default_params)
+        try:
+            names.extend(self._dependency_source(factor_def))
+        except Exception as e:
+            logger.warning(f"Cannot read dependencies of {factor_def.factor_id}: {e}")
+
+        takes_inputs = factor_def.factor_class is None and bool(factor_def.expression)
+        node = PlanNode(factor_id=factor_def.factor_id, required_bars=factor_def.required_bars)
+        for name in dict.fromkeys(names):
+            upstream = self._resolve(name)
+            if upstream is None:
+                node.fields.append(name)
+            elif takes_inputs:
+                node.inputs[name] = upstream.factor_id
+            else:
+                logger.debug(f"{factor_def.factor_id} is a class factor, not planning input {name}")
+        return node
+
+    def plan(self, factor_ids: list[str]) -> ExecutionPlan:
+        """
+        Build the execution plan for the requested factors.
+
+        Raises:
+            ValueError: If a factor is not registered
+            CyclicDependencyError: If the dependency graph has a cycle
+        """
+        requested = [self._definition(factor_id).factor_id for factor_id in factor_ids]
+        nodes: dict[str, PlanNode] = {}
+        order: list[PlanNode] = []
+        visiting: list[str] = []
+
+        def visit(factor_id: str) -> None:
+            if factor_id in visiting:
+                raise CyclicDependencyError(visiting[visiting.index(factor_id):] + [factor_id])
+            if factor_id in nodes:
+                return
+            visiting.append(factor_id)
+            node = self.node(self._definition(factor_id))
+            for upstream_id in node.dependencies:
+                visit(upstream_id)
+            visiting.pop()
+
+            upstream_bars = [nodes[u].required_bars for u in node.dependencies]
+            if upstream_bars:
+                node.required_bars += max(upstream_bars) - 1
+            for upstream_id in node.dependencies:
+                nodes[upstream_id].needs_series = True
+            nodes[factor_id] = node
+            order.append(node)
+
+        for factor_id in requested:
+            visit(factor_id)
+        for factor_id in requested:
+            nodes[factor_id].requested = True
+        return ExecutionPlan(nodes=order, requested=list(dict.fromkeys(requested)))
+
+    def execute(
+        self,
+        plan: ExecutionPlan,
+        panel: PricePanel,
+        params: dict[str, dict[str, Any]] | None = None,
+    ) -> PlanResult:
+        """
+        Evaluate a plan over a panel, each node exactly once.
+
+        Nodes that feed other nodes produce full (dates x stocks) values;
+        other nodes only need the panel's last date. A node whose inputs
+        failed is skipped and recorded in ``errors``.
+
+        Args:
+            plan: Plan from ``plan``
+            panel: Prices for every stock; each stock traded on the last date
+                is evaluated over its own last ``plan.required_bars`` bars
+            params: Optional per-factor parameters keyed by factor ID
+
+        Returns:
+            PlanResult with values, timings in milliseconds and results for
+            the requested factors on the panel's last date
+        """
+        params = params or {}
+        result = PlanResult(plan=plan)
+        traded = panel.traded()
+        last_date = panel.last_date
+        panel = panel.latest(plan.required_bars)
+
+        for node in plan.nodes:
+            failed = [u for u in node.dependencies if u in result.errors]
+            if failed:
+                result.errors[node.factor_id] = f"Upstream factor failed: {', '.join(failed)}"
+                continue
+
+            start = time.perf_counter()
+            try:
+                values = self._evaluate(
+                    node, panel, result.values, params.get(node.factor_id, {}),
+                )
+            except Exception as e:
+                logger.warning(f"Failed to calculate {node.factor_id} in plan: {e}")
+                result.errors[node.factor_id] = str(e)
+                continue
+            finally:
+                result.timings[node.factor_id] = (time.perf_counter() - start) * 1000
+
+            result.values[node.factor_id] = values
+            if node.requested:
+                last = values[-1]
+                result.results.extend(
+                    FactorResult(
+                        factor_id=node.factor_id,
+                        code=code,
+                        trade_date=last_date,
+                        value=float(last[j]),
+                    )
+                    for j, code in enumerate(panel.codes)
+                    if traded[j] and np.isfinite(last[j])
+                )
+
+        return result
+
+    def _evaluate(
+        self,
+        node: PlanNode,
+        panel: PricePanel,
+        upstream: dict[str, np.ndarray],
+        params: dict[str, Any],
+    ) -> np.ndarray:
+        """Values of one node as a (dates x stocks) array, or (1 x stocks) for leaves."""
+        factor_def = self._definition(node.factor_id)
+
+        if factor_def.factor_class is None and factor_def.expression:
+            from .expression_engine import get_expression_engine
+
+            inputs = {name: upstream[factor_id] for name, factor_id in node.inputs.items()}
+            return get_expression_engine().calculate_panel(
+                factor_def.expression,
+                open=panel.column('open'),
+                high=panel.column('high'),
+                low=panel.column('low'),
+                close=panel.column('close'),
+                volume=panel.column('volume'),
+                amount=panel.column('amount') if panel.has_column('amount') else None,
+                parameters={**factor_def.default_params, **params, **inputs},
+            )
+
+        factor_instance = self._registry.get_factor_instance(factor_def.factor_id)
+        if factor_instance is None:
+            raise ValueError(f"Factor cannot be instantiated: {factor_def.factor_id}")
+
+        rows = len(panel) if node.needs_series else 1
+        values = np.full((rows, len(panel.codes)), np.nan)
+        traded = ~np.isnan(panel.column('close'))
+        for j, code in enumerate(panel.codes):
+            if node.needs_series:
+                values[traded[:, j], j] = factor_instance.calculate_series(panel.frame(code), **params)
+            elif traded[-1, j]:
+                # Only its own window, as in calculate_bulk: path-dependent
+                # factors (EMA seeds) depend on where the window starts.
+                window = panel.frame(code)[-factor_def.required_bars:]
+                calculated = factor_instance.calculate(window, **params)
+                if calculated is not None and calculated.value is not None:
+                    values[0, j] = calculated.value
+        return values
@@ -0,0 +1,256 @@
+"""
+Cross-Sectional Factor Post-Processing.
+
+A universe calculation produces raw values only. ``CrossSectionProcessor``
+fills ``value_rank``, ``value_percentile``, ``value_normalized`` and
+``value_neutralized`` for every (factor, trade date) cross-section of a
+batch of results, with array operations over the whole cross-section:
+
+- rank (1 = highest value) and percentile (0-1, highest value = 1)
+- winsorization (median +/- k * MAD, or quantile clipping)
+- normalization (z-score, robust, min-max, rank or percentile)
+- industry / market-cap neutralization by least squares on industry
+  dummies plus log market cap
+"""
+
+import logging
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+from scipy import stats
+
+from .analysis import FactorNeutralizer, NeutralizationConfig
+from .base import FactorResult, NeutralizationType, NormalizeMethod
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    'CrossSection',
+    'CrossSectionConfig',
+    'CrossSectionProcessor',
+    'get_cross_section_processor',
+]
+
+MAD_SCALE = 1.4826
+
+
+@dataclass
+class CrossSectionConfig:
+    """
+    Configuration for cross-sectional post-processing.
+
+    ``winsorize_method`` is ``mad`` (clip to median +/- ``mad_limit`` robust
+    standard deviations) or ``quantile`` (clip to ``quantile_limits``).
+    Industries with fewer than ``min_industry_stocks`` members share one
+    dummy column in the neutralization regression.
+    """
+
+    winsorize: bool = True
+    winsorize_method: str = "mad"
+    mad_limit: float = 5.0
+    quantile_limits: tuple[float, float] = (0.01, 0.99)
+    normalize_method: NormalizeMethod = NormalizeMethod.ZSCORE
+    neutralization: NeutralizationType = NeutralizationType.BOTH
+    min_stocks: int = 10
+    min_industry_stocks: int = 5
+
+
+@dataclass
+class CrossSection:
+    """Post-processed arrays for one cross-section, NaN where undefined."""
+
+    rank: np.ndarray
+    percentile: np.ndarray
+    normalized: np.ndarray
+    neutralized: np.ndarray
+
+
+class CrossSectionProcessor:
+    """
+    Vectorized rank / percentile / normalization / neutralization stage.
+
+    ``process_cross_section`` works on arrays for one date; ``process``
+    groups a batch of FactorResults by (factor, trade date) and writes the
+    enriched fields back onto the results.
+    """
+
+    def __init__(self, config: CrossSectionConfig | None = None):
+        self.config = config or CrossSectionConfig()
+
+    def process(
+        self,
+        results: list[FactorResult],
+        industry_map: Mapping[str, str] | None = None,
+        market_caps: Mapping[str, float] | Mapping[date, Mapping[str, float]] | None = None,
+    ) -> list[FactorResult]:
+        """
+        Fill the cross-sectional fields of a batch of results in place.
+
+        Args:
+            results: Factor results, any mix of factors and trade dates
+            industry_map: Stock code to industry mapping
+            market_caps: Stock code to market cap, or trade date to such a
+                mapping when the batch spans several dates
+
+        Returns:
+            The same results, enriched
+        """
+        groups: dict[tuple[str, date], list[int]] = {}
+        for i, result in enumerate(results):
+            groups.setdefault((result.factor_id, result.trade_date), []).append(i)
+
+        caps_by_date = _is_dated(market_caps)
+        for (_, trade_date), indices in groups.items():
+            group = [results[i] for i in indices]
+            codes = [r.code for r in group]
+            values = np.array(
+                [np.nan if r.value is None else r.value for r in group], dtype=float,
+            )
+            industries = None
+            if industry_map:
+                industries = np.array([industry_map.get(code, "unknown") for code in codes])
+            log_caps = None
+            caps = market_caps.get(trade_date) if caps_by_date else market_caps
+            if caps:
+                log_caps = _log_caps(np.array(
+                    [caps.get(code, np.nan) or np.nan for code in codes], dtype=float,
+                ))
+
+            section = self.process_cross_section(values, industries, log_caps)
+            for j, result in enumerate(group):
+                result.value_rank = None if np.isnan(section.rank[j]) else int(section.rank[j])
+                result.value_percentile = _to_optional(section.percentile[j])
+                result.value_normalized = _to_optional(section.normalized[j])
+                result.value_neutralized = _to_optional(section.neutralized[j])
+
+        return results
+
+    def process_cross_section(
+        self,
+        values: np.ndarray,
+        industries: Sequence[str] | np.ndarray | None = None,
+        log_caps: np.ndarray | None = None,
+    ) -> CrossSection:
+        """
+        Post-process one cross-section.
+
+        Args:
+            values: Raw factor values, NaN where missing
+            industries: Industry label per stock
+            log_caps: Log market cap per stock, NaN where unknown
+
+        Returns:
+            CrossSection aligned with ``values``
+        """
+        values = np.asarray(values, dtype=float)
+        n = values.shape[0]
+        rank = np.full(n, np.nan)
+        percentile = np.full(n, np.nan)
+        normalized = np.full(n, np.nan)
+        neutralized = np.full(n, np.nan)
+
+        valid = np.isfinite(values)
+        count = int(valid.sum())
+        if count == 0:
+            return CrossSection(rank, percentile, normalized, neutralized)
+
+        x = values[valid]
+        rank[valid] = stats.rankdata(-x, method="min")
+        percentile[valid] = stats.rankdata(x, method="average") / count
+
+        if count < 2:
+            return CrossSection(rank, percentile, normalized, neutralized)
+
+        w = self._winsorize(x) if self.config.winsorize else x
+        normalized[valid] = self._normalize(w, percentile[valid])
+
+        target = normalized if self.config.normalize_method != NormalizeMethod.NONE else values
+        neutral_mode = self.config.neutralization
+        use_industry = (
+            industries is not None
+            and neutral_mode in (NeutralizationType.INDUSTRY, NeutralizationType.BOTH)
+        )
+        use_caps = (
+            log_caps is not None
+            and neutral_mode in (NeutralizationType.MARKET_CAP, NeutralizationType.BOTH)
+        )
+        if use_industry or use_caps:
+            neutralized[:] = self._neutralize(
+                target,
+                np.asarray(industries) if use_industry else None,
+                np.asarray(log_caps, dtype=float) if use_caps else None,
+            )
+
+        return CrossSection(rank, percentile, normalized, neutralized)
+
+    def _winsorize(self, x: np.ndarray) -> np.ndarray:
+        if self.config.winsorize_method == "quantile":
+            low, high = np.quantile(x, self.config.quantile_limits)
+        else:
+            median = np.median(x)
+            mad = np.median(np.abs(x - median)) * MAD_SCALE
+            if mad == 0:
+                return x
+            low = median - self.config.mad_limit * mad
+            high = median + self.config.mad_limit * mad
+        return np.clip(x, low, high)
+
+    def _normalize(self, w: np.ndarray, percentile: np.ndarray) -> np.ndarray:
+        method = self.config.normalize_method
+        if method == NormalizeMethod.NONE:
+            return w
+        if method == NormalizeMethod.PERCENTILE:
+            return percentile
+        if method == NormalizeMethod.RANK:
+            w = percentile
+        if method == NormalizeMethod.MINMAX:
+            low, high = w.min(), w.max()
+            return (w - low) / (high - low) if high > low else np.zeros_like(w)
+        if method == NormalizeMethod.ROBUST:
+            median = np.median(w)
+            mad = np.median(np.abs(w - median)) * MAD_SCALE
+            return (w - median) / mad if mad > 0 else np.zeros_like(w)
+        std = w.std()
+        return (w - w.mean()) / std if std > 0 else np.zeros_like(w)
+
+    def _neutralize(
+        self,
+        y: np.ndarray,
+        industries: np.ndarray | None,
+        log_caps: np.ndarray | None,
+    ) -> np.ndarray:
+        """Least-squares residual of ``y`` on industry dummies and log market cap."""
+        neutralizer = FactorNeutralizer(NeutralizationConfig(
+            min_industry_stocks=self.config.min_industry_stocks,
+        ))
+        return neutralizer.neutralize_panel(
+            y, log_caps, industries, min_stocks=self.config.min_stocks,
+        )[0]
+
+
+def _is_dated(market_caps: Mapping | None) -> bool:
+    if not market_caps:
+        return False
+    return isinstance(next(iter(market_caps)), date)
+
+
+def _log_caps(caps: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(caps > 0, np.log(caps), np.nan)
+
+
+def _to_optional(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+_processor: CrossSectionProcessor | None = None
+
+
+def get_cross_section_processor() -> CrossSectionProcessor:
+    """Get the global cross-section processor instance."""
+    global _processor
+    if _processor is None:
+        _processor = CrossSectionProcessor()
+    return _processor
@@ -16,6 +16,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable
 
+import numpy as np
+
 from .base import (
     FactorBase,
     FactorCategory,
@@ -25,7 +27,9 @@ from .base import (
     NormalizeMethod,
     ParameterDefinition,
     ValidationResult,
+    create_factor,
 )
+from .lookback import infer_lookback
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +49,7 @@ class FactorDefinition:
     parameters: dict[str, ParameterDefinition] = field(default_factory=dict)
     default_params: dict[str, Any] = field(default_factory=dict)
     lookback_period: int = 20
+    inferred_lookback: int | None = None
     required_fields: list[str] = field(default_factory=lambda: ["close"])
     normalize_method: NormalizeMethod = NormalizeMethod.ZSCORE
     tags: list[str] = field(default_factory=list)
@@ -56,6 +61,27 @@ class FactorDefinition:
     updated_at: datetime = field(default_factory=datetime.now)
     factor_class: type[FactorBase] | None = None
     
+    def __post_init__(self) -> None:
+        if self.expression and self.inferred_lookback is None:
+            self.refresh_lookback()
+    
+    @property
+    def required_bars(self) -> int:
+        """Bars to fetch for one calculation: exact for expressions, padded otherwise."""
+        if self.inferred_lookback is not None:
+            return self.inferred_lookback
+        return self.lookback_period * 2
+    
+    def refresh_lookback(self) -> int | None:
+        """Re-infer the expression's lookback after its expression or parameters change."""
+        self.inferred_lookback = None
+        if self.expression:
+            try:
+                self.inferred_lookback = infer_lookback(self.expression, self.default_params)
+            except ValueError as e:
+                logger.warning(f"Cannot infer lookback for {self.factor_id}: {e}")
+        return self.inferred_lookback
+    
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
@@ -70,6 +96,7 @@ class FactorDefinition:
             "parameters": {k: v.model_dump() for k, v in self.parameters.items()},
             "default_params": self.default_params,
             "lookback_period": self.lookback_period,
+            "inferred_lookback": self.inferred_lookback,
             "required_fields": self.required_fields,
             "normalize_method": self.normalize_method.value,
             "tags": self.tags,
@@ -132,6 +159,23 @@ class FactorDefinition:
         )
 
 
+def _expression_factor(factor_def: FactorDefinition) -> FactorBase:
+    """Wrap an expression-only definition in a factor that evaluates the expression."""
+    from .expression_engine import get_expression_engine
+    
+    engine = get_expression_engine()
+    
+    def calculate(klines, **params) -> float | None:
+        values = engine.calculate(
+            factor_def.expression, klines, {**factor_def.default_params, **params}
+        )
+        if values.ndim != 1 or not len(values) or np.isnan(values[-1]):
+            return None
+        return float(values[-1])
+    
+    return create_factor(factor_def.factor_id, calculate, factor_def.to_metadata())
+
+
 class UnifiedFactorRegistry:
     """
     Unified centralized registry for factor management.
@@ -324,6 +368,9 @@ class UnifiedFactorRegistry:
         if factor_def.factor_class:
             return factor_def.factor_class()
         
+        if factor_def.expression:
+            return _expression_factor(factor_def)
+        
         return None
     
     def list_factors(
@@ -427,6 +474,8 @@ class UnifiedFactorRegistry:
                 factor_def.parameters = parameters
             if default_params is not None:
                 factor_def.default_params = default_params
+            if expression or default_params is not None:
+                factor_def.refresh_lookback()
             if status:
                 factor_def.status = status
             
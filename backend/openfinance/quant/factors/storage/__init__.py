@@ -12,6 +12,17 @@ from .cache import (
     FactorCache,
     get_factor_cache,
 )
+from .columnar import (
+    ColumnarFactorStore,
+    FactorPanel,
+    get_columnar_factor_store,
+)
+from .state_store import (
+    IndicatorSpec,
+    IndicatorState,
+    IndicatorStateStore,
+    get_indicator_state_store,
+)
 
 __all__ = [
     "DatabaseConfig",
@@ -22,4 +33,11 @@ __all__ = [
     "CacheConfig",
     "FactorCache",
     "get_factor_cache",
+    "ColumnarFactorStore",
+    "FactorPanel",
+    "get_columnar_factor_store",
+    "IndicatorSpec",
+    "IndicatorState",
+    "IndicatorStateStore",
+    "get_indicator_state_store",
 ]
@@ -1,17 +1,27 @@
 """
 Factor Cache Module.
 
-Provides caching for factor calculation results.
-Supports Redis and in-memory caching.
+Provides two-tier caching for factor calculation results:
+
+- L1: in-process LRU with TTL and a size limit, O(1) per operation
+- L2: Redis (or a local in-process stand-in) shared between workers,
+  accessed with one pipelined round-trip per batch and a compact binary
+  record format instead of Pydantic JSON
+
+Keys carry a per-stock data version (the watermark of its latest
+committed bar), so committing new bars for a stock makes only that
+stock's entries unreachable instead of clearing the whole cache.
 """
 
-import asyncio
 import hashlib
 import json
 import logging
-from dataclasses import dataclass, field
-from datetime import date, datetime, timedelta
-from typing import Any
+import struct
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterable, Mapping
 
 from ..base import FactorResult
 
@@ -20,12 +30,19 @@ logger = logging.getLogger(__name__)
 
 @dataclass
 class CacheConfig:
-    """Cache configuration."""
+    """
+    Cache configuration.
+    
+    ``backend`` selects the L2 tier: ``memory`` (L1 only), ``local`` (an
+    in-process L2 stand-in) or ``redis``.
+    """
     
     enabled: bool = True
     backend: str = "memory"
     ttl_seconds: int = 3600
     max_memory_items: int = 10000
+    key_prefix: str = "factor"
+    version_refresh_seconds: float = 30.0
     
     redis_host: str = "localhost"
     redis_port: int = 6379
@@ -33,43 +50,272 @@ class CacheConfig:
     redis_password: str | None = None
 
 
+# Binary record: date ordinal, value, value_normalized, value_percentile,
+# value_neutralized, signal, confidence, value_rank, length of JSON tail.
+# Optional fields are NaN (floats) or -1 (rank); the tail carries
+# data_quality and metadata only when they differ from the defaults.
+_RECORD = struct.Struct('<i6dqH')
+_COUNT = struct.Struct('<I')
+_NO_RANK = -1
+
+
+def _pack_float(value: float | None) -> float:
+    return float('nan') if value is None else float(value)
+
+
+def _unpack_float(value: float) -> float | None:
+    return None if value != value else value
+
+
+def encode_results(results: Iterable[FactorResult]) -> bytes:
+    """Encode results of one (factor, code) into the compact binary format."""
+    results = list(results)
+    parts = [_COUNT.pack(len(results))]
+    for result in results:
+        extra = {}
+        if result.data_quality != "high":
+            extra["data_quality"] = result.data_quality
+        if result.metadata:
+            extra["metadata"] = result.metadata
+        tail = json.dumps(extra, separators=(',', ':'), default=str).encode() if extra else b''
+        parts.append(_RECORD.pack(
+            result.trade_date.toordinal(),
+            _pack_float(result.value),
+            _pack_float(result.value_normalized),
+            _pack_float(result.value_percentile),
+            _pack_float(result.value_neutralized),
+            result.signal,
+            result.confidence,
+            _NO_RANK if result.value_rank is None else result.value_rank,
+            len(tail),
+        ))
+        parts.append(tail)
+    return b''.join(parts)
+
+
+def decode_results(data: bytes, factor_id: str, code: str) -> list[FactorResult]:
+    """Decode the output of ``encode_results``; identity comes from the key."""
+    (count,) = _COUNT.unpack_from(data, 0)
+    offset = _COUNT.size
+    results = []
+    for _ in range(count):
+        (ordinal, value, normalized, percentile, neutralized,
+         signal, confidence, rank, tail_size) = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        extra = json.loads(data[offset:offset + tail_size]) if tail_size else {}
+        offset += tail_size
+        results.append(FactorResult(
+            factor_id=factor_id,
+            code=code,
+            trade_date=date.fromordinal(ordinal),
+            value=_unpack_float(value),
+            value_normalized=_unpack_float(normalized),
+            value_percentile=_unpack_float(percentile),
+            value_neutralized=_unpack_float(neutralized),
+            value_rank=None if rank == _NO_RANK else rank,
+            signal=signal,
+            confidence=confidence,
+            **extra,
+        ))
+    return results
+
+
+class LRUCache:
+    """
+    In-process LRU cache with per-entry TTL and a size limit.
+    
+    Entries live in an ``OrderedDict`` ordered from least to most recently
+    used, so lookup, insert, refresh and eviction are all O(1).
+    """
+    
+    def __init__(self, max_items: int, ttl_seconds: float):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+    
+    def delete_prefix(self, prefix: str) -> int:
+        keys = [k for k in self._entries if k.startswith(prefix)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+    
+    def clear(self) -> int:
+        count = len(self._entries)
+        self._entries.clear()
+        return count
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> dict[str, int]:
+        return {
+            "items": len(self._entries),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class LocalStore:
+    """
+    In-process stand-in for the Redis tier with the same batch interface.
+    
+    Used when Redis is not deployed; values are the encoded bytes so the
+    L2 code path, including serialization, is the same as with Redis.
+    """
+    
+    def __init__(self):
+        self._data: dict[str, tuple[bytes, float]] = {}
+        self._hashes: dict[str, dict[str, str]] = {}
+    
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        now = time.monotonic()
+        values = []
+        for key in keys:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._data[key]
+                entry = None
+            values.append(entry[0] if entry else None)
+        return values
+    
+    async def mset(self, mapping: dict[str, bytes], ttl_seconds: int) -> None:
+        expires_at = time.monotonic() + ttl_seconds
+        for key, value in mapping.items():
+            self._data[key] = (value, expires_at)
+    
+    async def delete(self, keys: list[str]) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+    
+    async def delete_prefix(self, prefix: str) -> int:
+        return await self.delete([k for k in self._data if k.startswith(prefix)])
+    
+    async def hset(self, name: str, mapping: dict[str, str]) -> None:
+        self._hashes.setdefault(name, {}).update(mapping)
+    
+    async def hgetall(self, name: str) -> dict[str, str]:
+        return dict(self._hashes.get(name, {}))
+    
+    async def close(self) -> None:
+        self._data.clear()
+        self._hashes.clear()
+
+
+class RedisStore:
+    """Redis tier: one MGET or one pipelined SET batch per call."""
+    
+    def __init__(self, client):
+        self._client = client
+    
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return await self._client.mget(keys)
+    
+    async def mset(self, mapping: dict[str, bytes], ttl_seconds: int) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(key, value, ex=ttl_seconds)
+        await pipe.execute()
+    
+    async def delete(self, keys: list[str]) -> int:
+        return await self._client.delete(*keys) if keys else 0
+    
+    async def delete_prefix(self, prefix: str) -> int:
+        keys = [key async for key in self._client.scan_iter(match=f"{prefix}*", count=1000)]
+        return await self.delete(keys)
+    
+    async def hset(self, name: str, mapping: dict[str, str]) -> None:
+        await self._client.hset(name, mapping=mapping)
+    
+    async def hgetall(self, name: str) -> dict[str, str]:
+        data = await self._client.hgetall(name)
+        return {
+            (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+            for k, v in data.items()
+        }
+    
+    async def close(self) -> None:
+        await self._client.close()
+
+
 class FactorCache:
     """
     Cache for factor calculation results.
     
     Features:
-    - In-memory LRU cache
-    - Redis support for distributed caching
-    - TTL-based expiration
-    - Cache key generation
+    - O(1) in-process LRU (L1) with TTL expiration
+    - Redis or local L2 tier for sharing between processes
+    - Batch lookups and writes for whole universes in one L2 round-trip
+    - Compact binary serialization
+    - Hit/miss/eviction counters
+    - Per-stock data versions in keys for targeted invalidation
+    - Request counts per factor to choose what to warm up
     """
     
     def __init__(self, config: CacheConfig | None = None):
         self.config = config or CacheConfig()
-        
-        self._memory_cache: dict[str, tuple[Any, datetime]] = {}
-        self._access_order: list[str] = []
-        
-        self._redis_client = None
+        self._memory = LRUCache(self.config.max_memory_items, self.config.ttl_seconds)
+        self._store: LocalStore | RedisStore | None = None
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._l2_round_trips = 0
+        self._l2_errors = 0
+        self._versions: dict[str, str] = {}
+        self._versions_loaded_at = 0.0
+        self._requests: Counter[str] = Counter()
     
     async def initialize(self) -> None:
         """Initialize cache backend."""
         if not self.config.enabled:
             return
         
-        if self.config.backend == "redis":
+        if self.config.backend == "local":
+            self._store = LocalStore()
+        elif self.config.backend == "redis":
             try:
                 import redis.asyncio as redis
                 
-                self._redis_client = redis.Redis(
+                client = redis.Redis(
                     host=self.config.redis_host,
                     port=self.config.redis_port,
                     db=self.config.redis_db,
                     password=self.config.redis_password,
-                    decode_responses=True,
+                    decode_responses=False,
                 )
                 
-                await self._redis_client.ping()
+                await client.ping()
+                self._store = RedisStore(client)
                 logger.info("Redis cache initialized")
             except ImportError:
                 logger.warning("Redis package not installed, falling back to memory cache")
@@ -77,12 +323,21 @@ class FactorCache:
             except Exception as e:
                 logger.warning(f"Redis connection failed: {e}, falling back to memory cache")
                 self.config.backend = "memory"
+        
+        await self.refresh_data_versions()
     
     async def close(self) -> None:
         """Close cache connections."""
-        if self._redis_client:
-            await self._redis_client.close()
-            self._redis_client = None
+        if self._store:
+            await self._store.close()
+            self._store = None
+    
+    @staticmethod
+    def _params_hash(params: dict[str, Any] | None) -> str | None:
+        if not params:
+            return None
+        param_str = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.md5(param_str.encode()).hexdigest()[:8]
     
     def _generate_key(
         self,
@@ -92,11 +347,12 @@ class FactorCache:
         params: dict[str, Any] | None = None,
     ) -> str:
         """Generate cache key."""
-        key_parts = [factor_id, code, trade_date.isoformat()]
+        key_parts = [
+            self.config.key_prefix, factor_id, code, trade_date.isoformat(), self.data_version(code),
+        ]
         
-        if params:
-            param_str = json.dumps(params, sort_keys=True)
-            param_hash = hashlib.md5(param_str.encode()).hexdigest()[:8]
+        param_hash = self._params_hash(params)
+        if param_hash:
             key_parts.append(param_hash)
         
         return ":".join(key_parts)
@@ -108,15 +364,114 @@ class FactorCache:
         params: dict[str, Any] | None = None,
     ) -> str:
         """Generate cache key for series data."""
-        key_parts = [factor_id, code, "series"]
+        key_parts = [self.config.key_prefix, factor_id, code, "series", self.data_version(code)]
         
-        if params:
-            param_str = json.dumps(params, sort_keys=True)
-            param_hash = hashlib.md5(param_str.encode()).hexdigest()[:8]
+        param_hash = self._params_hash(params)
+        if param_hash:
             key_parts.append(param_hash)
         
         return ":".join(key_parts)
     
+    @property
+    def _versions_key(self) -> str:
+        return f"{self.config.key_prefix}:versions"
+    
+    def data_version(self, code: str) -> str:
+        """Current data version of a stock (``0`` until bars are reported)."""
+        return self._versions.get(code, "0")
+    
+    def versioned_codes(self) -> list[str]:
+        """Stocks with a data version, i.e. every stock with reported bars."""
+        return sorted(self._versions)
+    
+    async def update_data_versions(
+        self,
+        watermarks: Mapping[str, date | str],
+        commit: str | None = None,
+    ) -> list[str]:
+        """
+        Record newly committed data for stocks.
+        
+        A stock whose watermark changes gets a new data version, so every
+        entry cached for it under the old version stops matching; entries
+        of other stocks are untouched. Stale entries age out of L1 by LRU
+        and of L2 by TTL.
+        
+        Args:
+            watermarks: Code to latest committed trade date (or any token
+                that changes when the stock's data changes)
+            commit: Token of the commit (e.g. a collection run ID) added to
+                the version, so bars re-collected for an already reported
+                date still invalidate the stock
+        
+        Returns:
+            Codes whose data version changed
+        """
+        changed = {}
+        for code, watermark in watermarks.items():
+            version = watermark.isoformat() if isinstance(watermark, date) else str(watermark)
+            if commit:
+                version = f"{version}+{commit}"
+            if self._versions.get(code) != version:
+                changed[code] = version
+        if not changed:
+            return []
+        
+        self._versions.update(changed)
+        if self._store:
+            try:
+                self._l2_round_trips += 1
+                await self._store.hset(self._versions_key, changed)
+            except Exception as e:
+                self._l2_errors += 1
+                logger.error(f"L2 cache version update failed: {e}")
+        return list(changed)
+    
+    async def refresh_data_versions(self) -> None:
+        """Load data versions written by other processes from L2."""
+        self._versions_loaded_at = time.monotonic()
+        if not self._store:
+            return
+        try:
+            self._l2_round_trips += 1
+            self._versions.update(await self._store.hgetall(self._versions_key))
+        except Exception as e:
+            self._l2_errors += 1
+            logger.error(f"L2 cache version refresh failed: {e}")
+    
+    def top_factors(self, count: int) -> list[str]:
+        """Most requested factor IDs, most requested first."""
+        return [factor_id for factor_id, _ in self._requests.most_common(count)]
+    
+    async def _l2_get(self, keys: list[str]) -> list[bytes | None]:
+        """Fetch encoded values from L2 in one round-trip."""
+        if not self._store or not keys:
+            return [None] * len(keys)
+        try:
+            self._l2_round_trips += 1
+            values = await self._store.mget(keys)
+        except Exception as e:
+            self._l2_errors += 1
+            logger.error(f"L2 cache get failed: {e}")
+            return [None] * len(keys)
+        hits = sum(v is not None for v in values)
+        self._l2_hits += hits
+        self._l2_misses += len(keys) - hits
+        return values
+    
+    async def _l2_set(self, mapping: dict[str, bytes], ttl: int) -> bool:
+        """Write encoded values to L2 in one round-trip."""
+        if not self._store or not mapping:
+            return True
+        try:
+            self._l2_round_trips += 1
+            await self._store.mset(mapping, ttl)
+            return True
+        except Exception as e:
+            self._l2_errors += 1
+            logger.error(f"L2 cache set failed: {e}")
+            return False
+    
     async def get(
         self,
         factor_id: str,
@@ -125,43 +480,59 @@ class FactorCache:
         params: dict[str, Any] | None = None,
     ) -> FactorResult | None:
         """Get cached factor result."""
-        if not self.config.enabled:
-            return None
+        found = await self.get_many(factor_id, [code], trade_date, params)
+        return found.get(code)
+    
+    async def get_many(
+        self,
+        factor_id: str,
+        codes: list[str],
+        trade_date: date,
+        params: dict[str, Any] | None = None,
+    ) -> dict[str, FactorResult]:
+        """
+        Get cached results of one factor for many stocks.
         
-        key = self._generate_key(factor_id, code, trade_date, params)
+        L1 is consulted first; all L1 misses are fetched from L2 with a
+        single round-trip and promoted to L1.
         
-        if self.config.backend == "redis" and self._redis_client:
-            return await self._get_redis(key)
-        else:
-            return self._get_memory(key)
-    
-    async def _get_redis(self, key: str) -> FactorResult | None:
-        """Get from Redis cache."""
-        try:
-            data = await self._redis_client.get(key)
-            if data:
-                result_dict = json.loads(data)
-                return FactorResult(**result_dict)
-        except Exception as e:
-            logger.error(f"Redis get failed: {e}")
-        return None
-    
-    def _get_memory(self, key: str) -> FactorResult | None:
-        """Get from memory cache."""
-        if key not in self._memory_cache:
-            return None
+        Returns:
+            Mapping of code to result for every code found
+        """
+        if not self.config.enabled:
+            return {}
         
-        value, timestamp = self._memory_cache[key]
+        self._requests[factor_id] += len(codes)
+        if (
+            self._store
+            and time.monotonic() - self._versions_loaded_at > self.config.version_refresh_seconds
+        ):
+            await self.refresh_data_versions()
         
-        if datetime.now() - timestamp > timedelta(seconds=self.config.ttl_seconds):
-            del self._memory_cache[key]
-            return None
+        found = {}
+        missing = []
+        for code in codes:
+            key = self._generate_key(factor_id, code, trade_date, params)
+            result = self._memory.get(key)
+            if result is None:
+                missing.append((code, key))
+            else:
+                found[code] = result
         
-        if key in self._access_order:
-            self._access_order.remove(key)
-        self._access_order.append(key)
+        if missing and self._store:
+            values = await self._l2_get([key for _, key in missing])
+            for (code, key), data in zip(missing, values):
+                if data is None:
+                    continue
+                try:
+                    result = decode_results(data, factor_id, code)[0]
+                except Exception as e:
+                    logger.warning(f"Discarding undecodable cache entry {key}: {e}")
+                    continue
+                self._memory.set(key, result)
+                found[code] = result
         
-        return value
+        return found
     
     async def set(
         self,
@@ -170,48 +541,33 @@ class FactorCache:
         ttl_seconds: int | None = None,
     ) -> bool:
         """Cache a factor result."""
-        if not self.config.enabled:
-            return False
-        
-        key = self._generate_key(
-            result.factor_id,
-            result.code,
-            result.trade_date,
-            params,
-        )
-        
-        ttl = ttl_seconds or self.config.ttl_seconds
-        
-        if self.config.backend == "redis" and self._redis_client:
-            return await self._set_redis(key, result, ttl)
-        else:
-            return self._set_memory(key, result)
+        return await self.set_many([result], params, ttl_seconds) > 0
     
-    async def _set_redis(self, key: str, result: FactorResult, ttl: int) -> bool:
-        """Set in Redis cache."""
-        try:
-            data = result.model_dump_json()
-            await self._redis_client.setex(key, ttl, data)
-            return True
-        except Exception as e:
-            logger.error(f"Redis set failed: {e}")
-            return False
-    
-    def _set_memory(self, key: str, result: FactorResult) -> bool:
-        """Set in memory cache."""
-        while len(self._memory_cache) >= self.config.max_memory_items:
-            if self._access_order:
-                oldest_key = self._access_order.pop(0)
-                self._memory_cache.pop(oldest_key, None)
-            else:
-                break
+    async def set_many(
+        self,
+        results: list[FactorResult],
+        params: dict[str, Any] | None = None,
+        ttl_seconds: int | None = None,
+    ) -> int:
+        """
+        Cache many results in L1 and with one pipelined L2 write.
         
-        self._memory_cache[key] = (result, datetime.now())
+        Returns:
+            Number of results cached
+        """
+        if not self.config.enabled or not results:
+            return 0
         
-        if key not in self._access_order:
-            self._access_order.append(key)
+        ttl = ttl_seconds or self.config.ttl_seconds
+        encoded = {}
+        for result in results:
+            key = self._generate_key(result.factor_id, result.code, result.trade_date, params)
+            self._memory.set(key, result, ttl)
+            if self._store:
+                encoded[key] = encode_results([result])
         
-        return True
+        await self._l2_set(encoded, ttl)
+        return len(results)
     
     async def get_series(
         self,
@@ -224,22 +580,19 @@ class FactorCache:
             return None
         
         key = self._generate_series_key(factor_id, code, params)
+        results = self._memory.get(key)
+        if results is not None:
+            return results
         
-        if self.config.backend == "redis" and self._redis_client:
-            try:
-                data = await self._redis_client.get(key)
-                if data:
-                    results = json.loads(data)
-                    return [FactorResult(**r) for r in results]
-            except Exception as e:
-                logger.error(f"Redis get series failed: {e}")
-        else:
-            if key in self._memory_cache:
-                value, timestamp = self._memory_cache[key]
-                if datetime.now() - timestamp <= timedelta(seconds=self.config.ttl_seconds):
-                    return value
+        if not self._store:
+            return None
+        (data,) = await self._l2_get([key])
+        if data is None:
+            return None
         
-        return None
+        results = decode_results(data, factor_id, code)
+        self._memory.set(key, results)
+        return results
     
     async def set_series(
         self,
@@ -255,17 +608,10 @@ class FactorCache:
         key = self._generate_series_key(first.factor_id, first.code, params)
         ttl = ttl_seconds or self.config.ttl_seconds
         
-        if self.config.backend == "redis" and self._redis_client:
-            try:
-                data = json.dumps([r.model_dump() for r in results])
-                await self._redis_client.setex(key, ttl, data)
-                return True
-            except Exception as e:
-                logger.error(f"Redis set series failed: {e}")
-                return False
-        else:
-            self._memory_cache[key] = (results, datetime.now())
-            return True
+        self._memory.set(key, results, ttl)
+        if self._store:
+            return await self._l2_set({key: encode_results(results)}, ttl)
+        return True
     
     async def delete(
         self,
@@ -276,71 +622,58 @@ class FactorCache:
     ) -> bool:
         """Delete cached result."""
         key = self._generate_key(factor_id, code, trade_date, params)
+        self._memory.delete(key)
         
-        if self.config.backend == "redis" and self._redis_client:
+        if self._store:
             try:
-                await self._redis_client.delete(key)
-                return True
+                await self._store.delete([key])
             except Exception as e:
-                logger.error(f"Redis delete failed: {e}")
+                logger.error(f"L2 cache delete failed: {e}")
                 return False
-        else:
-            self._memory_cache.pop(key, None)
-            if key in self._access_order:
-                self._access_order.remove(key)
-            return True
+        return True
     
     async def clear_factor(self, factor_id: str) -> int:
         """Clear all cached data for a factor."""
-        cleared = 0
+        prefix = f"{self.config.key_prefix}:{factor_id}:"
+        cleared = self._memory.delete_prefix(prefix)
         
-        if self.config.backend == "redis" and self._redis_client:
+        if self._store:
             try:
-                pattern = f"{factor_id}:*"
-                keys = []
-                async for key in self._redis_client.scan_iter(match=pattern):
-                    keys.append(key)
-                
-                if keys:
-                    cleared = await self._redis_client.delete(*keys)
+                cleared = max(cleared, await self._store.delete_prefix(prefix))
             except Exception as e:
-                logger.error(f"Redis clear factor failed: {e}")
-        else:
-            keys_to_delete = [
-                k for k in self._memory_cache
-                if k.startswith(factor_id)
-            ]
-            for key in keys_to_delete:
-                del self._memory_cache[key]
-                if key in self._access_order:
-                    self._access_order.remove(key)
-                cleared += 1
+                logger.error(f"L2 cache clear factor failed: {e}")
         
         return cleared
     
     async def clear_all(self) -> int:
         """Clear all cached data."""
-        cleared = len(self._memory_cache)
+        cleared = self._memory.clear()
         
-        if self.config.backend == "redis" and self._redis_client:
+        if self._store:
             try:
-                await self._redis_client.flushdb()
+                cleared = max(cleared, await self._store.delete_prefix(f"{self.config.key_prefix}:"))
             except Exception as e:
-                logger.error(f"Redis clear all failed: {e}")
-        
-        self._memory_cache.clear()
-        self._access_order.clear()
+                logger.error(f"L2 cache clear all failed: {e}")
         
         return cleared
     
     def get_stats(self) -> dict[str, Any]:
         """Get cache statistics."""
+        memory = self._memory.stats()
         return {
             "enabled": self.config.enabled,
             "backend": self.config.backend,
-            "memory_items": len(self._memory_cache),
-            "max_memory_items": self.config.max_memory_items,
+            "memory_items": memory["items"],
+            "max_memory_items": memory["max_items"],
             "ttl_seconds": self.config.ttl_seconds,
+            "data_versions": len(self._versions),
+            "l1": memory,
+            "l2": {
+                "hits": self._l2_hits,
+                "misses": self._l2_misses,
+                "round_trips": self._l2_round_trips,
+                "errors": self._l2_errors,
+            },
         }
 
 
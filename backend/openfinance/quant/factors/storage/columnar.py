@@ -0,0 +1,387 @@
+"""
+Columnar Factor Store Module.
+
+Keeps factor history as (dates x codes) float64 NumPy arrays on local disk,
+partitioned by factor and year, next to the row-oriented ``factor_data``
+table. Panel reads memory-map the partitions and return arrays directly,
+so loading a factor's ten-year history costs a few file opens instead of
+millions of row objects.
+
+Layout::
+
+    {root}/{factor_id}/{year}/CURRENT             name of the live version
+    {root}/{factor_id}/{year}/{version}/dates.npy    datetime64[D], ascending
+    {root}/{factor_id}/{year}/{version}/codes.json   column order
+    {root}/{factor_id}/{year}/{version}/values.npy   float64 (dates x codes), NaN = missing
+    {root}/.{factor_id}.lock                       writer lock
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+from ..base import FactorResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = "data/factor_store"
+POINTER_FILE = "CURRENT"
+
+
+@dataclass
+class FactorPanel:
+    """Factor values for many stocks aligned on one date index, oldest first."""
+    factor_id: str
+    dates: np.ndarray
+    codes: list[str]
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.dates.shape[0])
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.values.shape
+
+    def column(self, code: str) -> np.ndarray:
+        """History of one stock."""
+        return self.values[:, self.codes.index(code)]
+
+    def row(self, trade_date: date) -> dict[str, float]:
+        """Finite values of one date by stock code."""
+        i = int(np.searchsorted(self.dates, np.datetime64(trade_date, 'D')))
+        if i == len(self) or self.dates[i] != np.datetime64(trade_date, 'D'):
+            return {}
+        values = self.values[i]
+        return {code: float(v) for code, v in zip(self.codes, values, strict=True) if np.isfinite(v)}
+
+
+class ColumnarFactorStore:
+    """
+    Local columnar store of factor history.
+
+    Features:
+    - One partition per (factor, year); reads memory-map only the
+      partitions overlapping the requested dates
+    - Zero-copy reads when a range falls in one partition and all codes
+      are requested
+    - Append path for the nightly compute; writing a (date, code) again
+      replaces that value only, like the ``factor_data`` upsert, and new
+      codes widen the partition
+    - Partitions are rewritten into a new version directory and published
+      by atomically replacing the ``CURRENT`` pointer, so a reader never
+      sees a half-written or missing partition; the previous version is
+      kept until the next write for readers still opening it
+    - Writers hold a per-factor file lock as well as the thread lock, so
+      several processes can append to one store without losing rows
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        self.root = Path(root or os.getenv("FACTOR_STORE_DIR", DEFAULT_STORE_DIR))
+        self._lock = threading.RLock()
+
+    def factors(self) -> list[str]:
+        """Factor IDs with stored history."""
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def years(self, factor_id: str) -> list[int]:
+        """Years with a partition for a factor."""
+        factor_dir = self.root / factor_id
+        if not factor_dir.is_dir():
+            return []
+        return sorted(int(p.name) for p in factor_dir.iterdir() if p.is_dir() and p.name.isdigit())
+
+    def read_partition(self, factor_id: str, year: int, mmap: bool = True) -> FactorPanel | None:
+        """One year of a factor, memory-mapped unless ``mmap`` is False."""
+        # A concurrent writer may prune the version between reading the
+        # pointer and opening its files; the pointer is current again by then.
+        for attempt in range(3):
+            part = self._current_dir(factor_id, year)
+            if part is None:
+                return None
+            try:
+                with open(part / "codes.json", encoding="utf-8") as f:
+                    codes = json.load(f)
+                return FactorPanel(
+                    factor_id=factor_id,
+                    dates=np.load(part / "dates.npy"),
+                    codes=codes,
+                    values=np.load(part / "values.npy", mmap_mode="r" if mmap else None),
+                )
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+        return None
+
+    def load_panel(
+        self,
+        factor_id: str,
+        start_date: date | None = None,
+        end_date: date | None = None,
+        codes: Sequence[str] | None = None,
+    ) -> FactorPanel:
+        """
+        Load a (dates x codes) panel of one factor.
+
+        Args:
+            factor_id: Factor identifier
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            codes: Column order of the result; default is every stored code
+
+        Returns:
+            FactorPanel; a read-only memory-mapped view when the range lies in
+            one partition and ``codes`` is None, otherwise a new array
+        """
+        start = np.datetime64(start_date, 'D') if start_date else None
+        end = np.datetime64(end_date, 'D') if end_date else None
+        parts = []
+        for year in self.years(factor_id):
+            if (start_date and year < start_date.year) or (end_date and year > end_date.year):
+                continue
+            part = self.read_partition(factor_id, year)
+            if part is None:
+                continue
+            lo = 0 if start is None else int(np.searchsorted(part.dates, start, side="left"))
+            hi = len(part) if end is None else int(np.searchsorted(part.dates, end, side="right"))
+            if hi > lo:
+                parts.append((part, lo, hi))
+
+        if not parts:
+            return FactorPanel(
+                factor_id, np.array([], dtype='datetime64[D]'), list(codes or []),
+                np.empty((0, len(codes or []))),
+            )
+
+        if codes is None and len(parts) == 1:
+            part, lo, hi = parts[0]
+            return FactorPanel(factor_id, part.dates[lo:hi], part.codes, part.values[lo:hi])
+
+        if codes is None:
+            codes = sorted(set().union(*(part.codes for part, _, _ in parts)))
+        codes = list(codes)
+        index = {code: j for j, code in enumerate(codes)}
+        n_rows = sum(hi - lo for _, lo, hi in parts)
+        values = np.full((n_rows, len(codes)), np.nan)
+        dates = np.empty(n_rows, dtype='datetime64[D]')
+
+        row = 0
+        for part, lo, hi in parts:
+            src = [j for j, code in enumerate(part.codes) if code in index]
+            dst = [index[part.codes[j]] for j in src]
+            n = hi - lo
+            dates[row:row + n] = part.dates[lo:hi]
+            if src:
+                values[row:row + n, dst] = part.values[lo:hi][:, src]
+            row += n
+
+        return FactorPanel(factor_id, dates, codes, values)
+
+    def load_panels(
+        self,
+        factor_ids: Sequence[str],
+        start_date: date | None = None,
+        end_date: date | None = None,
+        codes: Sequence[str] | None = None,
+    ) -> dict[str, FactorPanel]:
+        """Load several factors' panels; see ``load_panel``."""
+        return {
+            factor_id: self.load_panel(factor_id, start_date, end_date, codes)
+            for factor_id in factor_ids
+        }
+
+    def write(
+        self,
+        factor_id: str,
+        dates: Sequence[date] | np.ndarray,
+        codes: Sequence[str],
+        values: np.ndarray,
+        present: np.ndarray | None = None,
+    ) -> int:
+        """
+        Merge a (dates x codes) block into the store.
+
+        Each cell of the block replaces the stored (date, code) value, as the
+        row upsert into ``factor_data`` does; stored codes missing from the
+        block keep their values on those dates.
+
+        Args:
+            factor_id: Factor identifier
+            dates: Block dates
+            codes: Block columns
+            values: (dates x codes) values, NaN = missing
+            present: Cells to write (default: all); others are left as stored
+
+        Returns:
+            Number of rows written
+        """
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        values = np.asarray(values, dtype=float)
+        codes = list(codes)
+        if values.shape != (dates.shape[0], len(codes)):
+            raise ValueError(f"Values have shape {values.shape}, expected {(dates.shape[0], len(codes))}")
+        present = np.ones(values.shape, dtype=bool) if present is None else np.asarray(present, dtype=bool)
+
+        years = dates.astype('datetime64[Y]').astype(int) + 1970
+        with self._write_lock(factor_id):
+            for year in np.unique(years):
+                rows = years == year
+                self._merge_partition(
+                    factor_id, int(year), dates[rows], codes, values[rows], present[rows],
+                )
+        return int(dates.shape[0])
+
+    def append(self, factor_id: str, trade_date: date, values: Mapping[str, float | None]) -> int:
+        """Store one date's cross-section of a factor."""
+        codes = list(values)
+        row = np.array([[np.nan if v is None else v for v in values.values()]], dtype=float)
+        return self.write(factor_id, [trade_date], codes, row)
+
+    def append_results(self, results: Iterable[FactorResult]) -> int:
+        """
+        Store raw values of factor results, any mix of factors and dates.
+
+        Returns:
+            Number of (factor, date) rows written
+        """
+        grouped: dict[str, dict[date, dict[str, float | None]]] = {}
+        for r in results:
+            grouped.setdefault(r.factor_id, {}).setdefault(r.trade_date, {})[r.code] = r.value
+
+        written = 0
+        for factor_id, by_date in grouped.items():
+            dates = sorted(by_date)
+            codes = sorted(set().union(*(by_date[d].keys() for d in dates)))
+            index = {code: j for j, code in enumerate(codes)}
+            block = np.full((len(dates), len(codes)), np.nan)
+            present = np.zeros(block.shape, dtype=bool)
+            for i, d in enumerate(dates):
+                for code, value in by_date[d].items():
+                    present[i, index[code]] = True
+                    if value is not None:
+                        block[i, index[code]] = value
+            written += self.write(factor_id, dates, codes, block, present)
+        return written
+
+    def delete(self, factor_id: str) -> None:
+        """Remove all history of a factor."""
+        with self._write_lock(factor_id):
+            shutil.rmtree(self.root / factor_id, ignore_errors=True)
+
+    def _partition_dir(self, factor_id: str, year: int) -> Path:
+        return self.root / factor_id / str(year)
+
+    def _current_dir(self, factor_id: str, year: int) -> Path | None:
+        """Directory holding the live version of a partition, if any."""
+        part = self._partition_dir(factor_id, year)
+        try:
+            version = (part / POINTER_FILE).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return part / version
+
+    @contextmanager
+    def _write_lock(self, factor_id: str) -> Iterator[None]:
+        """Serialize writers of a factor across threads and processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / f".{factor_id}.lock", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _merge_partition(
+        self,
+        factor_id: str,
+        year: int,
+        dates: np.ndarray,
+        codes: list[str],
+        values: np.ndarray,
+        present: np.ndarray,
+    ) -> None:
+        existing = self.read_partition(factor_id, year, mmap=False)
+        if existing is None:
+            all_dates = np.unique(dates)
+            all_codes = list(codes)
+        else:
+            all_dates = np.union1d(existing.dates, dates)
+            known = set(existing.codes)
+            all_codes = existing.codes + [code for code in codes if code not in known]
+
+        merged = np.full((all_dates.shape[0], len(all_codes)), np.nan)
+        if existing is not None:
+            rows = np.searchsorted(all_dates, existing.dates)
+            merged[rows, :len(existing.codes)] = existing.values
+        col_index = {code: j for j, code in enumerate(all_codes)}
+        rows = np.searchsorted(all_dates, dates)
+        cells = np.ix_(rows, [col_index[code] for code in codes])
+        merged[cells] = np.where(present, values, merged[cells])
+
+        self._replace_partition(factor_id, year, all_dates, all_codes, merged)
+
+    def _replace_partition(
+        self,
+        factor_id: str,
+        year: int,
+        dates: np.ndarray,
+        codes: list[str],
+        values: np.ndarray,
+    ) -> None:
+        part = self._partition_dir(factor_id, year)
+        part.mkdir(parents=True, exist_ok=True)
+        previous = self._current_dir(factor_id, year)
+        version = f"v{uuid.uuid4().hex}"
+        (part / version).mkdir()
+        np.save(part / version / "dates.npy", dates)
+        np.save(part / version / "values.npy", values)
+        with open(part / version / "codes.json", "w", encoding="utf-8") as f:
+            json.dump(codes, f)
+
+        pointer = part / f".{POINTER_FILE}.{version}"
+        pointer.write_text(version, encoding="utf-8")
+        os.replace(pointer, part / POINTER_FILE)
+
+        keep = {version, previous.name if previous is not None else None}
+        for entry in part.iterdir():
+            if entry.is_dir() and entry.name.startswith("v") and entry.name not in keep:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def get_stats(self) -> dict[str, object]:
+        """Get store statistics."""
+        return {
+            "root": str(self.root),
+            "factors": len(self.factors()),
+        }
+
+
+_columnar_store: ColumnarFactorStore | None = None
+
+
+def get_columnar_factor_store() -> ColumnarFactorStore:
+    """Get the global columnar factor store instance."""
+    global _columnar_store
+    if _columnar_store is None:
+        _columnar_store = ColumnarFactorStore()
+    return _columnar_store
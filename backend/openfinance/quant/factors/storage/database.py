@@ -12,9 +12,11 @@ from datetime import date, datetime
 from typing import Any
 
 import asyncpg
+import numpy as np
 from pydantic import BaseModel
 
 from ..base import FactorResult, FactorStatus
+from .columnar import FactorPanel
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +83,49 @@ class DatabaseConfig:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}?client_encoding=utf8"
 
 
+_DATA_COLUMNS = (
+    "factor_id", "code", "trade_date", "factor_name", "factor_category",
+    "factor_value", "factor_rank", "factor_percentile", "neutralized",
+    "factor_zscore", "factor_neutralized",
+)
+
+_DATA_UPDATES = """
+    factor_value = EXCLUDED.factor_value,
+    factor_rank = EXCLUDED.factor_rank,
+    factor_percentile = EXCLUDED.factor_percentile,
+    neutralized = EXCLUDED.neutralized,
+    factor_zscore = EXCLUDED.factor_zscore,
+    factor_neutralized = EXCLUDED.factor_neutralized,
+    collected_at = CURRENT_TIMESTAMP
+"""
+
+
+def _rows_to_panel(
+    factor_id: str,
+    rows: list[asyncpg.Record],
+    codes: list[str] | None,
+) -> FactorPanel:
+    """Scatter per-date code/value arrays into one (dates x codes) panel."""
+    columns = np.array(
+        sorted(set(codes)) if codes else sorted(set().union(*(row["codes"] for row in rows))),
+        dtype=object,
+    )
+    values = np.full((len(rows), len(columns)), np.nan)
+    for i, row in enumerate(rows):
+        positions = np.searchsorted(columns, np.array(row["codes"], dtype=object))
+        values[i, positions] = np.array(row["values"], dtype=float)
+    panel = FactorPanel(
+        factor_id=factor_id,
+        dates=np.array([row["trade_date"] for row in rows], dtype='datetime64[D]'),
+        codes=list(columns),
+        values=values,
+    )
+    if codes and list(codes) != panel.codes:
+        order = [panel.codes.index(code) for code in codes]
+        panel = FactorPanel(factor_id, panel.dates, list(codes), values[:, order])
+    return panel
+
+
 class FactorStorage:
     """
     Database storage for factor data.
@@ -88,12 +133,13 @@ class FactorStorage:
     Features:
     - Async database operations
     - Connection pooling
-    - Batch insert/update
-    - Query optimization
+    - Batch insert/update, COPY-based bulk merge for large batches
+    - Wide (date x code) panel reads aggregated server-side
     """
     
-    def __init__(self, config: DatabaseConfig | None = None):
+    def __init__(self, config: DatabaseConfig | None = None, copy_threshold: int = 1000):
         self.config = config or DatabaseConfig()
+        self.copy_threshold = copy_threshold
         self._pool: asyncpg.Pool | None = None
     
     async def initialize(self) -> None:
@@ -357,38 +403,166 @@ class FactorStorage:
         self,
         results: list[FactorResult],
     ) -> int:
-        """Save factor data in batch for better performance."""
-        if not results:
+        """
+        Save factor data in batch for better performance.
+        
+        Batches of ``copy_threshold`` rows or more go through
+        ``save_factor_data_copy``; smaller ones use one ``executemany``.
+        Results without a value are skipped (``factor_value`` is NOT NULL).
+        """
+        records = self._data_records(results)
+        if not records:
             return 0
         
+        if len(records) >= self.copy_threshold:
+            return await self._copy_merge(records)
+        
         async with self._pool.acquire() as conn:
-            records = [
-                (
-                    r.factor_id, r.code, r.trade_date, 
-                    r.factor_id, 
-                    "technical",
-                    r.value,
-                    r.value_rank,
-                    r.value_percentile,
-                    r.value_neutralized is not None,
-                )
-                for r in results
-            ]
-            
-            await conn.executemany("""
-                INSERT INTO openfinance.factor_data (
-                    factor_id, code, trade_date, factor_name, factor_category,
-                    factor_value, factor_rank, factor_percentile, neutralized
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+            await conn.executemany(f"""
+                INSERT INTO openfinance.factor_data ({", ".join(_DATA_COLUMNS)})
+                VALUES ({", ".join(f"${i}" for i in range(1, len(_DATA_COLUMNS) + 1))})
                 ON CONFLICT (factor_id, code, trade_date) DO UPDATE SET
-                    factor_value = EXCLUDED.factor_value,
-                    factor_rank = EXCLUDED.factor_rank,
-                    factor_percentile = EXCLUDED.factor_percentile,
-                    neutralized = EXCLUDED.neutralized,
-                    collected_at = CURRENT_TIMESTAMP
+                    {_DATA_UPDATES}
             """, records)
             
-            return len(results)
+            return len(records)
+    
+    async def save_factor_data_copy(
+        self,
+        results: list[FactorResult],
+    ) -> int:
+        """
+        Bulk-load factor data with COPY and one set-based merge.
+        
+        Rows are streamed into a temporary table with the binary COPY
+        protocol, then merged into ``factor_data`` with a single
+        ``INSERT ... SELECT ... ON CONFLICT``; the last row wins when a
+        (factor, code, date) appears more than once.
+        """
+        records = self._data_records(results)
+        if not records:
+            return 0
+        return await self._copy_merge(records)
+    
+    def _data_records(self, results: list[FactorResult]) -> list[tuple]:
+        """Rows in ``_DATA_COLUMNS`` order for results with a value."""
+        return [
+            (
+                r.factor_id, r.code, r.trade_date,
+                r.factor_id,
+                "technical",
+                r.value,
+                r.value_rank,
+                r.value_percentile,
+                r.value_neutralized is not None,
+                r.value_normalized,
+                r.value_neutralized,
+            )
+            for r in results
+            if r.value is not None
+        ]
+    
+    async def _copy_merge(self, records: list[tuple]) -> int:
+        columns = ", ".join(_DATA_COLUMNS)
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    CREATE TEMP TABLE factor_data_stage (
+                        seq BIGSERIAL,
+                        factor_id VARCHAR(50),
+                        code VARCHAR(10),
+                        trade_date DATE,
+                        factor_name VARCHAR(100),
+                        factor_category VARCHAR(50),
+                        factor_value DOUBLE PRECISION,
+                        factor_rank INTEGER,
+                        factor_percentile DOUBLE PRECISION,
+                        neutralized BOOLEAN,
+                        factor_zscore DOUBLE PRECISION,
+                        factor_neutralized DOUBLE PRECISION
+                    ) ON COMMIT DROP
+                """)
+                await conn.copy_records_to_table(
+                    "factor_data_stage",
+                    records=records,
+                    columns=list(_DATA_COLUMNS),
+                )
+                await conn.execute(f"""
+                    INSERT INTO openfinance.factor_data ({columns})
+                    SELECT DISTINCT ON (factor_id, code, trade_date) {columns}
+                    FROM factor_data_stage
+                    ORDER BY factor_id, code, trade_date, seq DESC
+                    ON CONFLICT (factor_id, code, trade_date) DO UPDATE SET
+                        {_DATA_UPDATES}
+                """)
+        
+        return len(records)
+    
+    async def load_factor_panel(
+        self,
+        factor_ids: list[str],
+        start_date: date | None = None,
+        end_date: date | None = None,
+        codes: list[str] | None = None,
+    ) -> dict[str, FactorPanel]:
+        """
+        Load wide (date x code) panels of one or more factors.
+        
+        The server aggregates each (factor, date) into one row of code and
+        value arrays, scanning in (factor, date, code) order, so the client
+        receives one row per date instead of one per stock and fills the
+        panel with array indexing.
+        
+        Args:
+            factor_ids: Factor identifiers
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            codes: Column order of every panel; default is the sorted union
+                of codes found for each factor
+        
+        Returns:
+            FactorPanel by factor ID (factors without data are omitted)
+        """
+        conditions = ["factor_id = ANY($1)"]
+        params: list[Any] = [factor_ids]
+        param_idx = 2
+        
+        if codes:
+            conditions.append(f"code = ANY(${param_idx})")
+            params.append(codes)
+            param_idx += 1
+        
+        if start_date:
+            conditions.append(f"trade_date >= ${param_idx}")
+            params.append(start_date)
+            param_idx += 1
+        
+        if end_date:
+            conditions.append(f"trade_date <= ${param_idx}")
+            params.append(end_date)
+            param_idx += 1
+        
+        where_clause = " AND ".join(conditions)
+        
+        async with self._pool.acquire() as conn:
+            rows = await conn.fetch(f"""
+                SELECT factor_id, trade_date,
+                       array_agg(code ORDER BY code) AS codes,
+                       array_agg(factor_value::float8 ORDER BY code) AS values
+                FROM openfinance.factor_data
+                WHERE {where_clause}
+                GROUP BY factor_id, trade_date
+                ORDER BY factor_id, trade_date
+            """, *params)
+        
+        by_factor: dict[str, list[asyncpg.Record]] = {}
+        for row in rows:
+            by_factor.setdefault(row["factor_id"], []).append(row)
+        
+        return {
+            factor_id: _rows_to_panel(factor_id, factor_rows, codes)
+            for factor_id, factor_rows in by_factor.items()
+        }
     
     async def load_factor_data(
         self,
@@ -426,8 +600,8 @@ class FactorStorage:
             rows = await conn.fetch(
                 f"SELECT factor_id, code, trade_date, factor_value as value, "
                 f"factor_rank as value_rank, factor_percentile as value_percentile, "
-                f"neutralized as value_neutralized, "
-                f"0.0 as value_normalized, 0.0 as signal, 0.5 as confidence, 'high' as data_quality, "
+                f"factor_neutralized as value_neutralized, "
+                f"factor_zscore as value_normalized, 0.0 as signal, 0.5 as confidence, 'high' as data_quality, "
                 f"'{{}}'::jsonb as metadata, collected_at as created_at, collected_at as updated_at "
                 f"FROM openfinance.factor_data WHERE {where_clause} {order_clause} {limit_clause}",
                 *params,
@@ -0,0 +1,299 @@
+"""
+Indicator State Store Module.
+
+Persists incremental indicator states per (factor, code) so the after-close
+update for the whole market feeds one new bar to each stock instead of
+recomputing every indicator over its lookback window.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from ..incremental import (
+    IncrementalIndicator,
+    bar_date,
+    create_indicator,
+    indicator_from_dict,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = "data/indicator_states.json"
+
+# Registered factors with a streaming variant: factor ID -> (indicator name,
+# parameter set from the factor's lookback period).
+FACTOR_INDICATORS: dict[str, tuple[str, str]] = {
+    "factor_rsi": ("rsi_factor", "period"),
+    "factor_kdj": ("kdj_factor", "n"),
+}
+
+
+@dataclass
+class IndicatorSpec:
+    """Which streaming indicator backs a factor, and with what parameters."""
+    indicator: str
+    params: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class IndicatorState:
+    """Streaming indicator state for one (factor, code) pair."""
+    indicator: IncrementalIndicator
+    last_date: date | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "indicator": self.indicator.to_dict(),
+            "last_date": self.last_date.isoformat() if self.last_date else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "IndicatorState":
+        last_date = data.get("last_date")
+        return cls(
+            indicator=indicator_from_dict(data["indicator"]),
+            last_date=date.fromisoformat(last_date) if last_date else None,
+        )
+
+
+class IndicatorStateStore:
+    """
+    Store of streaming indicator states keyed by (factor_id, code).
+
+    Features:
+    - O(1) per-stock daily updates from the previous state
+    - Idempotent updates: bars not newer than the last applied date are skipped
+    - JSON persistence so states survive restarts
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self._specs: dict[str, IndicatorSpec] = {}
+        self._states: dict[tuple[str, str], IndicatorState] = {}
+        self._lock = threading.RLock()
+
+    def register(self, factor_id: str, indicator: str, **params: Any) -> None:
+        """
+        Declare the streaming indicator behind a factor.
+
+        Args:
+            factor_id: Factor identifier
+            indicator: Indicator name (``ema``, ``rsi``, ``rsi_factor``, ``macd``, ...)
+            **params: Indicator parameters (e.g. ``period=14``)
+        """
+        create_indicator(indicator, **params)
+        spec = IndicatorSpec(indicator.lower(), dict(params))
+        with self._lock:
+            if self._specs.get(factor_id, spec) != spec:
+                self.remove(factor_id)
+            self._specs[factor_id] = spec
+
+    def register_factor(self, factor_id: str, lookback_period: int) -> bool:
+        """
+        Register a built-in factor with the streaming variant it matches.
+
+        Args:
+            factor_id: Factor identifier (see ``FACTOR_INDICATORS``)
+            lookback_period: The factor's configured lookback period
+
+        Returns:
+            False if the factor has no streaming variant
+        """
+        mapping = FACTOR_INDICATORS.get(factor_id)
+        if mapping is None:
+            return False
+        indicator, param = mapping
+        self.register(factor_id, indicator, **{param: lookback_period})
+        return True
+
+    @property
+    def factor_ids(self) -> list[str]:
+        """Factors with a registered indicator."""
+        return list(self._specs)
+
+    def _new_state(self, factor_id: str) -> IndicatorState:
+        spec = self._specs.get(factor_id)
+        if spec is None:
+            raise KeyError(f"No indicator registered for factor: {factor_id}")
+        return IndicatorState(create_indicator(spec.indicator, **spec.params))
+
+    def get(self, factor_id: str, code: str) -> IndicatorState | None:
+        """Get the state of a (factor, code) pair."""
+        return self._states.get((factor_id, code))
+
+    def value(self, factor_id: str, code: str) -> Any:
+        """Latest indicator value of a (factor, code) pair."""
+        state = self.get(factor_id, code)
+        return state.indicator.value if state else None
+
+    def factor_value(self, factor_id: str, code: str) -> float | None:
+        """
+        Latest factor value of a (factor, code) pair.
+
+        Indicators with several lines report the first one, as the factor
+        does (K for KDJ).
+        """
+        value = self.value(factor_id, code)
+        if isinstance(value, tuple):
+            value = value[0]
+        return value
+
+    def warm_up(self, factor_id: str, code: str, klines: Iterable[Any]) -> Any:
+        """
+        Rebuild a state from full history.
+
+        Args:
+            factor_id: Factor identifier
+            code: Stock code
+            klines: Bars sorted by date, oldest first
+
+        Returns:
+            Indicator value after the last bar
+        """
+        state = self._new_state(factor_id)
+        for bar in klines:
+            state.indicator.update(bar)
+            state.last_date = bar_date(bar) or state.last_date
+        with self._lock:
+            self._states[(factor_id, code)] = state
+        return state.indicator.value
+
+    def update(self, factor_id: str, code: str, bar: Any) -> Any:
+        """
+        Apply one new bar to a (factor, code) state.
+
+        A stock seen for the first time starts from an empty state. A bar
+        dated on or before the last applied date is ignored, so re-running
+        the same day's update does not double-count it.
+
+        Returns:
+            Indicator value after the bar
+        """
+        with self._lock:
+            state = self._states.get((factor_id, code))
+            if state is None:
+                state = self._new_state(factor_id)
+                self._states[(factor_id, code)] = state
+
+            trade_date = bar_date(bar)
+            if trade_date is not None and state.last_date is not None and trade_date <= state.last_date:
+                return state.indicator.value
+
+            value = state.indicator.update(bar)
+            state.last_date = trade_date or state.last_date
+            return value
+
+    def update_market(self, factor_id: str, bars: Mapping[str, Any]) -> dict[str, Any]:
+        """
+        Apply one new bar per stock for a factor.
+
+        Args:
+            factor_id: Factor identifier
+            bars: Mapping of stock code to that day's bar
+
+        Returns:
+            Mapping of stock code to updated indicator value
+        """
+        return {code: self.update(factor_id, code, bar) for code, bar in bars.items()}
+
+    def remove(self, factor_id: str, code: str | None = None) -> int:
+        """Drop the states of a factor (or of one of its stocks)."""
+        with self._lock:
+            keys = [
+                key for key in self._states
+                if key[0] == factor_id and (code is None or key[1] == code)
+            ]
+            for key in keys:
+                del self._states[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize all specs and states."""
+        with self._lock:
+            return {
+                "specs": {
+                    factor_id: {"indicator": spec.indicator, "params": spec.params}
+                    for factor_id, spec in self._specs.items()
+                },
+                "states": [
+                    {"factor_id": factor_id, "code": code, **state.to_dict()}
+                    for (factor_id, code), state in self._states.items()
+                ],
+            }
+
+    def load_dict(self, data: dict[str, Any]) -> None:
+        """Replace the store contents with a serialized snapshot."""
+        specs = {
+            factor_id: IndicatorSpec(spec["indicator"], spec.get("params", {}))
+            for factor_id, spec in data.get("specs", {}).items()
+        }
+        states = {
+            (item["factor_id"], item["code"]): IndicatorState.from_dict(item)
+            for item in data.get("states", [])
+        }
+        with self._lock:
+            self._specs = specs
+            self._states = states
+
+    def save(self, path: str | Path | None = None) -> Path:
+        """Write the store to a JSON file atomically."""
+        target = Path(path) if path else self.path
+        if target is None:
+            raise ValueError("No path configured for indicator state store")
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, target)
+        logger.info(f"Saved {len(self)} indicator states to {target}")
+        return target
+
+    def load(self, path: str | Path | None = None) -> int:
+        """
+        Load the store from a JSON file.
+
+        Returns:
+            Number of states loaded (0 if the file does not exist)
+        """
+        source = Path(path) if path else self.path
+        if source is None or not source.exists():
+            return 0
+
+        with open(source, encoding="utf-8") as f:
+            self.load_dict(json.load(f))
+        logger.info(f"Loaded {len(self)} indicator states from {source}")
+        return len(self)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get store statistics."""
+        return {
+            "factors": len(self._specs),
+            "states": len(self._states),
+            "path": str(self.path) if self.path else None,
+        }
+
+
+_state_store: IndicatorStateStore | None = None
+
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    """Get the global indicator state store, loaded from ``INDICATOR_STATE_PATH``."""
+    global _state_store
+    if _state_store is None:
+        _state_store = IndicatorStateStore(os.getenv("INDICATOR_STATE_PATH", DEFAULT_STATE_PATH))
+        try:
+            _state_store.load()
+        except Exception as e:
+            logger.warning(f"Failed to load indicator states: {e}")
+    return _state_store
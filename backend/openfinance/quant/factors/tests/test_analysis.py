@@ -0,0 +1,188 @@
+"""
+Factor Analysis Tests.
+
+Panel modes must agree with a per-date reference computation.
+"""
+
+import unittest
+
+import numpy as np
+from scipy import stats
+
+from openfinance.quant.factors.analysis import (
+    CorrelationAccumulator,
+    FactorCorrelationAnalyzer,
+    FactorICAnalyzer,
+    FactorNeutralizer,
+    NeutralizationConfig,
+    forward_returns,
+)
+
+
+def _lstsq_residual(y, size, industries, min_industry_stocks):
+    """Per-date least squares on industry dummies (small ones pooled) and size."""
+    labels, counts = np.unique(industries, return_counts=True)
+    pooled = np.where(np.isin(industries, labels[counts < min_industry_stocks]), "__pooled__", industries)
+    columns = [(pooled == label).astype(float) for label in np.unique(pooled)]
+    if size is not None:
+        columns.append(size)
+    design = np.column_stack(columns)
+    beta, *_ = np.linalg.lstsq(design, y, rcond=None)
+    return y - design @ beta
+
+
+class TestNeutralizePanel(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.n_dates, self.n_stocks = 6, 120
+        self.industries = rng.choice(["bank", "tech", "energy", "retail", "tiny"], self.n_stocks,
+                                     p=[0.3, 0.3, 0.2, 0.17, 0.03])
+        self.size = rng.normal(23, 1.5, (self.n_dates, self.n_stocks))
+        self.values = (
+            0.4 * self.size
+            + (self.industries == "tech") * 1.5
+            + rng.normal(0, 1, (self.n_dates, self.n_stocks))
+        )
+        self.values[1, :7] = np.nan
+        self.size[2, 10:15] = np.nan
+
+    def test_matches_per_date_least_squares(self):
+        neutralizer = FactorNeutralizer()
+        residual = neutralizer.neutralize_panel(self.values, self.size, self.industries)
+
+        for t in range(self.n_dates):
+            mask = np.isfinite(self.values[t]) & np.isfinite(self.size[t])
+            expected = _lstsq_residual(
+                self.values[t, mask], self.size[t, mask], self.industries[mask],
+                neutralizer.config.min_industry_stocks,
+            )
+            np.testing.assert_allclose(residual[t, mask], expected, atol=1e-9)
+            self.assertTrue(np.all(np.isnan(residual[t, ~mask])))
+
+    def test_industry_only_and_shared_size_row(self):
+        config = NeutralizationConfig(market_cap_neutral=False)
+        residual = FactorNeutralizer(config).neutralize_panel(self.values, self.size, self.industries)
+        t = 0
+        expected = _lstsq_residual(self.values[t], None, self.industries, config.min_industry_stocks)
+        np.testing.assert_allclose(residual[t], expected, atol=1e-9)
+
+        size_row = self.size[0]
+        residual = FactorNeutralizer().neutralize_panel(self.values[:1], size_row)
+        design = np.column_stack([np.ones(self.n_stocks), size_row])
+        beta, *_ = np.linalg.lstsq(design, self.values[0], rcond=None)
+        np.testing.assert_allclose(residual[0], self.values[0] - design @ beta, atol=1e-9)
+
+    def test_too_few_stocks(self):
+        values = self.values[:, :8]
+        residual = FactorNeutralizer().neutralize_panel(values, self.size[:, :8])
+        self.assertTrue(np.all(np.isnan(residual)))
+
+
+class TestICPanel(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        self.n_dates, self.n_stocks = 40, 60
+        self.prices = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, (self.n_dates, self.n_stocks)), axis=0))
+        self.factor = np.vstack([np.zeros(self.n_stocks), np.diff(np.log(self.prices), axis=0)])
+        self.factor += rng.normal(0, 0.01, self.factor.shape)
+        self.factor[3, :5] = np.nan
+        self.factor[4, 7] = self.factor[4, 8]
+        self.prices[10, 20:25] = np.nan
+
+    def test_matches_scipy_per_date(self):
+        returns = forward_returns(self.prices, 1)
+        series = FactorICAnalyzer().calculate_ic_panel(self.factor, returns)
+        for t in range(self.n_dates - 1):
+            mask = np.isfinite(self.factor[t]) & np.isfinite(returns[t])
+            x, y = self.factor[t, mask], returns[t, mask]
+            ic, p_value = stats.pearsonr(x, y)
+            self.assertAlmostEqual(series.ic[t], ic, places=10)
+            self.assertAlmostEqual(series.p_value[t], p_value, places=8)
+            self.assertAlmostEqual(series.rank_ic[t], stats.spearmanr(x, y)[0], places=10)
+            self.assertEqual(series.sample_size[t], mask.sum())
+        self.assertTrue(np.isnan(series.ic[-1]))
+        self.assertEqual(len(series.to_results()), self.n_dates - 1)
+
+    def test_decay_uses_every_date(self):
+        analyzer = FactorICAnalyzer()
+        decay = analyzer.calculate_ic_decay_panel(self.factor, self.prices, max_periods=5)
+        self.assertEqual([point.period for point in decay], [1, 2, 3, 4, 5])
+
+        series = analyzer.calculate_ic_panel(self.factor, forward_returns(self.prices, 3))
+        ics = series.ic[np.isfinite(series.ic)]
+        self.assertEqual(decay[2].sample_size, len(ics))
+        self.assertAlmostEqual(decay[2].mean_ic, ics.mean())
+        self.assertAlmostEqual(decay[2].ir, ics.mean() / ics.std())
+        self.assertAlmostEqual(decay[2].t_stat, ics.mean() / ics.std() * np.sqrt(len(ics)))
+
+
+class TestCorrelationMatrix(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        base = rng.normal(size=(80, 1))
+        self.values = base * rng.uniform(-1, 1, 6) + rng.normal(size=(80, 6))
+        self.values[:, 2] = self.values[:, 2] * 1e6 + 1e10
+        self.values[rng.random(self.values.shape) < 0.1] = np.nan
+        self.values[:75, 5] = np.nan
+        self.codes = [f"{j:06d}" for j in range(80)]
+        self.factor_values = {
+            f"f{k}": {c: v for c, v in zip(self.codes, self.values[:, k], strict=True) if np.isfinite(v)}
+            for k in range(6)
+        }
+
+    def test_pearson_matches_pairwise(self):
+        analyzer = FactorCorrelationAnalyzer()
+        matrix = analyzer.calculate_correlation_matrix(self.factor_values)
+        for a in self.factor_values:
+            for b in self.factor_values:
+                expected = 1.0 if a == b else analyzer.calculate_correlation(
+                    self.factor_values[a], self.factor_values[b],
+                ).correlation
+                self.assertAlmostEqual(matrix[a][b], expected, places=9)
+        self.assertEqual(matrix["f0"]["f5"], 0.0)
+
+    def test_spearman_without_missing_values(self):
+        values = np.nan_to_num(self.values[:, :5], nan=0.5)
+        corr = FactorCorrelationAnalyzer().correlation_matrix(values, method="spearman")
+        expected = stats.spearmanr(values).statistic
+        np.testing.assert_allclose(corr, expected, atol=1e-12)
+
+    def test_spearman_with_missing_values(self):
+        rng = np.random.default_rng(13)
+        base = rng.random(200)
+        values = np.column_stack([base + 0.3 * rng.normal(size=200), base ** 2])
+        values[base <= 0.3, 1] = np.nan
+        corr = FactorCorrelationAnalyzer().correlation_matrix(values, method="spearman")
+        common = np.isfinite(values[:, 1])
+        expected = stats.spearmanr(values[common, 0], values[common, 1]).statistic
+        self.assertAlmostEqual(corr[0, 1], expected, places=12)
+        self.assertAlmostEqual(corr[1, 0], expected, places=12)
+
+        analyzer = FactorCorrelationAnalyzer()
+        matrix = analyzer.calculate_correlation_matrix(self.factor_values, method="spearman")
+        for a in self.factor_values:
+            for b in self.factor_values:
+                if a == b or matrix[a][b] == 0.0:
+                    continue
+                expected = analyzer.calculate_correlation(
+                    self.factor_values[a], self.factor_values[b], method="spearman",
+                ).correlation
+                self.assertAlmostEqual(matrix[a][b], expected, places=9)
+
+    def test_accumulator(self):
+        rng = np.random.default_rng(12)
+        days = [rng.normal(size=(50, 3)) + np.array([0, 5, 100]) * day for day in range(4)]
+        accumulator = CorrelationAccumulator(["a", "b", "c"])
+        daily = [accumulator.update(day) for day in days]
+
+        np.testing.assert_allclose(accumulator.average(), np.mean(daily, axis=0), atol=1e-12)
+        np.testing.assert_allclose(accumulator.pooled(), np.corrcoef(np.vstack(days).T), atol=1e-10)
+        self.assertEqual(accumulator.dates, 4)
+        self.assertEqual(accumulator.to_dict()["a"]["a"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,425 @@
+"""
+Factor Cache Tests.
+
+Covers the O(1) LRU tier, the binary record format, batch access through
+the L2 tier in one round-trip, and cache use by bulk calculation.
+"""
+
+import asyncio
+import fnmatch
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from openfinance.quant.factors.base import FactorResult
+from openfinance.quant.factors.engine import EngineConfig, FactorEngine
+from openfinance.quant.factors.indicators.kdj import calculate_kdj
+from openfinance.quant.factors.indicators.rsi import calculate_rsi
+from openfinance.quant.factors.storage.cache import (
+    CacheConfig,
+    FactorCache,
+    LRUCache,
+    RedisStore,
+    decode_results,
+    encode_results,
+)
+from openfinance.quant.factors.storage.state_store import IndicatorStateStore
+from openfinance.quant.factors.tests.test_panel import START, InMemoryDataSource, _make_rows
+from openfinance.quant.factors.warmup import CacheWarmer
+
+TRADE_DATE = date(2024, 3, 1)
+
+
+def _results(codes, factor_id="factor_rsi", trade_date=TRADE_DATE):
+    return [
+        FactorResult(factor_id=factor_id, code=code, trade_date=trade_date, value=float(i), signal=0.5)
+        for i, code in enumerate(codes)
+    ]
+
+
+class RecordingRedis:
+    """Minimal asyncio Redis client that counts network round-trips."""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+        self.ttls = {}
+        self.round_trips = 0
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, **_options):
+        client = self
+
+        class Pipeline:
+            def __init__(self):
+                self.commands = []
+
+            def set(self, key, value, ex=None):
+                self.commands.append((key, value))
+                client.ttls[key] = ex
+
+            async def execute(self):
+                client.round_trips += 1
+                client.data.update(self.commands)
+
+        return Pipeline()
+
+    async def delete(self, *keys):
+        self.round_trips += 1
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+    async def hset(self, name, mapping):
+        self.round_trips += 1
+        self.hashes.setdefault(name, {}).update({k.encode(): v.encode() for k, v in mapping.items()})
+
+    async def hgetall(self, name):
+        self.round_trips += 1
+        return dict(self.hashes.get(name, {}))
+
+    async def scan_iter(self, match=None, **_options):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    async def close(self):
+        pass
+
+
+class TestLRUCache(unittest.TestCase):
+    """Ordering, limits, TTL and counters."""
+
+    def test_eviction_is_least_recently_used(self):
+        cache = LRUCache(max_items=3, ttl_seconds=60)
+        for key in "abc":
+            cache.set(key, key.upper())
+        self.assertEqual(cache.get("a"), "A")
+        cache.set("d", "D")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual([cache.get(k) for k in "acd"], ["A", "C", "D"])
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["hits"], 4)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(max_items=10, ttl_seconds=60)
+        cache.set("short", 1, ttl_seconds=0)
+        cache.set("long", 2)
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get("long"), 2)
+        self.assertEqual(cache.stats()["expirations"], 1)
+        self.assertEqual(len(cache), 1)
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_round_trip(self):
+        results = [
+            FactorResult(factor_id="f", code="600000", trade_date=TRADE_DATE, value=1.25,
+                         value_rank=3, value_percentile=0.4, signal=-0.5, confidence=0.9),
+            FactorResult(factor_id="f", code="600000", trade_date=TRADE_DATE + timedelta(days=1),
+                         value=None, data_quality="low", metadata={"n": 5}),
+        ]
+        data = encode_results(results)
+        self.assertLess(len(data), len(results[0].model_dump_json()))
+        self.assertEqual(decode_results(data, "f", "600000"), results)
+
+
+class TestFactorCache(unittest.TestCase):
+    """Batch access through L1 and L2."""
+
+    def _cache(self, backend="local", **kwargs):
+        cache = FactorCache(CacheConfig(backend=backend, **kwargs))
+        asyncio.run(cache.initialize())
+        return cache
+
+    def test_universe_lookup_is_one_round_trip(self):
+        redis = RecordingRedis()
+        cache = FactorCache(CacheConfig(backend="redis"))
+        cache._store = RedisStore(redis)
+        codes = [f"{600000 + i}" for i in range(500)]
+
+        async def run():
+            await cache.refresh_data_versions()
+            redis.round_trips = 0
+            await cache.set_many(_results(codes))
+            cache._memory.clear()
+            return await cache.get_many("factor_rsi", codes + ["999999"], TRADE_DATE)
+
+        found = asyncio.run(run())
+        self.assertEqual(redis.round_trips, 2)
+        self.assertEqual(len(found), 500)
+        self.assertEqual(found["600007"].value, 7.0)
+        self.assertEqual(set(redis.ttls.values()), {cache.config.ttl_seconds})
+        stats = cache.get_stats()
+        self.assertEqual(stats["l2"]["hits"], 500)
+        self.assertEqual(stats["l2"]["misses"], 1)
+        self.assertEqual(stats["l2"]["round_trips"], 3)
+
+        # Promoted to L1: no further L2 traffic.
+        asyncio.run(cache.get_many("factor_rsi", codes[:10], TRADE_DATE))
+        self.assertEqual(redis.round_trips, 2)
+
+        cleared = asyncio.run(cache.clear_factor("factor_rsi"))
+        self.assertEqual(cleared, 500)
+        self.assertEqual(redis.data, {})
+
+    def test_single_get_set_params_and_series(self):
+        cache = self._cache()
+        result = _results(["600000"])[0]
+
+        async def run():
+            await cache.set(result, params={"period": 6})
+            plain = await cache.get("factor_rsi", "600000", TRADE_DATE)
+            with_params = await cache.get("factor_rsi", "600000", TRADE_DATE, {"period": 6})
+            series = _results(["600000"] * 3)
+            await cache.set_series(series)
+            cache._memory.clear()
+            return plain, with_params, await cache.get_series("factor_rsi", "600000")
+
+        plain, with_params, series = asyncio.run(run())
+        self.assertIsNone(plain)
+        self.assertEqual(with_params, result)
+        self.assertEqual(len(series), 3)
+
+    def test_memory_backend_limits(self):
+        cache = self._cache(backend="memory", max_memory_items=100)
+        codes = [f"{600000 + i}" for i in range(150)]
+        asyncio.run(cache.set_many(_results(codes)))
+        found = asyncio.run(cache.get_many("factor_rsi", codes, TRADE_DATE))
+        self.assertEqual(sorted(found), codes[50:])
+        self.assertEqual(cache.get_stats()["l1"]["evictions"], 50)
+
+    def test_disabled(self):
+        cache = self._cache(enabled=False)
+        asyncio.run(cache.set_many(_results(["600000"])))
+        self.assertEqual(asyncio.run(cache.get_many("factor_rsi", ["600000"], TRADE_DATE)), {})
+
+
+class TestBulkCalculationCache(unittest.TestCase):
+
+    def test_cached_codes_skip_calculation(self):
+        codes = [f"{600000 + i}" for i in range(6)]
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(_make_rows(codes))
+        engine._cache = FactorCache(CacheConfig(backend="memory"))
+        self.addCleanup(engine.close)
+
+        requested = []
+        get_latest_panel = engine._data_source.get_latest_panel
+
+        async def recording_panel(codes, count, end_date=None):
+            requested.append(list(codes))
+            return await get_latest_panel(codes, count, end_date=end_date)
+
+        engine._data_source.get_latest_panel = recording_panel
+        trade_date = START + timedelta(days=79)
+
+        async def run():
+            first = await engine.calculate_bulk("factor_rsi", codes[:4], trade_date)
+            second = await engine.calculate_bulk("factor_rsi", codes, trade_date)
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(requested, [codes[:4], codes[4:]])
+        self.assertEqual([r.code for r in second], codes)
+        self.assertEqual(second[:4], first)
+
+
+
+class TestDataVersions(unittest.TestCase):
+    """New bars invalidate only the affected stocks and trigger warm-up."""
+
+    def test_version_bump_is_per_code(self):
+        cache = FactorCache(CacheConfig(backend="local"))
+        asyncio.run(cache.initialize())
+        codes = ["600000", "600001"]
+
+        async def run():
+            await cache.set_many(_results(codes))
+            changed = await cache.update_data_versions({"600000": TRADE_DATE})
+            unchanged = await cache.update_data_versions({"600000": TRADE_DATE})
+            return changed, unchanged, await cache.get_many("factor_rsi", codes, TRADE_DATE)
+
+        changed, unchanged, found = asyncio.run(run())
+        self.assertEqual(changed, ["600000"])
+        self.assertEqual(unchanged, [])
+        self.assertEqual(sorted(found), ["600001"])
+
+        other = FactorCache(CacheConfig(backend="local"))
+        other._store = cache._store
+        asyncio.run(other.refresh_data_versions())
+        self.assertEqual(other.data_version("600000"), TRADE_DATE.isoformat())
+        self.assertEqual(other.data_version("600001"), "0")
+
+    def test_warm_up_after_commit(self):
+        codes = [f"{600000 + i}" for i in range(5)]
+        trade_date = START + timedelta(days=79)
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(_make_rows(codes))
+        engine._cache = FactorCache(CacheConfig(backend="memory"))
+        self.addCleanup(engine.close)
+        saved = []
+
+        class RecordingStorage:
+            async def save_factor_data_batch(self, results):
+                saved.extend(results)
+                return len(results)
+
+        engine._storage = RecordingStorage()
+        warmer = CacheWarmer(
+            top_factors=2, engine=engine, state_store=IndicatorStateStore(), commit_window_seconds=0,
+        )
+
+        async def run():
+            await engine._cache.get_many("factor_cci", codes, trade_date)
+            await engine._cache.get_many("factor_wr", codes[:2], trade_date)
+            task = await warmer.on_bars_committed(dict.fromkeys(codes[:3], trade_date), commit="run-1")
+            await task
+            cci = await engine._cache.get_many("factor_cci", codes, trade_date)
+            wr = await engine._cache.get_many("factor_wr", codes, trade_date)
+            again = await warmer.on_bars_committed(dict.fromkeys(codes[:3], trade_date), commit="run-1")
+            return cci, wr, again
+
+        cci, wr, again = asyncio.run(run())
+        self.assertEqual(sorted(cci), codes[:3])
+        self.assertEqual(sorted(wr), codes[:3])
+        self.assertEqual(warmer.last_warmed, {"factor_cci": 3, "factor_wr": 3})
+        self.assertIsNone(again)
+        self.assertEqual(saved, [])
+
+    def test_recollected_date_invalidates(self):
+        cache = FactorCache(CacheConfig(backend="local"))
+        asyncio.run(cache.initialize())
+
+        async def run():
+            await cache.update_data_versions({"600000": TRADE_DATE}, commit="run-1")
+            await cache.set_many(_results(["600000"]))
+            changed = await cache.update_data_versions({"600000": TRADE_DATE}, commit="run-2")
+            return changed, await cache.get_many("factor_rsi", ["600000"], TRADE_DATE)
+
+        changed, found = asyncio.run(run())
+        self.assertEqual(changed, ["600000"])
+        self.assertEqual(found, {})
+        self.assertEqual(cache.data_version("600000"), f"{TRADE_DATE.isoformat()}+run-2")
+
+    def test_commit_window_warms_the_whole_universe(self):
+        from openfinance.quant.factors.registry import get_factor_registry
+
+        registry = get_factor_registry()
+        factor_def = registry.register(
+            name="cs_rank_close", code=f"cs_rank_close_{id(self)}", expression="cs_rank(close)",
+        )
+        self.addCleanup(registry.unregister, factor_def.factor_id)
+        codes = [f"{600000 + i}" for i in range(6)]
+        trade_date = START + timedelta(days=79)
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(_make_rows(codes))
+        engine._cache = FactorCache(CacheConfig(backend="memory"))
+        self.addCleanup(engine.close)
+        warmer = CacheWarmer(
+            default_factors=[factor_def.factor_id], engine=engine,
+            state_store=IndicatorStateStore(), commit_window_seconds=0.05,
+        )
+        fused = []
+        calculate_fused = engine.calculate_fused
+
+        async def recording_fused(factor_ids, codes, trade_date, **kwargs):
+            fused.append(list(codes))
+            return await calculate_fused(factor_ids, codes, trade_date, **kwargs)
+
+        engine.calculate_fused = recording_fused
+
+        async def run():
+            first = await warmer.on_bars_committed(dict.fromkeys(codes[:3], trade_date), commit="batch-1")
+            second = await warmer.on_bars_committed(dict.fromkeys(codes[3:], trade_date), commit="batch-2")
+            await first
+            cached = await engine._cache.get_many(factor_def.factor_id, codes, trade_date)
+            expected = await engine._calculate_bulk(factor_def.factor_id, codes, trade_date, None, persist=False)
+            return first is second, cached, expected
+
+        same_task, cached, expected = asyncio.run(run())
+        self.assertTrue(same_task)
+        self.assertEqual(fused, [codes])
+        self.assertEqual({code: r.value for code, r in cached.items()}, {r.code: r.value for r in expected})
+
+    def test_indicator_states_follow_commits(self):
+        codes = ["600000", "600001"]
+        source = InMemoryDataSource(_make_rows(codes, n=80))
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = source
+        self.addCleanup(engine.close)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        store = IndicatorStateStore(Path(tmp.name) / "states.json")
+        store.register_factor("factor_rsi", 14)
+        store.register_factor("factor_kdj", 14)
+        warmer = CacheWarmer(engine=engine, state_store=store, commit_window_seconds=0)
+        requested = []
+        get_latest_panel = source.get_latest_panel
+
+        async def recording_panel(codes, count, end_date=None):
+            requested.append((sorted(codes), count))
+            return await get_latest_panel(codes, count, end_date=end_date)
+
+        source.get_latest_panel = recording_panel
+
+        async def run(day):
+            task = await warmer.on_bars_committed({code: START + timedelta(days=day) for code in codes}, warm=False)
+            await task
+
+        asyncio.run(run(69))
+        asyncio.run(run(79))
+        klines = asyncio.run(source.get_klines("600001", START, START + timedelta(days=79)))
+        self.assertEqual(requested, [(codes, 500), (codes, 10)])
+        self.assertEqual(store.get("factor_rsi", "600001").indicator.count, 80)
+        self.assertAlmostEqual(store.value("factor_rsi", "600001"), calculate_rsi(klines, 14), places=9)
+        np.testing.assert_allclose(store.value("factor_kdj", "600001"), calculate_kdj(klines, n=14), rtol=1e-9)
+
+        saved = IndicatorStateStore(store.path)
+        saved.load()
+        self.assertEqual(saved.get("factor_rsi", "600001").last_date, START + timedelta(days=79))
+
+    def test_warm_up_reads_streamed_factors_from_states(self):
+        codes = [f"{600000 + i}" for i in range(4)]
+        trade_date = START + timedelta(days=79)
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(_make_rows(codes))
+        engine._cache = FactorCache(CacheConfig(backend="memory"))
+        self.addCleanup(engine.close)
+        store = IndicatorStateStore()
+        rsi = engine._registry.get_factor_instance("factor_rsi")
+        store.register_factor("factor_rsi", rsi.config.lookback_period)
+        warmer = CacheWarmer(default_factors=["factor_rsi", "factor_cci"], engine=engine, state_store=store)
+        fused = []
+        calculate_fused = engine.calculate_fused
+
+        async def recording_fused(factor_ids, codes, trade_date, **kwargs):
+            fused.append((list(factor_ids), list(codes)))
+            return await calculate_fused(factor_ids, codes, trade_date, **kwargs)
+
+        engine.calculate_fused = recording_fused
+
+        async def run():
+            await warmer.update_indicator_states(dict.fromkeys(codes[:3], trade_date))
+            await warmer.warm(codes, trade_date)
+            cached = await engine._cache.get_many("factor_rsi", codes, trade_date)
+            expected = await engine._calculate_bulk("factor_rsi", codes, trade_date, None, persist=False)
+            return cached, expected
+
+        cached, expected = asyncio.run(run())
+        self.assertEqual(fused, [(["factor_cci"], codes), (["factor_rsi"], codes[3:])])
+        self.assertEqual(warmer.last_warmed, {"factor_rsi": 4, "factor_cci": 4})
+        self.assertEqual(sorted(cached), codes)
+        for result in expected:
+            self.assertAlmostEqual(cached[result.code].value, result.value, places=9)
+            self.assertEqual(cached[result.code].value_normalized, result.value_normalized)
+
+
+if __name__ == '__main__':
+    unittest.main()
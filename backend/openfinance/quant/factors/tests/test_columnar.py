@@ -0,0 +1,118 @@
+"""
+Columnar Factor Store Tests.
+
+Panels written in any order and across year boundaries must read back
+aligned, rewriting a (date, code) must replace only that value, and
+concurrent writers and readers must never lose rows or see a missing
+partition.
+"""
+
+import multiprocessing
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from openfinance.quant.factors.base import FactorResult
+from openfinance.quant.factors.storage.columnar import POINTER_FILE, ColumnarFactorStore
+
+
+def _append_days(root, offset):
+    store = ColumnarFactorStore(root)
+    for day in range(offset, 40, 4):
+        store.append("h", date(2024, 2, 1) + timedelta(days=day), {"000001": float(day)})
+
+
+class TestColumnarFactorStore(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = ColumnarFactorStore(tmp.name)
+        rng = np.random.default_rng(4)
+        self.dates = np.array([date(2023, 12, 20) + timedelta(days=i) for i in range(30)], dtype='datetime64[D]')
+        self.codes = ["000001", "000002", "600000"]
+        self.values = rng.normal(size=(30, 3))
+        self.store.write("f", self.dates, self.codes, self.values)
+
+    def test_round_trip_across_years(self):
+        self.assertEqual(self.store.years("f"), [2023, 2024])
+        panel = self.store.load_panel("f")
+        np.testing.assert_array_equal(panel.dates, self.dates)
+        np.testing.assert_array_equal(panel.values, self.values)
+
+        panel = self.store.load_panel("f", date(2024, 1, 3), date(2024, 1, 5), codes=["600000", "999999"])
+        np.testing.assert_array_equal(panel.values[:, 0], self.values[14:17, 2])
+        self.assertTrue(np.all(np.isnan(panel.values[:, 1])))
+
+    def test_single_partition_is_memory_mapped(self):
+        panel = self.store.load_panel("f", date(2024, 1, 1), date(2024, 1, 10))
+        self.assertIsInstance(panel.values, np.memmap)
+        self.assertEqual(panel.shape, (10, 3))
+        self.assertEqual(panel.row(date(2024, 1, 2))["000002"], self.values[13, 1])
+
+    def test_append_replaces_and_widens(self):
+        self.store.append("f", date(2024, 1, 1), {"000001": 1.0, "300750": 2.0, "000002": None})
+        self.store.append_results([
+            FactorResult(factor_id="f", code="000001", trade_date=date(2024, 1, 19), value=3.0),
+            FactorResult(factor_id="g", code="000001", trade_date=date(2024, 1, 19), value=4.0),
+        ])
+        panel = self.store.load_panel("f", date(2024, 1, 1))
+        self.assertEqual(panel.codes, self.codes + ["300750"])
+        self.assertEqual(len(panel), 19)
+        np.testing.assert_array_equal(panel.values[0], [1.0, np.nan, self.values[12, 2], 2.0])
+        np.testing.assert_array_equal(panel.values[1, :3], self.values[13])
+        self.assertEqual(panel.row(date(2024, 1, 19)), {"000001": 3.0})
+        self.assertEqual(self.store.factors(), ["f", "g"])
+
+    def test_partial_append_keeps_other_codes(self):
+        day = date(2024, 3, 1)
+        self.store.append("p", day, {"000001": 1.0, "000002": 2.0, "000003": 3.0})
+        self.store.append("p", day, {"000002": 20.0})
+        self.store.append_results([
+            FactorResult(factor_id="p", code="000003", trade_date=day, value=None),
+            FactorResult(factor_id="p", code="000001", trade_date=date(2024, 3, 4), value=5.0),
+        ])
+        self.assertEqual(self.store.load_panel("p").row(day), {"000001": 1.0, "000002": 20.0})
+        self.assertEqual(self.store.load_panel("p").row(date(2024, 3, 4)), {"000001": 5.0})
+
+    def test_rewrite_swaps_versions(self):
+        before = self.store.load_panel("f", date(2024, 1, 1))
+        part = Path(self.store.root) / "f" / "2024"
+        first = (part / POINTER_FILE).read_text()
+
+        self.store.append("f", date(2024, 1, 1), {"000001": 9.0})
+        self.store.append("f", date(2024, 1, 2), {"000001": 8.0})
+        current = (part / POINTER_FILE).read_text()
+        versions = sorted(p.name for p in part.iterdir() if p.is_dir())
+        self.assertNotIn(first, versions)
+        self.assertIn(current, versions)
+        self.assertEqual(len(versions), 2)
+        np.testing.assert_array_equal(before.values, self.values[12:])
+        self.assertEqual(self.store.load_panel("f", date(2024, 1, 1)).values[1, 0], 8.0)
+
+    def test_missing_partition_reads_as_empty(self):
+        (Path(self.store.root) / "f" / "2025").mkdir()
+        self.assertEqual(self.store.years("f"), [2023, 2024, 2025])
+        panel = self.store.load_panel("f", date(2025, 1, 1))
+        self.assertEqual(panel.shape, (0, 0))
+        self.assertEqual(len(self.store.load_panel("f")), 30)
+
+    def test_concurrent_processes_keep_every_row(self):
+        processes = [
+            multiprocessing.Process(target=_append_days, args=(str(self.store.root), offset))
+            for offset in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        panel = self.store.load_panel("h")
+        self.assertEqual(len(panel), 40)
+        np.testing.assert_array_equal(panel.values[:, 0], np.arange(40.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Factor Storage Tests.
+
+Large batches must be staged with COPY and merged in one statement, and
+aggregated per-date rows must pivot into aligned panels. The database is
+replaced by a connection that records calls.
+"""
+
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from datetime import date
+
+import numpy as np
+
+from openfinance.quant.factors.base import FactorResult
+from openfinance.quant.factors.storage.database import FactorStorage
+
+
+class RecordingConnection:
+
+    def __init__(self, rows=None):
+        self.calls = []
+        self.rows = rows or []
+
+    async def execute(self, sql, *args):
+        self.calls.append(("execute", " ".join(sql.split()), args))
+
+    async def executemany(self, sql, records):
+        self.calls.append(("executemany", " ".join(sql.split()), list(records)))
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.calls.append(("copy", table, list(records), columns))
+
+    async def fetch(self, sql, *args):
+        self.calls.append(("fetch", " ".join(sql.split()), args))
+        return self.rows
+
+    def transaction(self):
+        @asynccontextmanager
+        async def transaction():
+            yield
+        return transaction()
+
+
+class RecordingPool:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        @asynccontextmanager
+        async def acquire():
+            yield self.conn
+        return acquire()
+
+
+def _storage(rows=None, copy_threshold=3):
+    conn = RecordingConnection(rows)
+    storage = FactorStorage(copy_threshold=copy_threshold)
+    storage._pool = RecordingPool(conn)
+    return storage, conn
+
+
+def _results(n, value=1.0):
+    return [
+        FactorResult(factor_id="f", code=f"{j:06d}", trade_date=date(2024, 1, 2), value=value)
+        for j in range(n)
+    ]
+
+
+class TestSave(unittest.TestCase):
+
+    def test_small_batch_uses_executemany(self):
+        storage, conn = _storage()
+        saved = asyncio.run(storage.save_factor_data_batch(_results(2) + _results(1, value=None)))
+        self.assertEqual(saved, 2)
+        self.assertEqual([call[0] for call in conn.calls], ["executemany"])
+
+    def test_large_batch_is_copied_and_merged(self):
+        storage, conn = _storage()
+        saved = asyncio.run(storage.save_factor_data_batch(_results(5)))
+        self.assertEqual(saved, 5)
+        kinds = [call[0] for call in conn.calls]
+        self.assertEqual(kinds, ["execute", "copy", "execute"])
+        self.assertIn("CREATE TEMP TABLE factor_data_stage", conn.calls[0][1])
+        self.assertEqual(len(conn.calls[1][2]), 5)
+        merge = conn.calls[2][1]
+        self.assertIn("SELECT DISTINCT ON (factor_id, code, trade_date)", merge)
+        self.assertIn("ON CONFLICT (factor_id, code, trade_date) DO UPDATE", merge)
+
+
+class TestLoadPanel(unittest.TestCase):
+
+    def test_pivots_rows(self):
+        rows = [
+            {"factor_id": "a", "trade_date": date(2024, 1, 2), "codes": ["000001", "600000"], "values": [1.0, 2.0]},
+            {"factor_id": "a", "trade_date": date(2024, 1, 3), "codes": ["000002"], "values": [3.0]},
+            {"factor_id": "b", "trade_date": date(2024, 1, 2), "codes": ["000001"], "values": [4.0]},
+        ]
+        storage, conn = _storage(rows)
+        panels = asyncio.run(storage.load_factor_panel(["a", "b"], start_date=date(2024, 1, 1)))
+
+        self.assertIn("GROUP BY factor_id, trade_date", conn.calls[0][1])
+        a = panels["a"]
+        self.assertEqual(a.codes, ["000001", "000002", "600000"])
+        np.testing.assert_array_equal(a.dates, np.array(["2024-01-02", "2024-01-03"], dtype="datetime64[D]"))
+        np.testing.assert_array_equal(a.values, [[1.0, np.nan, 2.0], [np.nan, 3.0, np.nan]])
+        self.assertEqual(panels["b"].shape, (1, 1))
+
+    def test_requested_code_order(self):
+        rows = [{"factor_id": "a", "trade_date": date(2024, 1, 2), "codes": ["000001", "600000"], "values": [1.0, 2.0]}]
+        storage, _ = _storage(rows)
+        panel = asyncio.run(storage.load_factor_panel(["a"], codes=["600000", "300750", "000001"]))["a"]
+        self.assertEqual(panel.codes, ["600000", "300750", "000001"])
+        np.testing.assert_array_equal(panel.values, [[2.0, np.nan, 1.0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,320 @@
+"""
+Factor Expression Engine Tests.
+
+Unit tests for expression evaluation over single stocks and panels.
+"""
+
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from openfinance.datacenter.models.analytical import ADSKLineModel
+from openfinance.quant.factors import kernels
+from openfinance.quant.factors.expression_engine import (
+    ExpressionContext,
+    ExpressionEvaluator,
+    FactorExpressionEngine,
+    FunctionRegistry,
+)
+
+
+def _make_panel(n_dates: int = 160, n_stocks: int = 5, seed: int = 0) -> dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_dates, n_stocks)), axis=0))
+    open_ = close * (1 + rng.normal(0, 0.005, close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, close.shape))
+    volume = rng.integers(1_000_000, 50_000_000, close.shape).astype(float)
+    amount = volume * close
+    return {
+        'open': open_, 'high': high, 'low': low,
+        'close': close, 'volume': volume, 'amount': amount,
+    }
+
+
+def _klines_for(panel: dict[str, np.ndarray], column: int) -> list[ADSKLineModel]:
+    start = date(2024, 1, 1)
+    return [
+        ADSKLineModel(
+            code="600000",
+            trade_date=start + timedelta(days=i),
+            open=panel['open'][i, column],
+            high=panel['high'][i, column],
+            low=panel['low'][i, column],
+            close=panel['close'][i, column],
+            volume=int(panel['volume'][i, column]),
+            amount=panel['amount'][i, column],
+        )
+        for i in range(panel['close'].shape[0])
+    ]
+
+
+class TestPanelEvaluation(unittest.TestCase):
+    """Panel mode must agree with evaluating each stock on its own."""
+
+    EXPRESSIONS = [
+        "close / sma(close, 20) - 1",
+        "ema(close, 12) - ema(close, 26)",
+        "rsi(close, 14)",
+        "std(returns, 20) * sqrt(252)",
+        "corr(close, volume, 10)",
+        "atr(high, low, close, 14) / close",
+        "cci(high, low, close, 20)",
+        "wr(high, low, close, 14)",
+        "obv(close, volume)",
+        "mfi(high, low, close, volume, 14)",
+        "ad(high, low, close, volume)",
+        "rank(volume)",
+        "cumsum(returns)",
+        "skewness(returns, 20) + kurtosis(returns, 20)",
+        "delta(close, 5) / shift(close, 5)",
+        "sortino(returns, 0.0, 20)",
+        "max_drawdown(close, 30)",
+        "beta(returns, shift(returns, 1), 30)",
+        "winsorize(returns)",
+        "vwap / close - 1",
+    ]
+
+    def setUp(self):
+        self.engine = FactorExpressionEngine()
+        self.panel = _make_panel()
+
+    def test_panel_matches_per_stock(self):
+        n_stocks = self.panel['close'].shape[1]
+        klines = [_klines_for(self.panel, j) for j in range(n_stocks)]
+        for expression in self.EXPRESSIONS:
+            with self.subTest(expression=expression):
+                with np.errstate(all='ignore'):
+                    panel_values = self.engine.calculate_panel(expression, **self.panel)
+                    expected = np.column_stack([
+                        self.engine.calculate(expression, klines[j]) for j in range(n_stocks)
+                    ])
+                self.assertEqual(panel_values.shape, self.panel['close'].shape)
+                np.testing.assert_allclose(panel_values, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_panel_handles_late_listing(self):
+        panel = {k: v.copy() for k, v in self.panel.items()}
+        for values in panel.values():
+            values[:40, 1] = np.nan
+        with np.errstate(all='ignore'):
+            result = self.engine.calculate_panel("sma(close, 10)", **panel)
+        self.assertTrue(np.all(np.isnan(result[:49, 1])))
+        self.assertFalse(np.any(np.isnan(result[49:, 1])))
+        self.assertFalse(np.any(np.isnan(result[9:, 0])))
+
+    def test_recursions_start_at_each_listing(self):
+        panel = {k: v.copy() for k, v in self.panel.items()}
+        for column, listed in ((1, 40), (3, 150)):
+            for values in panel.values():
+                values[:listed, column] = np.nan
+        expressions = [
+            "rsi(close, 14)",
+            "atr(high, low, close, 14)",
+            "obv(close, volume)",
+            "ad(high, low, close, volume)",
+        ]
+        for expression in expressions:
+            with self.subTest(expression=expression):
+                with np.errstate(all='ignore'):
+                    result = self.engine.calculate_panel(expression, **panel)
+                for column, listed in ((0, 0), (1, 40), (3, 150)):
+                    alone = {k: v[listed:, [column]] for k, v in self.panel.items()}
+                    with np.errstate(all='ignore'):
+                        expected = self.engine.calculate(expression, _klines_for(alone, 0))
+                    self.assertTrue(np.all(np.isnan(result[:listed, column])))
+                    np.testing.assert_allclose(result[listed:, column], expected, rtol=1e-9, equal_nan=True)
+
+        k, d, j = FunctionRegistry._kdj(panel['high'], panel['low'], panel['close'])
+        k1, _, _ = FunctionRegistry._kdj(*(self.panel[f][40:, 1] for f in ('high', 'low', 'close')))
+        np.testing.assert_allclose(k[40:, 1], k1, equal_nan=True)
+
+    def test_panel_rejects_mismatched_shapes(self):
+        panel = dict(self.panel)
+        panel['volume'] = panel['volume'][:, :2]
+        with self.assertRaises(ValueError):
+            self.engine.calculate_panel("close", **panel)
+
+    def test_scalar_expression_broadcasts_to_panel(self):
+        result = self.engine.calculate_panel("1.5", **self.panel)
+        self.assertEqual(result.shape, self.panel['close'].shape)
+
+
+class TestCrossSectionalFunctions(unittest.TestCase):
+    """cs_* functions operate across stocks on each date."""
+
+    def setUp(self):
+        self.engine = FactorExpressionEngine()
+        self.panel = _make_panel(n_dates=30, n_stocks=40, seed=3)
+        self.panel['close'][5, 7] = np.nan
+
+    def test_cs_rank(self):
+        result = self.engine.calculate_panel("cs_rank(close)", **self.panel)
+        self.assertTrue(np.isnan(result[5, 7]))
+        np.testing.assert_allclose(np.nanmin(result, axis=1), 0.0)
+        np.testing.assert_allclose(np.nanmax(result, axis=1), 1.0)
+        row = self.panel['close'][0]
+        self.assertEqual(result[0, np.argmax(row)], 1.0)
+        self.assertEqual(result[0, np.argmin(row)], 0.0)
+
+    def test_cs_rank_ties_share_rank(self):
+        data = np.array([[1.0, 2.0, 2.0, 3.0]])
+        np.testing.assert_allclose(kernels.cs_rank(data), [[0.0, 0.5, 0.5, 1.0]])
+
+    def test_cs_zscore_and_demean(self):
+        zscore = self.engine.calculate_panel("cs_zscore(close)", **self.panel)
+        demean = self.engine.calculate_panel("cs_demean(close)", **self.panel)
+        np.testing.assert_allclose(np.nanmean(zscore, axis=1), 0.0, atol=1e-12)
+        np.testing.assert_allclose(np.nanstd(zscore, axis=1), 1.0)
+        np.testing.assert_allclose(np.nanmean(demean, axis=1), 0.0, atol=1e-9)
+
+    def test_cs_winsorize(self):
+        result = self.engine.calculate_panel("cs_winsorize(returns, 0.1, 0.9)", **self.panel)
+        returns = np.diff(self.panel['close'], axis=0) / self.panel['close'][:-1]
+        upper = np.nanquantile(returns, 0.9, axis=1)
+        np.testing.assert_allclose(np.nanmax(result[1:], axis=1), upper)
+
+    def test_cs_neutralize(self):
+        result = self.engine.calculate_panel("cs_neutralize(returns, log(amount))", **self.panel)
+        size = np.log(self.panel['amount'])
+        for t in range(1, result.shape[0]):
+            valid = ~np.isnan(result[t])
+            self.assertAlmostEqual(np.sum(result[t, valid]), 0.0, places=9)
+            self.assertAlmostEqual(np.dot(result[t, valid], size[t, valid]), 0.0, places=6)
+
+
+class TestCompiledExpressionCache(unittest.TestCase):
+    """ExpressionEvaluator reuses compiled expressions."""
+
+    def setUp(self):
+        panel = _make_panel(n_dates=40, n_stocks=1)
+        self.context = ExpressionContext.from_arrays(**{k: v[:, 0] for k, v in panel.items()})
+        self.evaluator = ExpressionEvaluator(cache_size=2)
+
+    def test_repeated_evaluation_hits_cache(self):
+        first = self.evaluator.evaluate("sma(close, 5) / close", self.context)
+        second = self.evaluator.evaluate("sma(close, 5) / close", self.context)
+        np.testing.assert_array_equal(first, second)
+        info = self.evaluator.cache_info()
+        self.assertEqual(info["misses"], 1)
+        self.assertEqual(info["hits"], 1)
+
+    def test_cache_is_bounded_lru(self):
+        for expression in ("close", "open", "close", "high"):
+            self.evaluator.evaluate(expression, self.context)
+        info = self.evaluator.cache_info()
+        self.assertEqual(info["size"], 2)
+        self.evaluator.evaluate("close", self.context)
+        self.assertEqual(self.evaluator.cache_info()["hits"], 2)
+
+    def test_register_invalidates_cache(self):
+        registry = FunctionRegistry()
+        registry.register("cache_test_fn", lambda x: x * 2)
+        try:
+            np.testing.assert_allclose(
+                self.evaluator.evaluate("cache_test_fn(close)", self.context), self.context.close * 2,
+            )
+            registry.register("cache_test_fn", lambda x: x * 3)
+            np.testing.assert_allclose(
+                self.evaluator.evaluate("cache_test_fn(close)", self.context), self.context.close * 3,
+            )
+            self.assertEqual(self.evaluator.cache_info()["misses"], 2)
+        finally:
+            registry._functions.pop("cache_test_fn", None)
+            registry._namespace = None
+
+    def test_parameters_are_not_baked_in(self):
+        low = self.evaluator.evaluate("close * k", self.context, {"k": 1.0})
+        high = self.evaluator.evaluate("close * k", self.context, {"k": 2.0})
+        np.testing.assert_allclose(high, low * 2)
+
+    def test_invalid_expression_raises(self):
+        with self.assertRaises(ValueError):
+            self.evaluator.evaluate("close +", self.context)
+
+
+class TestBatchEvaluation(unittest.TestCase):
+    """calculate_many shares sub-expressions without changing results."""
+
+    EXPRESSIONS = [
+        "close / sma(close, 20) - 1",
+        "sma(close, 20) / close",
+        "std(returns, 20) * sqrt(252)",
+        "std(returns, 20) / abs(sma(returns, 20))",
+        "rank(volume) + sma(close, 20)",
+        "sma(close, 20) + rank(volume)",
+        "(close > open) * 1.0",
+        "-delta(close, 5) if True else close",
+    ]
+
+    def setUp(self):
+        self.engine = FactorExpressionEngine()
+        self.panel = _make_panel(n_dates=80, n_stocks=3)
+        self.klines = _klines_for(self.panel, 0)
+
+    def test_batch_matches_individual(self):
+        with np.errstate(all='ignore'):
+            result = self.engine.calculate_many(self.EXPRESSIONS, self.klines)
+        self.assertEqual(result.errors, {})
+        for expression in self.EXPRESSIONS:
+            with self.subTest(expression=expression):
+                with np.errstate(all='ignore'):
+                    expected = self.engine.calculate(expression, self.klines)
+                np.testing.assert_allclose(result.values[expression], expected, equal_nan=True)
+
+    def test_shared_subexpressions_evaluated_once(self):
+        calls = []
+        registry = FunctionRegistry()
+        registry.register("counted_sma", lambda x, n: calls.append(n) or kernels.rolling_sum(x, n) / n)
+        try:
+            result = self.engine.calculate_many(
+                ["close / counted_sma(close, 20)", "counted_sma(close, 20) - close", "counted_sma(close, 5)"],
+                self.klines,
+            )
+        finally:
+            registry._functions.pop("counted_sma", None)
+            registry._namespace = None
+        self.assertEqual(sorted(calls), [5, 20])
+        self.assertGreater(result.shared_nodes, 0)
+
+    def test_commutative_operands_are_canonical(self):
+        from openfinance.quant.factors.expression_dag import ExpressionDAG
+
+        dag = ExpressionDAG()
+        first = dag.add("rank(volume) + sma(close, 20)")
+        second = dag.add("sma(close, 20) + rank(volume)")
+        third = dag.add("sma(close, 20) - rank(volume)")
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, third)
+
+    def test_intermediate_values_are_released(self):
+        from openfinance.quant.factors.expression_dag import ExpressionDAG
+
+        dag = ExpressionDAG()
+        shared = dag.add("sma(close, 5)")
+        ratio = dag.add("close / sma(close, 5) - sma(close, 5) * close")
+        namespace = self.engine._evaluator.namespace(ExpressionContext.from_arrays(**self.panel))
+        values, failures = dag.evaluate(namespace)
+        self.assertEqual(failures, {})
+        self.assertEqual(set(values), {shared, ratio})
+        self.assertEqual([n.references for n in dag.nodes if n.label == 'sma'], [2])
+
+    def test_errors_are_isolated(self):
+        result = self.engine.calculate_many(
+            ["close +", "missing_fn(close)", "close / sma(close, 5)", "unknown_field * 2"],
+            self.klines,
+        )
+        self.assertEqual(set(result.errors), {"close +", "missing_fn(close)", "unknown_field * 2"})
+        self.assertIn("close / sma(close, 5)", result.values)
+
+    def test_panel_context(self):
+        context = ExpressionContext.from_arrays(**self.panel)
+        with np.errstate(all='ignore'):
+            result = self.engine.calculate_many(["cs_rank(close)", "sma(close, 10)", "2"], context)
+            expected = self.engine.calculate_panel("sma(close, 10)", **self.panel)
+        np.testing.assert_allclose(result.values["sma(close, 10)"], expected, equal_nan=True)
+        self.assertEqual(result.values["2"].shape, self.panel['close'].shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
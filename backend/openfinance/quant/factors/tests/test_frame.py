@@ -0,0 +1,209 @@
+"""
+KLineFrame Tests.
+
+The columnar container must be a drop-in replacement for a list of
+ADSKLineModel objects in factor code, and build correctly from raw rows.
+"""
+
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from openfinance.datacenter.models.analytical import ADSKLineModel
+from openfinance.quant.factors.base import FactorBase, FactorCategory, FactorMetadata, FactorType
+from openfinance.quant.factors.expression_engine import FactorExpressionEngine
+from openfinance.quant.factors.frame import KLINE_FIELDS, KLineFrame, kline_column
+from openfinance.quant.factors.indicators import (
+    calculate_atr,
+    calculate_boll,
+    calculate_cci,
+    calculate_kdj,
+    calculate_macd,
+    calculate_momentum,
+    calculate_obv,
+    calculate_rsi,
+    calculate_wr,
+)
+from openfinance.quant.factors.indicators.rsi import RSIFactor
+
+
+def _make_klines(n: int = 120, seed: int = 4) -> list[ADSKLineModel]:
+    rng = np.random.default_rng(seed)
+    close = 15 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    start = date(2024, 3, 1)
+    return [
+        ADSKLineModel(
+            code="000001",
+            trade_date=start + timedelta(days=i),
+            open=float(open_[i]),
+            high=float(max(open_[i], close[i]) * 1.01),
+            low=float(min(open_[i], close[i]) * 0.99),
+            close=float(close[i]),
+            volume=int(rng.integers(1_000_000, 9_000_000)),
+            amount=float(close[i] * 5_000_000),
+            pre_close=float(close[i - 1]) if i else None,
+            turnover_rate=float(rng.uniform(0.5, 5.0)),
+            change_pct=float(close[i] / close[i - 1] * 100 - 100) if i else None,
+            amplitude=float(rng.uniform(1.0, 4.0)),
+            name="平安银行",
+        )
+        for i in range(n)
+    ]
+
+
+class _TurnoverFactor(FactorBase):
+    """Mean turnover over the window, scaled by the last bar's move."""
+
+    def _default_metadata(self) -> FactorMetadata:
+        return FactorMetadata(
+            factor_id="test_turnover",
+            name="Turnover",
+            description="Reads fields outside OHLCV",
+            factor_type=FactorType.TECHNICAL,
+            category=FactorCategory.LIQUIDITY,
+            required_fields=["turnover_rate", "change_pct", "amplitude"],
+            lookback_period=20,
+        )
+
+    def _calculate(self, klines, **_params):
+        window = klines[-20:]
+        turnover = sum(k.turnover_rate for k in window) / len(window)
+        last = klines[-1]
+        assert last.name == "平安银行" and last.typical_price > 0
+        return turnover * (1 + last.change_pct / 100) + last.amplitude + last.volume % 7
+
+
+class TestKLineFrame(unittest.TestCase):
+    """Construction, slicing and row access."""
+
+    def setUp(self):
+        self.klines = _make_klines()
+        self.frame = KLineFrame.from_klines(self.klines)
+
+    def test_columns_match_models(self):
+        np.testing.assert_array_equal(self.frame.close, [k.close for k in self.klines])
+        self.assertEqual(self.frame.close.dtype, np.float64)
+        self.assertTrue(self.frame.close.flags['C_CONTIGUOUS'])
+        self.assertTrue(np.isnan(self.frame.pre_close[0]))
+        self.assertEqual(self.frame.trade_dates[-1], self.klines[-1].trade_date)
+
+    def test_sequence_behaviour(self):
+        self.assertEqual(len(self.frame), len(self.klines))
+        last = self.frame[-1]
+        self.assertEqual(last.code, "000001")
+        self.assertEqual(last.trade_date, self.klines[-1].trade_date)
+        self.assertAlmostEqual(last.close, self.klines[-1].close)
+        self.assertIsNone(self.frame[0].pre_close)
+        self.assertEqual([k.close for k in self.frame[:3]], [k.close for k in self.klines[:3]])
+        with self.assertRaises(IndexError):
+            self.frame[len(self.frame)]
+
+    def test_slices_are_views(self):
+        tail = self.frame[-20:]
+        self.assertIsInstance(tail, KLineFrame)
+        self.assertTrue(np.shares_memory(tail.close, self.frame.close))
+        self.assertEqual(tail[0].trade_date, self.klines[-20].trade_date)
+
+    def test_derived_columns_are_cached(self):
+        returns = self.frame.returns
+        self.assertIs(self.frame.returns, returns)
+        expected = np.diff(self.frame.close) / self.frame.close[:-1]
+        np.testing.assert_allclose(returns[1:], expected)
+        np.testing.assert_allclose(self.frame.vwap, self.frame.amount / self.frame.volume)
+
+    def test_from_rows(self):
+        rows = [
+            {
+                'code': '000001', 'trade_date': k.trade_date,
+                'open': Decimal(str(k.open)), 'high': Decimal(str(k.high)),
+                'low': Decimal(str(k.low)), 'close': Decimal(str(k.close)),
+                'volume': k.volume, 'amount': None,
+            }
+            for k in reversed(self.klines)
+        ]
+        frame = KLineFrame.from_rows(rows)
+        self.assertEqual(frame.code, '000001')
+        self.assertEqual(frame.trade_dates, [k.trade_date for k in self.klines])
+        np.testing.assert_allclose(frame.close, self.frame.close)
+        self.assertTrue(np.all(np.isnan(frame.amount)))
+        self.assertFalse(frame.has_column('pre_close'))
+
+    def test_to_klines_round_trip(self):
+        models = self.frame[-5:].to_klines()
+        self.assertEqual([m.close for m in models], [k.close for k in self.klines[-5:]])
+        self.assertEqual([m.volume for m in models], [k.volume for k in self.klines[-5:]])
+        self.assertEqual([m.turnover_rate for m in models], [k.turnover_rate for k in self.klines[-5:]])
+        self.assertEqual(models[-1].name, "平安银行")
+
+    def test_rows_carry_every_model_field(self):
+        last, model = self.frame[-1], self.klines[-1]
+        self.assertIsInstance(last.volume, int)
+        self.assertEqual(last.volume, model.volume)
+        self.assertEqual(last.turnover_rate, model.turnover_rate)
+        self.assertEqual(last.name, model.name)
+        self.assertIsNone(last.market_cap)
+        self.assertAlmostEqual(last.typical_price, model.typical_price)
+        with self.assertRaises(AttributeError):
+            _ = last.no_such_field
+
+    def test_kline_column_on_lists(self):
+        np.testing.assert_array_equal(kline_column(self.klines, 'close'), self.frame.close)
+        self.assertTrue(np.isnan(kline_column(self.klines, 'pre_close')[0]))
+
+
+class TestFrameAsFactorInput(unittest.TestCase):
+    """Factor code gives identical results for a frame and a model list."""
+
+    def setUp(self):
+        self.klines = _make_klines()
+        self.frame = KLineFrame.from_klines(self.klines)
+
+    def test_indicator_functions(self):
+        functions = [
+            calculate_rsi, calculate_macd, calculate_kdj, calculate_atr, calculate_obv,
+            calculate_cci, calculate_wr, calculate_boll, calculate_momentum,
+        ]
+        for func in functions:
+            with self.subTest(indicator=func.__name__):
+                expected = func(self.klines)
+                actual = func(self.frame)
+                np.testing.assert_allclose(
+                    np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), rtol=1e-12,
+                )
+
+    def test_factor_calculate(self):
+        factor = RSIFactor()
+        from_list = factor.calculate(self.klines)
+        from_frame = factor.calculate(self.frame)
+        self.assertEqual(from_frame.code, from_list.code)
+        self.assertEqual(from_frame.trade_date, from_list.trade_date)
+        self.assertAlmostEqual(from_frame.value, from_list.value)
+
+    def test_factor_reading_non_price_fields(self):
+        factor = _TurnoverFactor()
+        expected = factor.calculate(self.klines)
+        self.assertIsNotNone(expected)
+        self.assertAlmostEqual(factor.calculate(self.frame).value, expected.value)
+
+        rows = [
+            {'code': k.code, 'trade_date': k.trade_date, 'name': k.name, **k.model_dump(include=set(KLINE_FIELDS))}
+            for k in reversed(self.klines)
+        ]
+        self.assertAlmostEqual(factor.calculate(KLineFrame.from_rows(rows)).value, expected.value)
+
+    def test_expression_engine(self):
+        engine = FactorExpressionEngine()
+        for expression in ("rsi(close, 14)", "vwap / close - 1", "std(returns, 20)"):
+            with self.subTest(expression=expression):
+                np.testing.assert_allclose(
+                    engine.calculate(expression, self.frame),
+                    engine.calculate(expression, self.klines),
+                    equal_nan=True,
+                )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,229 @@
+"""
+Incremental Indicator Tests.
+
+Streaming updates must reproduce full-history recomputation, survive a
+serialization round trip mid-stream, and be applied once per trading day
+by the state store.
+"""
+
+import json
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from openfinance.datacenter.models.analytical import ADSKLineModel
+from openfinance.quant.factors.expression_engine import FunctionRegistry
+from openfinance.quant.factors.incremental import (
+    IncrementalATR,
+    IncrementalEMA,
+    IncrementalKDJ,
+    IncrementalKDJFactor,
+    IncrementalMACD,
+    IncrementalOBV,
+    IncrementalRSI,
+    IncrementalRSIFactor,
+    create_indicator,
+    indicator_from_dict,
+)
+from openfinance.quant.factors.indicators.kdj import calculate_kdj
+from openfinance.quant.factors.indicators.rsi import calculate_rsi_series
+from openfinance.quant.factors.storage import IndicatorStateStore
+
+
+def _make_bars(n: int = 300, seed: int = 5) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    close = 30 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    close[40:44] = close[39]
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    volume = rng.integers(1_000_000, 50_000_000, n).astype(float)
+    start = date(2024, 1, 1)
+    return [
+        {
+            'trade_date': start + timedelta(days=i),
+            'open': open_[i], 'high': high[i], 'low': low[i],
+            'close': close[i], 'volume': volume[i],
+        }
+        for i in range(n)
+    ]
+
+
+def _column(bars: list[dict], name: str) -> np.ndarray:
+    return np.array([bar[name] for bar in bars], dtype=float)
+
+
+def _stream(indicator, bars, width=None) -> np.ndarray:
+    values = indicator.update_many(bars)
+    if width is None:
+        return np.array([np.nan if v is None else v for v in values])
+    return np.array([[np.nan if x is None else x for x in v] for v in values]).T
+
+
+class TestIncrementalParity(unittest.TestCase):
+    """Streaming values equal the FunctionRegistry full-history results."""
+
+    def setUp(self):
+        self.bars = _make_bars()
+        self.close = _column(self.bars, 'close')
+        self.high = _column(self.bars, 'high')
+        self.low = _column(self.bars, 'low')
+        self.volume = _column(self.bars, 'volume')
+
+    def assertSeries(self, actual, expected):
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, equal_nan=True)
+
+    def test_ema(self):
+        for period in (1, 5, 20):
+            with self.subTest(period=period):
+                self.assertSeries(
+                    _stream(IncrementalEMA(period), self.bars),
+                    FunctionRegistry._ema(self.close, period),
+                )
+
+    def test_ema_skips_leading_gaps(self):
+        bars = [dict(bar, close=np.nan) for bar in self.bars[:10]] + self.bars[10:]
+        self.assertSeries(
+            _stream(IncrementalEMA(12), bars),
+            FunctionRegistry._ema(_column(bars, 'close'), 12),
+        )
+
+    def test_rsi(self):
+        for period in (6, 14):
+            with self.subTest(period=period):
+                self.assertSeries(
+                    _stream(IncrementalRSI(period), self.bars),
+                    FunctionRegistry._rsi(self.close, period),
+                )
+
+    def test_macd(self):
+        actual = _stream(IncrementalMACD(12, 26, 9), self.bars, width=3)
+        for got, expected in zip(actual, FunctionRegistry._macd(self.close, 12, 26, 9), strict=True):
+            self.assertSeries(got, expected)
+
+    def test_kdj(self):
+        actual = _stream(IncrementalKDJ(9, 3, 3), self.bars, width=3)
+        for got, expected in zip(actual, FunctionRegistry._kdj(self.high, self.low, self.close, 9, 3, 3), strict=True):
+            self.assertSeries(got, expected)
+
+    def test_atr(self):
+        self.assertSeries(
+            _stream(IncrementalATR(14), self.bars),
+            FunctionRegistry._atr(self.high, self.low, self.close, 14),
+        )
+
+    def test_obv(self):
+        self.assertSeries(
+            _stream(IncrementalOBV(), self.bars),
+            FunctionRegistry._obv(self.close, self.volume),
+        )
+
+    def test_rsi_factor(self):
+        bars = [dict(bar, close=30 + i) if 100 <= i < 130 else bar for i, bar in enumerate(self.bars)]
+        klines = [ADSKLineModel(code="600000", **bar) for bar in bars]
+        actual = _stream(IncrementalRSIFactor(14), bars)
+        self.assertSeries(actual, calculate_rsi_series(klines, 14))
+        self.assertEqual(actual[129], 100.0)
+
+    def test_kdj_factor(self):
+        klines = [ADSKLineModel(code="600000", **bar) for bar in self.bars[:80]]
+        actual = _stream(IncrementalKDJFactor(14, 3, 3), self.bars[:80], width=3)
+        expected = np.array([
+            [np.nan if v is None else v for v in calculate_kdj(klines[:i + 1], n=14)]
+            for i in range(len(klines))
+        ]).T
+        for got, want in zip(actual, expected, strict=True):
+            self.assertSeries(got, want)
+
+    def test_accepts_kline_models(self):
+        klines = [ADSKLineModel(code="600000", **bar) for bar in self.bars[:60]]
+        from_models = _stream(IncrementalRSI(14), klines)
+        from_dicts = _stream(IncrementalRSI(14), self.bars[:60])
+        np.testing.assert_array_equal(from_models, from_dicts)
+
+
+class TestIncrementalSerialization(unittest.TestCase):
+    """A state restored mid-stream continues exactly where it left off."""
+
+    def test_round_trip_mid_stream(self):
+        bars = _make_bars(120)
+        specs = [
+            ('ema', {'period': 10}), ('rsi', {'period': 14}), ('macd', {}),
+            ('kdj', {'n': 9}), ('atr', {'period': 14}), ('obv', {}),
+            ('rsi_factor', {'period': 14}), ('kdj_factor', {'n': 14}),
+        ]
+        for name, params in specs:
+            with self.subTest(indicator=name):
+                reference = create_indicator(name, **params)
+                expected = reference.update_many(bars)
+
+                first = create_indicator(name, **params)
+                first.update_many(bars[:70])
+                restored = indicator_from_dict(json.loads(json.dumps(first.to_dict())))
+                self.assertEqual(restored.value, first.value)
+                self.assertEqual(restored.update_many(bars[70:]), expected[70:])
+
+    def test_unknown_indicator(self):
+        with self.assertRaises(ValueError):
+            create_indicator('nope')
+
+
+class TestIndicatorStateStore(unittest.TestCase):
+    """Per-(factor, code) state persistence and daily updates."""
+
+    def setUp(self):
+        self.store = IndicatorStateStore()
+        self.store.register('factor_rsi', 'rsi', period=14)
+        self.bars = _make_bars(80)
+
+    def test_daily_update_matches_full_history(self):
+        self.store.warm_up('factor_rsi', '600000', self.bars[:-1])
+        value = self.store.update_market('factor_rsi', {'600000': self.bars[-1]})['600000']
+        expected = FunctionRegistry._rsi(_column(self.bars, 'close'), 14)[-1]
+        self.assertAlmostEqual(value, expected, places=9)
+
+    def test_same_day_is_not_applied_twice(self):
+        self.store.warm_up('factor_rsi', '600000', self.bars[:-1])
+        first = self.store.update('factor_rsi', '600000', self.bars[-1])
+        again = self.store.update('factor_rsi', '600000', self.bars[-1])
+        self.assertEqual(first, again)
+        self.assertEqual(self.store.get('factor_rsi', '600000').indicator.count, len(self.bars))
+
+    def test_register_factor_uses_matching_variant(self):
+        self.store.warm_up('factor_rsi', '600000', self.bars)
+        self.assertTrue(self.store.register_factor('factor_rsi', 14))
+        self.assertTrue(self.store.register_factor('factor_kdj', 14))
+        self.assertFalse(self.store.register_factor('factor_cci', 14))
+        self.assertIsNone(self.store.get('factor_rsi', '600000'))
+        self.assertEqual(sorted(self.store.factor_ids), ['factor_kdj', 'factor_rsi'])
+
+        self.store.warm_up('factor_kdj', '600000', self.bars)
+        self.store.register_factor('factor_kdj', 14)
+        self.assertIsInstance(self.store.get('factor_kdj', '600000').indicator, IncrementalKDJFactor)
+
+    def test_unregistered_factor_raises(self):
+        with self.assertRaises(KeyError):
+            self.store.update('factor_unknown', '600000', self.bars[0])
+
+    def test_save_and_load(self):
+        self.store.warm_up('factor_rsi', '600000', self.bars[:50])
+        self.store.warm_up('factor_rsi', '000001', self.bars[:30])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'states.json'
+            self.store.save(path)
+            restored = IndicatorStateStore(path)
+            self.assertEqual(restored.load(), 2)
+
+        for bar in self.bars[50:]:
+            self.store.update('factor_rsi', '600000', bar)
+            restored.update('factor_rsi', '600000', bar)
+        self.assertEqual(restored.value('factor_rsi', '600000'), self.store.value('factor_rsi', '600000'))
+        self.assertEqual(restored.remove('factor_rsi'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
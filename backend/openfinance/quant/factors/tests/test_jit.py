@@ -0,0 +1,92 @@
+"""
+JIT Kernel Parity Tests.
+
+The loop kernels in ``jit`` must reproduce the NumPy ``FunctionRegistry``
+kernels on series and panels. Without numba they run as plain Python, so
+parity is checked either way; registration is only checked with numba.
+"""
+
+import unittest
+
+import numpy as np
+
+from openfinance.quant.factors import jit
+from openfinance.quant.factors.expression_engine import FunctionRegistry
+
+
+def _ohlc(shape, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 25 * np.exp(np.cumsum(rng.normal(0, 0.02, shape), axis=0))
+    high = close * (1 + rng.uniform(0, 0.02, shape))
+    low = close * (1 - rng.uniform(0, 0.02, shape))
+    return high, low, close
+
+
+class TestJitParity(unittest.TestCase):
+    """JIT kernels match the NumPy kernels, including NaN layout."""
+
+    def setUp(self):
+        high, low, close = _ohlc((260, 6))
+        for panel in (high, low, close):
+            panel[:30, 2] = np.nan
+            panel[100, 4] = np.nan
+        self.inputs = {
+            'series': tuple(p[:, 0] for p in (high, low, close)),
+            'gappy_series': tuple(p[:, 2] for p in (high, low, close)),
+            'panel': (high, low, close),
+            'short': tuple(p[:5] for p in (high, low, close)),
+        }
+
+    def assertSame(self, actual, expected):
+        self.assertEqual(np.shape(actual), np.shape(expected))
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+    def _check(self, name, jit_fn, numpy_fn):
+        for label, (high, low, close) in self.inputs.items():
+            with self.subTest(kernel=name, data=label):
+                with np.errstate(all='ignore'):
+                    actual = jit_fn(high, low, close)
+                    expected = numpy_fn(high, low, close)
+                if not isinstance(expected, tuple):
+                    actual, expected = (actual,), (expected,)
+                for got, want in zip(actual, expected, strict=True):
+                    self.assertSame(got, want)
+
+    def test_ema(self):
+        for period in (1, 3, 12, 26):
+            self._check(
+                f'ema_{period}',
+                lambda _high, _low, close, period=period: jit.ema(close, period),
+                lambda _high, _low, close, period=period: FunctionRegistry._ema(close, period),
+            )
+
+    def test_rsi(self):
+        self._check(
+            'rsi',
+            lambda _high, _low, close: jit.rsi(close, 14),
+            lambda _high, _low, close: FunctionRegistry._rsi(close, 14),
+        )
+
+    def test_macd(self):
+        self._check(
+            'macd',
+            lambda _high, _low, close: jit.macd(close),
+            lambda _high, _low, close: FunctionRegistry._macd(close),
+        )
+
+    def test_kdj(self):
+        self._check('kdj', jit.kdj, FunctionRegistry._kdj)
+
+    def test_atr(self):
+        self._check('atr', jit.atr, FunctionRegistry._atr)
+
+    @unittest.skipUnless(jit.NUMBA_AVAILABLE, "numba not installed")
+    def test_registry_uses_jit_kernels(self):
+        registry = FunctionRegistry()
+        for name, func in jit.JIT_FUNCTIONS.items():
+            self.assertIs(registry.get(name), func)
+
+
+if __name__ == '__main__':
+    unittest.main()
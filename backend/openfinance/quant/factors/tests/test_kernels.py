@@ -0,0 +1,224 @@
+"""
+Rolling Kernel Parity Tests.
+
+Checks the vectorized kernels behind FunctionRegistry against the
+straightforward per-window loops they replaced: same values (to floating
+point tolerance) and the same NaN layout.
+"""
+
+import unittest
+
+import numpy as np
+
+from openfinance.quant.factors import kernels
+from openfinance.quant.factors.expression_engine import FunctionRegistry
+
+
+def _loop(data, period, reducer):
+    result = np.full_like(data, np.nan, dtype=float)
+    if len(data) < period:
+        return result
+    for i in range(period - 1, len(data)):
+        result[i] = reducer(data[i-period+1:i+1])
+    return result
+
+
+def _ref_wma(data, period):
+    weights = np.arange(1, period + 1)
+    return _loop(data, period, lambda w: np.sum(w * weights) / weights.sum())
+
+
+def _ref_skew_kurt(data, period, power, min_count, offset):
+    def reducer(window):
+        window = window[~np.isnan(window)]
+        if len(window) >= min_count:
+            mean = np.mean(window)
+            std = np.std(window)
+            if std > 0:
+                return np.mean(((window - mean) / std) ** power) - offset
+        return np.nan
+    return _loop(data, period, reducer)
+
+
+def _ref_zscore(data, period):
+    result = np.full_like(data, np.nan, dtype=float)
+    if len(data) < period:
+        return result
+    for i in range(period - 1, len(data)):
+        window = data[i-period+1:i+1]
+        mean = np.mean(window)
+        std = np.std(window)
+        if std > 0:
+            result[i] = (data[i] - mean) / std
+    return result
+
+
+def _ref_quantile(data, q, period):
+    def reducer(window):
+        window = window[~np.isnan(window)]
+        return np.quantile(window, q) if len(window) > 0 else np.nan
+    return _loop(data, period, reducer)
+
+
+def _ref_pair(x, y, period, func):
+    result = np.full_like(x, np.nan, dtype=float)
+    if len(x) < period:
+        return result
+    for i in range(period - 1, len(x)):
+        xw = x[i-period+1:i+1]
+        yw = y[i-period+1:i+1]
+        mask = ~np.isnan(xw) & ~np.isnan(yw)
+        if np.sum(mask) >= 2:
+            result[i] = func(xw[mask], yw[mask])[0, 1]
+    return result
+
+
+def _ref_normalize(data, period):
+    def reducer(window):
+        lo, hi = np.min(window), np.max(window)
+        return (window[-1] - lo) / (hi - lo) if hi != lo else np.nan
+    return _loop(data, period, reducer)
+
+
+def _price_series(n, seed, start=50.0):
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+
+
+class TestRollingKernelParity(unittest.TestCase):
+    """Vectorized kernels must match the per-window reference loops."""
+
+    PERIODS = (1, 2, 5, 20, 60)
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.close = _price_series(500, 1)
+        self.volume = rng.uniform(1e6, 5e8, 500)
+        self.returns = np.concatenate([[np.nan], np.diff(self.close) / self.close[:-1]])
+
+        gappy = self.close.copy()
+        gappy[[3, 40, 41, 42, 200, 201, 350]] = np.nan
+        gappy[420:470] = np.nan
+        self.gappy = gappy
+
+        flat = self.close.copy()
+        flat[100:140] = 5.0
+        self.flat = flat
+
+        self.series = {
+            'close': self.close,
+            'volume': self.volume,
+            'returns': self.returns,
+            'gappy': self.gappy,
+            'flat': self.flat,
+            'short': self.close[:7],
+        }
+
+    def assertParity(self, actual, expected, rtol=1e-7, atol=1e-10):
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+
+    def _check(self, name, actual_fn, expected_fn, periods=PERIODS, **tol):
+        for label, data in self.series.items():
+            for period in periods:
+                with self.subTest(kernel=name, series=label, period=period):
+                    with np.errstate(all='ignore'):
+                        expected = expected_fn(data, period)
+                    self.assertParity(actual_fn(data, period), expected, **tol)
+
+    def test_rolling_max_min(self):
+        self._check('max', FunctionRegistry._rolling_max, lambda d, p: _loop(d, p, np.max))
+        self._check('min', FunctionRegistry._rolling_min, lambda d, p: _loop(d, p, np.min))
+
+    def test_rolling_prod(self):
+        self._check('prod', FunctionRegistry._rolling_prod, lambda d, p: _loop(d, p, np.prod))
+
+    def test_rolling_count(self):
+        self._check(
+            'count', FunctionRegistry._rolling_count,
+            lambda d, p: _loop(d, p, lambda w: np.sum(~np.isnan(w))),
+        )
+
+    def test_wma(self):
+        self._check('wma', FunctionRegistry._wma, _ref_wma)
+
+    def test_std_var(self):
+        periods = (2, 5, 20, 60)
+        self._check('std', FunctionRegistry._std, lambda d, p: _loop(d, p, lambda w: np.std(w, ddof=1)), periods)
+        self._check('var', FunctionRegistry._var, lambda d, p: _loop(d, p, lambda w: np.var(w, ddof=1)), periods)
+        self._check(
+            'std_ddof0', lambda d, p: FunctionRegistry._std(d, p, ddof=0),
+            lambda d, p: _loop(d, p, np.std),
+        )
+
+    def test_zscore(self):
+        self._check('zscore', FunctionRegistry._zscore, _ref_zscore, (2, 5, 20, 60), rtol=1e-6)
+
+    def test_skewness_kurtosis(self):
+        self._check(
+            'skewness', FunctionRegistry._skewness,
+            lambda d, p: _ref_skew_kurt(d, p, 3, 3, 0), (3, 5, 20, 60), rtol=1e-6, atol=1e-8,
+        )
+        self._check(
+            'kurtosis', FunctionRegistry._kurtosis,
+            lambda d, p: _ref_skew_kurt(d, p, 4, 4, 3), (4, 5, 20, 60), rtol=1e-6, atol=1e-8,
+        )
+
+    def test_quantile(self):
+        for q in (0.0, 0.25, 0.5, 0.9):
+            self._check(
+                f'quantile_{q}', lambda d, p, q=q: FunctionRegistry._quantile(d, q, p),
+                lambda d, p, q=q: _ref_quantile(d, q, p),
+            )
+
+    def test_normalize(self):
+        self._check('normalize', FunctionRegistry._normalize, _ref_normalize)
+
+    def test_corr_cov(self):
+        pairs = {
+            'close_volume': (self.close, self.volume),
+            'gappy_returns': (self.gappy, self.returns),
+            'flat_close': (self.flat, self.close),
+        }
+        for label, (x, y) in pairs.items():
+            for period in (2, 5, 20, 60):
+                with self.subTest(pair=label, period=period):
+                    with np.errstate(all='ignore'):
+                        expected_cov = _ref_pair(x, y, period, np.cov)
+                        expected_corr = _ref_pair(x, y, period, np.corrcoef)
+                    self.assertParity(FunctionRegistry._cov(x, y, period), expected_cov, rtol=1e-6)
+                    self.assertParity(FunctionRegistry._corr(x, y, period), expected_corr, rtol=1e-6, atol=1e-8)
+
+    def test_long_series_does_not_drift(self):
+        data = _price_series(20000, 3, start=3000.0)
+        expected = _loop(data, 20, lambda w: np.std(w, ddof=1))
+        self.assertParity(kernels.rolling_std(data, 20), expected, rtol=1e-8)
+
+
+class TestRollingKernelPanels(unittest.TestCase):
+    """Kernels run along axis 0 so a (dates x stocks) panel matches per-column calls."""
+
+    def test_panel_matches_columns(self):
+        rng = np.random.default_rng(11)
+        panel = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (300, 6)), axis=0))
+        panel[10:15, 2] = np.nan
+        other = rng.normal(size=panel.shape)
+
+        single = [
+            kernels.rolling_max, kernels.rolling_min, kernels.rolling_std,
+            kernels.rolling_zscore, kernels.rolling_skew, kernels.rolling_kurt,
+            kernels.rolling_wma, kernels.rolling_count,
+        ]
+        for kernel in single:
+            with self.subTest(kernel=kernel.__name__):
+                expected = np.column_stack([kernel(panel[:, j], 20) for j in range(panel.shape[1])])
+                np.testing.assert_allclose(kernel(panel, 20), expected, equal_nan=True)
+
+        expected = np.column_stack([
+            kernels.rolling_corr(panel[:, j], other[:, j], 20) for j in range(panel.shape[1])
+        ])
+        np.testing.assert_allclose(kernels.rolling_corr(panel, other, 20), expected, equal_nan=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+Lookback Inference Tests.
+
+The inferred warm-up must match where the evaluated expression actually
+turns valid, and fetching exactly the inferred number of bars must give
+the same latest value as fetching the full history.
+"""
+
+import unittest
+import uuid
+
+import numpy as np
+
+from openfinance.quant.factors.expression_engine import ExpressionContext, ExpressionEvaluator
+from openfinance.quant.factors.frame import KLineFrame
+from openfinance.quant.factors.lookback import infer_lookback, infer_warmup
+from openfinance.quant.factors.registry import FactorDefinition, UnifiedFactorRegistry
+
+
+def _context(n: int = 300, seed: int = 1, tail: int | None = None) -> ExpressionContext:
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    volume = rng.uniform(1e6, 5e6, n)
+    arrays = [close * (1 + rng.normal(0, 0.005, n)), high, low, close, volume, close * volume]
+    if tail is not None:
+        arrays = [a[-tail:] for a in arrays]
+    return ExpressionContext.from_arrays(*arrays[:5], amount=arrays[5])
+
+
+def _first_valid(values: np.ndarray) -> int:
+    return int(np.argmax(~np.isnan(values)))
+
+
+def _bars(warmup) -> int:
+    return (max(warmup) if isinstance(warmup, tuple) else warmup) + 1
+
+
+class TestInferWarmup(unittest.TestCase):
+    """Static warm-up agrees with evaluation."""
+
+    EXACT = [
+        "sma(ema(close, 12), 20)",
+        "shift(shift(close, 3), 4)",
+        "delta(returns, 5)",
+        "rsi(close, 14)",
+        "atr(high, low, close, 14)",
+        "macd(close)[0]",
+        "macd(close)[1]",
+        "macd(close, 5, 10, 4)[2]",
+        "kdj(high, low, close)[0]",
+        "boll(close, 20)[0]",
+        "std(returns, 20)",
+        "volatility(close, 20)",
+        "mfi(high, low, close, volume, 14)",
+        "cci(high, low, close, 20)",
+        "wr(high, low, close)",
+        "quantile(close, 0.5, 10)",
+        "zscore(sma(close, 5), 10)",
+        "normalize(close, 15)",
+        "max(close, 10) / min(close, 10) - 1",
+        "sharpe(returns, 0.0, 20)",
+        "max_drawdown(close, 20)",
+        "alpha(returns, log_returns, 0.0, 30)",
+        "pct_change(sma(close, 5), 3)",
+        "diff(close)",
+        "wma(close, period=10)",
+        "ema(close, window)",
+        "ema(close, window * 2 + 1)",
+        "cumsum(returns)",
+        "obv(close, volume)",
+        "cs_rank(sma(close, 5))",
+        "abs(log(close / sma(close, 5)))",
+    ]
+
+    # These kernels emit partial-window values before a full window of
+    # valid inputs exists; the inferred warm-up is the full-window bound.
+    BOUNDED = [
+        "corr(returns, log_returns, 10)",
+        "skewness(returns, 20)",
+        "sortino(returns, 0.0, 20)",
+        "count(returns, 5)",
+        "where(returns > 0, returns, sma(returns, 3))",
+    ]
+
+    def setUp(self):
+        self.context = _context()
+        self.evaluator = ExpressionEvaluator()
+        self.parameters = {'window': 7}
+
+    def _empirical(self, expression):
+        with np.errstate(all='ignore'):
+            values = self.evaluator.evaluate(expression, self.context, self.parameters)
+        return _first_valid(values)
+
+    def test_exact_warmup(self):
+        for expression in self.EXACT:
+            with self.subTest(expression=expression):
+                inferred = infer_warmup(expression, self.parameters)
+                self.assertEqual(_bars(inferred) - 1, self._empirical(expression))
+
+    def test_bounded_warmup(self):
+        for expression in self.BOUNDED:
+            with self.subTest(expression=expression):
+                inferred = infer_warmup(expression, self.parameters)
+                self.assertGreaterEqual(_bars(inferred) - 1, self._empirical(expression))
+
+    def test_composition(self):
+        self.assertEqual(infer_lookback("sma(ema(close, 12), 20)"), 31)
+        self.assertEqual(infer_lookback("shift(close, 3) + shift(shift(close, 2), 5)"), 8)
+        self.assertEqual(infer_lookback("close"), 1)
+        self.assertEqual(infer_lookback("returns"), 2)
+        self.assertEqual(infer_warmup("macd(close)"), (25, 33, 33))
+        self.assertEqual(infer_lookback("my_func(close, 30)"), 31)
+
+    def test_unresolvable_window(self):
+        with self.assertRaises(ValueError):
+            infer_lookback("sma(close, window)")
+        with self.assertRaises(ValueError):
+            infer_lookback("sma(close,")
+
+    def test_exact_fetch_matches_full_history(self):
+        for expression in ("sma(std(returns, 10), 20)", "delta(close, 5) / max(close, 30)", "wr(high, low, close, 14)"):
+            with self.subTest(expression=expression):
+                bars = infer_lookback(expression)
+                full = self.evaluator.evaluate(expression, self.context)
+                fetched = self.evaluator.evaluate(expression, _context(tail=bars))
+                short = self.evaluator.evaluate(expression, _context(tail=bars - 1))
+                self.assertAlmostEqual(fetched[-1], full[-1], places=10)
+                self.assertTrue(np.isnan(short[-1]))
+
+
+class TestFactorDefinitionLookback(unittest.TestCase):
+    """The registry stores and uses the inferred lookback."""
+
+    def test_definition_infers_from_expression(self):
+        factor_def = FactorDefinition(
+            factor_id="factor_lb", name="LB", code="lb",
+            expression="sma(ema(close, fast), 20)", default_params={'fast': 12},
+            lookback_period=120,
+        )
+        self.assertEqual(factor_def.inferred_lookback, 31)
+        self.assertEqual(factor_def.required_bars, 31)
+        restored = FactorDefinition.from_dict(factor_def.to_dict())
+        self.assertEqual(restored.required_bars, 31)
+
+    def test_class_factor_keeps_padded_lookback(self):
+        factor_def = FactorDefinition(factor_id="factor_x", name="X", code="x", lookback_period=14)
+        self.assertIsNone(factor_def.inferred_lookback)
+        self.assertEqual(factor_def.required_bars, 28)
+
+    def test_register_update_and_calculate(self):
+        registry = UnifiedFactorRegistry()
+        code = f"lb_{uuid.uuid4().hex[:8]}"
+        factor_def = registry.register(name="LB", code=code, expression="sma(close, 10)")
+        try:
+            self.assertEqual(factor_def.required_bars, 10)
+            registry.update(factor_def.factor_id, expression="sma(close, 10) - shift(close, 15)")
+            self.assertEqual(factor_def.required_bars, 16)
+
+            context = _context(n=40)
+            frame = KLineFrame(
+                "000001",
+                np.datetime64('2024-01-01') + np.arange(40),
+                {'open': context.open, 'high': context.high, 'low': context.low,
+                 'close': context.close, 'volume': context.volume},
+            )
+            factor = registry.get_factor_instance(factor_def.factor_id)
+            result = factor.calculate(frame[-factor_def.required_bars:])
+            expected = np.mean(context.close[-10:]) - context.close[-16]
+            self.assertAlmostEqual(result.value, expected)
+        finally:
+            registry.unregister(factor_def.factor_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+"""
+Price Panel and Bulk Calculation Tests.
+
+A panel built from unordered rows must align every stock on one date
+index, and ``FactorEngine.calculate_bulk`` must give the same values as
+calculating each stock on its own.
+"""
+
+import asyncio
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from openfinance.quant.factors.data_source import KLineDataSource
+from openfinance.quant.factors.engine import EngineConfig, FactorEngine
+from openfinance.quant.factors.frame import KLineFrame
+from openfinance.quant.factors.panel import PricePanel
+from openfinance.quant.factors.registry import get_factor_registry
+
+START = date(2024, 1, 1)
+
+
+def _make_rows(codes, n=80, seed=9, skip=None):
+    """Rows for each code; ``skip`` maps code -> day offsets with no bar."""
+    rng = np.random.default_rng(seed)
+    skip = skip or {}
+    rows = []
+    for code in codes:
+        close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        for i in range(n):
+            if i in skip.get(code, ()):
+                continue
+            rows.append({
+                'code': code, 'trade_date': START + timedelta(days=i),
+                'open': Decimal(f"{close[i] * 0.995:.4f}"), 'high': close[i] * 1.01,
+                'low': close[i] * 0.99, 'close': close[i],
+                'volume': int(rng.integers(100_000, 900_000)), 'amount': close[i] * 500_000,
+                'pre_close': close[i - 1] if i else None,
+            })
+    return rows
+
+
+class InMemoryDataSource(KLineDataSource):
+    """Serves K-Lines from a list of rows, one stock at a time."""
+
+    def __init__(self, rows):
+        self._frames = {}
+        for code in {r['code'] for r in rows}:
+            self._frames[code] = KLineFrame.from_rows([r for r in rows if r['code'] == code], code=code)
+
+    async def get_klines(self, code, start_date, end_date, **_kwargs):
+        return [k for k in self._frames[code].to_klines() if start_date <= k.trade_date <= end_date]
+
+    async def get_latest_klines(self, code, count):
+        return self._frames[code][-count:].to_klines()
+
+    async def get_latest_frame(self, code, count):
+        return self._frames[code][-count:]
+
+    async def get_klines_batch(self, codes, start_date, end_date):
+        return {code: await self.get_klines(code, start_date, end_date) for code in codes}
+
+
+class TestPricePanel(unittest.TestCase):
+    """Alignment and per-stock views."""
+
+    def setUp(self):
+        self.codes = ['000001', '000002', '600000']
+        self.rows = _make_rows(self.codes, n=30, skip={'000002': {5, 6}, '600000': {29}})
+
+    def test_from_rows_aligns_dates(self):
+        shuffled = list(reversed(self.rows))
+        panel = PricePanel.from_rows(shuffled, codes=self.codes + ['999999'])
+        self.assertEqual(panel.shape, (30, 4))
+        self.assertEqual(panel.last_date, START + timedelta(days=29))
+        close = panel.column('close')
+        self.assertTrue(np.all(np.isnan(close[:, 3])))
+        self.assertTrue(np.isnan(close[5, 1]) and np.isnan(close[6, 1]))
+        self.assertEqual(panel.traded().tolist(), [True, True, False, False])
+        self.assertAlmostEqual(panel.column('open')[0, 0], float(self.rows[0]['open']))
+        self.assertTrue(np.isnan(panel.column('pre_close')[0, 0]))
+
+    def test_frame_skips_missing_bars(self):
+        panel = PricePanel.from_rows(self.rows)
+        frame = panel.frame('000002')
+        expected = KLineFrame.from_rows([r for r in self.rows if r['code'] == '000002'])
+        self.assertEqual(frame.trade_dates, expected.trade_dates)
+        np.testing.assert_allclose(frame.close, expected.close)
+
+    def test_from_frames_and_tail(self):
+        frames = [KLineFrame.from_rows([r for r in self.rows if r['code'] == c], code=c) for c in self.codes]
+        panel = PricePanel.from_frames(frames)
+        expected = PricePanel.from_rows(self.rows, codes=self.codes)
+        np.testing.assert_array_equal(panel.dates, expected.dates)
+        for name in ('close', 'volume', 'amount'):
+            np.testing.assert_allclose(panel.column(name), expected.column(name), equal_nan=True)
+        tail = panel.tail(10)
+        self.assertEqual(tail.shape, (10, 3))
+        self.assertTrue(np.shares_memory(tail.column('close'), panel.column('close')))
+
+    def test_latest_squeezes_out_gaps(self):
+        panel = PricePanel.from_rows(self.rows, codes=self.codes)
+        latest = panel.latest(10)
+        self.assertEqual(latest.shape, (10, 3))
+        close = latest.column('close')
+        np.testing.assert_array_equal(close[:, 0], panel.column('close')[-10:, 0])
+        np.testing.assert_array_equal(close[:, 1], panel.frame('000002').column('close')[-10:])
+        self.assertTrue(np.isnan(close[:, 2]).all())
+        self.assertEqual(latest.last_date, panel.last_date)
+
+
+class TestBulkCalculation(unittest.TestCase):
+    """Bulk results match per-stock results."""
+
+    def setUp(self):
+        self.codes = [f"{600000 + i}" for i in range(12)]
+        self.rows = _make_rows(self.codes, skip={self.codes[-1]: {79}})
+        self.engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False))
+        self.engine._data_source = InMemoryDataSource(self.rows)
+        self.trade_date = START + timedelta(days=79)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def _compare(self, factor_id):
+        async def run():
+            bulk = await self.engine.calculate_bulk(factor_id, self.codes, self.trade_date)
+            single = [await self.engine.calculate(factor_id, code, self.trade_date) for code in self.codes[:-1]]
+            return bulk, single
+
+        bulk, single = asyncio.run(run())
+        self.assertEqual([r.code for r in bulk], self.codes[:-1])
+        for got, want in zip(bulk, single, strict=True):
+            self.assertEqual(got.trade_date, self.trade_date)
+            self.assertAlmostEqual(got.value, want.value, places=10)
+
+    def test_expression_factor(self):
+        registry = get_factor_registry()
+        factor_def = registry.register(
+            name="Bulk", code=f"bulk_{uuid.uuid4().hex[:8]}",
+            expression="sma(close, 10) / ema(close, n) - 1", default_params={'n': 20},
+        )
+        try:
+            self._compare(factor_def.factor_id)
+        finally:
+            registry.unregister(factor_def.factor_id)
+
+    def test_class_factor(self):
+        self._compare("factor_rsi")
+
+    def test_suspension_inside_window(self):
+        self.rows = _make_rows(self.codes, skip={self.codes[1]: {70}, self.codes[-1]: {79}})
+        self.engine._data_source = InMemoryDataSource(self.rows)
+        registry = get_factor_registry()
+        factor_def = registry.register(
+            name="Gap", code=f"gap_{uuid.uuid4().hex[:8]}",
+            expression="sma(close, 10) / ema(close, 20) - 1",
+        )
+        try:
+            self._compare(factor_def.factor_id)
+            fused = asyncio.run(self.engine.calculate_fused(
+                [factor_def.factor_id, "factor_rsi"], self.codes, self.trade_date,
+            ))
+            self.assertIn((factor_def.factor_id, self.codes[1]), {(r.factor_id, r.code) for r in fused})
+        finally:
+            registry.unregister(factor_def.factor_id)
+
+    def test_fused_matches_bulk(self):
+        factor_ids = ["factor_rsi", "factor_macd", "factor_volatility", "factor_missing"]
+        panels = []
+        get_latest_panel = self.engine._data_source.get_latest_panel
+
+        async def counting_panel(codes, count, end_date=None):
+            panels.append(count)
+            return await get_latest_panel(codes, count, end_date=end_date)
+
+        self.engine._data_source.get_latest_panel = counting_panel
+
+        async def run():
+            fused = await self.engine.calculate_fused(
+                factor_ids, self.codes, self.trade_date, params={"factor_rsi": {"period": 6}},
+            )
+            fetches = len(panels)
+            bulk = await self.engine.calculate_bulk("factor_rsi", self.codes, self.trade_date, {"period": 6})
+            for factor_id in factor_ids[1:3]:
+                bulk += await self.engine.calculate_bulk(factor_id, self.codes, self.trade_date)
+            return fused, fetches, bulk
+
+        fused, fetches, bulk = asyncio.run(run())
+        self.assertEqual(fetches, 1)
+        registry = get_factor_registry()
+        self.assertEqual(panels[0], max(registry.get(f).required_bars for f in factor_ids[:3]))
+        self.assertEqual(
+            [(r.factor_id, r.code) for r in fused], [(r.factor_id, r.code) for r in bulk],
+        )
+        for got, want in zip(fused, bulk, strict=True):
+            self.assertAlmostEqual(got.value, want.value, places=10)
+
+    def test_universe_uses_bulk_path(self):
+        values = asyncio.run(self.engine.calculate_universe("factor_rsi", self.trade_date, universe=self.codes))
+        self.assertEqual(sorted(values), self.codes[:-1])
+
+
+
+class TestExecutionBackends(unittest.TestCase):
+    """Every backend gives the same results."""
+
+    def setUp(self):
+        self.codes = [f"{600000 + i}" for i in range(10)]
+        self.rows = _make_rows(self.codes, seed=3, skip={self.codes[0]: {79}})
+        self.trade_date = START + timedelta(days=79)
+
+    def _engine(self, backend):
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend=backend, max_workers=2))
+        engine._data_source = InMemoryDataSource(self.rows)
+        self.addCleanup(engine.close)
+        return engine
+
+    def _run(self, backend):
+        engine = self._engine(backend)
+
+        async def run():
+            fused = await engine.calculate_fused(["factor_kdj", "factor_cci"], self.codes, self.trade_date)
+            single = await engine.calculate("factor_rsi", self.codes[1], self.trade_date)
+            return fused, single
+
+        return asyncio.run(run())
+
+    def test_backends_agree(self):
+        expected, expected_single = self._run("inline")
+        self.assertEqual(len(expected), 2 * (len(self.codes) - 1))
+        for backend in ("thread", "process"):
+            with self.subTest(backend=backend):
+                fused, single = self._run(backend)
+                self.assertEqual(
+                    [(r.factor_id, r.code) for r in fused], [(r.factor_id, r.code) for r in expected],
+                )
+                for got, want in zip(fused, expected, strict=True):
+                    self.assertAlmostEqual(got.value, want.value, places=10)
+                    self.assertEqual(got.signal, want.signal)
+                self.assertAlmostEqual(single.value, expected_single.value, places=10)
+
+    def test_shards_follow_shard_size(self):
+        engine = self._engine("process")
+        engine.config.shard_size = 4
+        submitted = []
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(args[1])
+                return super().submit(fn, *args, **kwargs)
+
+        engine._executor.shutdown()
+        engine._executor = RecordingExecutor(max_workers=2)
+        results = asyncio.run(engine.calculate_fused(["factor_cci"], self.codes, self.trade_date))
+        self.assertEqual([len(codes) for codes in submitted], [3, 3, 3])
+        self.assertEqual(len(results), len(self.codes) - 1)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            FactorEngine(EngineConfig(backend="gpu"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+Factor Planner Tests.
+
+Plans must list every dependency before its dependents, reject cycles,
+and evaluate each shared input once while matching direct calculation.
+"""
+
+import asyncio
+import unittest
+import uuid
+from datetime import timedelta
+
+import numpy as np
+
+from openfinance.quant.factors.engine import EngineConfig, FactorEngine
+from openfinance.quant.factors.panel import PricePanel
+from openfinance.quant.factors.planner import CyclicDependencyError, FactorPlanner
+from openfinance.quant.factors.registry import get_factor_registry
+from openfinance.quant.factors.tests.test_panel import START, InMemoryDataSource, _make_rows
+
+
+class PlannerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = get_factor_registry()
+        self.prefix = uuid.uuid4().hex[:6]
+
+    def register(self, code, expression, **kwargs):
+        factor_def = self.registry.register(
+            name=code, code=f"{code}_{self.prefix}", expression=expression, **kwargs,
+        )
+        self.addCleanup(self.registry.unregister, factor_def.factor_id)
+        return factor_def
+
+    def code(self, code):
+        return f"{code}_{self.prefix}"
+
+
+class TestPlan(PlannerTestCase):
+    """Closure, ordering and cycle detection."""
+
+    def test_topological_order_and_bars(self):
+        trend = self.register("trend", "sma(close, 10) / sma(close, 30) - 1")
+        score = self.register(
+            "score", f"cs_rank({self.code('trend')}) + cs_rank(factor_rsi) + ts_rank(factor_rsi, 5)",
+        )
+        planner = FactorPlanner(dependency_source=lambda _factor_def: [])
+        plan = planner.plan([score.factor_id])
+
+        order = plan.factor_ids
+        self.assertEqual(sorted(order), sorted([trend.factor_id, "factor_rsi", score.factor_id]))
+        self.assertEqual(order[-1], score.factor_id)
+        self.assertEqual([n.factor_id for n in plan.nodes if n.requested], [score.factor_id])
+        self.assertEqual(sorted(plan.nodes[-1].dependencies), sorted([trend.factor_id, "factor_rsi"]))
+
+        rsi_bars = self.registry.get("factor_rsi").required_bars
+        self.assertEqual(plan.required_bars, max(30, rsi_bars) + score.required_bars - 1)
+        self.assertIn("nodes", plan.to_dict())
+
+    def test_metadata_dependencies(self):
+        combo = self.register("combo", "close")
+        planner = FactorPlanner(
+            dependency_source=lambda d: ["close", "macd"] if d.factor_id == combo.factor_id else [],
+        )
+        node = planner.plan([combo.factor_id]).nodes[-1]
+        self.assertEqual(node.inputs, {"macd": "factor_macd"})
+        self.assertEqual(node.fields, ["close"])
+
+    def test_class_factor_inputs_are_not_planned(self):
+        planner = FactorPlanner(
+            dependency_source=lambda d: ["close", "macd"] if d.factor_id == "factor_rsi" else [],
+        )
+        plan = planner.plan(["factor_rsi"])
+        self.assertEqual(plan.factor_ids, ["factor_rsi"])
+        self.assertEqual(plan.nodes[0].inputs, {})
+        self.assertEqual(plan.nodes[0].fields, ["close"])
+
+    def test_cycle_fails_early(self):
+        a, b = self.code("cyc_a"), self.code("cyc_b")
+        self.register("cyc_a", f"{b} + 1")
+        self.register("cyc_b", f"sma({a}, 3)")
+        planner = FactorPlanner(dependency_source=lambda _factor_def: [])
+        with self.assertRaises(CyclicDependencyError) as ctx:
+            planner.plan([f"factor_{a}"])
+        self.assertEqual(ctx.exception.cycle, [f"factor_{a}", f"factor_{b}", f"factor_{a}"])
+
+    def test_unknown_factor(self):
+        with self.assertRaises(ValueError):
+            FactorPlanner().plan(["factor_does_not_exist"])
+
+
+class TestExecute(PlannerTestCase):
+    """Every node runs once and dependents see upstream values."""
+
+    def setUp(self):
+        super().setUp()
+        self.codes = [f"{600000 + i}" for i in range(8)]
+        self.rows = _make_rows(self.codes, n=90, seed=4, skip={self.codes[2]: {89}})
+        self.panel = PricePanel.from_rows(self.rows, codes=self.codes)
+
+    def test_composite_matches_direct(self):
+        trend = self.register("trend", "sma(close, 5) / sma(close, 20) - 1")
+        score = self.register("score", f"cs_rank({self.code('trend')}) - cs_rank(factor_rsi)")
+        other = self.register("other", f"{self.code('trend')} * 2")
+        planner = FactorPlanner(dependency_source=lambda _factor_def: [])
+        plan = planner.plan([score.factor_id, other.factor_id])
+        self.assertEqual(plan.factor_ids.count(trend.factor_id), 1)
+
+        result = planner.execute(plan, self.panel)
+        self.assertEqual(result.errors, {})
+        self.assertEqual(set(result.timings), set(plan.factor_ids))
+
+        close = self.panel.column('close')
+        with np.errstate(invalid='ignore'):
+            trend_values = (
+                np.mean(close[-5:], axis=0) / np.mean(close[-20:], axis=0) - 1
+            )
+        rsi = self.registry.get_factor_instance("factor_rsi")
+        rsi_bars = self.registry.get("factor_rsi").required_bars
+        rsi_values = np.array([
+            rsi.calculate(self.panel.frame(code)[-rsi_bars:]).value if self.panel.traded()[j] else np.nan
+            for j, code in enumerate(self.codes)
+        ])
+
+        def rank(values):
+            valid = ~np.isnan(values)
+            ranks = np.full(values.shape, np.nan)
+            ranks[valid] = values[valid].argsort().argsort() / (valid.sum() - 1)
+            return ranks
+
+        expected = rank(trend_values) - rank(rsi_values)
+        got = {r.code: r.value for r in result.results if r.factor_id == score.factor_id}
+        self.assertNotIn(self.codes[2], got)
+        for j, code in enumerate(self.codes):
+            if code in got:
+                self.assertAlmostEqual(got[code], expected[j], places=10)
+        doubled = {r.code: r.value for r in result.results if r.factor_id == other.factor_id}
+        self.assertAlmostEqual(doubled[self.codes[0]], 2 * trend_values[0], places=10)
+        self.assertFalse(any(r.factor_id == trend.factor_id for r in result.results))
+
+    def test_failed_input_skips_dependents(self):
+        broken = self.register("broken", "close + missing_name")
+        user = self.register("user", f"{self.code('broken')} * 2")
+        planner = FactorPlanner(dependency_source=lambda _factor_def: [])
+        result = planner.execute(planner.plan([user.factor_id]), self.panel)
+        self.assertIn(broken.factor_id, result.errors)
+        self.assertIn("Upstream", result.errors[user.factor_id])
+        self.assertEqual(result.results, [])
+
+    def test_engine_calculate_planned(self):
+        score = self.register("eng", "cs_rank(factor_cci) + factor_wr / 100")
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(self.rows)
+        self.addCleanup(engine.close)
+
+        result = asyncio.run(engine.calculate_planned(
+            [score.factor_id, "factor_wr"], self.codes, START + timedelta(days=89),
+        ))
+        self.assertEqual(result.plan.factor_ids[-1], score.factor_id)
+        self.assertEqual(len(result.plan.factor_ids), 3)
+        by_factor = {}
+        for r in result.results:
+            by_factor.setdefault(r.factor_id, {})[r.code] = r.value
+        self.assertEqual(len(by_factor[score.factor_id]), len(self.codes) - 1)
+        bulk = asyncio.run(engine.calculate_bulk("factor_wr", self.codes, START + timedelta(days=89)))
+        for r in bulk:
+            self.assertAlmostEqual(by_factor["factor_wr"][r.code], r.value, places=10)
+
+    def test_class_leaf_uses_its_own_window(self):
+        wide = self.register("wide", "sma(close, 80) / close")
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(self.rows)
+        self.addCleanup(engine.close)
+        trade_date = START + timedelta(days=89)
+
+        result = asyncio.run(engine.calculate_planned([wide.factor_id, "factor_macd"], self.codes, trade_date))
+        self.assertGreater(result.plan.required_bars, self.registry.get("factor_macd").required_bars)
+        planned = {r.code: r.value for r in result.results if r.factor_id == "factor_macd"}
+        bulk = asyncio.run(engine.calculate_bulk("factor_macd", self.codes, trade_date))
+        self.assertEqual(set(planned), {r.code for r in bulk})
+        for r in bulk:
+            self.assertAlmostEqual(planned[r.code], r.value, places=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
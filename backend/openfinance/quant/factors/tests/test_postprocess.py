@@ -0,0 +1,172 @@
+"""
+Cross-Sectional Post-Processing Tests.
+
+Ranks, percentiles, normalized and neutralized values must be computed per
+(factor, date) cross-section and match straightforward reference math.
+"""
+
+import asyncio
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from openfinance.quant.factors.base import FactorResult, NeutralizationType, NormalizeMethod
+from openfinance.quant.factors.engine import EngineConfig, FactorEngine
+from openfinance.quant.factors.postprocess import CrossSectionConfig, CrossSectionProcessor
+from openfinance.quant.factors.tests.test_panel import START, InMemoryDataSource, _make_rows
+
+
+def _results(values, factor_id="f", trade_date=date(2024, 3, 1)):
+    return [
+        FactorResult(factor_id=factor_id, code=f"{j:06d}", trade_date=trade_date, value=v)
+        for j, v in enumerate(values)
+    ]
+
+
+class TestCrossSection(unittest.TestCase):
+    """Array-level behaviour."""
+
+    def test_rank_and_percentile(self):
+        processor = CrossSectionProcessor(CrossSectionConfig(winsorize=False))
+        section = processor.process_cross_section(np.array([3.0, np.nan, 1.0, 2.0, 3.0]))
+        np.testing.assert_array_equal(section.rank, [1, np.nan, 4, 3, 1])
+        np.testing.assert_allclose(section.percentile, [0.875, np.nan, 0.25, 0.5, 0.875])
+
+    def test_zscore_of_winsorized_values(self):
+        rng = np.random.default_rng(1)
+        values = rng.normal(0, 1, 200)
+        values[0] = 100.0
+        section = CrossSectionProcessor().process_cross_section(values)
+
+        median = np.median(values)
+        mad = np.median(np.abs(values - median)) * 1.4826
+        clipped = np.clip(values, median - 5 * mad, median + 5 * mad)
+        expected = (clipped - clipped.mean()) / clipped.std()
+        np.testing.assert_allclose(section.normalized, expected)
+        self.assertLess(section.normalized[0], 6)
+
+    def test_neutralized_is_orthogonal_to_industry_and_size(self):
+        rng = np.random.default_rng(2)
+        n = 300
+        industries = rng.choice(["bank", "tech", "energy"], n)
+        log_caps = rng.normal(23, 1, n)
+        values = 0.5 * log_caps + (industries == "tech") * 2 + rng.normal(0, 1, n)
+        processor = CrossSectionProcessor(CrossSectionConfig(winsorize=False))
+        section = processor.process_cross_section(values, industries, log_caps)
+
+        residual = section.neutralized
+        for industry in ("bank", "tech", "energy"):
+            self.assertAlmostEqual(residual[industries == industry].mean(), 0.0, places=10)
+        self.assertAlmostEqual(float(np.dot(residual, log_caps - log_caps.mean())), 0.0, places=8)
+
+    def test_neutralization_modes(self):
+        values = np.arange(20, dtype=float)
+        industries = np.array(["a"] * 10 + ["b"] * 10)
+        config = CrossSectionConfig(
+            winsorize=False,
+            normalize_method=NormalizeMethod.NONE,
+            neutralization=NeutralizationType.MARKET_CAP,
+        )
+        section = CrossSectionProcessor(config).process_cross_section(values, industries)
+        self.assertTrue(np.all(np.isnan(section.neutralized)))
+
+        config.neutralization = NeutralizationType.INDUSTRY
+        section = CrossSectionProcessor(config).process_cross_section(values, industries)
+        np.testing.assert_allclose(section.neutralized, np.tile(np.arange(10) - 4.5, 2))
+
+
+class TestProcessResults(unittest.TestCase):
+    """FactorResult batches."""
+
+    def test_groups_by_factor_and_date(self):
+        d1, d2 = date(2024, 3, 1), date(2024, 3, 4)
+        results = _results([1.0, 2.0, 3.0], "a", d1) + _results([30.0, 10.0], "a", d2)
+        results += _results([5.0, 4.0], "b", d1)
+        CrossSectionProcessor().process(results)
+        self.assertEqual([r.value_rank for r in results], [3, 2, 1, 1, 2, 1, 2])
+        self.assertEqual([r.value_percentile for r in results[3:5]], [1.0, 0.5])
+
+    def test_dated_market_caps(self):
+        d1, d2 = date(2024, 3, 1), date(2024, 3, 4)
+        values = np.random.default_rng(3).normal(size=12)
+        results = _results(values, "a", d1) + _results(values, "a", d2)
+        caps = {d1: {r.code: 1e9 * (i + 1) for i, r in enumerate(results[:12])}}
+        CrossSectionProcessor().process(results, market_caps=caps)
+        self.assertTrue(all(r.value_neutralized is not None for r in results[:12]))
+        self.assertTrue(all(r.value_neutralized is None for r in results[12:]))
+        self.assertIsNotNone(results[12].value_normalized)
+
+
+class TestEngineCrossSection(unittest.TestCase):
+
+    def test_calculate_cross_section(self):
+        codes = [f"{600000 + j}" for j in range(12)]
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(_make_rows(codes))
+        trade_date = START + timedelta(days=79)
+
+        results = asyncio.run(engine.calculate_cross_section(
+            "factor_rsi", trade_date, universe=codes,
+            industry_map={code: "x" if j % 2 else "y" for j, code in enumerate(codes)},
+        ))
+        self.assertEqual(len(results), len(codes))
+        self.assertEqual(sorted(r.value_rank for r in results), list(range(1, len(codes) + 1)))
+        self.assertTrue(all(r.value_neutralized is not None for r in results))
+        top = max(results, key=lambda r: r.value)
+        self.assertEqual(top.value_rank, 1)
+        self.assertEqual(top.value_percentile, 1.0)
+
+    def test_batched_universe_is_ranked_as_a_whole(self):
+        codes = [f"{600000 + j}" for j in range(12)]
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(_make_rows(codes))
+        trade_date = START + timedelta(days=79)
+        factor_ids = ["factor_rsi", "factor_cci"]
+
+        async def run():
+            results = []
+            for i in range(0, len(codes), 5):
+                results += await engine.calculate_fused(factor_ids, codes[i:i + 5], trade_date, persist=False)
+            return await engine.process_cross_sections(
+                results, industry_map={code: "x" if j % 2 else "y" for j, code in enumerate(codes)},
+            )
+
+        results = asyncio.run(run())
+        for factor_id in factor_ids:
+            ranks = [r.value_rank for r in results if r.factor_id == factor_id]
+            self.assertEqual(sorted(ranks), list(range(1, len(codes) + 1)))
+        self.assertTrue(all(r.value_normalized is not None for r in results))
+        self.assertTrue(all(r.value_neutralized is not None for r in results))
+
+    def test_nightly_job_ranks_expressions_across_the_universe(self):
+        from openfinance.datacenter.task.additional_executors import FactorComputeExecutor
+        from openfinance.datacenter.task.registry import TaskProgress
+        from openfinance.quant.factors.registry import get_factor_registry
+
+        registry = get_factor_registry()
+        factor_def = registry.register(
+            name="cs_rank_close", code=f"cs_rank_close_{id(self)}", expression="cs_rank(close)",
+        )
+        self.addCleanup(registry.unregister, factor_def.factor_id)
+        codes = [f"{600000 + j}" for j in range(120)]
+        engine = FactorEngine(EngineConfig(use_cache=False, save_to_db=False, backend="inline"))
+        engine._data_source = InMemoryDataSource(_make_rows(codes))
+        trade_date = START + timedelta(days=79)
+        progress = TaskProgress(task_id="factor_compute")
+
+        async def run():
+            expected = await engine.calculate_bulk(factor_def.factor_id, codes, trade_date)
+            collected = await FactorComputeExecutor()._collect_fused(
+                engine, [factor_def.factor_id], codes, trade_date, progress,
+            )
+            return expected, collected
+
+        expected, collected = asyncio.run(run())
+        self.assertEqual(len(collected), len(codes))
+        self.assertEqual({r.code: r.value for r in collected}, {r.code: r.value for r in expected})
+        self.assertEqual(progress.processed_records, len(codes))
+
+
+if __name__ == "__main__":
+    unittest.main()
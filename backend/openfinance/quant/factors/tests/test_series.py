@@ -0,0 +1,117 @@
+"""
+Factor Series Tests.
+
+``calculate_series`` must reproduce ``calculate`` on every prefix of the
+history, for native implementations and for the generic fallback.
+"""
+
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from openfinance.datacenter.models.analytical import ADSKLineModel
+from openfinance.quant.factors.frame import KLineFrame
+from openfinance.quant.factors.indicators.atr import ATRFactor
+from openfinance.quant.factors.indicators.boll import BOLLFactor
+from openfinance.quant.factors.indicators.cci import CCIFactor
+from openfinance.quant.factors.indicators.kdj import KDJFactor
+from openfinance.quant.factors.indicators.macd import MACDFactor
+from openfinance.quant.factors.indicators.momentum import MomentumFactor
+from openfinance.quant.factors.indicators.obv import OBVFactor
+from openfinance.quant.factors.indicators.rsi import RSIFactor
+from openfinance.quant.factors.indicators.trend_strength import TrendStrengthFactor
+from openfinance.quant.factors.indicators.wr import WRFactor
+from openfinance.quant.factors.library import (
+    MomentumFactor as PriceMomentumFactor,
+)
+from openfinance.quant.factors.library import (
+    RiskAdjustedMomentumFactor,
+    VolatilityFactor,
+)
+
+
+def _make_klines(n: int = 160, seed: int = 5) -> list[ADSKLineModel]:
+    rng = np.random.default_rng(seed)
+    close = 12 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    close[40:44] = close[39]
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    start = date(2024, 1, 1)
+    return [
+        ADSKLineModel(
+            code="600000",
+            trade_date=start + timedelta(days=i),
+            open=float(open_[i]),
+            high=float(max(open_[i], close[i]) * 1.01),
+            low=float(min(open_[i], close[i]) * 0.99),
+            close=float(close[i]),
+            volume=int(rng.integers(1_000_000, 9_000_000)),
+            amount=float(close[i] * 5_000_000),
+        )
+        for i in range(n)
+    ]
+
+
+def _prefix_values(factor, klines, **params) -> np.ndarray:
+    values = np.full(len(klines), np.nan)
+    for i in range(len(klines)):
+        result = factor.calculate(klines[:i + 1], **params)
+        if result is not None and result.value is not None:
+            values[i] = result.value
+    return values
+
+
+class TestCalculateSeries(unittest.TestCase):
+    """Series output matches per-prefix calculation."""
+
+    NATIVE = [
+        RSIFactor, MACDFactor, KDJFactor, BOLLFactor, ATRFactor, CCIFactor,
+        WRFactor, OBVFactor, MomentumFactor, PriceMomentumFactor, VolatilityFactor,
+    ]
+
+    def setUp(self):
+        self.klines = _make_klines()
+
+    def assertSeriesEqual(self, actual, expected):
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_native_factors(self):
+        for factor_class in self.NATIVE:
+            with self.subTest(factor=factor_class.__name__):
+                factor = factor_class()
+                self.assertIn('_calculate_series', factor_class.__dict__)
+                series = factor.calculate_series(self.klines)
+                self.assertEqual(series.shape, (len(self.klines),))
+                self.assertSeriesEqual(series, _prefix_values(factor, self.klines))
+
+    def test_parameters_and_frame_input(self):
+        frame = KLineFrame.from_klines(self.klines)
+        cases = [
+            (RSIFactor(), {'period': 6}),
+            (MACDFactor(), {'fast': 5, 'slow': 13, 'signal': 4}),
+            (KDJFactor(), {'n': 9, 'm1': 5}),
+            (CCIFactor(), {'period': 30}),
+        ]
+        for factor, params in cases:
+            with self.subTest(factor=type(factor).__name__):
+                expected = _prefix_values(factor, self.klines, **params)
+                self.assertSeriesEqual(factor.calculate_series(self.klines, **params), expected)
+                self.assertSeriesEqual(factor.calculate_series(frame, **params), expected)
+
+    def test_generic_fallback(self):
+        for factor in (TrendStrengthFactor(), RiskAdjustedMomentumFactor()):
+            with self.subTest(factor=type(factor).__name__):
+                self.assertNotIn('_calculate_series', type(factor).__dict__)
+                self.assertSeriesEqual(
+                    factor.calculate_series(self.klines), _prefix_values(factor, self.klines),
+                )
+
+    def test_short_history(self):
+        series = RSIFactor().calculate_series(self.klines[:5])
+        self.assertTrue(np.all(np.isnan(series)))
+        self.assertEqual(OBVFactor().calculate_series([]).shape, (0,))
+
+
+if __name__ == '__main__':
+    unittest.main()
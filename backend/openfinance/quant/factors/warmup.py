@@ -0,0 +1,308 @@
+"""
+Post-Collection Cache Warm-Up.
+
+When new K-Line bars are committed, ``notify_bars_committed`` bumps the
+data version of the affected stocks in the factor cache (invalidating only
+their entries). Once commits stop arriving for a short window, a background
+task feeds the new bars to the streaming indicator states in
+``IndicatorStateStore`` and precomputes the most-requested factors for the
+new date over the whole universe, so the first request after market close
+is served from cache. Factors backed by a streaming indicator state
+are read from the state instead of being recomputed.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from datetime import date
+
+from .base import FactorResult
+from .storage.state_store import FACTOR_INDICATORS, IndicatorStateStore, get_indicator_state_store
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    'CacheWarmer',
+    'get_cache_warmer',
+    'notify_bars_committed',
+]
+
+
+class CacheWarmer:
+    """
+    Invalidates and re-fills the factor cache after new bars are committed.
+
+    Commits less than ``commit_window_seconds`` apart (e.g. the batches of
+    one collection run) are handled together by one background task on the
+    current event loop, which warms the whole universe once, so ``cs_*``
+    factors are never ranked over a single batch. The universe defaults to
+    every stock with a data version in the cache. Stocks without an
+    indicator state are warmed up from ``state_history_bars`` bars.
+    """
+
+    def __init__(
+        self,
+        top_factors: int = 10,
+        default_factors: list[str] | None = None,
+        engine=None,
+        state_store: IndicatorStateStore | None = None,
+        state_history_bars: int = 500,
+        commit_window_seconds: float = 60.0,
+        universe: list[str] | None = None,
+    ):
+        self.top_factors = top_factors
+        self.default_factors = default_factors or ["factor_rsi", "factor_macd", "factor_momentum"]
+        self.state_history_bars = state_history_bars
+        self.commit_window_seconds = commit_window_seconds
+        self.universe = universe
+        self._engine = engine
+        self._state_store = state_store
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self._pending: dict[str, date] = {}
+        self._pending_warm = False
+        self._last_commit = 0.0
+        self._flush_task: asyncio.Task | None = None
+        self.last_warmed: dict[str, int] = {}
+
+    async def _get_engine(self):
+        if self._engine is None:
+            from .engine import get_factor_engine
+            self._engine = await get_factor_engine()
+        return self._engine
+
+    async def _get_state_store(self) -> IndicatorStateStore:
+        if self._state_store is None:
+            engine = await self._get_engine()
+            store = get_indicator_state_store()
+            for factor_id in FACTOR_INDICATORS:
+                factor = engine._registry.get_factor_instance(factor_id)
+                if factor is not None:
+                    store.register_factor(factor_id, factor.config.lookback_period)
+            self._state_store = store
+        return self._state_store
+
+    async def factors_to_warm(self) -> list[str]:
+        """Most-requested factors, or the defaults before any requests."""
+        engine = await self._get_engine()
+        if engine._cache is None:
+            return []
+        return engine._cache.top_factors(self.top_factors) or list(self.default_factors)
+
+    async def on_bars_committed(
+        self,
+        watermarks: Mapping[str, date],
+        warm: bool = True,
+        commit: str | None = None,
+    ) -> asyncio.Task | None:
+        """
+        Invalidate cached factors of updated stocks and schedule the
+        indicator state update and warm-up for the current commit window.
+
+        Args:
+            watermarks: Code to latest committed trade date
+            warm: Whether to precompute factors once the window closes
+            commit: Token of the commit (e.g. a collection batch ID) that is
+                part of the data version; a timestamp when omitted
+
+        Returns:
+            The background task of the commit window, or None if nothing changed
+        """
+        engine = await self._get_engine()
+        if not watermarks:
+            return None
+
+        commit = commit or f"{time.time_ns():x}"
+        if engine._cache is not None:
+            changed = await engine._cache.update_data_versions(watermarks, commit=commit)
+            logger.info(f"New bars for {len(changed)} stocks, invalidated their cached factors")
+        else:
+            changed = list(watermarks)
+        if not changed:
+            return None
+
+        for code in changed:
+            self._pending[code] = max(watermarks[code], self._pending.get(code, watermarks[code]))
+        self._pending_warm = self._pending_warm or warm
+        self._last_commit = time.monotonic()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush())
+            self._tasks.add(self._flush_task)
+            self._flush_task.add_done_callback(self._tasks.discard)
+        return self._flush_task
+
+    async def _flush(self) -> None:
+        """Handle pending commits once no new commit arrived for a window."""
+        while self._pending:
+            delay = self._last_commit + self.commit_window_seconds - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            watermarks, warm = self._pending, self._pending_warm
+            self._pending, self._pending_warm = {}, False
+            await self._after_commit(watermarks, warm)
+
+    async def _after_commit(self, watermarks: Mapping[str, date], warm: bool) -> None:
+        async with self._lock:
+            try:
+                await self.update_indicator_states(watermarks)
+            except Exception as e:
+                logger.warning(f"Indicator state update failed: {e}")
+            if warm:
+                await self._warm(await self._universe(watermarks), max(watermarks.values()))
+
+    async def _universe(self, watermarks: Mapping[str, date]) -> list[str]:
+        """Codes to warm: the configured universe or every versioned stock."""
+        if self.universe is not None:
+            codes = set(self.universe)
+        else:
+            engine = await self._get_engine()
+            codes = set(engine._cache.versioned_codes()) if engine._cache is not None else set()
+        return sorted(codes | set(watermarks))
+
+    async def update_indicator_states(self, watermarks: Mapping[str, date]) -> int:
+        """
+        Feed newly committed bars to the streaming indicator states.
+
+        Bars are read as price panels in batched queries: stocks with a
+        state read the days since their oldest applied date, stocks without
+        one read ``state_history_bars`` bars. The store skips bars a state
+        has already seen, and is saved off the event loop.
+
+        Returns:
+            Number of stocks updated
+        """
+        store = await self._get_state_store()
+        factor_ids = store.factor_ids
+        if not factor_ids:
+            return 0
+
+        end_date = max(watermarks.values())
+        behind: dict[str, date] = {}
+        fresh = []
+        for code, trade_date in watermarks.items():
+            last_dates = [getattr(store.get(f, code), "last_date", None) for f in factor_ids]
+            if not all(last_dates):
+                fresh.append(code)
+            elif min(last_dates) < trade_date:
+                behind[code] = min(last_dates)
+
+        # Calendar days since the oldest applied date bound the trading days
+        # still to feed, so one panel covers every stock that has a state.
+        lag = (end_date - min(behind.values())).days if behind else 0
+        source = (await self._get_engine())._data_source
+        updated = 0
+        for codes, count in ((list(behind), min(lag, self.state_history_bars)), (fresh, self.state_history_bars)):
+            if not codes:
+                continue
+            panel = await source.get_latest_panel(codes, count, end_date=end_date)
+            for code in codes:
+                if code not in panel:
+                    continue
+                bars = list(panel.frame(code))
+                for factor_id in factor_ids:
+                    for bar in bars:
+                        store.update(factor_id, code, bar)
+                updated += bool(bars)
+
+        if updated and store.path is not None:
+            await asyncio.get_running_loop().run_in_executor(None, store.save)
+        logger.info(f"Updated indicator states of {updated} stocks for {len(factor_ids)} factors")
+        return updated
+
+    async def warm(self, codes: list[str], trade_date: date) -> int:
+        """Precompute the factors to warm for ``codes`` on ``trade_date`` into the cache only."""
+        async with self._lock:
+            return await self._warm(codes, trade_date)
+
+    async def _warm(self, codes: list[str], trade_date: date) -> int:
+        engine = await self._get_engine()
+        factor_ids = await self.factors_to_warm()
+        if not factor_ids:
+            return 0
+
+        results, stale = await self._results_from_states(factor_ids, codes, trade_date)
+        lagging = [factor_id for factor_id, stale_codes in stale.items() if stale_codes]
+        jobs = [
+            ([factor_id for factor_id in factor_ids if factor_id not in stale], codes),
+            (lagging, sorted({code for factor_id in lagging for code in stale[factor_id]})),
+        ]
+        for job_factors, job_codes in jobs:
+            if not job_factors:
+                continue
+            try:
+                results.extend(await engine.calculate_fused(job_factors, job_codes, trade_date, persist=False))
+            except Exception as e:
+                logger.warning(f"Factor cache warm-up failed: {e}")
+
+        by_factor: dict[str, list] = {}
+        for result in results:
+            by_factor.setdefault(result.factor_id, []).append(result)
+        for factor_results in by_factor.values():
+            await engine._cache.set_many(factor_results)
+        counts = {factor_id: len(factor_results) for factor_id, factor_results in by_factor.items()}
+        self.last_warmed = counts
+        logger.info(f"Warmed {len(results)} factor values for {trade_date}: {counts}")
+        return len(results)
+
+    async def _results_from_states(
+        self,
+        factor_ids: list[str],
+        codes: list[str],
+        trade_date: date,
+    ) -> tuple[list[FactorResult], dict[str, list[str]]]:
+        """
+        Read streamed factors for ``trade_date`` from the indicator states.
+
+        Returns:
+            Results served from states, and for each streamed factor the
+            codes whose state has not reached ``trade_date``
+        """
+        store = await self._get_state_store()
+        registry = (await self._get_engine())._registry
+        results: list[FactorResult] = []
+        stale: dict[str, list[str]] = {}
+        for factor_id in factor_ids:
+            factor = registry.get_factor_instance(factor_id)
+            if factor is None or factor_id not in store.factor_ids:
+                continue
+            stale[factor_id] = []
+            for code in codes:
+                state = store.get(factor_id, code)
+                if state is None or state.last_date != trade_date:
+                    stale[factor_id].append(code)
+                    continue
+                value = store.factor_value(factor_id, code)
+                if value is None:
+                    continue
+                result = FactorResult(factor_id=factor_id, code=code, trade_date=trade_date, value=value)
+                if factor.config.normalize:
+                    result.value_normalized = factor.normalize(value)
+                results.append(result)
+        return results, stale
+
+    async def wait(self) -> None:
+        """Wait for scheduled warm-ups to finish."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+_warmer: CacheWarmer | None = None
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get the global cache warmer instance."""
+    global _warmer
+    if _warmer is None:
+        _warmer = CacheWarmer()
+    return _warmer
+
+
+async def notify_bars_committed(
+    watermarks: Mapping[str, date],
+    warm: bool = True,
+    commit: str | None = None,
+) -> asyncio.Task | None:
+    """Report committed bars (code -> latest trade date) to the global cache warmer."""
+    return await get_cache_warmer().on_bars_committed(watermarks, warm=warm, commit=commit)
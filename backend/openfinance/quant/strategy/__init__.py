@@ -7,6 +7,7 @@ Provides strategy development and optimization capabilities.
 from openfinance.quant.strategy.engine import StrategyEngine
 from openfinance.quant.strategy.builder import StrategyBuilder
 from openfinance.quant.strategy.optimizer import StrategyOptimizer
+from openfinance.quant.strategy.parallel import ParallelEvaluator
 
 from .base import (
     BaseStrategy,
@@ -71,6 +72,7 @@ __all__ = [
     "StrategyEngine",
     "StrategyBuilder",
     "StrategyOptimizer",
+    "ParallelEvaluator",
     "StrategyBase",
     "StrategyMetadata",
     "StrategyConfig",
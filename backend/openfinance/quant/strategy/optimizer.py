@@ -8,6 +8,8 @@ import asyncio
 import itertools
 import logging
 import random
+from collections.abc import AsyncIterator
+from contextlib import aclosing
 from datetime import datetime
 from typing import Any, Callable
 
@@ -21,9 +23,13 @@ from openfinance.domain.models.quant import (
     BacktestConfig,
     BacktestResult,
 )
+from openfinance.quant.strategy.parallel import ParallelEvaluator
+from openfinance.quant.strategy.search import TPESampler, halving_budgets, hyperband_brackets
 
 logger = logging.getLogger(__name__)
 
+_FIXED_STRATEGY_FIELDS = {"strategy_id", "name", "code", "parameters"}
+
 
 class StrategyOptimizer:
     """Optimizer for strategy parameters.
@@ -32,16 +38,28 @@ class StrategyOptimizer:
     - Grid search optimization
     - Random search optimization
     - Genetic algorithm optimization
-    - Bayesian optimization (placeholder)
+    - Bayesian optimization (TPE surrogate)
+    - Successive halving and Hyperband over backtest window length
+    - Parallel evaluation on a shared market panel
+    - Early stopping on a target objective score
     """
 
-    def __init__(self, backtest_func: Callable | None = None) -> None:
+    def __init__(
+        self,
+        backtest_func: Callable | None = None,
+        evaluator: ParallelEvaluator | None = None,
+    ) -> None:
         self._backtest_func = backtest_func
+        self._evaluator = evaluator
 
     def set_backtest_function(self, func: Callable) -> None:
         """Set the backtest function for optimization."""
         self._backtest_func = func
 
+    def set_parallel_evaluator(self, evaluator: ParallelEvaluator | None) -> None:
+        """Evaluate candidates on a process pool instead of the backtest function."""
+        self._evaluator = evaluator
+
     async def optimize(
         self,
         strategy: Strategy,
@@ -58,7 +76,7 @@ class StrategyOptimizer:
         Returns:
             OptimizationResult with best parameters.
         """
-        if not self._backtest_func:
+        if not self._backtest_func and self._evaluator is None:
             raise ValueError("Backtest function not set")
 
         if config.method == OptimizeMethod.GRID_SEARCH:
@@ -67,6 +85,12 @@ class StrategyOptimizer:
             return await self._random_search(strategy, config, backtest_config)
         elif config.method == OptimizeMethod.GENETIC:
             return await self._genetic_optimization(strategy, config, backtest_config)
+        elif config.method == OptimizeMethod.BAYESIAN:
+            return await self._bayesian_optimization(strategy, config, backtest_config)
+        elif config.method == OptimizeMethod.SUCCESSIVE_HALVING:
+            return await self._successive_halving(strategy, config, backtest_config)
+        elif config.method == OptimizeMethod.HYPERBAND:
+            return await self._hyperband(strategy, config, backtest_config)
         else:
             return await self._random_search(strategy, config, backtest_config)
 
@@ -84,38 +108,9 @@ class StrategyOptimizer:
         if len(all_combinations) > config.max_iterations:
             all_combinations = all_combinations[:config.max_iterations]
 
-        results = []
-        best_score = float("-inf")
-        best_params = {}
-
-        for i, combo in enumerate(all_combinations):
-            params = dict(zip(param_names, combo))
-
-            test_strategy = strategy.model_copy()
-            test_strategy.parameters.update(params)
-
-            try:
-                backtest_result = await self._run_backtest(
-                    test_strategy,
-                    backtest_config,
-                )
-                score = self._get_objective_score(backtest_result, config.objective)
-
-                results.append({
-                    "params": params,
-                    "score": score,
-                    "metrics": backtest_result.metrics.model_dump() if backtest_result.metrics else {},
-                })
-
-                if score > best_score:
-                    best_score = score
-                    best_params = params
-
-            except Exception as e:
-                logger.warning(f"Backtest failed for params {params}: {e}")
-
-            if i % 10 == 0:
-                logger.info(f"Grid search progress: {i}/{len(all_combinations)}")
+        candidates = [dict(zip(param_names, combo)) for combo in all_combinations]
+        evaluated, _ = await self._search(strategy, candidates, config, backtest_config)
+        results, best_params, best_score = self._collect(candidates, evaluated)
 
         return OptimizationResult(
             strategy_id=strategy.strategy_id,
@@ -137,35 +132,12 @@ class StrategyOptimizer:
             random.seed(config.seed)
             np.random.seed(config.seed)
 
-        results = []
-        best_score = float("-inf")
-        best_params = {}
-
-        for i in range(config.max_iterations):
-            params = self._sample_params(config.parameters)
-
-            test_strategy = strategy.model_copy()
-            test_strategy.parameters.update(params)
-
-            try:
-                backtest_result = await self._run_backtest(
-                    test_strategy,
-                    backtest_config,
-                )
-                score = self._get_objective_score(backtest_result, config.objective)
-
-                results.append({
-                    "params": params,
-                    "score": score,
-                    "metrics": backtest_result.metrics.model_dump() if backtest_result.metrics else {},
-                })
-
-                if score > best_score:
-                    best_score = score
-                    best_params = params
-
-            except Exception as e:
-                logger.warning(f"Backtest failed for params {params}: {e}")
+        candidates = [
+            self._sample_params(config.parameters)
+            for _ in range(config.max_iterations)
+        ]
+        evaluated, _ = await self._search(strategy, candidates, config, backtest_config)
+        results, best_params, best_score = self._collect(candidates, evaluated)
 
         return OptimizationResult(
             strategy_id=strategy.strategy_id,
@@ -202,32 +174,25 @@ class StrategyOptimizer:
         best_params = {}
 
         for gen in range(generations):
-            fitness_scores = []
-
-            for individual in population:
-                test_strategy = strategy.model_copy()
-                test_strategy.parameters.update(individual)
+            evaluated, stopped = await self._search(strategy, population, config, backtest_config)
+            evaluated.sort(key=lambda x: x[0])
+            fitness_scores = [(population[k], score) for k, score, _ in evaluated]
 
-                try:
-                    backtest_result = await self._run_backtest(
-                        test_strategy,
-                        backtest_config,
-                    )
-                    score = self._get_objective_score(backtest_result, config.objective)
-                    fitness_scores.append((individual, score))
-
-                    results.append({
-                        "params": individual,
-                        "score": score,
-                        "generation": gen,
-                    })
+            for k, score, backtest_result in evaluated:
+                if backtest_result is None:
+                    continue
+                results.append({
+                    "params": population[k],
+                    "score": score,
+                    "generation": gen,
+                })
 
-                    if score > best_score:
-                        best_score = score
-                        best_params = individual
+                if score > best_score:
+                    best_score = score
+                    best_params = population[k]
 
-                except Exception as e:
-                    fitness_scores.append((individual, float("-inf")))
+            if stopped:
+                break
 
             fitness_scores.sort(key=lambda x: x[1], reverse=True)
 
@@ -254,6 +219,341 @@ class StrategyOptimizer:
             duration_ms=0,
         )
 
+    async def _bayesian_optimization(
+        self,
+        strategy: Strategy,
+        config: OptimizationConfig,
+        backtest_config: BacktestConfig,
+    ) -> OptimizationResult:
+        """Bayesian optimization with a TPE surrogate.
+
+        Starts from random candidates, then proposes candidates where the
+        surrogate expects the best scores. With a parallel evaluator each
+        round proposes one candidate per worker.
+        """
+        sampler = TPESampler(config.parameters, rng=np.random.default_rng(config.seed))
+        n_startup = min(config.max_iterations, max(5, config.max_iterations // 10))
+        batch_size = self._evaluator.n_jobs if self._evaluator is not None else 1
+
+        history: list[tuple[dict[str, Any], float]] = []
+        results = []
+        best_score = float("-inf")
+        best_params = {}
+        round_index = 0
+
+        while len(history) < config.max_iterations:
+            n = min(batch_size, config.max_iterations - len(history))
+            if len(history) < n_startup:
+                n = min(n, n_startup - len(history))
+                candidates = [sampler.sample_prior() for _ in range(n)]
+            else:
+                candidates = sampler.suggest(history, n)
+
+            evaluated, stopped = await self._search(strategy, candidates, config, backtest_config)
+            for k, score, backtest_result in evaluated:
+                history.append((candidates[k], score))
+                if backtest_result is None:
+                    continue
+                results.append({
+                    "params": candidates[k],
+                    "score": score,
+                    "metrics": backtest_result.metrics.model_dump() if backtest_result.metrics else {},
+                    "round": round_index,
+                })
+
+                if score > best_score:
+                    best_score = score
+                    best_params = candidates[k]
+
+            if stopped:
+                break
+            round_index += 1
+
+        return OptimizationResult(
+            strategy_id=strategy.strategy_id,
+            method=OptimizeMethod.BAYESIAN,
+            best_params=best_params,
+            best_score=best_score,
+            all_results=results,
+            duration_ms=0,
+        )
+
+    async def _successive_halving(
+        self,
+        strategy: Strategy,
+        config: OptimizationConfig,
+        backtest_config: BacktestConfig,
+    ) -> OptimizationResult:
+        """Successive halving over backtest window length.
+
+        ``max_iterations`` random candidates are backtested on the most
+        recent ``min_budget`` share of the period; the best 1/``eta`` move
+        on to an ``eta`` times longer window, until the survivors run on
+        the full period. Only full-period scores compete for the best.
+        """
+        if config.seed:
+            random.seed(config.seed)
+            np.random.seed(config.seed)
+
+        candidates = [
+            self._sample_params(config.parameters)
+            for _ in range(config.max_iterations)
+        ]
+        budgets = halving_budgets(config.eta, config.min_budget)
+        results, _ = await self._run_bracket(
+            strategy, candidates, budgets, config, backtest_config, bracket=0,
+        )
+        best_params, best_score = self._best_full_budget(results)
+
+        return OptimizationResult(
+            strategy_id=strategy.strategy_id,
+            method=OptimizeMethod.SUCCESSIVE_HALVING,
+            best_params=best_params,
+            best_score=best_score,
+            all_results=results,
+            duration_ms=0,
+        )
+
+    async def _hyperband(
+        self,
+        strategy: Strategy,
+        config: OptimizationConfig,
+        backtest_config: BacktestConfig,
+    ) -> OptimizationResult:
+        """Hyperband: successive halving brackets from aggressive to none.
+
+        Each bracket trades candidate count against the starting window
+        length; brackets repeat until ``max_iterations`` candidates have
+        been sampled.
+        """
+        if config.seed:
+            random.seed(config.seed)
+            np.random.seed(config.seed)
+
+        brackets = hyperband_brackets(config.eta, config.min_budget)
+        results = []
+        sampled = 0
+        stopped = False
+
+        while sampled < config.max_iterations and not stopped:
+            for bracket, (n, budgets) in enumerate(brackets):
+                n = min(n, config.max_iterations - sampled)
+                if n <= 0:
+                    break
+                candidates = [self._sample_params(config.parameters) for _ in range(n)]
+                sampled += n
+                records, stopped = await self._run_bracket(
+                    strategy, candidates, budgets, config, backtest_config, bracket=bracket,
+                )
+                results.extend(records)
+                if stopped:
+                    break
+
+        best_params, best_score = self._best_full_budget(results)
+
+        return OptimizationResult(
+            strategy_id=strategy.strategy_id,
+            method=OptimizeMethod.HYPERBAND,
+            best_params=best_params,
+            best_score=best_score,
+            all_results=results,
+            duration_ms=0,
+        )
+
+    async def _run_bracket(
+        self,
+        strategy: Strategy,
+        candidates: list[dict[str, Any]],
+        budgets: list[float],
+        config: OptimizationConfig,
+        backtest_config: BacktestConfig,
+        bracket: int,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """One successive halving run over increasing budgets.
+
+        Returns:
+            Result records tagged with budget, rung and bracket, and whether
+            the target score was reached on the full period.
+        """
+        results = []
+        alive = list(candidates)
+
+        for rung, budget in enumerate(budgets):
+            full = budget >= 1.0
+            window = self._budget_config(backtest_config, budget)
+            evaluated, stopped = await self._search(
+                strategy, alive, config, window, early_stop=full,
+            )
+
+            for k, score, backtest_result in evaluated:
+                if backtest_result is None:
+                    continue
+                results.append({
+                    "params": alive[k],
+                    "score": score,
+                    "metrics": backtest_result.metrics.model_dump() if backtest_result.metrics else {},
+                    "budget": budget,
+                    "rung": rung,
+                    "bracket": bracket,
+                })
+
+            if stopped or full:
+                return results, stopped
+
+            ranked = sorted(evaluated, key=lambda x: (-x[1], x[0]))
+            keep = max(1, len(alive) // config.eta)
+            alive = [alive[k] for k, _, _ in ranked[:keep]]
+            logger.info(
+                f"Bracket {bracket} rung {rung}: promoting {len(alive)} candidates "
+                f"to budget {budgets[rung + 1]:.3f}"
+            )
+
+        return results, False
+
+    def _budget_config(
+        self,
+        backtest_config: BacktestConfig,
+        budget: float,
+    ) -> BacktestConfig:
+        """Backtest config restricted to the most recent ``budget`` share of the period."""
+        if budget >= 1.0:
+            return backtest_config
+        span = backtest_config.end_date - backtest_config.start_date
+        return backtest_config.model_copy(update={
+            "start_date": backtest_config.end_date - span * budget,
+        })
+
+    def _best_full_budget(
+        self,
+        results: list[dict[str, Any]],
+    ) -> tuple[dict[str, Any], float]:
+        """Best parameters and score among full-period evaluations."""
+        best_score = float("-inf")
+        best_params = {}
+        for record in results:
+            if record["budget"] >= 1.0 and record["score"] > best_score:
+                best_score = record["score"]
+                best_params = record["params"]
+        return best_params, best_score
+
+    async def _search(
+        self,
+        strategy: Strategy,
+        candidates: list[dict[str, Any]],
+        config: OptimizationConfig,
+        backtest_config: BacktestConfig,
+        early_stop: bool = True,
+    ) -> tuple[list[tuple[int, float, BacktestResult | None]], bool]:
+        """Score candidate parameter sets.
+
+        Unless ``early_stop`` is False, stops as soon as a score reaches
+        ``config.target_score``; candidates not yet evaluated at that point
+        are dropped.
+
+        Returns:
+            (candidate index, score, result) in completion order, with a
+            None result for failed backtests, and whether the search
+            stopped early.
+        """
+        evaluated: list[tuple[int, float, BacktestResult | None]] = []
+
+        async with aclosing(self._evaluate(strategy, candidates, backtest_config)) as stream:
+            async for k, backtest_result, error in stream:
+                if error is not None:
+                    logger.warning(f"Backtest failed for params {candidates[k]}: {error}")
+                    evaluated.append((k, float("-inf"), None))
+                    continue
+
+                score = self._get_objective_score(backtest_result, config.objective)
+                evaluated.append((k, score, backtest_result))
+
+                if len(evaluated) % 10 == 0:
+                    logger.info(f"Optimization progress: {len(evaluated)}/{len(candidates)}")
+
+                if early_stop and config.target_score is not None and score >= config.target_score:
+                    logger.info(
+                        f"Target {config.objective}={config.target_score} reached after "
+                        f"{len(evaluated)}/{len(candidates)} candidates"
+                    )
+                    return evaluated, True
+
+        return evaluated, False
+
+    async def _evaluate(
+        self,
+        strategy: Strategy,
+        candidates: list[dict[str, Any]],
+        backtest_config: BacktestConfig,
+    ) -> AsyncIterator[tuple[int, BacktestResult | None, BaseException | None]]:
+        """Backtest candidates, yielding (index, result, error) as each finishes.
+
+        Uses the parallel evaluator when one is set, otherwise awaits the
+        backtest function one candidate at a time.
+        """
+        strategies = [self._candidate_strategy(strategy, params) for params in candidates]
+
+        if self._evaluator is not None:
+            jobs = [(test_strategy, backtest_config) for test_strategy in strategies]
+            async with aclosing(self._evaluator.evaluate(jobs)) as stream:
+                async for k, outcome in stream:
+                    if isinstance(outcome, BaseException):
+                        yield k, None, outcome
+                    else:
+                        yield k, outcome, None
+            return
+
+        for k, test_strategy in enumerate(strategies):
+            try:
+                backtest_result = await self._run_backtest(test_strategy, backtest_config)
+            except Exception as e:
+                yield k, None, e
+            else:
+                yield k, backtest_result, None
+
+    def _collect(
+        self,
+        candidates: list[dict[str, Any]],
+        evaluated: list[tuple[int, float, BacktestResult | None]],
+    ) -> tuple[list[dict[str, Any]], dict[str, Any], float]:
+        """Result records, best parameters and best score of a search."""
+        results = []
+        best_score = float("-inf")
+        best_params = {}
+
+        for k, score, backtest_result in evaluated:
+            if backtest_result is None:
+                continue
+            results.append({
+                "params": candidates[k],
+                "score": score,
+                "metrics": backtest_result.metrics.model_dump() if backtest_result.metrics else {},
+            })
+
+            if score > best_score:
+                best_score = score
+                best_params = candidates[k]
+
+        return results, best_params, best_score
+
+    def _candidate_strategy(
+        self,
+        strategy: Strategy,
+        params: dict[str, Any],
+    ) -> Strategy:
+        """Copy of the strategy with candidate parameters applied.
+
+        Parameters named after a Strategy field (e.g. ``max_positions`` or
+        ``rebalance_freq``) also set that field.
+        """
+        fields = {
+            name: value for name, value in params.items()
+            if name in Strategy.model_fields and name not in _FIXED_STRATEGY_FIELDS
+        }
+        return strategy.model_copy(update={
+            **fields,
+            "parameters": {**strategy.parameters, **params},
+        })
+
     async def _run_backtest(
         self,
         strategy: Strategy,
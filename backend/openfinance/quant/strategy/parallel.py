@@ -0,0 +1,110 @@
+"""
+Parallel Candidate Evaluation for Strategy Optimization.
+
+``ParallelEvaluator`` puts a ``MarketPanel`` into shared memory once and
+backtests candidate strategies on a process pool with
+``BacktestEngine.run_panel``. Workers map the shared panel at start-up, so
+the pool holds a single copy of the market data however many workers it
+has; each task ships only the candidate strategy and config, and returns
+the result without its daily records.
+"""
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+
+from openfinance.domain.models.quant import BacktestConfig, BacktestResult, Strategy
+from openfinance.quant.backtest.engine import BacktestEngine
+from openfinance.quant.backtest.panel import MarketPanel, SharedMarketPanel, SharedPanelHandle
+
+logger = logging.getLogger(__name__)
+
+_worker_panel: SharedMarketPanel | None = None
+_worker_engine: BacktestEngine | None = None
+
+
+def _init_worker(handle: SharedPanelHandle) -> None:
+    global _worker_panel, _worker_engine
+    _worker_panel = SharedMarketPanel.attach(handle)
+    _worker_engine = BacktestEngine()
+
+
+def _run_candidate(strategy: Strategy, config: BacktestConfig) -> BacktestResult:
+    result = _worker_engine.run_panel(strategy, config, _worker_panel.panel)
+    return result.model_copy(update={"equity_curve": [], "positions": [], "trades": []})
+
+
+class ParallelEvaluator:
+    """
+    Backtests candidates on a process pool over one shared market panel.
+
+    The pool and shared memory are created on first use and kept until
+    ``close``, so successive batches (e.g. genetic generations) reuse the
+    same workers. Use as a context manager or call ``close`` explicitly.
+    """
+
+    def __init__(self, panel: MarketPanel, n_jobs: int | None = None):
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self._panel: MarketPanel | None = panel
+        self._shared: SharedMarketPanel | None = None
+        self._pool: ProcessPoolExecutor | None = None
+
+    def start(self) -> None:
+        """Share the panel and start the workers."""
+        if self._pool is not None:
+            return
+        if self._panel is None:
+            raise RuntimeError("ParallelEvaluator is closed")
+        self._shared = SharedMarketPanel(self._panel)
+        self._panel = None
+        logger.info(
+            f"Shared market panel: {self._shared.nbytes / 1e6:.1f} MB, {self.n_jobs} workers"
+        )
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.n_jobs,
+            initializer=_init_worker,
+            initargs=(self._shared.handle,),
+        )
+
+    async def evaluate(
+        self,
+        candidates: Sequence[tuple[Strategy, BacktestConfig]],
+    ) -> AsyncIterator[tuple[int, BacktestResult | BaseException]]:
+        """Backtest candidates, yielding (index, result or error) as each finishes.
+
+        Closing the generator early (e.g. on reaching a target score)
+        cancels every candidate that has not started.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        futures = {
+            asyncio.wrap_future(self._pool.submit(_run_candidate, strategy, config), loop=loop): k
+            for k, (strategy, config) in enumerate(candidates)
+        }
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    yield futures[future], error if error is not None else future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        """Stop the workers and free the shared panel."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self) -> "ParallelEvaluator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,209 @@
+"""
+Sample-Efficient Search Helpers for Strategy Optimization.
+
+- ``TPESampler``: Tree-structured Parzen Estimator. Observed candidates are
+  split into a good set (top ``gamma`` by score) and the rest; each
+  parameter gets a Parzen density for both sets, and new candidates are the
+  draws from the good density with the highest good/bad density ratio.
+- ``halving_budgets`` / ``hyperband_brackets``: budget schedules for
+  successive halving and Hyperband, as fractions of the full backtest
+  window.
+
+Parameter specs use the optimizer's format: ``{"values": [...]}`` for
+categorical choices, ``{"min", "max"}`` with optional ``"step"`` and
+``"type": "int"`` for numeric ranges, otherwise ``"default"``.
+"""
+
+import math
+from typing import Any
+
+import numpy as np
+
+EPS = 1e-12
+
+
+def halving_budgets(eta: int, min_budget: float) -> list[float]:
+    """Rung budgets from ``min_budget`` up to the full window, growing by ``eta``."""
+    s_max = max(0, int(math.floor(math.log(1.0 / min_budget, eta) + 1e-9)))
+    return [float(eta) ** (k - s_max) for k in range(s_max + 1)]
+
+
+def hyperband_brackets(eta: int, min_budget: float) -> list[tuple[int, list[float]]]:
+    """(candidate count, rung budgets) per Hyperband bracket, most aggressive first."""
+    s_max = len(halving_budgets(eta, min_budget)) - 1
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        brackets.append((n, [float(eta) ** (k - s) for k in range(s + 1)]))
+    return brackets
+
+
+class TPESampler:
+    """
+    Tree-structured Parzen Estimator over the optimizer's parameter specs.
+
+    Parameters are modelled independently: numeric ones with a mixture of
+    Gaussians centred on the observed values (bandwidth from neighbour
+    spacing, plus a wide prior component), categorical ones with smoothed
+    frequencies.
+    """
+
+    def __init__(
+        self,
+        params: dict[str, dict[str, Any]],
+        gamma: float = 0.25,
+        n_candidates: int = 24,
+        rng: np.random.Generator | None = None,
+    ):
+        self.params = params
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.rng = rng or np.random.default_rng()
+
+    def sample_prior(self) -> dict[str, Any]:
+        """Uniform draw from the parameter space."""
+        sampled = {}
+        for name, spec in self.params.items():
+            if "values" in spec:
+                sampled[name] = spec["values"][self.rng.integers(len(spec["values"]))]
+            elif "min" in spec and "max" in spec:
+                sampled[name] = self._cast(spec, self.rng.uniform(spec["min"], spec["max"]))
+            else:
+                sampled[name] = spec.get("default")
+        return sampled
+
+    def suggest(
+        self,
+        history: list[tuple[dict[str, Any], float]],
+        n: int = 1,
+    ) -> list[dict[str, Any]]:
+        """Propose ``n`` new candidates given (params, score) observations.
+
+        Higher scores are better; non-finite scores count as bad. Candidates
+        already observed are skipped when the space allows it.
+        """
+        if not history:
+            return [self.sample_prior() for _ in range(n)]
+
+        scores = np.array([score for _, score in history], dtype=float)
+        scores = np.where(np.isfinite(scores), scores, -np.inf)
+        order = np.argsort(-scores, kind="stable")
+        n_good = max(1, int(math.ceil(self.gamma * len(history))))
+        good = [history[i][0] for i in order[:n_good]]
+        bad = [history[i][0] for i in order[n_good:]] or good
+
+        pool = self.n_candidates * n
+        draws: dict[str, list[Any]] = {}
+        log_ratio = np.zeros(pool)
+        for name, spec in self.params.items():
+            if "values" in spec:
+                values, ratio = self._categorical(spec, [p[name] for p in good], [p[name] for p in bad], pool)
+            elif "min" in spec and "max" in spec:
+                values, ratio = self._numeric(spec, [p[name] for p in good], [p[name] for p in bad], pool)
+            else:
+                values, ratio = [spec.get("default")] * pool, np.zeros(pool)
+            draws[name] = values
+            log_ratio += ratio
+
+        seen = {self._key(params) for params, _ in history}
+        chosen = []
+        for i in np.argsort(-log_ratio, kind="stable"):
+            params = {name: draws[name][i] for name in self.params}
+            key = self._key(params)
+            if key in seen:
+                continue
+            seen.add(key)
+            chosen.append(params)
+            if len(chosen) == n:
+                break
+        while len(chosen) < n:
+            chosen.append(self.sample_prior())
+        return chosen
+
+    def _categorical(
+        self,
+        spec: dict[str, Any],
+        good: list[Any],
+        bad: list[Any],
+        pool: int,
+    ) -> tuple[list[Any], np.ndarray]:
+        choices = spec["values"]
+        index = {self._key(v): j for j, v in enumerate(choices)}
+
+        def weights(observed):
+            counts = np.ones(len(choices))
+            for v in observed:
+                j = index.get(self._key(v))
+                if j is not None:
+                    counts[j] += 1
+            return counts / counts.sum()
+
+        good_probs, bad_probs = weights(good), weights(bad)
+        picks = self.rng.choice(len(choices), size=pool, p=good_probs)
+        return [choices[j] for j in picks], np.log(good_probs[picks]) - np.log(bad_probs[picks])
+
+    def _numeric(
+        self,
+        spec: dict[str, Any],
+        good: list[Any],
+        bad: list[Any],
+        pool: int,
+    ) -> tuple[list[Any], np.ndarray]:
+        low, high = float(spec["min"]), float(spec["max"])
+        good_mix = self._parzen(np.asarray(good, dtype=float), low, high)
+        bad_mix = self._parzen(np.asarray(bad, dtype=float), low, high)
+
+        mus, sigmas, w = good_mix
+        component = self.rng.choice(len(mus), size=pool, p=w)
+        x = self.rng.normal(mus[component], sigmas[component])
+        outside = (x < low) | (x > high)
+        for _ in range(10):
+            if not outside.any():
+                break
+            x[outside] = self.rng.normal(mus[component[outside]], sigmas[component[outside]])
+            outside = (x < low) | (x > high)
+        x = np.clip(x, low, high)
+
+        values = [self._cast(spec, v) for v in x.tolist()]
+        x = np.asarray(values, dtype=float)
+        return values, np.log(self._density(x, *good_mix)) - np.log(self._density(x, *bad_mix))
+
+    @staticmethod
+    def _parzen(
+        points: np.ndarray,
+        low: float,
+        high: float,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Mixture of the observations and a wide prior centred on the range."""
+        width = max(high - low, EPS)
+        mus = np.append(np.sort(points), 0.5 * (low + high))
+        if len(points):
+            edges = np.concatenate([[low], mus[:-1], [high]])
+            sigmas = np.maximum(edges[1:-1] - edges[:-2], edges[2:] - edges[1:-1])
+            sigmas = np.clip(sigmas, width / min(100.0, len(points) + 1), width)
+        else:
+            sigmas = np.array([])
+        sigmas = np.append(sigmas, width)
+        weights = np.full(len(mus), 1.0 / len(mus))
+        return mus, sigmas, weights
+
+    @staticmethod
+    def _density(x: np.ndarray, mus: np.ndarray, sigmas: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        z = (x[:, None] - mus[None, :]) / sigmas[None, :]
+        pdf = np.exp(-0.5 * z * z) / (sigmas[None, :] * math.sqrt(2 * math.pi))
+        return pdf @ weights + EPS
+
+    @staticmethod
+    def _cast(spec: dict[str, Any], value: float) -> Any:
+        low, high = spec["min"], spec["max"]
+        if "step" in spec:
+            step = spec["step"]
+            value = low + round((value - low) / step) * step
+            value = min(max(value, low), high)
+        if spec.get("type") == "int":
+            return int(round(value))
+        return float(value)
+
+    @staticmethod
+    def _key(value: Any) -> str:
+        return repr(value)
@@ -0,0 +1,114 @@
+"""
+Strategy Optimizer Tests.
+
+Parallel evaluation must score candidates exactly like an in-process panel
+backtest, and searches must stop once the target score is reached.
+"""
+
+import asyncio
+import unittest
+
+from openfinance.domain.models.quant import OptimizationConfig, OptimizeMethod
+from openfinance.quant.backtest.engine import BacktestEngine
+from openfinance.quant.backtest.panel import MarketPanel
+from openfinance.quant.backtest.tests.test_simulation import (
+    _config,
+    _factor_values,
+    _price_frame,
+    _strategy,
+)
+from openfinance.quant.strategy.optimizer import StrategyOptimizer
+from openfinance.quant.strategy.parallel import ParallelEvaluator
+
+
+def _grid(method=OptimizeMethod.GRID_SEARCH, **kwargs):
+    return OptimizationConfig(
+        method=method,
+        parameters={
+            "max_positions": {"values": [3, 5, 8]},
+            "rebalance_freq": {"values": ["weekly", "monthly"]},
+        },
+        **kwargs,
+    )
+
+
+class TestSequentialSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.seen = []
+
+        async def backtest(strategy, config):
+            self.seen.append(strategy)
+            result = BacktestEngine().run_panel(strategy, config, self.panel)
+            return result
+
+        frame = _price_frame(n_dates=50, n_stocks=20, seed=4)
+        self.panel = MarketPanel.from_frame(frame, _factor_values(frame, weekdays=5))
+        self.optimizer = StrategyOptimizer(backtest)
+
+    def test_candidates_set_strategy_fields(self):
+        strategy = _strategy("daily")
+        result = asyncio.run(self.optimizer.optimize(strategy, _grid(), _config()))
+        self.assertEqual(len(result.all_results), 6)
+        self.assertEqual(
+            [(s.max_positions, s.rebalance_freq) for s in self.seen],
+            [(3, "weekly"), (3, "monthly"), (5, "weekly"), (5, "monthly"), (8, "weekly"), (8, "monthly")],
+        )
+        self.assertEqual(strategy.parameters, {})
+        self.assertEqual(strategy.max_positions, 10)
+        best = max(result.all_results, key=lambda r: r["score"])
+        self.assertEqual(result.best_params, best["params"])
+
+    def test_stops_at_target_score(self):
+        scores = asyncio.run(self.optimizer.optimize(_strategy("daily"), _grid(), _config()))
+        target = sorted(r["score"] for r in scores.all_results)[-2]
+        self.seen.clear()
+
+        result = asyncio.run(self.optimizer.optimize(
+            _strategy("daily"), _grid(target_score=target), _config(),
+        ))
+        self.assertGreaterEqual(result.all_results[-1]["score"], target)
+        self.assertLess(len(self.seen), 6)
+        self.assertEqual(len(result.all_results), len(self.seen))
+
+
+class TestParallelEvaluator(unittest.TestCase):
+
+    def test_matches_in_process_scores(self):
+        frame = _price_frame(n_dates=60, n_stocks=30, seed=6)
+        panel = MarketPanel.from_frame(frame, _factor_values(frame, weekdays=5))
+
+        async def backtest(strategy, config):
+            return BacktestEngine().run_panel(strategy, config, panel)
+
+        expected = asyncio.run(StrategyOptimizer(backtest).optimize(
+            _strategy("daily"), _grid(), _config(),
+        ))
+
+        with ParallelEvaluator(panel, n_jobs=2) as evaluator:
+            optimizer = StrategyOptimizer(evaluator=evaluator)
+            result = asyncio.run(optimizer.optimize(_strategy("daily"), _grid(), _config()))
+            genetic = asyncio.run(optimizer.optimize(
+                _strategy("daily"),
+                _grid(method=OptimizeMethod.GENETIC, max_iterations=8, seed=1),
+                _config(),
+            ))
+            bayesian = asyncio.run(optimizer.optimize(
+                _strategy("daily"),
+                _grid(method=OptimizeMethod.BAYESIAN, max_iterations=8, seed=2),
+                _config(),
+            ))
+
+        def by_params(r):
+            return {tuple(sorted(x["params"].items())): x["score"] for x in r.all_results}
+
+        self.assertEqual(by_params(result), by_params(expected))
+        self.assertEqual(result.best_score, expected.best_score)
+        self.assertEqual(len(genetic.all_results), 8)
+        self.assertEqual(len(bayesian.all_results), 8)
+        self.assertEqual(sorted({r["round"] for r in bayesian.all_results}), [0, 1, 2, 3, 4])
+        self.assertIsNone(evaluator._shared)
+
+
+if __name__ == "__main__":
+    unittest.main()
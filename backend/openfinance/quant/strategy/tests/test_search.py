@@ -0,0 +1,140 @@
+"""
+Search Strategy Tests.
+
+Covers the TPE sampler, the halving schedules, and the Bayesian, successive
+halving and Hyperband optimizer methods on a synthetic objective.
+"""
+
+import asyncio
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from openfinance.domain.models.quant import (
+    BacktestConfig,
+    BacktestResult,
+    OptimizationConfig,
+    OptimizeMethod,
+    PerformanceMetrics,
+    Strategy,
+    StrategyType,
+)
+from openfinance.quant.strategy.optimizer import StrategyOptimizer
+from openfinance.quant.strategy.search import TPESampler, halving_budgets, hyperband_brackets
+
+PARAMS = {
+    "x": {"min": 0, "max": 30, "type": "int"},
+    "y": {"min": 0.0, "max": 1.0},
+    "z": {"min": 0.0, "max": 1.0, "step": 0.25},
+    "c": {"values": ["a", "b", "c"]},
+}
+
+
+def _objective(params):
+    return -((params["x"] - 7) / 10) ** 2 - (params["y"] - 0.3) ** 2 - (0.0 if params["c"] == "b" else 0.2)
+
+
+class SyntheticBacktest:
+    """Scores candidates by a known objective; shorter windows are biased."""
+
+    def __init__(self):
+        self.windows = []
+
+    async def __call__(self, strategy, config):
+        years = (config.end_date - config.start_date).days / 365.25
+        self.windows.append(years)
+        score = _objective(strategy.parameters) - 0.01 / years
+        return BacktestResult(
+            backtest_id="bt", strategy_id=strategy.strategy_id, config=config,
+            start_date=config.start_date, end_date=config.end_date, duration_ms=0,
+            metrics=PerformanceMetrics(sharpe_ratio=score),
+        )
+
+
+def _optimize(method, max_iterations, seed=1, **kwargs):
+    backtest = SyntheticBacktest()
+    result = asyncio.run(StrategyOptimizer(backtest).optimize(
+        Strategy(name="s", code="s", strategy_type=StrategyType.SINGLE_FACTOR),
+        OptimizationConfig(method=method, parameters=PARAMS, max_iterations=max_iterations, seed=seed, **kwargs),
+        BacktestConfig(strategy_id="s", start_date=datetime(2015, 1, 1), end_date=datetime(2024, 12, 31)),
+    ))
+    return result, backtest
+
+
+class TestSchedules(unittest.TestCase):
+
+    def test_budgets(self):
+        np.testing.assert_allclose(halving_budgets(3, 1 / 9), [1 / 9, 1 / 3, 1])
+        self.assertEqual(halving_budgets(3, 1.0), [1.0])
+        brackets = hyperband_brackets(3, 1 / 9)
+        self.assertEqual([n for n, _ in brackets], [9, 5, 3])
+        self.assertEqual([len(b) for _, b in brackets], [3, 2, 1])
+
+
+class TestTPESampler(unittest.TestCase):
+
+    def test_prior_respects_specs(self):
+        sampler = TPESampler(PARAMS, rng=np.random.default_rng(0))
+        for params in [sampler.sample_prior() for _ in range(50)]:
+            self.assertIsInstance(params["x"], int)
+            self.assertTrue(0 <= params["x"] <= 30)
+            self.assertIn(params["z"], (0.0, 0.25, 0.5, 0.75, 1.0))
+            self.assertIn(params["c"], ("a", "b", "c"))
+
+    def test_suggestions_concentrate_on_good_region(self):
+        sampler = TPESampler(PARAMS, rng=np.random.default_rng(0))
+        history = [(p, _objective(p)) for p in (sampler.sample_prior() for _ in range(40))]
+        suggested = sampler.suggest(history, n=20)
+        prior = [sampler.sample_prior() for _ in range(20)]
+
+        self.assertGreater(np.mean([_objective(p) for p in suggested]), np.mean([_objective(p) for p in prior]))
+        keys = {repr(p) for p, _ in history}
+        self.assertTrue(all(repr(p) not in keys for p in suggested))
+        self.assertEqual(len({repr(p) for p in suggested}), 20)
+
+
+class TestOptimizerMethods(unittest.TestCase):
+
+    def test_bayesian_beats_random_search(self):
+        gaps = {}
+        for method in (OptimizeMethod.RANDOM_SEARCH, OptimizeMethod.BAYESIAN):
+            gaps[method] = np.mean([
+                _objective(_optimize(method, 30, seed=seed)[0].best_params) for seed in range(1, 6)
+            ])
+        self.assertGreater(gaps[OptimizeMethod.BAYESIAN], gaps[OptimizeMethod.RANDOM_SEARCH])
+
+        result, backtest = _optimize(OptimizeMethod.BAYESIAN, 12)
+        self.assertEqual(result.method, OptimizeMethod.BAYESIAN)
+        self.assertEqual(len(result.all_results), 12)
+        self.assertEqual(len(backtest.windows), 12)
+
+    def test_successive_halving_promotes_best_to_full_period(self):
+        result, backtest = _optimize(OptimizeMethod.SUCCESSIVE_HALVING, 27)
+        rungs = [[r for r in result.all_results if r["rung"] == k] for k in range(3)]
+        self.assertEqual([len(r) for r in rungs], [27, 9, 3])
+        np.testing.assert_allclose(sorted(set(np.round(backtest.windows, 2))), [1.11, 3.33, 10.0], atol=0.01)
+
+        promoted = sorted(rungs[0], key=lambda r: -r["score"])[:9]
+        self.assertEqual(
+            sorted(repr(r["params"]) for r in rungs[1]),
+            sorted(repr(r["params"]) for r in promoted),
+        )
+        best = max(rungs[2], key=lambda r: r["score"])
+        self.assertEqual(result.best_params, best["params"])
+        self.assertEqual(result.best_score, best["score"])
+
+    def test_hyperband_and_target_score(self):
+        result, backtest = _optimize(OptimizeMethod.HYPERBAND, 17)
+        self.assertEqual(sorted({r["bracket"] for r in result.all_results}), [0, 1, 2])
+        self.assertEqual(sum(1 for r in result.all_results if r["rung"] == 0), 17)
+        self.assertTrue(all(r["budget"] == 1.0 for r in result.all_results if r["bracket"] == 2))
+
+        full = max(r["score"] for r in result.all_results if r["budget"] == 1.0)
+        stopped, _ = _optimize(OptimizeMethod.HYPERBAND, 17, target_score=full - 1.0)
+        self.assertLess(len(stopped.all_results), len(result.all_results))
+        self.assertEqual(stopped.all_results[-1]["budget"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -125,10 +125,16 @@ CREATE TABLE IF NOT EXISTS openfinance.factor_data (
     factor_rank INTEGER,
     factor_percentile DECIMAL(8,4),
     neutralized BOOLEAN DEFAULT FALSE,
+    factor_zscore DECIMAL(12,6),
+    factor_neutralized DECIMAL(20,8),
     collected_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     CONSTRAINT uq_factor_code_date UNIQUE (factor_id, code, trade_date)
 );
 
+-- Cross-sectional post-processing columns for tables created before they existed
+ALTER TABLE openfinance.factor_data ADD COLUMN IF NOT EXISTS factor_zscore DECIMAL(12,6);
+ALTER TABLE openfinance.factor_data ADD COLUMN IF NOT EXISTS factor_neutralized DECIMAL(20,8);
+
 -- Entities Table (Knowledge Graph)
 CREATE TABLE IF NOT EXISTS openfinance.entities (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),